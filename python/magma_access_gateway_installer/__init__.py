@@ -4,6 +4,7 @@
 
 import argparse
 import logging
+import os
 import sys
 from ipaddress import ip_address, ip_network
 
@@ -15,11 +16,31 @@ except ModuleNotFoundError:
     sys.tracebacklimit = None  # type: ignore[assignment]
     raise Exception("systemd module not found! Make sure you're using Ubuntu 20.04!")
 
-from .agw_installation_errors import AGWInstallationError, ArgumentError
+from .agw_dkms_module_cache import AGWInstallerDKMSModuleCache
+from .agw_event_stream import AGWInstallerEventStream
+from .agw_host_performance_tuner import AGWInstallerHostPerformanceTuner
+from .agw_installation_errors import (
+    AGWInstallationError,
+    ArgumentError,
+    InterfaceActivationError,
+    InvalidUserError,
+    ResourceControlProfileError,
+)
 from .agw_installer import AGWInstaller
+from .agw_interface_activator import AGWInstallerInterfaceActivator
+from .agw_interface_selector import AGWInstallerInterfaceSelector
 from .agw_network_configurator import AGWInstallerNetworkConfigurator
+from .agw_nic_tuner import AGWInstallerNICTuner
+from .agw_offline_bundle import AGWInstallerOfflineBundle
+from .agw_ovs_tuner import AGWInstallerOVSTuner
+from .agw_package_downloader import AGWInstallerPackageDownloader
+from .agw_pipelined_profile import AGWPipelinedPerformanceProfile
 from .agw_preinstall import AGWInstallerPreinstall
+from .agw_redis_tuner import AGWInstallerRedisTuner
+from .agw_resource_control_tuner import AGWInstallerResourceControlTuner
 from .agw_service_user_creator import AGWInstallerServiceUserCreator
+from .agw_step_executor import AGWInstallerStepExecutor
+from .agw_sysctl_tuner import AGWInstallerSysctlTuner
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -40,20 +61,201 @@ def main():
         preinstall.preinstall_checks()
         args = cli_arguments_parser(sys.argv[1:])
         validate_args(args)
+        event_stream = open_event_stream(args)
     except AGWInstallationError:
         return
 
-    preinstall.install_required_system_packages()
+    if args.preview_performance_profile:
+        preview_performance_profile(args)
+        return
 
-    service_user_creator = AGWInstallerServiceUserCreator()
-    service_user_creator.create_magma_user()
-    service_user_creator.add_magma_user_to_sudo_group()
-    service_user_creator.add_magma_user_to_sudoers_file()
+    event_stream.emit("install_start", magma_version=AGWInstaller.MAGMA_VERSION)
+    try:
+        if not args.skip_hardware_checks:
+            with event_stream.step("hardware_checks"):
+                preinstall.hardware_checks(args.hardware_requirements)
+        with event_stream.step("configure_offline_bundle"):
+            offline_bundle = configure_offline_bundle(args)
+    except AGWInstallationError:
+        event_stream.emit("install_end", status="failed")
+        return
+
+    try:
+        with event_stream.step("select_mirrors"):
+            package_downloader = configure_package_downloader(args)
+        AGWInstaller(
+            offline_bundle,
+            package_downloader,
+            event_stream,
+            args.max_parallel_steps,
+            configure_dkms_module_cache(args),
+            args.magma_apt_key_fingerprint,
+        ).install(
+            args.unblock_local_ips,
+            args.no_reboot,
+            args.performance_profile,
+            args.always_reboot,
+            get_prerequisite_steps(args, preinstall),
+            configure_ovs_tuner(args),
+        )
+    except AGWInstallationError:
+        event_stream.emit("install_end", status="failed")
+        return
+    event_stream.emit("install_end", status="succeeded")
+
+
+def preview_performance_profile(args: argparse.Namespace):
+    """Logs changes which requested pipelined performance profile would introduce."""
+    try:
+        AGWInstaller().preview_pipelined_performance_profile(args.performance_profile)
+    except AGWInstallationError:
+        return
+
+
+def bundle():
+    args = bundle_arguments_parser(sys.argv[1:])
+    try:
+        if os.geteuid() != 0:
+            raise InvalidUserError()
+        AGWInstaller(
+            magma_apt_key_fingerprint=args.magma_apt_key_fingerprint
+        ).configure_apt_for_magma_agw_deb_package_installation()
+        offline_bundle = AGWInstallerOfflineBundle(args.output)
+        offline_bundle.build(
+            AGWInstaller.MAGMA_VERSION, get_offline_bundle_packages(), args.signing_key
+        )
+    except AGWInstallationError:
+        return
+
+
+def bundle_arguments_parser(cli_arguments: list) -> argparse.Namespace:
+    cli_options = argparse.ArgumentParser()
+    cli_options.add_argument(
+        "--output",
+        dest="output",
+        required=False,
+        default=f"magma-agw-bundle-{AGWInstaller.MAGMA_VERSION}.tar.gz",
+        help="Path of the offline installation bundle to write.",
+    )
+    cli_options.add_argument(
+        "--signing-key",
+        dest="signing_key",
+        required=False,
+        help="GPG key from the local keyring used to sign bundle's apt repository. "
+        "If not given, an ephemeral key is generated.",
+    )
+    cli_options.add_argument(
+        "--magma-apt-key-fingerprint",
+        dest="magma_apt_key_fingerprint",
+        required=False,
+        help="Out of band verified fingerprint of Magma apt signing key. "
+        "Overrides the fingerprint pinned in the snap.",
+    )
+    return cli_options.parse_args(cli_arguments)
+
+
+def build_dkms_module_cache():
+    args = build_dkms_module_cache_arguments_parser(sys.argv[1:])
+    try:
+        if os.geteuid() != 0:
+            raise InvalidUserError()
+        AGWInstaller(
+            magma_apt_key_fingerprint=args.magma_apt_key_fingerprint
+        ).configure_apt_for_magma_agw_deb_package_installation()
+        AGWInstaller.update_apt_cache()
+        dkms_module_cache = AGWInstallerDKMSModuleCache(args.output)
+        dkms_module_cache.install_package()
+        cache_files = dkms_module_cache.populate(args.kernels)
+        logger.info(f"Prebuilt Open vSwitch modules written: {', '.join(cache_files)}.")
+    except AGWInstallationError:
+        return
+
+
+def build_dkms_module_cache_arguments_parser(cli_arguments: list) -> argparse.Namespace:
+    cli_options = argparse.ArgumentParser()
+    cli_options.add_argument(
+        "--output",
+        dest="output",
+        required=False,
+        default="magma-agw-dkms-module-cache",
+        help="Directory to write prebuilt Open vSwitch modules to.",
+    )
+    cli_options.add_argument(
+        "--kernels",
+        dest="kernels",
+        nargs="+",
+        required=False,
+        default=[os.uname().release],
+        help="Space separated list of kernel releases to build the module for. "
+        "Headers of each kernel must be installed. Defaults to the running kernel.",
+    )
+    cli_options.add_argument(
+        "--magma-apt-key-fingerprint",
+        dest="magma_apt_key_fingerprint",
+        required=False,
+        help="Out of band verified fingerprint of Magma apt signing key. "
+        "Overrides the fingerprint pinned in the snap.",
+    )
+    return cli_options.parse_args(cli_arguments)
 
-    if not args.skip_networking:
-        configure_network(args)
 
-    AGWInstaller().install(args.unblock_local_ips, args.no_reboot)
+def activate_interfaces():
+    args = activate_interfaces_arguments_parser(sys.argv[1:])
+    try:
+        if os.geteuid() != 0:
+            raise InvalidUserError()
+        report = AGWInstallerInterfaceActivator(args.interfaces, args.timeout).activate()
+        if down := [interface for interface, result in report.items() if not result["up"]]:
+            raise InterfaceActivationError(down)
+    except AGWInstallationError:
+        return
+
+
+def activate_interfaces_arguments_parser(cli_arguments: list) -> argparse.Namespace:
+    cli_options = argparse.ArgumentParser()
+    cli_options.add_argument(
+        "--interfaces",
+        dest="interfaces",
+        nargs="+",
+        required=False,
+        default=AGWInstaller.MAGMA_INTERFACES,
+        help="Interfaces to bring up. Defaults to interfaces created by Magma AGW.",
+    )
+    cli_options.add_argument(
+        "--timeout",
+        dest="timeout",
+        type=float,
+        required=False,
+        default=AGWInstallerInterfaceActivator.TIMEOUT,
+        help="Seconds to wait for each interface to be reported up.",
+    )
+    return cli_options.parse_args(cli_arguments)
+
+
+def verify_resource_control():
+    args = verify_resource_control_arguments_parser(sys.argv[1:])
+    try:
+        resource_control_tuner = AGWInstallerResourceControlTuner(args.resource_control_profile)
+        if mismatches := resource_control_tuner.report():
+            raise ResourceControlProfileError(
+                f"Resource control profile {args.resource_control_profile} is not in effect. "
+                f"Mismatched settings: {', '.join(mismatches)}."
+            )
+    except AGWInstallationError:
+        return
+
+
+def verify_resource_control_arguments_parser(cli_arguments: list) -> argparse.Namespace:
+    cli_options = argparse.ArgumentParser()
+    cli_options.add_argument(
+        "--resource-control-profile",
+        dest="resource_control_profile",
+        required=False,
+        default=AGWInstallerResourceControlTuner.DEFAULT_PROFILE,
+        choices=AGWInstallerResourceControlTuner.load_profiles().keys(),
+        help="Resource control profile to verify Magma services against.",
+    )
+    return cli_options.parse_args(cli_arguments)
 
 
 def cli_arguments_parser(cli_arguments: list) -> argparse.Namespace:
@@ -117,16 +319,22 @@ def cli_arguments_parser(cli_arguments: list) -> argparse.Namespace:
         "--sgi",
         dest="sgi",
         required=False,
-        default=set_default_sgi_interface(),
         help="Defines which interface should be used as SGi interface.",
     )
     cli_options.add_argument(
         "--s1",
         dest="s1",
         required=False,
-        default=set_default_s1_interface(),
         help="Defines which interface should be used as S1 interface.",
     )
+    cli_options.add_argument(
+        "--auto-select-interfaces",
+        dest="auto_select_interfaces",
+        action="store_true",
+        required=False,
+        help="If used, SGi and S1 interfaces not given with --sgi and --s1 will be selected by "
+        "carrier, link speed, duplex, RX queue count and NUMA node instead of by name.",
+    )
     cli_options.add_argument(
         "--unblock-local-ips",
         dest="unblock_local_ips",
@@ -142,7 +350,213 @@ def cli_arguments_parser(cli_arguments: list) -> argparse.Namespace:
         help="If used, the installer will not automatically reboot "
         "and will invite the user to reboot manually.",
     )
-    return cli_options.parse_args(cli_arguments)
+    cli_options.add_argument(
+        "--always-reboot",
+        dest="always_reboot",
+        action="store_true",
+        required=False,
+        help="If used, the installer reboots even if Magma AGW could be activated without "
+        "a reboot.",
+    )
+    cli_options.add_argument(
+        "--hardware-requirements",
+        dest="hardware_requirements",
+        required=False,
+        help="Path to a YAML file overriding fail and warn thresholds of hardware checks. "
+        "See resources/hardware_requirements.yaml for the format.",
+    )
+    cli_options.add_argument(
+        "--skip-hardware-checks",
+        dest="skip_hardware_checks",
+        action="store_true",
+        required=False,
+        help="If used, CPU, memory and disk requirements will not be checked before installation.",
+    )
+    cli_options.add_argument(
+        "--tune-nics",
+        dest="tune_nics",
+        action="store_true",
+        required=False,
+        help="If used, combined queues, ring sizes, offloads, RPS/XPS masks and IRQ affinity "
+        "of SGi and S1 interfaces will be tuned and persisted.",
+    )
+    cli_options.add_argument(
+        "--tune-sysctl",
+        dest="tune_sysctl",
+        action="store_true",
+        required=False,
+        help="If used, conntrack, socket buffer, netdev backlog and SCTP kernel settings will be "
+        "sized for --target-subscribers and --target-enodebs and persisted in /etc/sysctl.d/.",
+    )
+    cli_options.add_argument(
+        "--tune-ovs",
+        dest="tune_ovs",
+        action="store_true",
+        required=False,
+        help="If used, Open vSwitch handler and revalidator thread counts, flow limit and "
+        "max-idle will be sized for host's CPU count and --target-subscribers.",
+    )
+    cli_options.add_argument(
+        "--target-subscribers",
+        dest="target_subscribers",
+        type=int,
+        required=False,
+        default=1000,
+        help="Expected number of subscribers served by this Access Gateway. Example: 1000.",
+    )
+    cli_options.add_argument(
+        "--target-enodebs",
+        dest="target_enodebs",
+        type=int,
+        required=False,
+        default=10,
+        help="Expected number of eNodeBs connected to this Access Gateway. Example: 10.",
+    )
+    cli_options.add_argument(
+        "--tune-host-performance",
+        dest="tune_host_performance",
+        action="store_true",
+        required=False,
+        help="If used, CPU frequency governor will be set to performance, C-states deeper than "
+        "--max-cstate will be disabled and --hugepages hugepages will be reserved.",
+    )
+    cli_options.add_argument(
+        "--hugepages",
+        dest="hugepages",
+        type=int,
+        required=False,
+        default=256,
+        help="Number of hugepages to reserve for the OVS datapath. Example: 256.",
+    )
+    cli_options.add_argument(
+        "--max-cstate",
+        dest="max_cstate",
+        type=int,
+        required=False,
+        help="Deepest CPU idle state (C-state) allowed. Example: 1.",
+    )
+    cli_options.add_argument(
+        "--tune-redis",
+        dest="tune_redis",
+        action="store_true",
+        required=False,
+        help="If used, Redis memory limit, eviction policy, persistence and slow log settings "
+        "will be applied to magma@redis service through a systemd drop-in.",
+    )
+    cli_options.add_argument(
+        "--redis-maxmemory-mb",
+        dest="redis_maxmemory_mb",
+        type=int,
+        required=False,
+        help="Redis memory limit in megabytes. Defaults to a quarter of host's RAM. "
+        "Example: 1024.",
+    )
+    cli_options.add_argument(
+        "--tune-resource-control",
+        dest="tune_resource_control",
+        action="store_true",
+        required=False,
+        help="If used, CPU and IO weights, nice levels and memory limits of "
+        "--resource-control-profile will be applied to Magma services and sctpd "
+        "through systemd drop-ins.",
+    )
+    cli_options.add_argument(
+        "--resource-control-profile",
+        dest="resource_control_profile",
+        required=False,
+        default=AGWInstallerResourceControlTuner.DEFAULT_PROFILE,
+        choices=AGWInstallerResourceControlTuner.load_profiles().keys(),
+        help="Resource control profile to apply with --tune-resource-control.",
+    )
+    cli_options.add_argument(
+        "--performance-profile",
+        dest="performance_profile",
+        required=False,
+        choices=AGWPipelinedPerformanceProfile.load_profiles().keys(),
+        help="Pipelined performance profile to apply to /etc/magma/pipelined.yml.",
+    )
+    cli_options.add_argument(
+        "--preview-performance-profile",
+        dest="preview_performance_profile",
+        action="store_true",
+        required=False,
+        help="If used, changes which --performance-profile would introduce to an existing "
+        "/etc/magma/pipelined.yml are printed and the installer exits without installing.",
+    )
+    cli_options.add_argument(
+        "--bundle",
+        dest="bundle",
+        required=False,
+        help="Path to the offline installation bundle created with magma-access-gateway.bundle. "
+        "If used, packages are installed from the bundle instead of the Magma artifactory.",
+    )
+    cli_options.add_argument(
+        "--bundle-key-fingerprint",
+        dest="bundle_key_fingerprint",
+        required=False,
+        help="Fingerprint of the key offline bundle must be signed with. Required with --bundle. "
+        "Obtain it from the bundle's builder, not from the bundle itself.",
+    )
+    cli_options.add_argument(
+        "--magma-apt-key-fingerprint",
+        dest="magma_apt_key_fingerprint",
+        required=False,
+        help="Out of band verified fingerprint of Magma apt signing key. "
+        "Overrides the fingerprint pinned in the snap.",
+    )
+    cli_options.add_argument(
+        "--dkms-module-cache",
+        dest="dkms_module_cache",
+        required=False,
+        help="Directory with prebuilt Open vSwitch modules created with "
+        "magma-access-gateway.build-dkms-module-cache. If one matches the running kernel, "
+        "it's used instead of building the module with DKMS.",
+    )
+    cli_options.add_argument(
+        "--magma-mirrors",
+        dest="magma_mirrors",
+        nargs="+",
+        required=False,
+        help="Space separated list of candidate Magma repository mirrors. "
+        "The fastest one is used. "
+        "Example: --magma-mirrors https://linuxfoundation.jfrog.io/artifactory/magma-packages.",
+    )
+    cli_options.add_argument(
+        "--ubuntu-mirrors",
+        dest="ubuntu_mirrors",
+        nargs="+",
+        required=False,
+        help="Space separated list of candidate Ubuntu archive mirrors to download packages from. "
+        "Example: --ubuntu-mirrors http://archive.ubuntu.com/ubuntu.",
+    )
+    cli_options.add_argument(
+        "--download-connections",
+        dest="download_connections",
+        type=int,
+        required=False,
+        default=AGWInstallerPackageDownloader.CONNECTIONS,
+        help="Number of parallel connections used to download packages from the mirrors.",
+    )
+    cli_options.add_argument(
+        "--event-stream",
+        dest="event_stream",
+        required=False,
+        help="Destination of installation progress events written as JSON lines: "
+        "fd:<number>, unix:<socket path> or path of a file. "
+        "Example: --event-stream unix:/run/agw-provisioning.sock.",
+    )
+    cli_options.add_argument(
+        "--max-parallel-steps",
+        dest="max_parallel_steps",
+        type=int,
+        required=False,
+        default=AGWInstallerStepExecutor.MAX_PARALLEL_STEPS,
+        help="Maximum number of independent installation steps run at the same time. "
+        "Use 1 to run installation steps one by one.",
+    )
+    args = cli_options.parse_args(cli_arguments)
+    select_sgi_and_s1_interfaces(args)
+    return args
 
 
 def validate_args(args: argparse.Namespace):
@@ -157,6 +571,68 @@ def validate_args(args: argparse.Namespace):
     )
     validate_arbitrary_dns(args)
     validate_custom_sgi_and_s1_interfaces(args)
+    validate_performance_profile_preview(args)
+    validate_capacity_targets(args)
+    validate_host_performance(args)
+    validate_redis_maxmemory(args)
+    validate_offline_bundle(args)
+    validate_package_mirrors(args)
+    validate_dkms_module_cache(args)
+    if args.max_parallel_steps < 1:
+        raise ArgumentError("Invalid --max-parallel-steps argument. It must be a positive number.")
+    if args.no_reboot and args.always_reboot:
+        raise ArgumentError("--no-reboot and --always-reboot can't be used together.")
+
+
+def validate_capacity_targets(args: argparse.Namespace):
+    if args.target_subscribers < 1:
+        raise ArgumentError("Invalid --target-subscribers argument. It must be a positive number.")
+    if args.target_enodebs < 1:
+        raise ArgumentError("Invalid --target-enodebs argument. It must be a positive number.")
+
+
+def validate_host_performance(args: argparse.Namespace):
+    if args.hugepages < 0:
+        raise ArgumentError("Invalid --hugepages argument. It must not be a negative number.")
+    if args.max_cstate is not None and args.max_cstate < 0:
+        raise ArgumentError("Invalid --max-cstate argument. It must not be a negative number.")
+
+
+def validate_redis_maxmemory(args: argparse.Namespace):
+    if args.redis_maxmemory_mb is not None and args.redis_maxmemory_mb < 1:
+        raise ArgumentError("Invalid --redis-maxmemory-mb argument. It must be a positive number.")
+
+
+def validate_offline_bundle(args: argparse.Namespace):
+    if args.bundle and not os.path.isfile(args.bundle):
+        raise ArgumentError(f"Invalid --bundle argument. {args.bundle} doesn't exist.")
+    if args.bundle_key_fingerprint and not args.bundle:
+        raise ArgumentError("--bundle-key-fingerprint can only be used with --bundle.")
+    if args.bundle and not args.bundle_key_fingerprint:
+        raise ArgumentError(
+            "--bundle requires --bundle-key-fingerprint to verify the bundle's signature."
+        )
+
+
+def validate_dkms_module_cache(args: argparse.Namespace):
+    if args.dkms_module_cache and not os.path.isdir(args.dkms_module_cache):
+        raise ArgumentError(
+            f"Invalid --dkms-module-cache argument. {args.dkms_module_cache} doesn't exist."
+        )
+
+
+def validate_package_mirrors(args: argparse.Namespace):
+    if args.download_connections < 1:
+        raise ArgumentError(
+            "Invalid --download-connections argument. It must be a positive number."
+        )
+    if args.bundle and (args.magma_mirrors or args.ubuntu_mirrors):
+        raise ArgumentError("--magma-mirrors and --ubuntu-mirrors can't be used with --bundle.")
+
+
+def validate_performance_profile_preview(args: argparse.Namespace):
+    if args.preview_performance_profile and not args.performance_profile:
+        raise ArgumentError("--preview-performance-profile requires --performance-profile.")
 
 
 def validate_custom_sgi_and_s1_interfaces(args: argparse.Namespace):
@@ -232,6 +708,151 @@ def configure_network(args: argparse.Namespace):
     network_configurator.apply_netplan_configuration()
 
 
+def get_prerequisite_steps(args: argparse.Namespace, preinstall: AGWInstallerPreinstall) -> list:
+    """Returns steps preparing the host, incl. optional tuning stages requested by the operator."""
+    define_step = AGWInstallerStepExecutor.define_step
+    return [
+        define_step(
+            "install_required_system_packages",
+            preinstall.install_required_system_packages,
+            outputs=["system_packages"],
+            locks=["dpkg", "network"],
+        ),
+        define_step(
+            "create_magma_user",
+            create_magma_user,
+            inputs=["system_packages"],
+            outputs=["magma_user"],
+        ),
+        define_step(
+            "configure_network",
+            lambda: configure_network(args),
+            outputs=["network_config"],
+            locks=["network"],
+            skip=args.skip_networking,
+        ),
+        define_step(
+            "tune_nics",
+            lambda: tune_nics(args),
+            inputs=["system_packages"],
+            locks=["network"],
+            skip=not args.tune_nics,
+        ),
+        define_step("tune_sysctl", lambda: tune_sysctl(args), skip=not args.tune_sysctl),
+        define_step(
+            "tune_host_performance",
+            lambda: tune_host_performance(args),
+            skip=not args.tune_host_performance,
+        ),
+        define_step("tune_redis", lambda: tune_redis(args), skip=not args.tune_redis),
+        define_step(
+            "tune_resource_control",
+            lambda: tune_resource_control(args),
+            skip=not args.tune_resource_control,
+        ),
+    ]
+
+
+def create_magma_user():
+    service_user_creator = AGWInstallerServiceUserCreator()
+    service_user_creator.create_magma_user()
+    service_user_creator.add_magma_user_to_sudo_group()
+    service_user_creator.add_magma_user_to_sudoers_file()
+
+
+def configure_offline_bundle(args: argparse.Namespace) -> AGWInstallerOfflineBundle:
+    """Configures offline bundle as the only apt source if operator provided one."""
+    if not args.bundle:
+        return None  # type: ignore[return-value]
+    offline_bundle = AGWInstallerOfflineBundle(args.bundle)
+    offline_bundle.configure_apt_source(AGWInstaller.MAGMA_VERSION, args.bundle_key_fingerprint)
+    return offline_bundle
+
+
+def configure_dkms_module_cache(args: argparse.Namespace) -> AGWInstallerDKMSModuleCache:
+    """Uses prebuilt Open vSwitch modules if operator provided a cache directory."""
+    if not args.dkms_module_cache:
+        return None  # type: ignore[return-value]
+    return AGWInstallerDKMSModuleCache(args.dkms_module_cache)
+
+
+def configure_ovs_tuner(args: argparse.Namespace) -> AGWInstallerOVSTuner:
+    """Tunes Open vSwitch once it's started if operator requested it."""
+    if not args.tune_ovs:
+        return None  # type: ignore[return-value]
+    return AGWInstallerOVSTuner(args.target_subscribers)
+
+
+def open_event_stream(args: argparse.Namespace) -> AGWInstallerEventStream:
+    """Opens installation event stream and forwards installer's warnings and errors to it."""
+    event_stream = AGWInstallerEventStream(args.event_stream)
+    if event_stream.enabled:
+        logger.addHandler(event_stream.log_handler())
+    return event_stream
+
+
+def configure_package_downloader(args: argparse.Namespace) -> AGWInstallerPackageDownloader:
+    """Ranks candidate mirrors if operator provided any."""
+    mirrors = {
+        AGWInstallerPackageDownloader.MAGMA_REPOSITORY: args.magma_mirrors or [],
+        AGWInstallerPackageDownloader.UBUNTU_REPOSITORY: args.ubuntu_mirrors or [],
+    }
+    if not any(mirrors.values()):
+        return None  # type: ignore[return-value]
+    package_downloader = AGWInstallerPackageDownloader(
+        mirrors,
+        {
+            AGWInstallerPackageDownloader.MAGMA_REPOSITORY: (
+                f"dists/{AGWInstaller.MAGMA_VERSION}/Release"
+            ),
+            AGWInstallerPackageDownloader.UBUNTU_REPOSITORY: "dists/focal/Release",
+        },
+        args.download_connections,
+    )
+    package_downloader.select_mirrors()
+    return package_downloader
+
+
+def get_offline_bundle_packages() -> list:
+    """Returns all packages installed from the apt repositories during AGW installation."""
+    return list(
+        dict.fromkeys(
+            AGWInstallerPreinstall.REQUIRED_SYSTEM_PACKAGES
+            + AGWInstaller.MAGMA_AGW_RUNTIME_DEPENDENCIES  # noqa: W503
+            + ["magma"]  # noqa: W503
+        )
+    )
+
+
+def tune_nics(args: argparse.Namespace):
+    nic_tuner = AGWInstallerNICTuner([args.sgi, args.s1])
+    nic_tuner.verify(nic_tuner.tune_nics())
+
+
+def tune_sysctl(args: argparse.Namespace):
+    sysctl_tuner = AGWInstallerSysctlTuner(args.target_subscribers, args.target_enodebs)
+    sysctl_tuner.tune_sysctl()
+    sysctl_tuner.report()
+
+
+def tune_host_performance(args: argparse.Namespace):
+    host_performance_tuner = AGWInstallerHostPerformanceTuner(args.hugepages, args.max_cstate)
+    host_performance_tuner.tune_host()
+    host_performance_tuner.report()
+
+
+def tune_redis(args: argparse.Namespace):
+    redis_tuner = AGWInstallerRedisTuner(args.redis_maxmemory_mb)
+    redis_tuner.tune_redis()
+    redis_tuner.report()
+
+
+def tune_resource_control(args: argparse.Namespace):
+    resource_control_tuner = AGWInstallerResourceControlTuner(args.resource_control_profile)
+    resource_control_tuner.tune_resource_control()
+    resource_control_tuner.report()
+
+
 def generate_network_config(args: argparse.Namespace) -> dict:
     return {
         "sgi_ipv4_address": args.sgi_ipv4_address,
@@ -250,6 +871,18 @@ def get_mac_address(interface_name: str) -> str:
     return netifaces.ifaddresses(interface_name)[netifaces.AF_LINK][0]["addr"]
 
 
+def select_sgi_and_s1_interfaces(args: argparse.Namespace):
+    """Sets SGi and S1 interfaces which haven't been specified by the operator."""
+    if args.sgi and args.s1:
+        return
+    if args.auto_select_interfaces:
+        interface_selector = AGWInstallerInterfaceSelector(network_interfaces)
+        args.sgi, args.s1 = interface_selector.select(args.sgi, args.s1)
+        return
+    args.sgi = args.sgi or set_default_sgi_interface()
+    args.s1 = args.s1 or set_default_s1_interface()
+
+
 def set_default_sgi_interface() -> str:
     return "eth0" if "eth0" in network_interfaces else network_interfaces[0]
 
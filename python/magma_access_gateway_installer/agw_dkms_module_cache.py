@@ -0,0 +1,153 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+import re
+from subprocess import CalledProcessError, check_call, check_output
+
+from .agw_installation_errors import DKMSModuleCacheError
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerDKMSModuleCache:
+    """Prebuilt Open vSwitch kernel modules keyed by package version, kernel release and arch.
+
+    Modules are stored as DKMS binaries-only tarballs. Once a tarball is loaded into the DKMS
+    tree, the module is reported as built, so postinst of openvswitch-datapath-dkms only
+    installs it instead of compiling it, and kernel headers aren't needed.
+    """
+
+    PACKAGE = "openvswitch-datapath-dkms"
+    LIB_MODULES_DIR = "/lib/modules"
+    CACHE_FILE_SUFFIX = ".dkms.tar.gz"
+    DKMS_CONF_REGEX = re.compile(r'^(PACKAGE_NAME|PACKAGE_VERSION)="?([^"\n]*)', re.MULTILINE)
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def get_cache_file(self, package_version: str, kernel: str, arch: str) -> str:
+        """Returns path of the prebuilt module for given package version, kernel and arch."""
+        # Epoch separator isn't allowed in file names on every filesystem the cache is copied to
+        package_version = package_version.replace(":", "%3a")
+        return os.path.join(
+            self.cache_dir,
+            f"{self.PACKAGE}_{package_version}_{kernel}_{arch}{self.CACHE_FILE_SUFFIX}",
+        )
+
+    def load_prebuilt_module(self) -> bool:
+        """Loads prebuilt module matching the running kernel into the DKMS tree.
+
+        Any problem only results in a warning, as DKMS builds the module itself then.
+
+        :returns:
+            bool: whether prebuilt module has been loaded
+        """
+        package_version = self._get_candidate_version()
+        kernel, arch = os.uname().release, os.uname().machine
+        if not package_version:
+            logger.warning(f"No installation candidate for {self.PACKAGE}. Skipping.")
+            return False
+        cache_file = self.get_cache_file(package_version, kernel, arch)
+        if not os.path.isfile(cache_file):
+            logger.info(
+                f"No prebuilt {self.PACKAGE} {package_version} module for kernel {kernel} "
+                f"({arch}) in {self.cache_dir}. Module will be built by DKMS."
+            )
+            return False
+        logger.info(f"Loading prebuilt Open vSwitch module from {cache_file}...")
+        try:
+            check_call(["dkms", "ldtarball", f"--archive={cache_file}"])
+        except CalledProcessError as e:
+            logger.warning(
+                f"Prebuilt module couldn't be loaded: {e}. Module will be built by DKMS."
+            )
+            return False
+        return True
+
+    def populate(self, kernels: list) -> list:
+        """Builds Open vSwitch module for given kernels and stores it in the cache.
+
+        Kernel headers of each kernel must be installed on the host running this.
+
+        :returns:
+            list: paths of written cache files
+        :raises:
+            DKMSModuleCacheError: if package isn't installed or headers of a kernel are missing
+        """
+        package_version = self._get_installed_version()
+        if not package_version:
+            raise DKMSModuleCacheError(f"{self.PACKAGE} is not installed.")
+        module_name, module_version = self._get_dkms_module()
+        if missing_headers := [
+            kernel
+            for kernel in kernels
+            if not os.path.isdir(os.path.join(self.LIB_MODULES_DIR, kernel, "build"))
+        ]:
+            raise DKMSModuleCacheError(
+                f"Kernel headers not installed for: {', '.join(missing_headers)}. "
+                f"Install linux-headers-<kernel> packages first."
+            )
+        os.makedirs(self.cache_dir, exist_ok=True)
+        dkms_module = ["-m", module_name, "-v", module_version]
+        cache_files = []
+        for kernel in kernels:
+            if not self._module_built(dkms_module, kernel):
+                logger.info(f"Building {module_name} {module_version} module for {kernel}...")
+                check_call(["dkms", "build"] + dkms_module + ["-k", kernel])  # noqa: W503
+            cache_file = self.get_cache_file(package_version, kernel, os.uname().machine)
+            logger.info(f"Writing {cache_file}...")
+            check_call(
+                ["dkms", "mktarball"]
+                + dkms_module  # noqa: W503
+                + ["-k", kernel, "--binaries-only", f"--archive={cache_file}"]  # noqa: W503
+            )
+            cache_files.append(cache_file)
+        return cache_files
+
+    def install_package(self):
+        """Installs openvswitch-datapath-dkms, so its module can be built for the cache."""
+        if not self._get_installed_version():
+            logger.info(f"Installing {self.PACKAGE} package...")
+            check_call(["apt", "-qq", "install", "-y", "--no-install-recommends", self.PACKAGE])
+
+    def _get_candidate_version(self) -> str:
+        """Returns version of the package apt would install or an empty string."""
+        policy = check_output(["apt-cache", "policy", self.PACKAGE]).decode("utf-8")
+        if match := re.search(r"^\s*Candidate:\s*(\S+)", policy, re.MULTILINE):
+            return "" if match.group(1) == "(none)" else match.group(1)
+        return ""
+
+    def _get_installed_version(self) -> str:
+        """Returns installed version of the package or an empty string."""
+        try:
+            return (
+                check_output(["dpkg-query", "-W", "-f=${Status} ${Version}", self.PACKAGE])
+                .decode("utf-8")
+                .partition("install ok installed ")[2]
+                .strip()
+            )
+        except CalledProcessError:
+            return ""
+
+    def _get_dkms_module(self) -> tuple:
+        """Returns DKMS module name and version from dkms.conf shipped with the package.
+
+        :raises:
+            DKMSModuleCacheError: if package doesn't ship a dkms.conf naming the module
+        """
+        for path in check_output(["dpkg-query", "-L", self.PACKAGE]).decode("utf-8").split():
+            if os.path.basename(path) == "dkms.conf":
+                with open(path, "r") as dkms_conf:
+                    settings = dict(self.DKMS_CONF_REGEX.findall(dkms_conf.read()))
+                if "PACKAGE_NAME" in settings and "PACKAGE_VERSION" in settings:
+                    return settings["PACKAGE_NAME"], settings["PACKAGE_VERSION"]
+        raise DKMSModuleCacheError(f"{self.PACKAGE} doesn't ship a valid dkms.conf.")
+
+    @staticmethod
+    def _module_built(dkms_module: list, kernel: str) -> bool:
+        """Checks whether DKMS reports the module as built or installed for the kernel."""
+        status = check_output(["dkms", "status"] + dkms_module + ["-k", kernel]).decode("utf-8")
+        return bool(re.search(r": (built|installed)", status))
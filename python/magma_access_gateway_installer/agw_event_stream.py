@@ -0,0 +1,169 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from subprocess import CalledProcessError, Popen
+
+from .agw_installation_errors import EventStreamError
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerEventStream:
+    """Writes installation progress as JSON lines to a file descriptor, a file or a Unix socket.
+
+    Each line is a single JSON object with at least `ts`, `host` and `event` keys. Events:
+        - step_start, step_end: installation steps with their duration and status
+        - apt_progress: download and unpack progress parsed from apt's status-fd
+        - warning, error: installer's warnings and errors
+        - install_start, install_end, reboot
+    Without a destination, all events are dropped.
+    """
+
+    FD_PREFIX = "fd:"
+    UNIX_SOCKET_PREFIX = "unix:"
+    APT_STATUS_STAGES = {"dlstatus": "download", "pmstatus": "install"}
+    APT_STATUS_ERRORS = ["pmerror"]
+
+    def __init__(self, destination: str = None):  # type: ignore[assignment]
+        """
+        :param destination: fd:<number>, unix:<socket path> or path of a file to append to
+        """
+        self.destination = destination
+        self.host = socket.gethostname()
+        self._lock = threading.Lock()
+        self._write = self._open(destination) if destination else None
+
+    @property
+    def enabled(self) -> bool:
+        return self._write is not None
+
+    def emit(self, event: str, **fields):
+        """Writes a single event. Stream is disabled if the destination goes away."""
+        if not self.enabled:
+            return
+        line = json.dumps(
+            {"ts": round(time.time(), 3), "host": self.host, "event": event, **fields}
+        )
+        with self._lock:
+            try:
+                self._write(f"{line}\n".encode("utf-8"))  # type: ignore[misc]
+                return
+            except OSError as e:
+                self._write = None
+                error = e
+        logger.warning(f"Event stream {self.destination} closed ({error}). Disabling it.")
+
+    @contextmanager
+    def step(self, name: str):
+        """Emits step_start and step_end events around an installation step."""
+        self.emit("step_start", step=name)
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.emit(
+                "step_end",
+                step=name,
+                status="failed",
+                duration_s=round(time.monotonic() - start, 3),
+                error=str(e) or type(e).__name__,
+            )
+            raise
+        self.emit(
+            "step_end",
+            step=name,
+            status="succeeded",
+            duration_s=round(time.monotonic() - start, 3),
+        )
+
+    def run_apt(self, apt_command: list, package: str):
+        """Runs apt command emitting its progress reported on apt's status-fd.
+
+        :param apt_command: apt command, joined with spaces and run by the shell
+        :param package: name of the package being installed
+        :raises:
+            CalledProcessError: if apt fails
+        """
+        status_read_fd, status_write_fd = os.pipe()
+        command = [apt_command[0], f"-o APT::Status-Fd={status_write_fd}", *apt_command[1:]]
+        try:
+            process = Popen(" ".join(command), shell=True, pass_fds=(status_write_fd,))
+        finally:
+            os.close(status_write_fd)
+        with os.fdopen(status_read_fd, "r", errors="replace") as apt_status:
+            for line in apt_status:
+                self._emit_apt_status(line, package)
+        if return_code := process.wait():
+            raise CalledProcessError(return_code, " ".join(command))
+
+    def log_handler(self) -> logging.Handler:
+        """Returns logging handler forwarding installer's warnings and errors to the stream."""
+        handler = AGWInstallerEventStreamLogHandler(self)
+        handler.setLevel(logging.WARNING)
+        return handler
+
+    def _emit_apt_status(self, line: str, package: str):
+        """Parses a single apt status-fd line, e.g. `pmstatus:magma:42.8571:Unpacking magma`."""
+        status, _, rest = line.strip().partition(":")
+        status_package, _, rest = rest.partition(":")
+        percent, _, message = rest.partition(":")
+        if status in self.APT_STATUS_ERRORS:
+            self.emit("error", source="apt", package=package, item=status_package, message=message)
+            return
+        if status not in self.APT_STATUS_STAGES:
+            return
+        try:
+            percent_value = round(float(percent), 1)
+        except ValueError:
+            return
+        self.emit(
+            "apt_progress",
+            package=package,
+            stage=self.APT_STATUS_STAGES[status],
+            item=status_package,
+            percent=percent_value,
+            message=message,
+        )
+
+    def _open(self, destination: str):
+        """Opens the destination and returns a function writing bytes to it.
+
+        :raises:
+            EventStreamError: if destination can't be opened
+        """
+        try:
+            if destination.startswith(self.FD_PREFIX):
+                fd = int(destination.partition(":")[2])
+                os.fstat(fd)
+                return lambda data: os.write(fd, data)
+            if destination.startswith(self.UNIX_SOCKET_PREFIX):
+                unix_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                unix_socket.connect(destination.partition(":")[2])
+                return unix_socket.sendall
+            stream_file = open(destination, "ab", buffering=0)
+            return stream_file.write
+        except (OSError, ValueError) as e:
+            raise EventStreamError(destination, str(e))
+
+
+class AGWInstallerEventStreamLogHandler(logging.Handler):
+    """Forwards log records to the event stream as warning or error events."""
+
+    def __init__(self, event_stream: AGWInstallerEventStream):
+        super().__init__()
+        self.event_stream = event_stream
+
+    def emit(self, record: logging.LogRecord):
+        self.event_stream.emit(
+            "error" if record.levelno >= logging.ERROR else "warning",
+            source="installer",
+            message=record.getMessage(),
+        )
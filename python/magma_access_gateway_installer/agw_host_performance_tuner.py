@@ -0,0 +1,160 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import glob
+import logging
+import os
+import re
+from subprocess import DEVNULL, call, check_call
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerHostPerformanceTuner:
+    TMPFILES_CONFIG_FILE = "/etc/tmpfiles.d/magma-host-performance.conf"
+    HUGEPAGES_SYSCTL_CONFIG_FILE = "/etc/sysctl.d/99-magma-hugepages.conf"
+    SYS_CPU = "/sys/devices/system/cpu"
+    PROC_MEMINFO = "/proc/meminfo"
+    CPU_GOVERNOR = "performance"
+    CONFLICTING_SERVICES = ["ondemand"]
+
+    def __init__(self, hugepages: int, max_cstate: int = None):  # type: ignore[assignment]
+        self.hugepages = hugepages
+        self.max_cstate = max_cstate
+
+    def tune_host(self):
+        """Sets CPU governor, limits deep C-states and reserves hugepages persistently."""
+        logger.info("Tuning host for OVS datapath performance...")
+        tmpfiles_entries = self._cpu_governor_tmpfiles_entries() + self._cstate_tmpfiles_entries()
+        if tmpfiles_entries:
+            self._write_tmpfiles_config(tmpfiles_entries)
+            self._disable_conflicting_services()
+        self._reserve_hugepages()
+
+    def report(self) -> list:
+        """Logs current CPU governor, C-states and hugepages against their targets.
+
+        :returns:
+            list: names of settings which current value doesn't match the target
+        """
+        logger.info("Host performance report:")
+        mismatches = []
+        for setting, target, current in self._compare_with_targets():
+            status = "OK" if target == current else "MISMATCH"
+            logger.info(f"  {setting}: current={current} target={target} {status}")
+            if target != current:
+                mismatches.append(setting)
+        for mismatch in mismatches:
+            logger.warning(f"Host setting {mismatch} doesn't match its target!")
+        return mismatches
+
+    def _compare_with_targets(self) -> list:
+        """Returns list of (setting, target value, current value) for tuned settings."""
+        comparison = []
+        for governor_file in self._cpu_governor_files():
+            cpu = governor_file.split(os.sep)[-3]
+            comparison.append(
+                (f"{cpu} governor", self.CPU_GOVERNOR, self._read_file(governor_file))
+            )
+        for disable_file in self._deep_cstate_disable_files():
+            cpu, _, state = disable_file.split(os.sep)[-4:-1]
+            comparison.append((f"{cpu} {state} disabled", "1", self._read_file(disable_file)))
+        comparison.append(
+            ("HugePages_Total", str(self.hugepages), str(self._get_total_hugepages()))
+        )
+        return comparison
+
+    def _cpu_governor_tmpfiles_entries(self) -> list:
+        """Returns tmpfiles.d entries setting CPU frequency governor on all CPUs."""
+        if not self._cpu_governor_files():
+            logger.info("CPU frequency scaling not available. Skipping CPU governor setup.")
+            return []
+        logger.info(f"Setting CPU frequency governor to {self.CPU_GOVERNOR}...")
+        return [f"w {self.SYS_CPU}/cpu*/cpufreq/scaling_governor - - - - {self.CPU_GOVERNOR}"]
+
+    def _cstate_tmpfiles_entries(self) -> list:
+        """Returns tmpfiles.d entries disabling C-states deeper than configured maximum."""
+        if self.max_cstate is None:
+            return []
+        if not (states := self._deep_cstates()):
+            logger.info(f"No C-states deeper than C{self.max_cstate} found.")
+            return []
+        logger.info(f"Disabling C-states deeper than C{self.max_cstate}...")
+        return [f"w {self.SYS_CPU}/cpu*/cpuidle/{state}/disable - - - - 1" for state in states]
+
+    def _write_tmpfiles_config(self, tmpfiles_entries: list):
+        """Persists settings as tmpfiles.d config and applies it immediately."""
+        logger.info(f"Writing {self.TMPFILES_CONFIG_FILE}...")
+        with open(self.TMPFILES_CONFIG_FILE, "w") as tmpfiles_config:
+            tmpfiles_config.write(
+                "# This is the host performance config written by magma-access-gateway snap\n"
+            )
+            tmpfiles_config.writelines(f"{entry}\n" for entry in tmpfiles_entries)
+        check_call(["systemd-tmpfiles", "--create", self.TMPFILES_CONFIG_FILE])
+
+    def _disable_conflicting_services(self):
+        """Disables services which reset CPU governor on boot."""
+        for service in self.CONFLICTING_SERVICES:
+            if call(["systemctl", "is-enabled", "--quiet", service], stderr=DEVNULL) == 0:
+                logger.info(f"Disabling {service} service...")
+                check_call(["systemctl", "disable", service])
+
+    def _reserve_hugepages(self):
+        """Persists hugepages reservation in /etc/sysctl.d/ and applies it immediately."""
+        logger.info(f"Reserving {self.hugepages} hugepages...")
+        with open(self.HUGEPAGES_SYSCTL_CONFIG_FILE, "w") as hugepages_config:
+            hugepages_config.write(
+                "# This is the hugepages config written by magma-access-gateway snap\n"
+                f"vm.nr_hugepages = {self.hugepages}\n"
+            )
+        check_call(["sysctl", "-p", self.HUGEPAGES_SYSCTL_CONFIG_FILE])
+
+    def _cpu_governor_files(self) -> list:
+        """Returns paths to scaling_governor files of all CPUs."""
+        return sorted(
+            glob.glob(os.path.join(self.SYS_CPU, "cpu[0-9]*", "cpufreq", "scaling_governor"))
+        )
+
+    def _deep_cstates(self) -> list:
+        """Returns names of cpuidle states deeper than configured maximum C-state."""
+        states = [
+            os.path.basename(state_dir)
+            for state_dir in glob.glob(os.path.join(self.SYS_CPU, "cpu0", "cpuidle", "state*"))
+        ]
+        return sorted(
+            (state for state in states if self._cstate_index(state) > self.max_cstate),
+            key=self._cstate_index,
+        )
+
+    def _deep_cstate_disable_files(self) -> list:
+        """Returns paths to disable files of C-states deeper than configured maximum."""
+        if self.max_cstate is None:
+            return []
+        return sorted(
+            os.path.join(cpu_dir, "cpuidle", state, "disable")
+            for cpu_dir in glob.glob(os.path.join(self.SYS_CPU, "cpu[0-9]*"))
+            for state in self._deep_cstates()
+            if os.path.exists(os.path.join(cpu_dir, "cpuidle", state, "disable"))
+        )
+
+    def _get_total_hugepages(self) -> int:
+        """Returns number of hugepages currently reserved."""
+        meminfo = self._read_file(self.PROC_MEMINFO)
+        if match := re.search(r"^HugePages_Total:\s+(\d+)", meminfo, re.MULTILINE):
+            return int(match.group(1))
+        return 0
+
+    @staticmethod
+    def _cstate_index(state: str) -> int:
+        """Returns index of a cpuidle state (i.e. 2 for state2)."""
+        return int(state.replace("state", ""))
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        """Returns stripped content of a file or an empty string if it can't be read."""
+        try:
+            with open(path, "r") as file:
+                return file.read().strip()
+        except OSError:
+            return ""
@@ -18,40 +18,134 @@ class AGWInstallationError(Exception):
 class InvalidUserError(AGWInstallationError):
     """Exception raised when installation has been started by user different from root."""
 
+    MESSAGE = "Invalid user. Installation should be performed by the root user."
+
     def __init__(self):
-        super().__init__("Invalid user. Installation should be performed by the root user.")
+        super().__init__(self.MESSAGE)
 
 
 class UnsupportedOSError(AGWInstallationError):
     """Exception raised when installation has been started on an OS other than Ubuntu."""
 
+    MESSAGE = "Invalid OS. Only Ubuntu 20.04 is supported."
+
     def __init__(self):
-        super().__init__("Invalid OS. Only Ubuntu 20.04 is supported.")
+        super().__init__(self.MESSAGE)
 
 
 class UnsupportedKernelVersionError(AGWInstallationError):
     """Exception raised when unsupported kernel version is detected."""
 
+    MESSAGE = (
+        "Invalid Kernel Version. Only 5.4.0 is supported. For downgrading kernel version, please refer to:\n"  # noqa E501, W505
+        "https://discourse.ubuntu.com/t/how-to-downgrade-the-kernel-on-ubuntu-20-04-to-the-5-4-lts-version/26459"  # noqa E501, W505
+    )
+
     def __init__(self):
-        self._message = (
-            "Invalid Kernel Version. Only 5.4.0 is supported. For downgrading kernel version, please refer to:\n"  # noqa E501, W505
-            "https://discourse.ubuntu.com/t/how-to-downgrade-the-kernel-on-ubuntu-20-04-to-the-5-4-lts-version/26459"  # noqa E501, W505
-        )
-        super().__init__(self._message)
+        super().__init__(self.MESSAGE)
 
 
 class InvalidNumberOfInterfacesError(AGWInstallationError):
     """Exception raised if number of available network interfaces is different from expected."""
 
+    MESSAGE = (
+        "Invalid number of network interfaces. "
+        "Installation requires at least two network interfaces available."
+    )
+
     def __init__(self):
+        super().__init__(self.MESSAGE)
+
+
+class PreinstallChecksError(AGWInstallationError):
+    """Exception raised if more than one installation precondition is not met."""
+
+    def __init__(self, failed_preconditions: list):
+        failures = "\n".join(f"- {precondition.MESSAGE}" for precondition in failed_preconditions)
+        super().__init__(f"Following pre-install checks failed:\n{failures}")
+
+
+class InsufficientHardwareError(AGWInstallationError):
+    """Exception raised if host's hardware doesn't meet installation requirements."""
+
+    def __init__(self, failures: list):
+        super().__init__(
+            "Insufficient hardware. Following requirements are not met:\n" + "\n".join(failures)
+        )
+
+
+class MagmaAptSigningKeyError(AGWInstallationError):
+    """Exception raised if Magma apt signing key doesn't match the pinned fingerprint."""
+
+    def __init__(self, pinned_fingerprint: str, fingerprints: list):
+        super().__init__(
+            f"Magma apt signing key doesn't match pinned fingerprint {pinned_fingerprint}. "
+            f"Got: {', '.join(fingerprints) or 'no keys'}."
+        )
+
+
+class MissingMagmaAptKeyPinError(AGWInstallationError):
+    """Exception raised if no Magma apt signing key fingerprint is pinned in the snap."""
+
+    def __init__(self, fingerprint_file: str):
         super().__init__(
-            "Invalid number of network interfaces. "
-            "Installation requires at least two network interfaces available."
+            f"No Magma apt signing key fingerprint is pinned in {fingerprint_file}. "
+            "Refusing to trust an unverified key. Pass its out of band verified fingerprint "
+            "with --magma-apt-key-fingerprint."
         )
 
 
+class OfflineBundleError(AGWInstallationError):
+    """Exception raised if offline installation bundle can't be used."""
+
+    def __init__(self, message):
+        super().__init__(f"Invalid offline bundle. {message}")
+
+
 class ArgumentError(AGWInstallationError):
     """Exception raised if argument provided by operator is invalid."""
 
     def __init__(self, message):
         super().__init__(f"Invalid argument. {message}")
+
+
+class PipelinedPerformanceProfileError(AGWInstallationError):
+    """Exception raised if pipelined performance profile can't be applied or validated."""
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class ResourceControlProfileError(AGWInstallationError):
+    """Exception raised if resource control profile can't be applied or isn't in effect."""
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class EventStreamError(AGWInstallationError):
+    """Exception raised if installation event stream destination can't be opened."""
+
+    def __init__(self, destination: str, message: str):
+        super().__init__(f"Event stream {destination} can't be opened: {message}.")
+
+
+class StepGraphError(AGWInstallationError):
+    """Exception raised if installation steps can't be ordered or started."""
+
+    def __init__(self, message):
+        super().__init__(f"Invalid installation steps. {message}")
+
+
+class InterfaceActivationError(AGWInstallationError):
+    """Exception raised if network interfaces can't be brought up."""
+
+    def __init__(self, interfaces: list):
+        super().__init__(f"Interfaces not up: {', '.join(interfaces)}.")
+
+
+class DKMSModuleCacheError(AGWInstallationError):
+    """Exception raised if prebuilt DKMS module cache can't be populated."""
+
+    def __init__(self, message):
+        super().__init__(f"DKMS module cache can't be populated. {message}")
@@ -4,11 +4,29 @@
 
 import logging
 import os
+import shutil
 import time
-from subprocess import check_call, check_output
+import urllib.request
+from subprocess import CalledProcessError, check_call, check_output
 
 import ruamel.yaml
 
+from .agw_dkms_module_cache import AGWInstallerDKMSModuleCache
+from .agw_event_stream import AGWInstallerEventStream
+from .agw_installation_errors import (
+    InterfaceActivationError,
+    MagmaAptSigningKeyError,
+    MissingMagmaAptKeyPinError,
+    PipelinedPerformanceProfileError,
+)
+from .agw_interface_activator import AGWInstallerInterfaceActivator
+from .agw_live_activation import AGWInstallerLiveActivation
+from .agw_offline_bundle import AGWInstallerOfflineBundle
+from .agw_ovs_tuner import AGWInstallerOVSTuner
+from .agw_package_downloader import AGWInstallerPackageDownloader
+from .agw_pipelined_profile import AGWPipelinedPerformanceProfile
+from .agw_step_executor import AGWInstallerStepExecutor
+
 logger = logging.getLogger("magma_access_gateway_installer")
 
 
@@ -25,25 +43,75 @@ class AGWInstaller:
         "ca-certificates",
     ]
     MAGMA_INTERFACES = ["gtp_br0", "mtr0", "uplink_br0", "ipfix0", "dhcp0"]
+    MAGMA_APT_REPOSITORY_CONFIG_FILE = "/etc/apt/sources.list.d/magma.list"
+    MAGMA_APT_KEYRING = "/usr/share/keyrings/magma-archive-keyring.gpg"
+    MAGMA_APT_KEY_URL = f"https://{MAGMA_ARTIFACTORY}/api/security/keypair/magmaci/public"
+    MAGMA_APT_KEY_FETCH_TIMEOUT = 30
+    # Fingerprint is committed to the source tree. Keyring is fetched and verified against it
+    # when the snap is built.
+    PINNED_MAGMA_APT_KEYRING = os.path.join(
+        os.path.abspath(os.path.dirname(__file__)), "resources", "magma-archive-keyring.gpg"
+    )
+    PINNED_MAGMA_APT_KEY_FINGERPRINT_FILE = os.path.join(
+        os.path.abspath(os.path.dirname(__file__)),
+        "resources",
+        "magma-archive-keyring.fingerprint",
+    )
+    INSECURE_APT_CONFIG_FILE = "/etc/apt/apt.conf.d/99insecurehttpsrepo"
     PIPELINED_CONFIG_FILE = "/etc/magma/pipelined.yml"
 
-    def install(self, unblock_local_ips: bool = False, no_reboot: bool = False):
+    def __init__(
+        self,
+        offline_bundle: AGWInstallerOfflineBundle = None,  # type: ignore[assignment]
+        package_downloader: AGWInstallerPackageDownloader = None,  # type: ignore[assignment]
+        event_stream: AGWInstallerEventStream = None,  # type: ignore[assignment]
+        max_parallel_steps: int = AGWInstallerStepExecutor.MAX_PARALLEL_STEPS,
+        dkms_module_cache: AGWInstallerDKMSModuleCache = None,  # type: ignore[assignment]
+        magma_apt_key_fingerprint: str = None,  # type: ignore[assignment]
+    ):
+        """
+        :param magma_apt_key_fingerprint: out of band verified fingerprint of Magma apt signing
+            key, used instead of the one pinned in the source tree
+        """
+        self.offline_bundle = offline_bundle
+        self.package_downloader = package_downloader
+        self.event_stream = event_stream or AGWInstallerEventStream()
+        self.max_parallel_steps = max_parallel_steps
+        self.dkms_module_cache = dkms_module_cache
+        self.magma_apt_key_fingerprint = magma_apt_key_fingerprint
+
+    def install(
+        self,
+        unblock_local_ips: bool = False,
+        no_reboot: bool = False,
+        performance_profile: str = None,  # type: ignore[assignment]
+        always_reboot: bool = False,
+        prerequisite_steps: list = None,  # type: ignore[assignment]
+        ovs_tuner: AGWInstallerOVSTuner = None,  # type: ignore[assignment]
+    ):
+        """Installs Magma AGW running installation steps concurrently where possible.
+
+        :param prerequisite_steps: steps preparing the host, run along the installation steps.
+            They must provide network_config, which steps using apt wait for.
+        :param ovs_tuner: if given, Open vSwitch is tuned once it's started
+        """
+        prerequisite_steps = prerequisite_steps or self.get_skipped_prerequisite_steps()
         if self._magma_agw_installed:
+            self._run_steps_restoring_apt_sources(
+                prerequisite_steps
+                + self._get_ovs_tuning_steps(ovs_tuner)  # noqa: W503
+                + self._get_performance_profile_steps(performance_profile)  # noqa: W503
+            )
             logger.info("Magma Access Gateway already installed. Exiting...")
             return
         else:
             logger.info("Starting Magma AGW deployment...")
-            self.update_apt_cache()
-            self.update_ca_certificates_package()
-            self.forbid_usage_of_expired_dst_root_ca_x3_certificate()
-            self.configure_apt_for_magma_agw_deb_package_installation()
-            self.install_runtime_dependencies()
-            self.preconfigure_wireshark_suid_property()
-            self.install_magma_agw()
-            self.start_open_vswitch()
-            self.start_magma()
-            if unblock_local_ips:
-                self.unblock_local_ips()
+            self._run_steps_restoring_apt_sources(
+                prerequisite_steps
+                + self.get_installation_steps(  # noqa: W503
+                    unblock_local_ips, performance_profile, ovs_tuner
+                )
+            )
             if no_reboot:
                 logger.info(
                     "Magma AGW deployment completed successfully!\n"
@@ -53,6 +121,14 @@ class AGWInstaller:
                     "integrate Access Gateway with the Orchestrator."
                 )
                 return
+            elif not always_reboot and self.activate_without_reboot():
+                logger.info(
+                    "Magma AGW deployment completed successfully!\n"
+                    "\t\tNo reboot was required and Magma AGW has been activated.\n"
+                    "\t\tRun magma-access-gateway.configure to integrate Access Gateway "
+                    "with the Orchestrator."
+                )
+                return
             else:
                 logger.info(
                     "Magma AGW deployment completed successfully!\n"
@@ -60,9 +136,190 @@ class AGWInstaller:
                     "\t\tOnce the system is online again, run magma-access-gateway.configure to "
                     "integrate Access Gateway with the Orchestrator."
                 )
+                self.event_stream.emit("reboot")
                 time.sleep(5)
                 os.system("reboot")
 
+    def get_installation_steps(
+        self,
+        unblock_local_ips: bool = False,
+        performance_profile: str = None,  # type: ignore[assignment]
+        ovs_tuner: AGWInstallerOVSTuner = None,  # type: ignore[assignment]
+    ) -> list:
+        """Returns Magma AGW installation steps with their inputs, outputs and locks."""
+        define_step = AGWInstallerStepExecutor.define_step
+        apt_locks = ["dpkg", "network"]
+        return [
+            define_step(
+                "update_apt_cache",
+                self.update_apt_cache,
+                inputs=["network_config"],
+                outputs=["apt_cache"],
+                locks=apt_locks,
+            ),
+            define_step(
+                "update_ca_certificates_package",
+                self.update_ca_certificates_package,
+                inputs=["network_config", "apt_cache"],
+                outputs=["ca_certificates_package"],
+                locks=apt_locks + ["ca_certificates"],
+            ),
+            define_step(
+                "forbid_usage_of_expired_dst_root_ca_x3_certificate",
+                self.forbid_usage_of_expired_dst_root_ca_x3_certificate,
+                outputs=["ca_trust"],
+                locks=["ca_certificates"],
+            ),
+            define_step(
+                "configure_apt_for_magma_agw_deb_package_installation",
+                self.configure_apt_for_magma_agw_deb_package_installation,
+                inputs=["network_config", "ca_certificates_package", "ca_trust"],
+                outputs=["magma_apt_source"],
+                locks=apt_locks,
+            ),
+            define_step(
+                "prefetch_packages",
+                self.prefetch_packages,
+                inputs=["network_config", "magma_apt_source"],
+                outputs=["package_cache"],
+                locks=["network"],
+                skip=not self.package_downloader,
+            ),
+            define_step(
+                "install_runtime_dependencies",
+                self.install_runtime_dependencies,
+                inputs=["network_config", "package_cache"],
+                outputs=["runtime_dependencies"],
+                locks=apt_locks,
+            ),
+            define_step(
+                "preconfigure_wireshark_suid_property",
+                self.preconfigure_wireshark_suid_property,
+                outputs=["debconf_preseed"],
+                locks=["dpkg"],
+            ),
+            define_step(
+                "load_prebuilt_openvswitch_module",
+                self.load_prebuilt_openvswitch_module,
+                inputs=["runtime_dependencies"],
+                outputs=["openvswitch_module"],
+                skip=not self.dkms_module_cache,
+            ),
+            define_step(
+                "install_magma_agw",
+                self.install_magma_agw,
+                inputs=[
+                    "network_config",
+                    "runtime_dependencies",
+                    "debconf_preseed",
+                    "openvswitch_module",
+                ],
+                outputs=["magma_package"],
+                locks=apt_locks,
+            ),
+            define_step(
+                "configure_pipelined",
+                lambda: self.configure_pipelined(unblock_local_ips, performance_profile),
+                inputs=["magma_package"],
+                outputs=["pipelined_config"],
+                skip=not (unblock_local_ips or performance_profile),
+            ),
+            define_step(
+                "start_open_vswitch",
+                self.start_open_vswitch,
+                inputs=["magma_package"],
+                outputs=["openvswitch"],
+            ),
+            *self._get_ovs_tuning_steps(ovs_tuner, inputs=["openvswitch"]),
+            define_step(
+                "start_magma",
+                self.start_magma,
+                inputs=["openvswitch", "openvswitch_tuning", "pipelined_config"],
+                outputs=["magma"],
+            ),
+        ]
+
+    @staticmethod
+    def get_skipped_prerequisite_steps() -> list:
+        """Returns stand-ins for prerequisite steps when the host was prepared beforehand."""
+        return [
+            AGWInstallerStepExecutor.define_step(
+                "configure_network", lambda: None, outputs=["network_config"], skip=True
+            )
+        ]
+
+    @staticmethod
+    def _get_ovs_tuning_steps(
+        ovs_tuner: AGWInstallerOVSTuner, inputs: list = None  # type: ignore[assignment]
+    ) -> list:
+        """Returns step tuning Open vSwitch, skipped if the operator didn't request tuning."""
+        return [
+            AGWInstallerStepExecutor.define_step(
+                "tune_open_vswitch",
+                lambda: AGWInstaller.tune_open_vswitch(ovs_tuner),
+                inputs=inputs,
+                outputs=["openvswitch_tuning"],
+                skip=not ovs_tuner,
+            )
+        ]
+
+    def _get_performance_profile_steps(
+        self, performance_profile: str = None  # type: ignore[assignment]
+    ) -> list:
+        """Returns step applying pipelined performance profile to already installed Magma AGW.
+
+        Step is skipped if the operator didn't request a profile.
+        """
+        return [
+            AGWInstallerStepExecutor.define_step(
+                "reapply_pipelined_performance_profile",
+                lambda: self.reapply_pipelined_performance_profile(performance_profile),
+                skip=not performance_profile,
+            )
+        ]
+
+    def _run_steps_restoring_apt_sources(self, steps: list):
+        """Runs steps and lets apt use all its sources again, even if a step failed."""
+        try:
+            self._run_steps(steps)
+        finally:
+            self.restore_apt_sources()
+
+    def _run_steps(self, steps: list):
+        """Runs installation steps concurrently, reporting each of them to the event stream."""
+        if steps:
+            AGWInstallerStepExecutor(steps, self.max_parallel_steps, self.event_stream).run()
+
+    def activate_without_reboot(self) -> bool:
+        """Activates Magma AGW live if nothing installed or configured requires a reboot.
+
+        :returns:
+            bool: whether Magma AGW has been activated and verified without a reboot
+        """
+        live_activation = AGWInstallerLiveActivation(self.MAGMA_INTERFACES)
+        with self.event_stream.step("activate_without_reboot"):
+            reboot_reasons = live_activation.get_reboot_reasons()
+            for reboot_reason in reboot_reasons:
+                logger.info(f"Reboot required: {reboot_reason}")
+            if reboot_reasons:
+                return False
+            try:
+                verification_failures = live_activation.activate()
+            except CalledProcessError as e:
+                verification_failures = [str(e)]
+            if verification_failures:
+                logger.info(
+                    f"Live activation couldn't be verified ({len(verification_failures)} failed "
+                    "checks). Falling back to reboot..."
+                )
+                return False
+            return True
+
+    def restore_apt_sources(self):
+        """Lets apt use all its sources again if Magma AGW was installed from offline bundle."""
+        if self.offline_bundle:
+            self.offline_bundle.restore_apt_sources()
+
     @property
     def _magma_agw_installed(self) -> bool:
         """Checks whether Magma Access Gateway is already installed or not."""
@@ -127,44 +384,107 @@ class AGWInstaller:
     @property
     def _magma_apt_repository_configured(self) -> bool:
         """Checks whether Magma custom apt repository has already been configured."""
-        return os.path.exists("/etc/apt/sources.list.d/magma.list")
+        return os.path.exists(self.MAGMA_APT_REPOSITORY_CONFIG_FILE)
 
     def _configure_apt_for_magma_agw_deb_package_installation(self):
         """Configures apt (repository and keys) to allow Magma AGW deb package installation."""
+        self._install_magma_apt_signing_key()
         self._configure_private_apt_repository_to_install_magma_agw_from()
-        self._add_unvalidated_apt_signing_key()
+        self._remove_insecure_magma_apt_repository_config()
 
     def _configure_private_apt_repository_to_install_magma_agw_from(self):
         """Creates an apt repository configuration to allow Magma AGW deb package installation."""
         logger.info("Configuring private apt repository for install Magma AGW from...")
-        with open("/etc/apt/sources.list.d/magma.list", "w") as magma_private_apt_repo:
+        with open(self.MAGMA_APT_REPOSITORY_CONFIG_FILE, "w") as magma_private_apt_repo:
             magma_private_apt_repo.write(
-                f"deb https://{self.MAGMA_ARTIFACTORY}/magma-packages {self.MAGMA_VERSION} main"
+                f"deb [signed-by={self.MAGMA_APT_KEYRING}] "
+                f"{self._magma_repository_url} {self.MAGMA_VERSION} main"
             )
 
-    def _add_unvalidated_apt_signing_key(self):
-        """Adds unvalidated apt signing key."""
-        logger.info("Adding unvalidated apt signing key...")
-        check_call(
-            [
-                "apt-key",
-                "adv",
-                "--fetch-keys",
-                f"https://{self.MAGMA_ARTIFACTORY}/api/security/keypair/magmaci/public",
-            ]
+    @property
+    def _magma_repository_url(self) -> str:
+        """Returns URL of the best Magma repository mirror, or of the Magma artifactory."""
+        magma_repository_url = f"https://{self.MAGMA_ARTIFACTORY}/magma-packages"
+        if self.package_downloader:
+            return self.package_downloader.best_mirror(
+                AGWInstallerPackageDownloader.MAGMA_REPOSITORY, magma_repository_url
+            )
+        return magma_repository_url
+
+    def _install_magma_apt_signing_key(self):
+        """Installs Magma apt signing key shipped with the snap.
+
+        The key is fetched from the artifactory only if the shipped keyring doesn't match
+        the pinned fingerprint.
+
+        :raises:
+            MissingMagmaAptKeyPinError: if no fingerprint is pinned
+            MagmaAptSigningKeyError: if fetched key doesn't match the pinned fingerprint
+        """
+        pinned_fingerprint = self._get_pinned_magma_apt_key_fingerprint()
+        if not pinned_fingerprint:
+            raise MissingMagmaAptKeyPinError(self.PINNED_MAGMA_APT_KEY_FINGERPRINT_FILE)
+        if pinned_fingerprint in self._get_key_fingerprints(self.PINNED_MAGMA_APT_KEYRING):
+            logger.info(f"Installing pinned Magma apt signing key {pinned_fingerprint}...")
+            shutil.copyfile(self.PINNED_MAGMA_APT_KEYRING, self.MAGMA_APT_KEYRING)
+            return
+        logger.warning(
+            "Magma apt signing key shipped with the snap doesn't match the pinned fingerprint. "
+            f"Fetching it from {self.MAGMA_APT_KEY_URL}..."
+        )
+        self._fetch_magma_apt_signing_key()
+        fetched_fingerprints = self._get_key_fingerprints(self.MAGMA_APT_KEYRING)
+        if pinned_fingerprint not in fetched_fingerprints:
+            os.remove(self.MAGMA_APT_KEYRING)
+            raise MagmaAptSigningKeyError(pinned_fingerprint, fetched_fingerprints)
+
+    def _fetch_magma_apt_signing_key(self):
+        """Downloads armored Magma apt signing key and stores it as a binary keyring."""
+        with urllib.request.urlopen(
+            self.MAGMA_APT_KEY_URL, timeout=self.MAGMA_APT_KEY_FETCH_TIMEOUT
+        ) as response:
+            armored_key = response.read()
+        with open(self.MAGMA_APT_KEYRING, "wb") as keyring:
+            keyring.write(check_output(["gpg", "--dearmor"], input=armored_key))
+
+    def _get_pinned_magma_apt_key_fingerprint(self) -> str:
+        """Returns fingerprint of Magma apt signing key given by operator or pinned in the tree."""
+        if self.magma_apt_key_fingerprint:
+            return self.magma_apt_key_fingerprint.replace(" ", "").upper()
+        try:
+            with open(self.PINNED_MAGMA_APT_KEY_FINGERPRINT_FILE, "r") as fingerprint_file:
+                return "".join(
+                    line.strip().replace(" ", "").upper()
+                    for line in fingerprint_file
+                    if not line.lstrip().startswith("#")
+                )
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _get_key_fingerprints(keyring: str) -> list:
+        """Returns fingerprints of all keys in a keyring file."""
+        if not os.path.exists(keyring):
+            return []
+        show_keys_output = check_output(["gpg", "--show-keys", "--with-colons", keyring]).decode(
+            "utf-8"
         )
-        self._ignore_magma_apt_repository_ssl_cert()
-
-    def _ignore_magma_apt_repository_ssl_cert(self):
-        """Ignores Magma apt repository's SSL certificate."""
-        logger.info("Ignoring Magma apt repository's SSL certificate...")
-        ignore_cert = f"""Acquire::https::{self.MAGMA_ARTIFACTORY}/magma-packages {{
-Verify-Peer "false";
-Verify-Host "false";
-}};
-"""
-        with open("/etc/apt/apt.conf.d/99insecurehttpsrepo", "w") as insecured_repo_host:
-            insecured_repo_host.write(ignore_cert)
+        return [
+            line.split(":")[9].upper()
+            for line in show_keys_output.splitlines()
+            if line.startswith("fpr:")
+        ]
+
+    def _remove_insecure_magma_apt_repository_config(self):
+        """Removes apt config disabling TLS verification left by older installer versions."""
+        if os.path.exists(self.INSECURE_APT_CONFIG_FILE):
+            logger.info(f"Removing {self.INSECURE_APT_CONFIG_FILE}...")
+            os.remove(self.INSECURE_APT_CONFIG_FILE)
+
+    def prefetch_packages(self):
+        """Downloads Magma AGW packages from the best mirrors over parallel connections."""
+        if self.package_downloader:
+            self.package_downloader.prefetch(self.MAGMA_AGW_RUNTIME_DEPENDENCIES + ["magma"])
 
     def install_runtime_dependencies(self):
         """Installs Magma AGW's runtime dependencies using apt."""
@@ -172,6 +492,11 @@ Verify-Host "false";
         for required_package in self.MAGMA_AGW_RUNTIME_DEPENDENCIES:
             self._install_apt_package(required_package)
 
+    def load_prebuilt_openvswitch_module(self):
+        """Loads prebuilt Open vSwitch module, so DKMS doesn't compile it during installation."""
+        if self.dkms_module_cache:
+            self.dkms_module_cache.load_prebuilt_module()
+
     @staticmethod
     def preconfigure_wireshark_suid_property():
         """Prevents Wireshark popup while installing Magma AGW."""
@@ -188,31 +513,100 @@ Verify-Host "false";
         """Start openvswitch-switch service."""
         self._start_service("openvswitch-switch")
 
+    @staticmethod
+    def tune_open_vswitch(ovs_tuner: AGWInstallerOVSTuner):
+        """Sets Open vSwitch other_config and logs values in effect."""
+        ovs_tuner.tune_ovs()
+        ovs_tuner.report()
+
     def start_magma(self):
         """Starts Magma AGW."""
         self._stop_service("magma@*")
         self._bring_up_magma_interfaces()
         self._start_service("magma@magma")
 
+    def configure_pipelined(
+        self,
+        unblock_local_ips: bool = False,
+        performance_profile: str = None,  # type: ignore[assignment]
+    ):
+        """Applies pipelined changes requested by the operator before Magma AGW starts."""
+        if unblock_local_ips:
+            self.unblock_local_ips()
+        if performance_profile:
+            self.apply_pipelined_performance_profile(performance_profile)
+
+    def reapply_pipelined_performance_profile(self, profile_name: str):
+        """Applies pipelined performance profile to running Magma AGW and restarts pipelined."""
+        self.apply_pipelined_performance_profile(profile_name)
+        self._restart_service("magma@pipelined")
+
     def unblock_local_ips(self):
         """Unblocks access to AGW local IPs from UEs."""
-        yaml = ruamel.yaml.YAML()
         logger.info("Unblocking AGW local IPs usage...")
-        with open(self.PIPELINED_CONFIG_FILE, "r") as pipelined_config_orig:
-            pipelined_config = yaml.load(pipelined_config_orig)
+        pipelined_config = self._load_pipelined_config()
         pipelined_config["access_control"]["block_agw_local_ips"] = False
+        self._save_pipelined_config(pipelined_config)
+
+    def apply_pipelined_performance_profile(self, profile_name: str):
+        """Applies pipelined performance profile and validates the result.
+
+        :raises:
+            PipelinedPerformanceProfileError: if profile is unknown or its validation failed
+        """
+        profile = AGWPipelinedPerformanceProfile(profile_name)
+        logger.info(
+            f"Applying pipelined performance profile {profile.name} "
+            f"(version {profile.version})..."
+        )
+        pipelined_config = self._load_pipelined_config()
+        profile.log_diff(pipelined_config)
+        profile.apply(pipelined_config)
+        self._save_pipelined_config(pipelined_config)
+        profile.validate(self._load_pipelined_config())
+
+    def preview_pipelined_performance_profile(self, profile_name: str):
+        """Logs changes which pipelined performance profile would introduce without applying.
+
+        :raises:
+            PipelinedPerformanceProfileError: if pipelined config doesn't exist yet
+        """
+        profile = AGWPipelinedPerformanceProfile(profile_name)
+        if not os.path.exists(self.PIPELINED_CONFIG_FILE):
+            raise PipelinedPerformanceProfileError(
+                f"{self.PIPELINED_CONFIG_FILE} not found. Magma AGW must be installed "
+                "to preview pipelined performance profile."
+            )
+        profile.log_diff(self._load_pipelined_config())
+
+    def _load_pipelined_config(self):
+        """Loads pipelined config preserving its comments and formatting."""
+        yaml = ruamel.yaml.YAML()
+        with open(self.PIPELINED_CONFIG_FILE, "r") as pipelined_config_orig:
+            return yaml.load(pipelined_config_orig)
+
+    def _save_pipelined_config(self, pipelined_config):
+        """Saves pipelined config preserving its comments and formatting."""
+        yaml = ruamel.yaml.YAML()
         with open(self.PIPELINED_CONFIG_FILE, "w") as pipelined_config_updated:
             yaml.dump(pipelined_config, pipelined_config_updated)
 
     def _bring_up_magma_interfaces(self):
-        """Brings up interfaces created by Magma AGW."""
-        for interface in self.MAGMA_INTERFACES:
-            logger.info(f"Bringing up {interface} interface...")
-            self._bring_up_interface(interface)
+        """Brings up interfaces created by Magma AGW concurrently.
 
-    @staticmethod
-    def _install_apt_package(package_name, dpkg_options: list = None):  # type: ignore[assignment]
-        """Installs package using apt."""
+        :raises:
+            InterfaceActivationError: if any of the interfaces isn't reported up over netlink
+        """
+        logger.info(f"Bringing up {', '.join(self.MAGMA_INTERFACES)} interfaces...")
+        report = AGWInstallerInterfaceActivator(self.MAGMA_INTERFACES).activate()
+        self.event_stream.emit("interfaces_up", interfaces=report)
+        if down := [interface for interface, result in report.items() if not result["up"]]:
+            raise InterfaceActivationError(down)
+
+    def _install_apt_package(
+        self, package_name, dpkg_options: list = None  # type: ignore[assignment]
+    ):
+        """Installs package using apt, reporting its progress to the event stream if enabled."""
         logger.info(f"Installing {package_name} package...")
         apt_install_command = [
             "apt",
@@ -226,23 +620,26 @@ Verify-Host "false";
             for option in dpkg_options:
                 apt_install_command.insert(1, f'-o "Dpkg::Options::=--{option}"')
         try:
-            check_call(" ".join(apt_install_command), shell=True)
+            if self.event_stream.enabled:
+                self.event_stream.run_apt(apt_install_command, package_name)
+            else:
+                check_call(" ".join(apt_install_command), shell=True)
         except Exception as any_exception:
             logging.error(any_exception)
             raise any_exception
 
-    @staticmethod
-    def _bring_up_interface(interface_name):
-        """Brings up interface using ifup command."""
-        logger.info(f"Bringing up {interface_name}...")
-        check_call(["ifup", interface_name])
-
     @staticmethod
     def _stop_service(service_name):
         """Stops system service."""
         logger.info(f"Stopping {service_name} service...")
         check_call(["service", service_name, "stop"])
 
+    @staticmethod
+    def _restart_service(service_name):
+        """Restarts system service."""
+        logger.info(f"Restarting {service_name} service...")
+        check_call(["service", service_name, "restart"])
+
     @staticmethod
     def _start_service(service_name):
         """Starts system service."""
@@ -0,0 +1,240 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import glob
+import logging
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import PIPE, call
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerInterfaceActivator:
+    """Brings up network interfaces concurrently and confirms them through netlink link events.
+
+    Interfaces are brought up with ifup, so ifupdown hooks (e.g. Open vSwitch ones creating
+    bridges and ports) still run. An interface declared as a port of an OVS bridge
+    (ovs_bridge option in /etc/network/interfaces) is brought up once its bridge is up.
+    Interfaces which are already up are left untouched. An interface is considered up only
+    once the kernel reports it administratively up and operationally up (or unknown, as for
+    OVS internal ports), regardless of ifup's exit code.
+    """
+
+    INTERFACES_FILE = "/etc/network/interfaces"
+    INTERFACES_DIR = "/etc/network/interfaces.d"
+    TIMEOUT = 30
+    NETLINK_RECEIVE_TIMEOUT = 0.2
+    NETLINK_ROUTE = 0
+    RTMGRP_LINK = 1
+    RTM_NEWLINK = 16
+    RTM_GETLINK = 18
+    NLMSG_DONE = 3
+    NLM_F_REQUEST = 1
+    NLM_F_DUMP = 0x300
+    IFLA_IFNAME = 3
+    IFLA_OPERSTATE = 16
+    IFF_UP = 1
+    IF_OPER_UNKNOWN = 0
+    IF_OPER_UP = 6
+    NLMSG_HEADER = struct.Struct("=LHHLL")
+    IFINFOMSG = struct.Struct("=BxHiII")
+    RTATTR_HEADER = struct.Struct("=HH")
+
+    def __init__(self, interfaces: list, timeout: float = TIMEOUT):
+        """
+        :param interfaces: names of interfaces to bring up
+        :param timeout: seconds to wait for each interface to come up
+        """
+        self.interfaces = interfaces
+        self.timeout = timeout
+        self._links: dict = {}
+        self._up_since: dict = {}
+        self._condition = threading.Condition()
+        self._start = 0.0
+        self._link_dump_received = threading.Event()
+
+    def activate(self) -> dict:
+        """Brings up interfaces and waits until netlink reports each of them up.
+
+        :returns:
+            dict: report of each interface with keys:
+                up (bool), already_up (bool), time_to_up_s (float or None), error (str)
+        """
+        dependencies = self.get_dependencies()
+        self._start = time.monotonic()
+        stop_listening = threading.Event()
+        with self._open_netlink_socket() as netlink_socket:
+            self._request_link_dump(netlink_socket)
+            listener = threading.Thread(
+                target=self._listen, args=(netlink_socket, stop_listening), daemon=True
+            )
+            listener.start()
+            try:
+                if not self._link_dump_received.wait(self.timeout):
+                    logger.warning("Current state of interfaces wasn't received over netlink.")
+                with ThreadPoolExecutor(max_workers=max(len(self.interfaces), 1)) as executor:
+                    results = list(
+                        executor.map(
+                            lambda interface: self._activate_interface(
+                                interface, dependencies.get(interface, [])
+                            ),
+                            self.interfaces,
+                        )
+                    )
+            finally:
+                stop_listening.set()
+                listener.join()
+        report = dict(zip(self.interfaces, results))
+        self.log_report(report)
+        return report
+
+    def get_dependencies(self) -> dict:
+        """Returns interfaces each of the interfaces to bring up has to wait for.
+
+        Ports of OVS bridges depend on their bridges, as long as the bridge is brought up too.
+        """
+        dependencies: dict = {}
+        interface = None
+        for interfaces_file in [self.INTERFACES_FILE] + sorted(
+            glob.glob(os.path.join(self.INTERFACES_DIR, "*"))
+        ):
+            try:
+                with open(interfaces_file, "r") as interfaces_config:
+                    lines = interfaces_config.readlines()
+            except OSError:
+                continue
+            for line in lines:
+                words = line.split()
+                if len(words) < 2:
+                    continue
+                if words[0] == "iface":
+                    interface = words[1]
+                elif words[0] == "ovs_bridge" and interface and words[1] in self.interfaces:
+                    dependencies.setdefault(interface, []).append(words[1])
+        return dependencies
+
+    @staticmethod
+    def log_report(report: dict):
+        for interface, result in report.items():
+            if result["already_up"]:
+                logger.info(f"{interface} was already up.")
+            elif result["up"]:
+                logger.info(f"{interface} is up after {result['time_to_up_s']:.2f}s.")
+            else:
+                logger.warning(f"{interface} is not up: {result['error']}")
+
+    def _activate_interface(self, interface: str, dependencies: list) -> dict:
+        """Brings up a single interface once its dependencies are up."""
+        result: dict = {"up": False, "already_up": False, "time_to_up_s": None, "error": ""}
+        deadline = time.monotonic() + self.timeout
+        if not all(self._wait_until_up(dependency, deadline) for dependency in dependencies):
+            result["error"] = f"{', '.join(dependencies)} didn't come up."
+            return result
+        with self._condition:
+            if self._links.get(interface):
+                result.update(up=True, already_up=True, time_to_up_s=0.0)
+                return result
+        ifup = call(["ifup", interface], stdout=PIPE, stderr=PIPE)
+        if self._wait_until_up(interface, deadline):
+            if ifup:
+                logger.warning(f"ifup {interface} exited with {ifup}, but {interface} is up.")
+            result.update(up=True, time_to_up_s=round(self._up_since[interface], 3))
+        else:
+            result["error"] = f"not reported up within {self.timeout}s (ifup exited with {ifup})."
+        return result
+
+    def _wait_until_up(self, interface: str, deadline: float) -> bool:
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._links.get(interface, False),
+                timeout=max(deadline - time.monotonic(), 0),
+            )
+
+    def _listen(self, netlink_socket: socket.socket, stop_listening: threading.Event):
+        """Updates state of links from netlink messages until told to stop."""
+        while not stop_listening.is_set():
+            readable, _, _ = select.select([netlink_socket], [], [], self.NETLINK_RECEIVE_TIMEOUT)
+            if not readable:
+                continue
+            try:
+                data = netlink_socket.recv(65536)
+            except OSError:
+                return
+            for interface, up in self.parse_link_messages(data):
+                with self._condition:
+                    self._links[interface] = up
+                    if up and interface not in self._up_since:
+                        self._up_since[interface] = time.monotonic() - self._start
+                    self._condition.notify_all()
+            if any(
+                message_type == self.NLMSG_DONE for message_type, _ in self._split_messages(data)
+            ):
+                self._link_dump_received.set()
+
+    @classmethod
+    def parse_link_messages(cls, data: bytes) -> list:
+        """Returns (interface name, is up) for each RTM_NEWLINK message in netlink data."""
+        links = [
+            cls._parse_link_message(payload)
+            for message_type, payload in cls._split_messages(data)
+            if message_type == cls.RTM_NEWLINK
+        ]
+        return [link for link in links if link[0]]
+
+    @classmethod
+    def _split_messages(cls, data: bytes) -> list:
+        """Returns (message type, payload) of each netlink message in data."""
+        messages = []
+        offset = 0
+        while offset + cls.NLMSG_HEADER.size <= len(data):
+            length, message_type, _, _, _ = cls.NLMSG_HEADER.unpack_from(data, offset)
+            if length < cls.NLMSG_HEADER.size:
+                break
+            payload = data[offset + cls.NLMSG_HEADER.size : offset + length]  # noqa: E203
+            messages.append((message_type, payload))
+            offset += (length + 3) & ~3
+        return messages
+
+    @classmethod
+    def _parse_link_message(cls, payload: bytes) -> tuple:
+        """Parses ifinfomsg and its IFLA_IFNAME and IFLA_OPERSTATE attributes."""
+        _, _, _, flags, _ = cls.IFINFOMSG.unpack_from(payload)
+        name = ""
+        operstate = cls.IF_OPER_UNKNOWN
+        offset = cls.IFINFOMSG.size
+        while offset + cls.RTATTR_HEADER.size <= len(payload):
+            length, attribute_type = cls.RTATTR_HEADER.unpack_from(payload, offset)
+            if length < cls.RTATTR_HEADER.size:
+                break
+            value = payload[offset + cls.RTATTR_HEADER.size : offset + length]  # noqa: E203
+            if attribute_type == cls.IFLA_IFNAME:
+                name = value.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+            elif attribute_type == cls.IFLA_OPERSTATE and value:
+                operstate = value[0]
+            offset += (length + 3) & ~3
+        up = bool(flags & cls.IFF_UP) and operstate in [cls.IF_OPER_UP, cls.IF_OPER_UNKNOWN]
+        return name, up
+
+    def _open_netlink_socket(self) -> socket.socket:
+        """Opens netlink socket subscribed to link events."""
+        netlink_socket = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, self.NETLINK_ROUTE)
+        netlink_socket.bind((0, self.RTMGRP_LINK))
+        return netlink_socket
+
+    def _request_link_dump(self, netlink_socket: socket.socket):
+        """Asks the kernel for the current state of all links."""
+        request = self.NLMSG_HEADER.pack(
+            self.NLMSG_HEADER.size + self.IFINFOMSG.size,
+            self.RTM_GETLINK,
+            self.NLM_F_REQUEST | self.NLM_F_DUMP,
+            1,
+            0,
+        ) + self.IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        netlink_socket.send(request)
@@ -0,0 +1,132 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerInterfaceSelector:
+    SYS_CLASS_NET = "/sys/class/net"
+
+    def __init__(self, network_interfaces: list):
+        self.network_interfaces = network_interfaces
+
+    def select(self, sgi: str = None, s1: str = None) -> tuple:  # type: ignore[assignment]
+        """Picks SGi and S1 interfaces not chosen by the operator and explains the choice.
+
+        The fastest interface becomes SGi. S1 is the fastest of the remaining interfaces,
+        preferring the ones attached to the same NUMA node as SGi, so that traffic forwarded
+        between S1 and SGi doesn't cross NUMA nodes.
+
+        :returns:
+            tuple: SGi interface name, S1 interface name
+        """
+        candidates = self.rank_interfaces()
+        for rank, candidate in enumerate(candidates, start=1):
+            logger.info(f"Interface candidate {rank}: {self._describe(candidate)}")
+        if not sgi:
+            sgi = self._pick(candidates, exclude=[s1])["name"]
+            logger.info(f"Selected {sgi} as SGi interface as the best ranked interface.")
+        if not s1:
+            sgi_numa_node = self.probe_interface(sgi)["numa_node"]
+            remaining_candidates = [
+                candidate for candidate in candidates if candidate["name"] != sgi
+            ]
+            same_numa_node_candidates = [
+                candidate
+                for candidate in remaining_candidates
+                if candidate["numa_node"] == sgi_numa_node
+            ]
+            s1 = (same_numa_node_candidates or remaining_candidates)[0]["name"]
+            numa_note = f" on SGi's NUMA node {sgi_numa_node}" if same_numa_node_candidates else ""
+            logger.info(
+                f"Selected {s1} as S1 interface as the best ranked remaining interface{numa_note}."
+            )
+        return sgi, s1
+
+    def rank_interfaces(self) -> list:
+        """Probes all interfaces and sorts them from the most to the least suitable one.
+
+        Physical interfaces with carrier go first, followed by faster, full-duplex interfaces
+        with more RX queues. Interfaces without a backing device (bridges, veths etc.) are only
+        considered if there are fewer than two physical ones.
+        """
+        probed_interfaces = [
+            self.probe_interface(interface) for interface in self.network_interfaces
+        ]
+        physical_interfaces = [interface for interface in probed_interfaces if interface["driver"]]
+        return sorted(
+            physical_interfaces if len(physical_interfaces) >= 2 else probed_interfaces,
+            key=lambda interface: (
+                interface["carrier"],
+                interface["speed"],
+                interface["duplex"] == "full",
+                interface["rx_queues"],
+            ),
+            reverse=True,
+        )
+
+    def probe_interface(self, interface: str) -> dict:
+        """Reads interface's speed, duplex, carrier, driver, RX queue count and NUMA node."""
+        interface_dir = os.path.join(self.SYS_CLASS_NET, interface)
+        driver_link = os.path.join(interface_dir, "device", "driver")
+        queues_dir = os.path.join(interface_dir, "queues")
+        speed = self._read_int(os.path.join(interface_dir, "speed"))
+        return {
+            "name": interface,
+            "speed": max(speed, 0),
+            "duplex": self._read_file(os.path.join(interface_dir, "duplex")),
+            "carrier": self._read_file(os.path.join(interface_dir, "carrier")) == "1",
+            "driver": (
+                os.path.basename(os.readlink(driver_link)) if os.path.islink(driver_link) else ""
+            ),
+            "rx_queues": len(
+                [queue for queue in self._list_dir(queues_dir) if queue.startswith("rx-")]
+            ),
+            "numa_node": max(
+                self._read_int(os.path.join(interface_dir, "device", "numa_node")), 0
+            ),
+        }
+
+    @staticmethod
+    def _pick(candidates: list, exclude: list) -> dict:
+        """Returns the best ranked candidate which is not excluded."""
+        return next(candidate for candidate in candidates if candidate["name"] not in exclude)
+
+    @staticmethod
+    def _describe(interface: dict) -> str:
+        """Returns human readable summary of interface's probed properties."""
+        return (
+            f"{interface['name']} speed={interface['speed'] or 'unknown'}Mb/s "
+            f"duplex={interface['duplex'] or 'unknown'} "
+            f"carrier={'yes' if interface['carrier'] else 'no'} "
+            f"driver={interface['driver'] or 'none'} rx_queues={interface['rx_queues']} "
+            f"numa_node={interface['numa_node']}"
+        )
+
+    def _read_int(self, path: str) -> int:
+        """Returns integer content of a file or -1 if it can't be read."""
+        try:
+            return int(self._read_file(path))
+        except ValueError:
+            return -1
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        """Returns stripped content of a file or an empty string if it can't be read."""
+        try:
+            with open(path, "r") as file:
+                return file.read().strip()
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _list_dir(path: str) -> list:
+        """Returns directory entries or an empty list if directory can't be read."""
+        try:
+            return os.listdir(path)
+        except OSError:
+            return []
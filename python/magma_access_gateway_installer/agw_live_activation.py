@@ -0,0 +1,169 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+from subprocess import DEVNULL, CalledProcessError, call, check_call, check_output
+
+import yaml
+
+from .agw_interface_activator import AGWInstallerInterfaceActivator
+from .agw_network_configurator import AGWInstallerNetworkConfigurator
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerLiveActivation:
+    REBOOT_REQUIRED_FILE = "/var/run/reboot-required"
+    REBOOT_REQUIRED_PACKAGES_FILE = "/var/run/reboot-required.pkgs"
+    MAGMA_NETPLAN_CONFIG_FILE = AGWInstallerNetworkConfigurator.MAGMA_NETPLAN_CONFIG_FILE
+    SYS_CLASS_NET = "/sys/class/net"
+    SYS_MODULE = "/sys/module"
+    KERNEL_MODULES = ["openvswitch"]
+    SERVICES = ["openvswitch-switch", "magma@magma"]
+
+    def __init__(self, magma_interfaces: list):
+        self.magma_interfaces = magma_interfaces
+
+    def get_reboot_reasons(self) -> list:
+        """Checks whether anything installed or configured takes effect only after a reboot.
+
+        :returns:
+            list: human readable reasons for a reboot, empty if the installation can be
+                activated live
+        """
+        return (
+            self._get_pending_package_reboots()
+            + self._get_pending_interface_renames()  # noqa: W503
+            + self._get_stale_kernel_modules()  # noqa: W503
+        )
+
+    def activate(self) -> list:
+        """Loads kernel modules, starts services and brings up interfaces without a reboot.
+
+        :returns:
+            list: verification failures, empty if the installation is fully active
+        """
+        logger.info("Activating Magma AGW without reboot...")
+        for module in self.KERNEL_MODULES:
+            if not self._module_is_loaded(module):
+                logger.info(f"Loading {module} kernel module...")
+                check_call(["modprobe", module])
+        for service in self.SERVICES:
+            if not self._service_is_active(service):
+                logger.info(f"Starting {service} service...")
+                check_call(["systemctl", "start", service])
+        interfaces = AGWInstallerInterfaceActivator(self.magma_interfaces).activate()
+        failures = [
+            f"Interface {interface} is not up."
+            for interface, result in interfaces.items()
+            if not result["up"]
+        ]
+        for failure in failures:
+            logger.warning(f"Live activation check failed: {failure}")
+        return failures + self.verify()
+
+    def verify(self) -> list:
+        """Checks that kernel modules are loaded, services active and Magma interfaces exist."""
+        failures = [
+            f"Kernel module {module} is not loaded."
+            for module in self.KERNEL_MODULES
+            if not self._module_is_loaded(module)
+        ]
+        failures += [
+            f"Service {service} is not active."
+            for service in self.SERVICES
+            if not self._service_is_active(service)
+        ]
+        failures += [
+            f"Interface {interface} doesn't exist."
+            for interface in self.magma_interfaces
+            if not os.path.exists(os.path.join(self.SYS_CLASS_NET, interface))
+        ]
+        for failure in failures:
+            logger.warning(f"Live activation check failed: {failure}")
+        return failures
+
+    def _get_pending_package_reboots(self) -> list:
+        """Returns packages which requested a reboot, e.g. a new kernel."""
+        if not os.path.exists(self.REBOOT_REQUIRED_FILE):
+            return []
+        try:
+            with open(self.REBOOT_REQUIRED_PACKAGES_FILE, "r") as reboot_required_packages:
+                packages = sorted(set(reboot_required_packages.read().split()))
+        except OSError:
+            packages = []
+        return [f"Packages require a reboot: {', '.join(packages) or 'unknown'}."]
+
+    def _get_pending_interface_renames(self) -> list:
+        """Returns interfaces which netplan set-name will rename only on the next boot."""
+        try:
+            with open(self.MAGMA_NETPLAN_CONFIG_FILE, "r") as netplan_config_file:
+                netplan_config = yaml.safe_load(netplan_config_file) or {}
+        except OSError:
+            return []
+        pending_renames = []
+        for ethernet_name, ethernet in (
+            netplan_config.get("network", {}).get("ethernets", {}).items()
+        ):
+            ethernet = ethernet or {}
+            set_name = ethernet.get("set-name", ethernet_name)
+            current_name = self._get_interface_by_mac_address(
+                ethernet.get("match", {}).get("macaddress", "")
+            )
+            if current_name and current_name != set_name:
+                pending_renames.append(
+                    f"Interface {current_name} is renamed to {set_name} on the next boot."
+                )
+        return pending_renames
+
+    def _get_stale_kernel_modules(self) -> list:
+        """Returns loaded kernel modules which differ from the ones installed on disk."""
+        stale_modules = []
+        for module in self.KERNEL_MODULES:
+            loaded_srcversion = self._read_file(
+                os.path.join(self.SYS_MODULE, module, "srcversion")
+            )
+            if not loaded_srcversion:
+                continue
+            try:
+                installed_srcversion = (
+                    check_output(["modinfo", "-F", "srcversion", module], stderr=DEVNULL)
+                    .decode("utf-8")
+                    .strip()
+                )
+            except CalledProcessError:
+                continue
+            if installed_srcversion and installed_srcversion != loaded_srcversion:
+                stale_modules.append(
+                    f"Loaded {module} kernel module differs from the installed one."
+                )
+        return stale_modules
+
+    def _get_interface_by_mac_address(self, mac_address: str) -> str:
+        """Returns name of the interface with given MAC address."""
+        try:
+            interfaces = os.listdir(self.SYS_CLASS_NET)
+        except OSError:
+            return ""
+        for interface in interfaces:
+            address = self._read_file(os.path.join(self.SYS_CLASS_NET, interface, "address"))
+            if mac_address and address.lower() == mac_address.lower():
+                return interface
+        return ""
+
+    def _module_is_loaded(self, module: str) -> bool:
+        return os.path.isdir(os.path.join(self.SYS_MODULE, module))
+
+    @staticmethod
+    def _service_is_active(service: str) -> bool:
+        return call(["systemctl", "is-active", "--quiet", service], stderr=DEVNULL) == 0
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        try:
+            with open(path, "r") as file:
+                return file.read().strip()
+        except OSError:
+            return ""
@@ -0,0 +1,283 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+import re
+from subprocess import DEVNULL, CalledProcessError, call, check_call, check_output
+
+from jinja2 import Environment, FileSystemLoader, Template
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerNICTuner:
+    NIC_TUNING_SCRIPT = "/usr/local/sbin/magma-nic-tuning.sh"
+    NIC_TUNING_SCRIPT_TEMPLATE = "nic_tuning.sh.j2"
+    NIC_TUNING_SERVICE = "magma-nic-tuning"
+    NIC_TUNING_SERVICE_FILE = "/etc/systemd/system/magma-nic-tuning.service"
+    NIC_TUNING_SERVICE_TEMPLATE = "magma-nic-tuning.service.j2"
+    SYS_CLASS_NET = "/sys/class/net"
+    SYS_CPU_ONLINE = "/sys/devices/system/cpu/online"
+    PROC_IRQ = "/proc/irq"
+    OFFLOADS = {
+        "rx": "rx-checksumming",
+        "tx": "tx-checksumming",
+        "gso": "generic-segmentation-offload",
+        "gro": "generic-receive-offload",
+    }
+    TUNED_OFFLOADS = {"rx": "on", "tx": "on", "gso": "on", "gro": "on"}
+
+    def __init__(self, network_interfaces: list):
+        self.network_interfaces = network_interfaces
+
+    def tune_nics(self) -> dict:
+        """Probes NICs, persists tuned settings as a boot time service and applies them.
+
+        :returns:
+            dict: tuning targets for each of the tuned interfaces
+        """
+        logger.info("Tuning S1 and SGi network interfaces...")
+        targets = {}
+        for interface in self.network_interfaces:
+            capabilities = self.probe_interface(interface)
+            logger.info(
+                f"{interface}: NUMA node {capabilities['numa_node']}, "
+                f"local CPUs {capabilities['local_cpus']}, "
+                f"combined queues {capabilities['combined']}/{capabilities['max_combined']}, "
+                f"RX ring {capabilities['rx_ring']}/{capabilities['max_rx_ring']}, "
+                f"TX ring {capabilities['tx_ring']}/{capabilities['max_tx_ring']}"
+            )
+            targets[interface] = self.compute_targets(capabilities)
+        self._write_nic_tuning_script(targets)
+        self._write_nic_tuning_service()
+        self._disable_irqbalance()
+        self._enable_nic_tuning_service()
+        return targets
+
+    def verify(self, targets: dict) -> list:
+        """Compares NICs' current settings with tuning targets and logs a verification report.
+
+        :returns:
+            list: descriptions of settings not matching their targets
+        """
+        logger.info("NIC tuning verification report:")
+        mismatches = []
+        for interface, target in targets.items():
+            for setting, expected, actual in self._compare_with_targets(interface, target):
+                status = "OK" if expected == actual else "MISMATCH"
+                logger.info(
+                    f"  {interface} {setting}: target={expected} current={actual} {status}"
+                )
+                if expected != actual:
+                    mismatches.append(f"{interface} {setting}")
+        for mismatch in mismatches:
+            logger.warning(f"NIC tuning not in effect for {mismatch}!")
+        return mismatches
+
+    def probe_interface(self, interface: str) -> dict:
+        """Probes interface's channels, rings, offloads, NUMA node, local CPUs and IRQs."""
+        channels = self._ethtool_settings("-l", interface, ["Combined"])
+        rings = self._ethtool_settings("-g", interface, ["RX", "TX"])
+        numa_node = int(self._read_interface_device_file(interface, "numa_node") or -1)
+        local_cpus = self._parse_cpu_list(
+            self._read_interface_device_file(interface, "local_cpulist")
+            or self._read_file(self.SYS_CPU_ONLINE)  # noqa: W503
+        )
+        return {
+            "mac_address": self._read_file(os.path.join(self.SYS_CLASS_NET, interface, "address")),
+            "max_combined": channels["max"].get("Combined"),
+            "combined": channels["current"].get("Combined"),
+            "max_rx_ring": rings["max"].get("RX"),
+            "rx_ring": rings["current"].get("RX"),
+            "max_tx_ring": rings["max"].get("TX"),
+            "tx_ring": rings["current"].get("TX"),
+            "offloads": self._get_offloads(interface),
+            "numa_node": max(numa_node, 0),
+            "local_cpus": local_cpus,
+            "irqs": self._get_interface_irqs(interface),
+            "tx_queues": self._get_interface_queues(interface, "tx"),
+            "rx_queues": self._get_interface_queues(interface, "rx"),
+        }
+
+    def compute_targets(self, capabilities: dict) -> dict:
+        """Computes tuned settings from interface's capabilities."""
+        cpus = capabilities["local_cpus"]
+        combined = None
+        if capabilities["max_combined"]:
+            combined = min(capabilities["max_combined"], len(cpus))
+        return {
+            "mac_address": capabilities["mac_address"],
+            "combined": combined,
+            "rx_ring": capabilities["max_rx_ring"],
+            "tx_ring": capabilities["max_tx_ring"],
+            "offloads": dict(self.TUNED_OFFLOADS),
+            "cpus": cpus,
+            "rps_mask": self._cpu_mask(cpus),
+            "xps_masks": [self._cpu_mask([cpu]) for cpu in cpus],
+        }
+
+    def _compare_with_targets(self, interface: str, target: dict) -> list:
+        """Returns list of (setting, target value, current value) for given interface."""
+        capabilities = self.probe_interface(interface)
+        comparison = []
+        if target["combined"]:
+            comparison.append(("combined queues", target["combined"], capabilities["combined"]))
+        if target["rx_ring"] and target["tx_ring"]:
+            comparison.append(("RX ring", target["rx_ring"], capabilities["rx_ring"]))
+            comparison.append(("TX ring", target["tx_ring"], capabilities["tx_ring"]))
+        for offload, state in target["offloads"].items():
+            comparison.append((offload, state, capabilities["offloads"].get(offload)))
+        cpus = target["cpus"]
+        for index, irq in enumerate(capabilities["irqs"]):
+            comparison.append(
+                (f"IRQ {irq} affinity", str(cpus[index % len(cpus)]), self._get_irq_affinity(irq))
+            )
+        for queue in capabilities["rx_queues"]:
+            comparison.append(
+                (
+                    f"{queue} RPS mask",
+                    int(target["rps_mask"].replace(",", ""), 16),
+                    self._read_queue_mask(interface, queue, "rps_cpus"),
+                )
+            )
+        xps_masks = target["xps_masks"]
+        for index, queue in enumerate(capabilities["tx_queues"]):
+            comparison.append(
+                (
+                    f"{queue} XPS mask",
+                    int(xps_masks[index % len(xps_masks)].replace(",", ""), 16),
+                    self._read_queue_mask(interface, queue, "xps_cpus"),
+                )
+            )
+        return comparison
+
+    def _write_nic_tuning_script(self, targets: dict):
+        """Renders NIC tuning script persisting tuned settings."""
+        logger.info(f"Writing NIC tuning script to {self.NIC_TUNING_SCRIPT}...")
+        nics = [dict(target, name=interface) for interface, target in targets.items()]
+        with open(self.NIC_TUNING_SCRIPT, "w") as nic_tuning_script:
+            nic_tuning_script.write(
+                self._load_template(self.NIC_TUNING_SCRIPT_TEMPLATE).render(nics=nics)
+            )
+        os.chmod(self.NIC_TUNING_SCRIPT, 0o755)
+
+    def _write_nic_tuning_service(self):
+        """Renders systemd service applying NIC tuning script on every boot."""
+        with open(self.NIC_TUNING_SERVICE_FILE, "w") as nic_tuning_service:
+            nic_tuning_service.write(
+                self._load_template(self.NIC_TUNING_SERVICE_TEMPLATE).render(
+                    nic_tuning_script=self.NIC_TUNING_SCRIPT
+                )
+            )
+
+    def _enable_nic_tuning_service(self):
+        """Enables NIC tuning service and runs it to apply tuned settings immediately."""
+        logger.info(f"Enabling and starting {self.NIC_TUNING_SERVICE} service...")
+        check_call(["systemctl", "daemon-reload"])
+        check_call(["systemctl", "enable", self.NIC_TUNING_SERVICE])
+        check_call(["systemctl", "restart", self.NIC_TUNING_SERVICE])
+
+    @staticmethod
+    def _disable_irqbalance():
+        """Disables irqbalance which would otherwise override tuned IRQ affinity.
+
+        irqbalance is disabled even when it isn't running, as it would still start at boot.
+        """
+        if call(["systemctl", "cat", "irqbalance"], stdout=DEVNULL, stderr=DEVNULL) != 0:
+            return
+        logger.info("Disabling irqbalance service to preserve tuned IRQ affinity...")
+        check_call(["systemctl", "disable", "--now", "irqbalance"])
+
+    @staticmethod
+    def _ethtool_settings(option: str, interface: str, settings: list) -> dict:
+        """Parses pre-set maximums and current values of given settings from ethtool output."""
+        parsed: dict = {"max": {}, "current": {}}
+        try:
+            ethtool_output = check_output(["ethtool", option, interface]).decode("utf-8")
+        except CalledProcessError:
+            logger.warning(f"ethtool {option} is not supported by {interface}.")
+            return parsed
+        maximums, _, current = ethtool_output.partition("Current hardware settings:")
+        for section, text in (("max", maximums), ("current", current)):
+            for setting in settings:
+                if match := re.search(rf"^{setting}:\s+(\d+)", text, re.MULTILINE):
+                    parsed[section][setting] = int(match.group(1))
+        return parsed
+
+    def _get_offloads(self, interface: str) -> dict:
+        """Returns current state ("on"/"off") of tuned offloads."""
+        try:
+            features = check_output(["ethtool", "-k", interface]).decode("utf-8")
+        except CalledProcessError:
+            return {}
+        offloads = {}
+        for offload, feature in self.OFFLOADS.items():
+            if match := re.search(rf"^{feature}: (on|off)", features, re.MULTILINE):
+                offloads[offload] = match.group(1)
+        return offloads
+
+    def _get_interface_irqs(self, interface: str) -> list:
+        """Returns sorted list of MSI IRQs used by interface's device."""
+        msi_irqs_dir = os.path.join(self.SYS_CLASS_NET, interface, "device", "msi_irqs")
+        if not os.path.isdir(msi_irqs_dir):
+            return []
+        return sorted(int(irq) for irq in os.listdir(msi_irqs_dir))
+
+    def _get_interface_queues(self, interface: str, direction: str) -> list:
+        """Returns interface's RX or TX queue names sorted by queue number."""
+        queues_dir = os.path.join(self.SYS_CLASS_NET, interface, "queues")
+        if not os.path.isdir(queues_dir):
+            return []
+        return sorted(
+            (queue for queue in os.listdir(queues_dir) if queue.startswith(f"{direction}-")),
+            key=lambda queue: int(queue.split("-")[1]),
+        )
+
+    def _get_irq_affinity(self, irq: int) -> str:
+        """Returns IRQ's CPU affinity list."""
+        return self._read_file(os.path.join(self.PROC_IRQ, str(irq), "smp_affinity_list"))
+
+    def _read_queue_mask(self, interface: str, queue: str, mask_file: str) -> int:
+        """Returns RPS/XPS CPU mask of interface's queue as an integer."""
+        mask = self._read_file(
+            os.path.join(self.SYS_CLASS_NET, interface, "queues", queue, mask_file)
+        )
+        return int(mask.replace(",", "") or "0", 16)
+
+    def _read_interface_device_file(self, interface: str, file_name: str) -> str:
+        """Reads a file from interface's device sysfs directory."""
+        return self._read_file(os.path.join(self.SYS_CLASS_NET, interface, "device", file_name))
+
+    def _load_template(self, template_name: str) -> Template:
+        file_loader = FileSystemLoader(
+            os.path.join(os.path.abspath(os.path.dirname(__file__)), "resources")
+        )
+        env = Environment(loader=file_loader)
+        return env.get_template(template_name)
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        """Returns stripped content of a file or an empty string if it can't be read."""
+        try:
+            with open(path, "r") as file:
+                return file.read().strip()
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _parse_cpu_list(cpu_list: str) -> list:
+        """Parses CPU list in a kernel format (i.e. 0-3,8-11) to a list of CPU numbers."""
+        cpus: list = []
+        for cpu_range in filter(None, cpu_list.split(",")):
+            first, _, last = cpu_range.partition("-")
+            cpus.extend(range(int(first), int(last or first) + 1))
+        return cpus or [0]
+
+    @staticmethod
+    def _cpu_mask(cpus: list) -> str:
+        """Returns hexadecimal CPU mask in a kernel format for given list of CPUs."""
+        mask = f"{sum(1 << cpu for cpu in set(cpus)):x}"
+        mask = mask.zfill(-(-len(mask) // 8) * 8)
+        return ",".join(mask[index : index + 8] for index in range(0, len(mask), 8))  # noqa: E203
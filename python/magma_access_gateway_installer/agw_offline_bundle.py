@@ -0,0 +1,305 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+from subprocess import check_call, check_output
+
+import yaml
+
+from .agw_installation_errors import OfflineBundleError
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerOfflineBundle:
+    BUNDLE_DIR = "/var/cache/magma-agw-bundle"
+    BUNDLE_MANIFEST = "bundle.yaml"
+    BUNDLE_KEYRING = "magma-bundle-keyring.gpg"
+    BUNDLE_ORIGIN = "magma-agw-bundle"
+    MAGMA_APT_REPOSITORY_CONFIG_FILE = "/etc/apt/sources.list.d/magma.list"
+    # apt silently ignores *.bak files, so the backup doesn't add a duplicate source
+    MAGMA_APT_REPOSITORY_CONFIG_BACKUP_FILE = "/etc/apt/sources.list.d/magma.list.bak"
+    # Restricts apt to the bundle repository for the duration of the installation
+    OFFLINE_APT_CONFIG_FILE = "/etc/apt/apt.conf.d/99magma-offline-bundle"
+    EPHEMERAL_SIGNING_KEY_UID = "Magma AGW offline bundle"
+
+    def __init__(self, bundle_path: str):
+        self.bundle_path = bundle_path
+
+    def build(
+        self,
+        magma_version: str,
+        packages: list,
+        signing_key: str = None,  # type: ignore[assignment]
+    ) -> str:
+        """Downloads full dependency closure of given packages into a signed apt repository.
+
+        The repository is written to the bundle path as a tar.gz archive together with
+        the public key it is signed with. If no signing key is given, an ephemeral one
+        is generated.
+
+        :returns:
+            str: fingerprint of the key bundle's repository is signed with
+        """
+        with tempfile.TemporaryDirectory() as workdir:
+            repository_dir = os.path.join(workdir, "repository")
+            gnupg_home = os.path.join(workdir, "gnupg")
+            os.makedirs(os.path.join(repository_dir, "partial"))
+            os.makedirs(gnupg_home, mode=0o700)
+            self._download_packages(repository_dir, packages)
+            shutil.rmtree(os.path.join(repository_dir, "partial"))
+            self._create_apt_repository_index(repository_dir, magma_version)
+            gpg_env = dict(os.environ)
+            if not signing_key:
+                gpg_env["GNUPGHOME"] = gnupg_home
+                signing_key = self._generate_ephemeral_signing_key(gpg_env)
+            self._sign_apt_repository(repository_dir, signing_key, gpg_env)
+            fingerprint = self._get_key_fingerprints(
+                os.path.join(repository_dir, self.BUNDLE_KEYRING)
+            )[0]
+            self._write_manifest(repository_dir, magma_version, fingerprint)
+            logger.info(f"Writing offline bundle to {self.bundle_path}...")
+            with tarfile.open(self.bundle_path, "w:gz") as bundle:
+                bundle.add(repository_dir, arcname=".")
+        logger.info(
+            f"Offline bundle for Magma {magma_version} written to {self.bundle_path}. "
+            f"Its repository is signed with key {fingerprint}."
+        )
+        return fingerprint
+
+    def configure_apt_source(self, magma_version: str, key_fingerprint: str):
+        """Extracts the bundle and configures it as the only apt source of the installation.
+
+        Keyring shipped inside the bundle is only trusted if it contains the key with given
+        fingerprint, obtained separately from the bundle.
+
+        :raises:
+            OfflineBundleError: if no fingerprint is given, bundle is malformed, built for
+                a different Magma version or not signed with the expected key
+        """
+        if not key_fingerprint:
+            raise OfflineBundleError(
+                "Fingerprint of the key bundle is signed with is required to verify it."
+            )
+        self._extract()
+        manifest = self._load_manifest()
+        if manifest.get("magma_version") != magma_version:
+            raise OfflineBundleError(
+                f"Bundle contains Magma {manifest.get('magma_version')}, "
+                f"but {magma_version} is required."
+            )
+        keyring = os.path.join(self.BUNDLE_DIR, self.BUNDLE_KEYRING)
+        fingerprints = self._get_key_fingerprints(keyring)
+        if key_fingerprint.replace(" ", "").upper() not in fingerprints:
+            raise OfflineBundleError(
+                f"Bundle is signed with {', '.join(fingerprints) or 'no key'}, "
+                f"not with {key_fingerprint}."
+            )
+        logger.info(
+            f"Configuring offline bundle with {len(manifest.get('packages', []))} packages "
+            f"signed with {', '.join(fingerprints)} as apt source..."
+        )
+        if not self._bundle_configured:
+            self._back_up_magma_apt_source()
+        with open(self.MAGMA_APT_REPOSITORY_CONFIG_FILE, "w") as magma_apt_repo:
+            magma_apt_repo.write(f"deb [signed-by={keyring}] file:{self.BUNDLE_DIR} ./")
+        with open(self.OFFLINE_APT_CONFIG_FILE, "w") as offline_apt_config:
+            offline_apt_config.write(
+                f'Dir::Etc::sourcelist "{self.MAGMA_APT_REPOSITORY_CONFIG_FILE}";\n'
+                'Dir::Etc::sourceparts "-";\n'
+                'APT::Get::List-Cleanup "0";\n'
+            )
+
+    def restore_apt_sources(self):
+        """Lets apt use all configured sources again once installation from bundle is done.
+
+        Magma apt source is restored to the one configured before the installation. If there
+        was none, it's removed, so a later online installation configures the artifactory.
+        """
+        if os.path.exists(self.OFFLINE_APT_CONFIG_FILE):
+            logger.info("Restoring apt sources used before installation from offline bundle...")
+            os.remove(self.OFFLINE_APT_CONFIG_FILE)
+        if not self._bundle_configured:
+            return
+        if os.path.exists(self.MAGMA_APT_REPOSITORY_CONFIG_BACKUP_FILE):
+            os.replace(
+                self.MAGMA_APT_REPOSITORY_CONFIG_BACKUP_FILE, self.MAGMA_APT_REPOSITORY_CONFIG_FILE
+            )
+        else:
+            os.remove(self.MAGMA_APT_REPOSITORY_CONFIG_FILE)
+
+    def _back_up_magma_apt_source(self):
+        """Backs up Magma apt source configured before the installation, if there is one."""
+        if os.path.exists(self.MAGMA_APT_REPOSITORY_CONFIG_FILE):
+            shutil.copyfile(
+                self.MAGMA_APT_REPOSITORY_CONFIG_FILE, self.MAGMA_APT_REPOSITORY_CONFIG_BACKUP_FILE
+            )
+        elif os.path.exists(self.MAGMA_APT_REPOSITORY_CONFIG_BACKUP_FILE):
+            os.remove(self.MAGMA_APT_REPOSITORY_CONFIG_BACKUP_FILE)
+
+    @property
+    def _bundle_configured(self) -> bool:
+        """Checks whether Magma apt source points to the offline bundle."""
+        try:
+            with open(self.MAGMA_APT_REPOSITORY_CONFIG_FILE, "r") as magma_apt_repo:
+                return f"file:{self.BUNDLE_DIR}" in magma_apt_repo.read()
+        except OSError:
+            return False
+
+    @staticmethod
+    def _download_packages(repository_dir: str, packages: list):
+        """Downloads packages with all their dependencies, as if nothing was installed."""
+        logger.info(f"Downloading {', '.join(packages)} with all dependencies...")
+        check_call(
+            [
+                "apt-get",
+                "-qq",
+                "-y",
+                "--download-only",
+                "--no-install-recommends",
+                "-o",
+                "Dir::State::status=/dev/null",
+                "-o",
+                f"Dir::Cache::archives={repository_dir}",
+                "install",
+                *packages,
+            ]
+        )
+
+    def _create_apt_repository_index(self, repository_dir: str, magma_version: str):
+        """Generates Packages and Release files of a flat apt repository."""
+        logger.info("Generating offline bundle's apt repository index...")
+        packages_index = check_output(["apt-ftparchive", "packages", "."], cwd=repository_dir)
+        with open(os.path.join(repository_dir, "Packages"), "wb") as packages_file:
+            packages_file.write(packages_index)
+        release = check_output(
+            [
+                "apt-ftparchive",
+                "-o",
+                f"APT::FTPArchive::Release::Origin={self.BUNDLE_ORIGIN}",
+                "-o",
+                f"APT::FTPArchive::Release::Suite={magma_version}",
+                "release",
+                ".",
+            ],
+            cwd=repository_dir,
+        )
+        with open(os.path.join(repository_dir, "Release"), "wb") as release_file:
+            release_file.write(release)
+
+    def _generate_ephemeral_signing_key(self, gpg_env: dict) -> str:
+        """Generates passwordless signing key used only for this bundle."""
+        logger.info("Generating ephemeral offline bundle signing key...")
+        check_call(
+            [
+                "gpg",
+                "--batch",
+                "--passphrase",
+                "",
+                "--quick-gen-key",
+                self.EPHEMERAL_SIGNING_KEY_UID,
+                "rsa3072",
+                "sign",
+                "never",
+            ],
+            env=gpg_env,
+        )
+        return self.EPHEMERAL_SIGNING_KEY_UID
+
+    def _sign_apt_repository(self, repository_dir: str, signing_key: str, gpg_env: dict):
+        """Signs Release file and exports public part of signing key into the repository."""
+        logger.info(f"Signing offline bundle's apt repository with {signing_key}...")
+        release = os.path.join(repository_dir, "Release")
+        gpg = ["gpg", "--batch", "--yes", "--local-user", signing_key]
+        check_call(
+            gpg + ["--clearsign", "--output", os.path.join(repository_dir, "InRelease"), release],
+            env=gpg_env,
+        )
+        check_call(
+            gpg
+            + ["--armor", "--detach-sign", "--output", f"{release}.gpg", release],  # noqa: W503
+            env=gpg_env,
+        )
+        check_call(
+            [
+                "gpg",
+                "--batch",
+                "--yes",
+                "--output",
+                os.path.join(repository_dir, self.BUNDLE_KEYRING),
+                "--export",
+                signing_key,
+            ],
+            env=gpg_env,
+        )
+
+    def _write_manifest(self, repository_dir: str, magma_version: str, fingerprint: str):
+        """Writes manifest describing bundle's content."""
+        manifest = {
+            "magma_version": magma_version,
+            "key_fingerprint": fingerprint,
+            "packages": sorted(
+                file_name for file_name in os.listdir(repository_dir) if file_name.endswith(".deb")
+            ),
+        }
+        with open(os.path.join(repository_dir, self.BUNDLE_MANIFEST), "w") as manifest_file:
+            yaml.safe_dump(manifest, manifest_file)
+
+    def _extract(self):
+        """Extracts bundle archive into bundle directory.
+
+        :raises:
+            OfflineBundleError: if bundle can't be read or contains unexpected entries
+        """
+        logger.info(f"Extracting offline bundle {self.bundle_path} to {self.BUNDLE_DIR}...")
+        shutil.rmtree(self.BUNDLE_DIR, ignore_errors=True)
+        os.makedirs(self.BUNDLE_DIR, mode=0o755)
+        try:
+            with tarfile.open(self.bundle_path, "r:gz") as bundle:
+                for member in bundle.getmembers():
+                    if not self._is_safe_member(member):
+                        raise OfflineBundleError(f"Unexpected bundle entry {member.name}.")
+                bundle.extractall(self.BUNDLE_DIR)
+        except (OSError, tarfile.TarError) as e:
+            raise OfflineBundleError(f"Can't read bundle {self.bundle_path}: {e}.")
+
+    def _load_manifest(self) -> dict:
+        """Returns bundle's manifest.
+
+        :raises:
+            OfflineBundleError: if bundle has no readable manifest
+        """
+        try:
+            with open(os.path.join(self.BUNDLE_DIR, self.BUNDLE_MANIFEST), "r") as manifest_file:
+                return yaml.safe_load(manifest_file) or {}
+        except (OSError, yaml.YAMLError) as e:
+            raise OfflineBundleError(f"Can't read bundle manifest: {e}.")
+
+    @staticmethod
+    def _is_safe_member(member: tarfile.TarInfo) -> bool:
+        """Checks that bundle entry is a file or a directory which stays inside bundle dir."""
+        path = os.path.normpath(member.name)
+        return (
+            (member.isfile() or member.isdir())
+            and not os.path.isabs(path)  # noqa: W503
+            and path.split(os.sep)[0] != ".."  # noqa: W503
+        )
+
+    @staticmethod
+    def _get_key_fingerprints(keyring: str) -> list:
+        """Returns fingerprints of all keys in a keyring file."""
+        if not os.path.exists(keyring):
+            return []
+        show_keys_output = check_output(["gpg", "--show-keys", "--with-colons", keyring]).decode(
+            "utf-8"
+        )
+        return [
+            line.split(":")[9].upper()
+            for line in show_keys_output.splitlines()
+            if line.startswith("fpr:")
+        ]
@@ -0,0 +1,123 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+from subprocess import check_call, check_output
+
+import yaml
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerOVSTuner:
+    """Sizes ovs-vswitchd threads and datapath flow table for the host and subscriber count.
+
+    Revalidators follow OVS's own default of a quarter of the cores plus one, but are capped, so
+    they don't compete with Magma services on larger hosts. Handlers get the remaining cores.
+    Flow limit grows with the subscriber count, while idle megaflows are evicted sooner to keep
+    revalidation rounds short under heavy flow churn.
+    """
+
+    OVS_TUNING_FILE = "/var/opt/magma/ovs_tuning.yml"
+    MAX_REVALIDATOR_THREADS = 4
+    MAX_HANDLER_THREADS = 8
+    FLOWS_PER_SUBSCRIBER = 100
+    MIN_FLOW_LIMIT = 200000
+    MAX_FLOW_LIMIT = 2000000
+    MAX_IDLE_MS = 10000
+    MIN_MAX_IDLE_MS = 2000
+    # Up to this many subscribers, OVS's default max-idle is kept
+    MAX_IDLE_SUBSCRIBERS = 1000
+
+    def __init__(self, target_subscribers: int, cpus: int = None):  # type: ignore[assignment]
+        self.target_subscribers = target_subscribers
+        self.cpus = cpus or os.cpu_count() or 1
+
+    def compute_other_config(self) -> dict:
+        """Computes Open_vSwitch other_config values for the host's cores and subscribers."""
+        revalidators = self._clamp(self.cpus // 4 + 1, 1, self.MAX_REVALIDATOR_THREADS)
+        return {
+            "n-handler-threads": str(
+                self._clamp(self.cpus - revalidators, 1, self.MAX_HANDLER_THREADS)
+            ),
+            "n-revalidator-threads": str(revalidators),
+            "flow-limit": str(
+                self._clamp(
+                    self.target_subscribers * self.FLOWS_PER_SUBSCRIBER,
+                    self.MIN_FLOW_LIMIT,
+                    self.MAX_FLOW_LIMIT,
+                )
+            ),
+            "max-idle": str(
+                self._clamp(
+                    self.MAX_IDLE_MS * self.MAX_IDLE_SUBSCRIBERS // self.target_subscribers,
+                    self.MIN_MAX_IDLE_MS,
+                    self.MAX_IDLE_MS,
+                )
+            ),
+        }
+
+    def tune_ovs(self):
+        """Sets other_config of Open_vSwitch and stores the targets for post-install checks.
+
+        Open_vSwitch table lives in OVSDB, so the values survive restarts of openvswitch-switch.
+        """
+        logger.info(
+            f"Tuning Open vSwitch for {self.cpus} CPUs "
+            f"and {self.target_subscribers} subscribers..."
+        )
+        other_config = self.compute_other_config()
+        check_call(
+            ["ovs-vsctl", "set", "Open_vSwitch", "."]
+            + [f"other_config:{key}={value}" for key, value in other_config.items()]  # noqa: W503
+        )
+        self._write_ovs_tuning_file(other_config)
+
+    def report(self) -> list:
+        """Logs current value against the target for each tuned other_config key.
+
+        :returns:
+            list: keys which current value doesn't match the target
+        """
+        logger.info("Open vSwitch other_config report:")
+        mismatches = []
+        for key, target in self.compute_other_config().items():
+            current = self._get_current_value(key)
+            status = "OK" if current == target else "MISMATCH"
+            logger.info(f"  {key}: current={current} target={target} {status}")
+            if current != target:
+                mismatches.append(key)
+        for mismatch in mismatches:
+            logger.warning(f"Open vSwitch setting {mismatch} doesn't match its target!")
+        return mismatches
+
+    def _write_ovs_tuning_file(self, other_config: dict):
+        """Stores applied other_config, so post-install checks can verify it."""
+        logger.info(f"Writing {self.OVS_TUNING_FILE}...")
+        os.makedirs(os.path.dirname(self.OVS_TUNING_FILE), exist_ok=True)
+        with open(self.OVS_TUNING_FILE, "w") as ovs_tuning_file:
+            ovs_tuning_file.write(
+                "# This is the Open vSwitch tuning written by magma-access-gateway snap\n"
+                f"# CPUs: {self.cpus}\n"
+                f"# Target subscribers: {self.target_subscribers}\n"
+            )
+            yaml.safe_dump({"other_config": other_config}, ovs_tuning_file)
+
+    @staticmethod
+    def _get_current_value(key: str) -> str:
+        """Returns current other_config value or an empty string if it's not set."""
+        return (
+            check_output(
+                ["ovs-vsctl", "--if-exists", "get", "Open_vSwitch", ".", f"other_config:{key}"]
+            )
+            .decode("utf-8")
+            .strip()
+            .strip('"')
+        )
+
+    @staticmethod
+    def _clamp(value: int, minimum: int, maximum: int) -> int:
+        """Limits value to a given range."""
+        return max(minimum, min(value, maximum))
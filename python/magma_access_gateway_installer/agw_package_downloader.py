@@ -0,0 +1,235 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import hashlib
+import logging
+import os
+import re
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import check_output
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerPackageDownloader:
+    APT_ARCHIVES_DIR = "/var/cache/apt/archives"
+    CONNECTIONS = 4
+    # Mirror which doesn't send any data for that long is considered stalled
+    STALL_TIMEOUT = 10
+    PROBE_BYTES = 256 * 1024
+    CHUNK_SIZE = 64 * 1024
+    APT_HASH_ALGORITHMS = {"SHA512": "sha512", "SHA256": "sha256", "SHA1": "sha1", "MD5Sum": "md5"}
+    PRINT_URIS_LINE_PATTERN = re.compile(
+        r"^'(?P<uri>[^']+)' (?P<file_name>\S+) (?P<size>\d+) (?P<hash>\S*)"
+    )
+    MAGMA_REPOSITORY = "magma"
+    UBUNTU_REPOSITORY = "ubuntu"
+
+    def __init__(
+        self,
+        mirrors: dict,
+        probe_paths: dict,
+        connections: int = CONNECTIONS,
+    ):
+        """
+        :param mirrors: candidate mirror base URLs of each repository, keyed by repository name
+        :param probe_paths: path of a file used to probe mirrors of each repository
+        :param connections: number of parallel download connections
+        """
+        self.mirrors = mirrors
+        self.probe_paths = probe_paths
+        self.connections = connections
+        self.ranked_mirrors: dict = {repository: [] for repository in mirrors}
+
+    def select_mirrors(self) -> dict:
+        """Probes all candidate mirrors concurrently and ranks them by throughput and latency.
+
+        :returns:
+            dict: probe results of each repository's mirrors, from the best to the worst one
+        """
+        candidates = [
+            (repository, mirror)
+            for repository, repository_mirrors in self.mirrors.items()
+            for mirror in repository_mirrors
+        ]
+        with ThreadPoolExecutor(max_workers=max(len(candidates), 1)) as executor:
+            probes = list(
+                executor.map(lambda candidate: self.probe_mirror(*candidate), candidates)
+            )
+        probe_results: dict = {repository: [] for repository in self.mirrors}
+        for (repository, _), probe in zip(candidates, probes):
+            probe_results[repository].append(probe)
+        for repository, repository_probes in probe_results.items():
+            repository_probes.sort(
+                key=lambda probe: (
+                    not probe["reachable"],
+                    -probe["throughput_kb_per_s"],
+                    probe["latency_ms"],
+                )
+            )
+            self.ranked_mirrors[repository] = [
+                probe["mirror"] for probe in repository_probes if probe["reachable"]
+            ]
+            self._log_probe_results(repository, repository_probes)
+        return probe_results
+
+    def probe_mirror(self, repository: str, mirror: str) -> dict:
+        """Measures time to first byte and throughput of a mirror."""
+        url = f"{mirror.rstrip('/')}/{self.probe_paths[repository]}"
+        probe = {
+            "mirror": mirror,
+            "reachable": False,
+            "latency_ms": float("inf"),
+            "throughput_kb_per_s": 0.0,
+        }
+        try:
+            start = time.perf_counter()
+            with urllib.request.urlopen(url, timeout=self.STALL_TIMEOUT) as response:
+                first_byte = time.perf_counter()
+                received = len(response.read(self.PROBE_BYTES))
+                finish = time.perf_counter()
+        except OSError as e:
+            logger.warning(f"Mirror {mirror} can't be reached: {e}")
+            return probe
+        probe["reachable"] = True
+        probe["latency_ms"] = (first_byte - start) * 1000
+        probe["throughput_kb_per_s"] = received / 1024 / max(finish - start, 1e-6)
+        return probe
+
+    def best_mirror(self, repository: str, default: str) -> str:
+        """Returns best ranked mirror of a repository or the default if none is reachable."""
+        return next(iter(self.ranked_mirrors.get(repository, [])), default)
+
+    def prefetch(self, packages: list) -> list:
+        """Downloads packages apt would install into apt's cache over parallel connections.
+
+        Each package is downloaded from the best ranked mirror of its repository and from the
+        next one if the mirror stalls, fails or serves a corrupted file. Packages which can't
+        be downloaded from any mirror are left for apt to download.
+
+        :returns:
+            list: names of files which couldn't be prefetched
+        """
+        downloads = self._get_download_list(packages)
+        if not downloads:
+            return []
+        logger.info(
+            f"Downloading {len(downloads)} packages "
+            f"({sum(download['size'] for download in downloads) // 1024} kB) "
+            f"over {self.connections} parallel connections..."
+        )
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.connections) as executor:
+            results = list(executor.map(self._download, downloads))
+        failed = [download["file_name"] for download, ok in zip(downloads, results) if not ok]
+        logger.info(
+            f"Downloaded {len(downloads) - len(failed)} out of {len(downloads)} packages "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
+        for file_name in failed:
+            logger.warning(f"{file_name} couldn't be prefetched. apt will download it.")
+        return failed
+
+    def _get_download_list(self, packages: list) -> list:
+        """Parses URIs, sizes and hashes of packages apt would download to install packages."""
+        print_uris_output = check_output(
+            [
+                "apt-get",
+                "install",
+                "-qq",
+                "-y",
+                "--print-uris",
+                "--no-install-recommends",
+                *packages,
+            ]
+        ).decode("utf-8")
+        downloads = []
+        for line in print_uris_output.splitlines():
+            if match := self.PRINT_URIS_LINE_PATTERN.match(line):
+                algorithm, _, digest = match.group("hash").partition(":")
+                downloads.append(
+                    {
+                        "uri": match.group("uri"),
+                        "file_name": match.group("file_name"),
+                        "size": int(match.group("size")),
+                        "hash_algorithm": self.APT_HASH_ALGORITHMS.get(algorithm),
+                        "digest": digest,
+                    }
+                )
+        return downloads
+
+    def _download(self, download: dict) -> bool:
+        """Downloads a single package trying its repository's mirrors in the ranked order."""
+        destination = os.path.join(self.APT_ARCHIVES_DIR, download["file_name"])
+        for url in self._get_candidate_urls(download["uri"]):
+            try:
+                self._download_file(url, f"{destination}.partial", download)
+                os.replace(f"{destination}.partial", destination)
+                return True
+            except (OSError, ValueError) as e:
+                logger.warning(f"Downloading {url} failed: {e}. Trying next mirror...")
+                if os.path.exists(f"{destination}.partial"):
+                    os.remove(f"{destination}.partial")
+        return False
+
+    def _get_candidate_urls(self, uri: str) -> list:
+        """Returns URLs of a package in each ranked mirror of its repository, then apt's URI."""
+        repository_base, separator, path = uri.partition("/pool/")
+        if not separator:
+            return [uri]
+        mirror_urls = [
+            f"{mirror.rstrip('/')}/pool/{path}"
+            for mirror in self.ranked_mirrors.get(self._get_repository(repository_base), [])
+        ]
+        return list(dict.fromkeys(mirror_urls + [uri]))
+
+    def _get_repository(self, repository_base: str) -> str:
+        """Returns name of the repository a base URL belongs to.
+
+        Packages coming from a base URL which isn't any of the candidate mirrors are assumed
+        to come from the Ubuntu archive configured in /etc/apt/sources.list.
+        """
+        for repository, repository_mirrors in self.mirrors.items():
+            if repository_base.rstrip("/") in [
+                mirror.rstrip("/") for mirror in repository_mirrors
+            ]:
+                return repository
+        return self.UBUNTU_REPOSITORY
+
+    def _download_file(self, url: str, destination: str, download: dict):
+        """Downloads a file and verifies its size and hash.
+
+        :raises:
+            OSError: if download fails or stalls
+            ValueError: if downloaded file doesn't match size or hash expected by apt
+        """
+        file_hash = hashlib.new(download["hash_algorithm"]) if download["hash_algorithm"] else None
+        size = 0
+        with urllib.request.urlopen(url, timeout=self.STALL_TIMEOUT) as response, open(
+            destination, "wb"
+        ) as package_file:
+            while chunk := response.read(self.CHUNK_SIZE):
+                package_file.write(chunk)
+                size += len(chunk)
+                if file_hash:
+                    file_hash.update(chunk)
+        if size != download["size"]:
+            raise ValueError(f"expected {download['size']} bytes, got {size}")
+        if file_hash and file_hash.hexdigest() != download["digest"]:
+            raise ValueError(f"{download['hash_algorithm']} mismatch")
+
+    @staticmethod
+    def _log_probe_results(repository: str, probes: list):
+        """Logs probed mirrors of a repository from the best to the worst one."""
+        logger.info(f"Mirrors of {repository} repository:")
+        for rank, probe in enumerate(probes, start=1):
+            if probe["reachable"]:
+                logger.info(
+                    f"  {rank}. {probe['mirror']} latency={probe['latency_ms']:.0f}ms "
+                    f"throughput={probe['throughput_kb_per_s']:.0f}kB/s"
+                )
+            else:
+                logger.info(f"  {rank}. {probe['mirror']} unreachable")
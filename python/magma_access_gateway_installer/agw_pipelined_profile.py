@@ -0,0 +1,112 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+
+import yaml
+
+from .agw_installation_errors import PipelinedPerformanceProfileError
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWPipelinedPerformanceProfile:
+    PROFILES_FILE = os.path.join(
+        os.path.abspath(os.path.dirname(__file__)),
+        "resources",
+        "pipelined_performance_profiles.yaml",
+    )
+    STATIC_SERVICES_KEY = "static_services"
+
+    def __init__(self, name: str):
+        profiles = self.load_profiles()
+        if name not in profiles:
+            raise PipelinedPerformanceProfileError(
+                f"Unknown pipelined performance profile: {name}. "
+                f"Available profiles: {', '.join(profiles)}."
+            )
+        self.name = name
+        self.version = profiles[name]["version"]
+        self.settings = profiles[name].get("settings", {})
+        self.disabled_static_services = profiles[name].get("disabled_static_services", [])
+
+    @classmethod
+    def load_profiles(cls) -> dict:
+        """Loads pipelined performance profiles shipped with the snap."""
+        with open(cls.PROFILES_FILE, "r") as profiles_file:
+            return yaml.safe_load(profiles_file)
+
+    def diff(self, pipelined_config: dict) -> list:
+        """Returns list of (key, current value, profile value) for keys the profile changes."""
+        changes = [
+            (key, self._get_value(pipelined_config, key), value)
+            for key, value in self.settings.items()
+            if self._get_value(pipelined_config, key) != value
+        ]
+        current_static_services = list(pipelined_config.get(self.STATIC_SERVICES_KEY) or [])
+        target_static_services = self._target_static_services(current_static_services)
+        if current_static_services != target_static_services:
+            changes.append(
+                (self.STATIC_SERVICES_KEY, current_static_services, target_static_services)
+            )
+        return changes
+
+    def apply(self, pipelined_config: dict):
+        """Applies profile settings to given pipelined config in place."""
+        for key, value in self.settings.items():
+            self._set_value(pipelined_config, key, value)
+        if pipelined_config.get(self.STATIC_SERVICES_KEY):
+            static_services = pipelined_config[self.STATIC_SERVICES_KEY]
+            for service in self.disabled_static_services:
+                while service in static_services:
+                    static_services.remove(service)
+
+    def validate(self, pipelined_config: dict):
+        """Validates that given pipelined config reflects all profile settings.
+
+        :raises:
+            PipelinedPerformanceProfileError: if any of the profile settings is not in effect
+        """
+        if mismatches := self.diff(pipelined_config):
+            raise PipelinedPerformanceProfileError(
+                f"Pipelined performance profile {self.name} (version {self.version}) "
+                "validation failed. Mismatched keys: "
+                f"{', '.join(key for key, _, _ in mismatches)}."
+            )
+
+    def log_diff(self, pipelined_config: dict):
+        """Logs changes which applying the profile would introduce to given pipelined config."""
+        logger.info(f"Pipelined performance profile {self.name} (version {self.version}) preview:")
+        if not (changes := self.diff(pipelined_config)):
+            logger.info("  No changes required.")
+        for key, current_value, target_value in changes:
+            logger.info(f"  {key}: {current_value} -> {target_value}")
+
+    def _target_static_services(self, static_services: list) -> list:
+        """Returns static services list with services disabled by the profile removed."""
+        return [
+            service for service in static_services if service not in self.disabled_static_services
+        ]
+
+    @staticmethod
+    def _get_value(config: dict, dotted_key: str):
+        """Returns value of a nested key given in a dotted notation or None if it's missing."""
+        value = config
+        for key in dotted_key.split("."):
+            if not isinstance(value, dict) or key not in value:
+                return None
+            value = value[key]
+        return value
+
+    @staticmethod
+    def _set_value(config: dict, dotted_key: str, value):
+        """Sets value of a nested key given in a dotted notation creating missing sections."""
+        *parent_keys, leaf_key = dotted_key.split(".")
+        section = config
+        for key in parent_keys:
+            if not isinstance(section.get(key), dict):
+                section[key] = {}
+            section = section[key]
+        section[leaf_key] = value
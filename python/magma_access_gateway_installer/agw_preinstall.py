@@ -3,11 +3,20 @@
 # See LICENSE file for licensing details.
 
 import logging
-from subprocess import check_call, check_output
+import os
+import re
+import shutil
+import time
+from subprocess import check_call
+
+import yaml
 
 from .agw_installation_errors import (
+    ArgumentError,
+    InsufficientHardwareError,
     InvalidNumberOfInterfacesError,
     InvalidUserError,
+    PreinstallChecksError,
     UnsupportedKernelVersionError,
     UnsupportedOSError,
 )
@@ -17,33 +26,134 @@ logger = logging.getLogger("magma_access_gateway_installer")
 
 class AGWInstallerPreinstall:
     REQUIRED_NUMBER_OF_NICS = 2
-    REQUIRED_SYSTEM_PACKAGES = ["ifupdown", "net-tools", "sudo"]
+    REQUIRED_SYSTEM_PACKAGES = ["ethtool", "ifupdown", "net-tools", "sudo"]
     SUPPORTED_KERNEL_VERSION = "5.4.0"
+    HARDWARE_REQUIREMENTS_FILE = os.path.join(
+        os.path.abspath(os.path.dirname(__file__)), "resources", "hardware_requirements.yaml"
+    )
+    HARDWARE_THRESHOLDS = ["fail_below", "warn_below", "fail_above", "warn_above"]
+    MAGMA_DATA_DIR = "/var/opt/magma"
+    PROC_MEMINFO = "/proc/meminfo"
+    SEQUENTIAL_WRITE_SIZE = 64 * 1024 * 1024
+    SEQUENTIAL_WRITE_BLOCK_SIZE = 1024 * 1024
+    FSYNC_SAMPLES = 32
+    FSYNC_BLOCK_SIZE = 4096
 
     def __init__(self, network_interfaces: list):
         self.network_interfaces = network_interfaces
 
     def preinstall_checks(self):
-        """Checks whether installation preconditions are met. If not, relevant errors are being
-        logged and installation is cancelled.
+        """Checks whether installation preconditions are met. All preconditions are evaluated
+        and all failed ones are reported together, so that they can be fixed at once.
 
         :raises:
             InvalidUserError: if installation wasn't started using root user
-            UnsupportedOSException: if OS is not Ubuntu
-            InvalidNumberOfInterfaces: if number of available network interfaces is different from
-                expected
+            UnsupportedOSError: if OS is not Ubuntu 20.04
+            UnsupportedKernelVersionError: if kernel version is not supported
+            InvalidNumberOfInterfacesError: if number of available network interfaces is
+                different from expected
+            PreinstallChecksError: if more than one of the above preconditions is not met
         """
         logger.info("Starting pre-install checks...")
-        if not self._user_is_root:
-            raise InvalidUserError()
-        elif not self._ubuntu_is_installed:
-            raise UnsupportedOSError()
-        elif not self._kernel_version_is_supported:
-            raise UnsupportedKernelVersionError()
-        elif not self._required_amount_of_network_interfaces_is_available:
-            raise InvalidNumberOfInterfacesError()
-        else:
-            logger.info("Magma AGW pre-install checks completed.")
+        preconditions = [
+            (self._user_is_root, InvalidUserError),
+            (self._ubuntu_is_installed, UnsupportedOSError),
+            (self._kernel_version_is_supported, UnsupportedKernelVersionError),
+            (
+                self._required_amount_of_network_interfaces_is_available,
+                InvalidNumberOfInterfacesError,
+            ),
+        ]
+        failed_preconditions = [error for is_met, error in preconditions if not is_met]
+        if len(failed_preconditions) == 1:
+            raise failed_preconditions[0]()
+        if failed_preconditions:
+            raise PreinstallChecksError(failed_preconditions)
+        logger.info("Magma AGW pre-install checks completed.")
+
+    def hardware_checks(self, hardware_requirements_file: str = None):  # type: ignore[assignment]
+        """Measures host's CPUs, memory, free disk space and disk write performance and compares
+        them against hardware requirements. Requirements which are not met are all reported
+        together.
+
+        :raises:
+            InsufficientHardwareError: if any of the measurements crosses its fail threshold
+        """
+        logger.info("Starting hardware checks...")
+        requirements = self.load_hardware_requirements(hardware_requirements_file)
+        measurements = self.measure_hardware()
+        for metric, value in measurements.items():
+            logger.info(f"  {metric}: {value:.1f}")
+        failures, warnings = self._evaluate_hardware(measurements, requirements)
+        for warning in warnings:
+            logger.warning(f"Hardware below recommended level. {warning}")
+        if failures:
+            raise InsufficientHardwareError(failures)
+        logger.info("Magma AGW hardware checks completed.")
+
+    def load_hardware_requirements(
+        self, hardware_requirements_file: str = None  # type: ignore[assignment]
+    ) -> dict:
+        """Loads default hardware requirements and overrides them with operator provided ones.
+
+        :raises:
+            ArgumentError: if operator provided requirements can't be loaded
+        """
+        with open(self.HARDWARE_REQUIREMENTS_FILE, "r") as default_requirements_file:
+            requirements = yaml.safe_load(default_requirements_file)
+        if not hardware_requirements_file:
+            return requirements
+        try:
+            with open(hardware_requirements_file, "r") as custom_requirements_file:
+                custom_requirements = yaml.safe_load(custom_requirements_file) or {}
+        except (OSError, yaml.YAMLError):
+            raise ArgumentError(
+                f"Can't load hardware requirements from {hardware_requirements_file}."
+            )
+        if not isinstance(custom_requirements, dict):
+            raise ArgumentError(
+                f"Hardware requirements in {hardware_requirements_file} must be a mapping."
+            )
+        if unknown_metrics := set(custom_requirements) - set(requirements):
+            raise ArgumentError(
+                f"Unknown hardware requirements: {', '.join(sorted(unknown_metrics))}."
+            )
+        for metric, thresholds in custom_requirements.items():
+            self._validate_hardware_thresholds(metric, thresholds)
+            requirements[metric].update(thresholds)
+        return requirements
+
+    def _validate_hardware_thresholds(self, metric: str, thresholds):
+        """Checks that operator provided thresholds of a metric are numbers with known names.
+
+        :raises:
+            ArgumentError: if thresholds aren't a mapping of known thresholds to numbers
+        """
+        if not isinstance(thresholds, dict):
+            raise ArgumentError(
+                f"Thresholds of {metric} hardware requirement must be a mapping, "
+                "e.g. fail_below: 2."
+            )
+        if unknown_thresholds := set(thresholds) - set(self.HARDWARE_THRESHOLDS):
+            raise ArgumentError(
+                f"Unknown thresholds of {metric} hardware requirement: "
+                f"{', '.join(sorted(unknown_thresholds))}."
+            )
+        for threshold, value in thresholds.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ArgumentError(f"Threshold {threshold} of {metric} must be a number.")
+
+    def measure_hardware(self) -> dict:
+        """Measures CPU count, memory, free disk space and disk write performance."""
+        os.makedirs(self.MAGMA_DATA_DIR, exist_ok=True)
+        sequential_write_mb_per_s, fsync_latency_ms = self._measure_disk_write_performance()
+        return {
+            "cpus": os.cpu_count() or 0,
+            "memory_gb": self._get_total_memory() / 1024**3,
+            "free_disk_gb": shutil.disk_usage(self.MAGMA_DATA_DIR).free / 1024**3,
+            "sequential_write_mb_per_s": sequential_write_mb_per_s,
+            "fsync_latency_ms": fsync_latency_ms,
+        }
 
     def install_required_system_packages(self):
         """Installs required system packages using apt."""
@@ -57,7 +167,7 @@ class AGWInstallerPreinstall:
     @property
     def _user_is_root(self) -> bool:
         """Check whether root user is used."""
-        return check_output(["whoami"]).decode("utf-8").rstrip() == "root"
+        return os.geteuid() == 0
 
     @property
     def _ubuntu_is_installed(self) -> bool:
@@ -67,7 +177,10 @@ class AGWInstallerPreinstall:
             for line in etc_os_release:
                 key, value = line.partition("=")[::2]
                 system_info[key.strip()] = str(value.strip().replace('"', ""))
-        return system_info["ID"].lower() == "ubuntu" and system_info["VERSION_ID"] == "20.04"
+        return (
+            system_info.get("ID", "").lower() == "ubuntu"
+            and system_info.get("VERSION_ID") == "20.04"  # noqa: W503
+        )
 
     @property
     def _required_amount_of_network_interfaces_is_available(self) -> bool:
@@ -77,5 +190,64 @@ class AGWInstallerPreinstall:
     @property
     def _kernel_version_is_supported(self) -> bool:
         """Checks whether kernel version is supported."""
-        kernel_version = check_output(["uname", "-r"]).decode("utf-8").rstrip()
-        return self.SUPPORTED_KERNEL_VERSION in kernel_version
+        return self.SUPPORTED_KERNEL_VERSION in os.uname().release
+
+    def _measure_disk_write_performance(self) -> tuple:
+        """Measures sequential write throughput and 95th percentile of fsync latency of small
+        writes in Magma's data directory, which is where Redis and Magma services persist state.
+        """
+        logger.info(f"Measuring disk write performance in {self.MAGMA_DATA_DIR}...")
+        test_file_path = os.path.join(self.MAGMA_DATA_DIR, ".magma-preinstall-disk-test")
+        block = os.urandom(self.SEQUENTIAL_WRITE_BLOCK_SIZE)
+        test_file = os.open(test_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            start = time.perf_counter()
+            for _ in range(self.SEQUENTIAL_WRITE_SIZE // self.SEQUENTIAL_WRITE_BLOCK_SIZE):
+                os.write(test_file, block)
+            os.fsync(test_file)
+            sequential_write_time = time.perf_counter() - start
+            fsync_latencies = []
+            for _ in range(self.FSYNC_SAMPLES):
+                os.write(test_file, block[: self.FSYNC_BLOCK_SIZE])
+                start = time.perf_counter()
+                os.fsync(test_file)
+                fsync_latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            os.close(test_file)
+            os.remove(test_file_path)
+        fsync_latencies.sort()
+        return (
+            self.SEQUENTIAL_WRITE_SIZE / 1024**2 / max(sequential_write_time, 1e-9),
+            fsync_latencies[int(0.95 * (len(fsync_latencies) - 1))],
+        )
+
+    def _get_total_memory(self) -> int:
+        """Returns total RAM of the host in bytes."""
+        with open(self.PROC_MEMINFO, "r") as meminfo:
+            if match := re.search(r"^MemTotal:\s+(\d+) kB", meminfo.read(), re.MULTILINE):
+                return int(match.group(1)) * 1024
+        return 0
+
+    @staticmethod
+    def _evaluate_hardware(measurements: dict, requirements: dict) -> tuple:
+        """Compares measurements with fail and warn thresholds.
+
+        :returns:
+            tuple: list of failed requirements and list of warnings
+        """
+        failures: list = []
+        warnings: list = []
+        for metric, thresholds in requirements.items():
+            value = measurements[metric]
+            for severity, findings in [("fail", failures), ("warn", warnings)]:
+                if (
+                    minimum := thresholds.get(f"{severity}_below")
+                ) is not None and value < minimum:
+                    findings.append(f"{metric}: measured {value:.1f}, expected at least {minimum}")
+                    break
+                if (
+                    maximum := thresholds.get(f"{severity}_above")
+                ) is not None and value > maximum:
+                    findings.append(f"{metric}: measured {value:.1f}, expected at most {maximum}")
+                    break
+        return failures, warnings
@@ -0,0 +1,147 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+import re
+from subprocess import DEVNULL, call, check_call, check_output
+
+import yaml
+from jinja2 import Environment, FileSystemLoader, Template
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerRedisTuner:
+    REDIS_SERVICE = "magma@redis"
+    REDIS_CONFIG_FILE = "/etc/magma/redis.yml"
+    DEFAULT_REDIS_PORT = 6380
+    REDIS_TUNING_SCRIPT = "/usr/local/sbin/magma-redis-tuning.sh"
+    REDIS_TUNING_SCRIPT_TEMPLATE = "redis_tuning.sh.j2"
+    REDIS_DROP_IN_FILE = "/etc/systemd/system/magma@redis.service.d/magma-redis-tuning.conf"
+    REDIS_DROP_IN_TEMPLATE = "magma-redis-tuning.conf.j2"
+    PROC_MEMINFO = "/proc/meminfo"
+    MAXMEMORY_TO_RAM_RATIO = 0.25
+    MIN_MAXMEMORY = 256 * 1024 * 1024
+    # Magma keeps subscriber and session state in Redis, so keys must never be evicted silently
+    MAXMEMORY_POLICY = "noeviction"
+    SLOWLOG_THRESHOLD_US = 10000
+    SLOWLOG_MAX_LEN = 128
+
+    def __init__(self, maxmemory_mb: int = None):  # type: ignore[assignment]
+        self.maxmemory_mb = maxmemory_mb
+
+    def compute_settings(self) -> dict:
+        """Computes Redis memory limit, eviction, persistence and slow log settings."""
+        return {
+            "maxmemory": self.compute_maxmemory(),
+            "maxmemory-policy": self.MAXMEMORY_POLICY,
+            "appendonly": "yes",
+            "appendfsync": "everysec",
+            "no-appendfsync-on-rewrite": "yes",
+            "save": "900 1",
+            "slowlog-log-slower-than": self.SLOWLOG_THRESHOLD_US,
+            "slowlog-max-len": self.SLOWLOG_MAX_LEN,
+        }
+
+    def compute_maxmemory(self) -> int:
+        """Returns Redis memory limit in bytes, either requested or derived from host's RAM."""
+        if self.maxmemory_mb:
+            return self.maxmemory_mb * 1024 * 1024
+        return max(int(self._get_total_memory() * self.MAXMEMORY_TO_RAM_RATIO), self.MIN_MAXMEMORY)
+
+    def tune_redis(self):
+        """Persists Redis settings as magma@redis drop-in and applies them if Redis runs."""
+        logger.info("Tuning Redis memory limit, eviction policy and persistence...")
+        self._write_redis_tuning_script()
+        self._write_redis_drop_in()
+        check_call(["systemctl", "daemon-reload"])
+        if self._redis_is_running():
+            logger.info(f"Applying Redis settings to running {self.REDIS_SERVICE} service...")
+            check_call(["/bin/bash", self.REDIS_TUNING_SCRIPT])
+
+    def report(self) -> list:
+        """Logs current value against the target for each tuned Redis setting.
+
+        :returns:
+            list: names of settings which current value doesn't match the target
+        """
+        if not self._redis_is_running():
+            logger.info(
+                f"{self.REDIS_SERVICE} is not running yet. "
+                "Redis settings will be applied when it starts."
+            )
+            return []
+        logger.info("Redis settings report:")
+        mismatches = []
+        for key, value in self.compute_settings().items():
+            target = str(value)
+            current = self._get_current_value(key)
+            status = "OK" if current == target else "MISMATCH"
+            logger.info(f"  {key}: current={current} target={target} {status}")
+            if current != target:
+                mismatches.append(key)
+        for mismatch in mismatches:
+            logger.warning(f"Redis setting {mismatch} doesn't match its target!")
+        return mismatches
+
+    def get_redis_port(self) -> int:
+        """Returns port of Magma's Redis as configured in /etc/magma/redis.yml."""
+        try:
+            with open(self.REDIS_CONFIG_FILE, "r") as redis_config_file:
+                redis_config = yaml.safe_load(redis_config_file) or {}
+        except OSError:
+            redis_config = {}
+        return int(redis_config.get("port", self.DEFAULT_REDIS_PORT))
+
+    def _write_redis_tuning_script(self):
+        """Renders script applying Redis settings through redis-cli."""
+        logger.info(f"Writing Redis tuning script to {self.REDIS_TUNING_SCRIPT}...")
+        with open(self.REDIS_TUNING_SCRIPT, "w") as redis_tuning_script:
+            redis_tuning_script.write(
+                self._load_template(self.REDIS_TUNING_SCRIPT_TEMPLATE).render(
+                    port=self.get_redis_port(), settings=self.compute_settings()
+                )
+            )
+        os.chmod(self.REDIS_TUNING_SCRIPT, 0o755)
+
+    def _write_redis_drop_in(self):
+        """Renders magma@redis drop-in running Redis tuning script every time Redis starts."""
+        logger.info(f"Writing {self.REDIS_DROP_IN_FILE}...")
+        os.makedirs(os.path.dirname(self.REDIS_DROP_IN_FILE), exist_ok=True)
+        with open(self.REDIS_DROP_IN_FILE, "w") as redis_drop_in:
+            redis_drop_in.write(
+                self._load_template(self.REDIS_DROP_IN_TEMPLATE).render(
+                    redis_tuning_script=self.REDIS_TUNING_SCRIPT
+                )
+            )
+
+    def _get_current_value(self, key: str) -> str:
+        """Returns current value of a Redis setting."""
+        config_get_output = check_output(
+            ["redis-cli", "-p", str(self.get_redis_port()), "config", "get", key]
+        ).decode("utf-8")
+        config_get_lines = config_get_output.splitlines()
+        return config_get_lines[1].strip() if len(config_get_lines) > 1 else ""
+
+    def _get_total_memory(self) -> int:
+        """Returns total RAM of the host in bytes."""
+        try:
+            with open(self.PROC_MEMINFO, "r") as meminfo:
+                if match := re.search(r"^MemTotal:\s+(\d+) kB", meminfo.read(), re.MULTILINE):
+                    return int(match.group(1)) * 1024
+        except OSError:
+            pass
+        return 0
+
+    def _redis_is_running(self) -> bool:
+        return call(["systemctl", "is-active", "--quiet", self.REDIS_SERVICE], stderr=DEVNULL) == 0
+
+    @staticmethod
+    def _load_template(template_name: str) -> Template:
+        file_loader = FileSystemLoader(
+            os.path.join(os.path.abspath(os.path.dirname(__file__)), "resources")
+        )
+        env = Environment(loader=file_loader)
+        return env.get_template(template_name)
@@ -0,0 +1,241 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+import re
+from subprocess import DEVNULL, call, check_call, check_output
+
+import yaml
+from jinja2 import Environment, FileSystemLoader, Template
+
+from .agw_installation_errors import ResourceControlProfileError
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerResourceControlTuner:
+    PROFILES_FILE = os.path.join(
+        os.path.abspath(os.path.dirname(__file__)),
+        "resources",
+        "resource_control_profiles.yaml",
+    )
+    DEFAULT_PROFILE = "small"
+    SYSTEMD_SYSTEM_DIR = "/etc/systemd/system"
+    DROP_IN_FILE_NAME = "magma-resource-control.conf"
+    DROP_IN_TEMPLATE = "magma-resource-control.conf.j2"
+    PROC_MEMINFO = "/proc/meminfo"
+    SYS_FS_CGROUP = "/sys/fs/cgroup"
+    DIRECTIVES = ["CPUWeight", "CPUAffinity", "IOWeight", "Nice", "MemoryHigh", "MemoryMax"]
+    # Directives systemd can apply to cgroup of a running unit, others need a restart
+    RUNTIME_DIRECTIVES = ["CPUWeight", "IOWeight", "MemoryHigh", "MemoryMax"]
+    MEMORY_DIRECTIVES = ["MemoryHigh", "MemoryMax"]
+    # cgroup files holding memory limits in effect. Legacy (v1) memory controller, which Ubuntu
+    # 20.04 uses by default, has no equivalent of MemoryHigh, so systemd ignores it there.
+    UNIFIED_MEMORY_FILES = {"MemoryHigh": "memory.high", "MemoryMax": "memory.max"}
+    LEGACY_MEMORY_FILES = {"MemoryMax": os.path.join("memory", "memory.limit_in_bytes")}
+    # systemd rounds memory limits given in percent down to a whole page
+    MEMORY_TOLERANCE_RATIO = 0.01
+    MEMORY_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+    def __init__(self, profile_name: str = DEFAULT_PROFILE):
+        profiles = self.load_profiles()
+        if profile_name not in profiles:
+            raise ResourceControlProfileError(
+                f"Unknown resource control profile: {profile_name}. "
+                f"Available profiles: {', '.join(profiles)}."
+            )
+        self.profile_name = profile_name
+        self.version = profiles[profile_name]["version"]
+        self.services = profiles[profile_name].get("services", {})
+        if unsupported_directives := sorted(
+            {directive for settings in self.services.values() for directive in settings}
+            - set(self.DIRECTIVES)  # noqa: W503
+        ):
+            raise ResourceControlProfileError(
+                f"Resource control profile {profile_name} uses unsupported directives: "
+                f"{', '.join(unsupported_directives)}."
+            )
+
+    @classmethod
+    def load_profiles(cls) -> dict:
+        """Loads resource control profiles shipped with the snap."""
+        with open(cls.PROFILES_FILE, "r") as profiles_file:
+            return yaml.safe_load(profiles_file)
+
+    def tune_resource_control(self):
+        """Persists profile settings as drop-ins and applies cgroup settings to running units."""
+        logger.info(
+            f"Applying resource control profile {self.profile_name} (version {self.version}) "
+            "to Magma services..."
+        )
+        for service, settings in self.services.items():
+            self._write_drop_in(service, settings)
+        check_call(["systemctl", "daemon-reload"])
+        for service, settings in self.services.items():
+            runtime_settings = [
+                f"{directive}={value}"
+                for directive, value in settings.items()
+                if directive in self.RUNTIME_DIRECTIVES
+            ]
+            if runtime_settings and self._service_is_running(service):
+                logger.info(f"Applying resource control settings to running {service} service...")
+                check_call(
+                    ["systemctl", "set-property", "--runtime", f"{service}.service"]
+                    + runtime_settings  # noqa: W503
+                )
+
+    def report(self) -> list:
+        """Logs value in effect against the target for each setting of each service.
+
+        Memory limits are read from the cgroup of a running service, so only limits enforced
+        by the kernel match. Limits the cgroup hierarchy doesn't support are reported as not
+        enforced instead of being compared. Services which aren't installed yet are skipped.
+
+        :returns:
+            list: "<service> <directive>" of settings which value doesn't match the target
+        """
+        logger.info(
+            f"Resource control profile {self.profile_name} (version {self.version}) report:"
+        )
+        total_memory = self._get_total_memory()
+        memory_files = self._get_memory_files()
+        mismatches = []
+        for service, settings in self.services.items():
+            current_values = self._get_current_values(service, list(settings), memory_files)
+            if current_values.get("LoadState") != "loaded":
+                logger.info(f"  {service}: not installed yet, settings will apply once it is")
+                continue
+            for directive, value in settings.items():
+                target = str(value)
+                if directive in self.MEMORY_DIRECTIVES and directive not in memory_files:
+                    logger.warning(
+                        f"  {service} {directive}: target={target} NOT ENFORCED, "
+                        "legacy cgroup hierarchy doesn't support it"
+                    )
+                    continue
+                current = current_values.get(directive, "")
+                matches = self._matches(directive, current, target, total_memory)
+                status = "OK" if matches else "MISMATCH"
+                logger.info(f"  {service} {directive}: current={current} target={target} {status}")
+                if not matches:
+                    mismatches.append(f"{service} {directive}")
+        for mismatch in mismatches:
+            logger.warning(f"Resource control setting {mismatch} doesn't match its target!")
+        return mismatches
+
+    def get_drop_in_file(self, service: str) -> str:
+        return os.path.join(
+            self.SYSTEMD_SYSTEM_DIR, f"{service}.service.d", self.DROP_IN_FILE_NAME
+        )
+
+    def _write_drop_in(self, service: str, settings: dict):
+        """Renders drop-in with resource control settings of a single service."""
+        drop_in_file = self.get_drop_in_file(service)
+        logger.info(f"Writing {drop_in_file}...")
+        os.makedirs(os.path.dirname(drop_in_file), exist_ok=True)
+        with open(drop_in_file, "w") as drop_in:
+            drop_in.write(
+                self._load_template(self.DROP_IN_TEMPLATE).render(
+                    profile=self.profile_name, version=self.version, settings=settings
+                )
+            )
+
+    def _get_current_values(self, service: str, directives: list, memory_files: dict) -> dict:
+        """Returns load state and values of given directives in effect for a service.
+
+        Memory limits come from the service's cgroup. If the service isn't running, there's no
+        cgroup and values configured in systemd, which apply once it starts, are returned.
+        """
+        show_output = check_output(
+            [
+                "systemctl",
+                "show",
+                f"{service}.service",
+                f"--property={','.join(['LoadState', 'ControlGroup'] + directives)}",
+            ]
+        ).decode("utf-8")
+        current_values = dict(
+            line.split("=", 1) for line in show_output.splitlines() if "=" in line
+        )
+        if control_group := current_values.get("ControlGroup", "").lstrip("/"):
+            for directive in set(directives) & set(memory_files):
+                if enforced_value := self._read_cgroup_file(
+                    memory_files[directive], control_group
+                ):
+                    current_values[directive] = enforced_value
+        return current_values
+
+    def _get_memory_files(self) -> dict:
+        """Returns cgroup files holding memory limits of the host's cgroup hierarchy."""
+        if os.path.exists(os.path.join(self.SYS_FS_CGROUP, "cgroup.controllers")):
+            return self.UNIFIED_MEMORY_FILES
+        return self.LEGACY_MEMORY_FILES
+
+    def _read_cgroup_file(self, cgroup_file: str, control_group: str) -> str:
+        """Returns content of a file of a cgroup or an empty string if it can't be read."""
+        controller, name = os.path.split(cgroup_file)
+        try:
+            with open(
+                os.path.join(self.SYS_FS_CGROUP, controller, control_group, name), "r"
+            ) as file:
+                return file.read().strip()
+        except OSError:
+            return ""
+
+    def _matches(self, directive: str, current: str, target: str, total_memory: int) -> bool:
+        """Compares value reported by systemd with the target written to the drop-in."""
+        if directive in self.MEMORY_DIRECTIVES:
+            current_bytes = self._to_bytes(current, total_memory)
+            target_bytes = self._to_bytes(target, total_memory)
+            if current_bytes is None or target_bytes is None:
+                return current == target
+            return abs(current_bytes - target_bytes) <= target_bytes * self.MEMORY_TOLERANCE_RATIO
+        if directive == "CPUAffinity":
+            return self._parse_cpu_list(current) == self._parse_cpu_list(target)
+        return current == target
+
+    def _to_bytes(self, value: str, total_memory: int):
+        """Converts systemd memory limit (bytes, K/M/G/T suffix or percent) to bytes.
+
+        Returns None for values which aren't a finite number of bytes, e.g. infinity.
+        """
+        if value.endswith("%"):
+            return int(total_memory * float(value[:-1]) / 100)
+        if value[-1:].upper() in self.MEMORY_SUFFIXES:
+            return int(float(value[:-1]) * self.MEMORY_SUFFIXES[value[-1:].upper()])
+        return int(value) if value.isdigit() else None
+
+    @staticmethod
+    def _parse_cpu_list(cpu_list: str) -> set:
+        """Parses CPU list like `0-1 3` or `0,2-3` into a set of CPU numbers."""
+        cpus: set = set()
+        for cpu_range in re.split(r"[\s,]+", cpu_list.strip()):
+            if not cpu_range:
+                continue
+            first, _, last = cpu_range.partition("-")
+            cpus.update(range(int(first), int(last or first) + 1))
+        return cpus
+
+    def _get_total_memory(self) -> int:
+        """Returns total RAM of the host in bytes."""
+        try:
+            with open(self.PROC_MEMINFO, "r") as meminfo:
+                if match := re.search(r"^MemTotal:\s+(\d+) kB", meminfo.read(), re.MULTILINE):
+                    return int(match.group(1)) * 1024
+        except OSError:
+            pass
+        return 0
+
+    @staticmethod
+    def _service_is_running(service: str) -> bool:
+        return call(["systemctl", "is-active", "--quiet", service], stderr=DEVNULL) == 0
+
+    @staticmethod
+    def _load_template(template_name: str) -> Template:
+        file_loader = FileSystemLoader(
+            os.path.join(os.path.abspath(os.path.dirname(__file__)), "resources")
+        )
+        env = Environment(loader=file_loader)
+        return env.get_template(template_name)
@@ -2,9 +2,10 @@
 # Copyright 2022 Canonical Ltd.
 # See LICENSE file for licensing details.
 
+import grp
 import logging
 import pwd
-from subprocess import check_call, check_output
+from subprocess import check_call
 
 logger = logging.getLogger("magma_access_gateway_installer")
 
@@ -43,7 +44,12 @@ class AGWInstallerServiceUserCreator:
     @property
     def _magma_user_in_sudo_group(self) -> bool:
         """Checks whether Magma user belongs to sudo group."""
-        return "sudo" in check_output(["groups", self.MAGMA_USER]).decode()
+        try:
+            sudo_group = grp.getgrnam("sudo")
+            magma_user = pwd.getpwnam(self.MAGMA_USER)
+        except KeyError:
+            return False
+        return self.MAGMA_USER in sudo_group.gr_mem or magma_user.pw_gid == sudo_group.gr_gid
 
     @property
     def _magma_user_in_sudoers(self) -> bool:
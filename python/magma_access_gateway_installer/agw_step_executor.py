@@ -0,0 +1,242 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+from .agw_event_stream import AGWInstallerEventStream
+from .agw_installation_errors import StepGraphError
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerStepExecutor:
+    """Runs installation steps as a DAG with bounded concurrency.
+
+    Each step declares what it needs (inputs), what it provides (outputs) and which shared
+    resources it must use exclusively (locks), e.g. dpkg or host's network. A step starts once
+    all steps providing its inputs have finished and none of its locks is held. Skipped steps
+    finish immediately, so steps depending on their outputs aren't blocked.
+    """
+
+    MAX_PARALLEL_STEPS = 4
+
+    def __init__(
+        self,
+        steps: list,
+        max_parallel_steps: int = MAX_PARALLEL_STEPS,
+        event_stream: AGWInstallerEventStream = None,  # type: ignore[assignment]
+    ):
+        """
+        :param steps: steps created with define_step, in their preferred start order
+        :param max_parallel_steps: maximum number of steps running at the same time
+        :param event_stream: event stream start and end of each step are reported to
+        """
+        self.steps = steps
+        self.max_parallel_steps = max_parallel_steps
+        self.event_stream = event_stream or AGWInstallerEventStream()
+        self.dependencies = self._resolve_dependencies(steps)
+        self.timings: dict = {}
+
+    @staticmethod
+    def define_step(
+        name: str,
+        run: Callable,
+        inputs: list = None,  # type: ignore[assignment]
+        outputs: list = None,  # type: ignore[assignment]
+        locks: list = None,  # type: ignore[assignment]
+        skip: bool = False,
+    ) -> dict:
+        """Returns definition of a single installation step."""
+        return {
+            "name": name,
+            "run": run,
+            "inputs": inputs or [],
+            "outputs": outputs or [],
+            "locks": locks or [],
+            "skip": skip,
+        }
+
+    def run(self) -> dict:
+        """Runs all steps and logs the critical path of the run.
+
+        If a step fails, no further steps are started. Once running steps finish, exception
+        of the first failed step is raised.
+
+        :returns:
+            dict: critical path report
+        """
+        start = time.monotonic()
+        pending = list(self.steps)
+        running: dict = {}
+        held_locks: set = set()
+        failure = None
+        with ThreadPoolExecutor(max_workers=self.max_parallel_steps) as executor:
+            while pending or running:
+                if failure is None:
+                    self._start_ready_steps(executor, pending, running, held_locks, start)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    held_locks.difference_update(step["locks"])
+                    self.timings[step["name"]]["end"] = time.monotonic() - start
+                    if future.exception() and failure is None:
+                        failure = future.exception()
+        if failure:
+            raise failure
+        report = self.critical_path_report()
+        self._log_critical_path_report(report)
+        self.event_stream.emit("critical_path", **report)
+        return report
+
+    def critical_path_report(self) -> dict:
+        """Returns chain of steps which determined total run time.
+
+        Walking back from the step which finished last, each step's predecessor is the step
+        it waited for the longest, i.e. the latest finishing of its dependencies and of steps
+        holding the same locks before it started.
+        """
+        if not self.timings:
+            return {"total_s": 0.0, "critical_path": [], "off_critical_path": []}
+        step = max(self.timings, key=lambda name: self.timings[name]["end"])
+        critical_path: list = []
+        while step:
+            critical_path.insert(0, step)
+            step = self._get_blocking_step(step, critical_path)
+        return {
+            "total_s": round(max(timing["end"] for timing in self.timings.values()), 3),
+            "critical_path": [self._step_summary(name) for name in critical_path],
+            "off_critical_path": [
+                self._step_summary(name) for name in self.timings if name not in critical_path
+            ],
+        }
+
+    def _start_ready_steps(
+        self, executor, pending: list, running: dict, held_locks: set, start: float
+    ):
+        """Starts pending steps whose dependencies finished and whose locks are free.
+
+        :raises:
+            StepGraphError: if no step is running and none of the pending ones can start
+        """
+        finished = {name for name, timing in self.timings.items() if "end" in timing}
+        ready = [step for step in pending if self.dependencies[step["name"]] <= finished]
+        while ready and len(running) < self.max_parallel_steps:
+            step = ready.pop(0)
+            if step["skip"]:
+                pending.remove(step)
+                now = time.monotonic() - start
+                self.timings[step["name"]] = {"start": now, "end": now, "skipped": True}
+                finished.add(step["name"])
+                ready += [
+                    dependent
+                    for dependent in pending
+                    if dependent not in ready and self.dependencies[dependent["name"]] <= finished
+                ]
+            elif not held_locks.intersection(step["locks"]):
+                pending.remove(step)
+                held_locks.update(step["locks"])
+                self.timings[step["name"]] = {"start": time.monotonic() - start, "skipped": False}
+                running[executor.submit(self._run_step, step)] = step
+        if pending and not running:
+            raise StepGraphError(
+                f"Steps can't be started: {', '.join(step['name'] for step in pending)}."
+            )
+
+    def _run_step(self, step: dict):
+        with self.event_stream.step(step["name"]):
+            step["run"]()
+
+    def _get_blocking_step(self, name: str, excluded: list) -> str:
+        """Returns step which finished last before given step could start."""
+        locks = set(self._get_step(name)["locks"])
+        lock_holders = {step["name"] for step in self.steps if locks & set(step["locks"])}
+        candidates = [
+            candidate
+            for candidate in self.dependencies[name] | lock_holders
+            if candidate in self.timings
+            and candidate not in excluded  # noqa: W503
+            and self.timings[candidate]["end"] <= self.timings[name]["start"]  # noqa: W503
+        ]
+        if not candidates:
+            return ""
+        return max(candidates, key=lambda candidate: self.timings[candidate]["end"])
+
+    def _get_step(self, name: str) -> dict:
+        return next(step for step in self.steps if step["name"] == name)
+
+    def _step_summary(self, name: str) -> dict:
+        timing = self.timings[name]
+        return {
+            "step": name,
+            "start_s": round(timing["start"], 3),
+            "duration_s": round(timing["end"] - timing["start"], 3),
+            "skipped": timing["skipped"],
+        }
+
+    @staticmethod
+    def _resolve_dependencies(steps: list) -> dict:
+        """Maps each step to the steps providing its inputs.
+
+        :raises:
+            StepGraphError: if step names repeat, an input isn't provided by any step
+                or steps depend on each other in a cycle
+        """
+        names = [step["name"] for step in steps]
+        if duplicates := sorted({name for name in names if names.count(name) > 1}):
+            raise StepGraphError(f"Duplicate steps: {', '.join(duplicates)}.")
+        providers: dict = {}
+        for step in steps:
+            for output in step["outputs"]:
+                providers.setdefault(output, set()).add(step["name"])
+        dependencies = {}
+        for step in steps:
+            if missing := [output for output in step["inputs"] if output not in providers]:
+                raise StepGraphError(
+                    f"Inputs of {step['name']} step aren't provided by any step: "
+                    f"{', '.join(missing)}."
+                )
+            dependencies[step["name"]] = {
+                provider for output in step["inputs"] for provider in providers[output]
+            } - {step["name"]}
+        AGWInstallerStepExecutor._check_for_cycles(dependencies)
+        return dependencies
+
+    @staticmethod
+    def _check_for_cycles(dependencies: dict):
+        """Raises StepGraphError if steps can't be ordered."""
+        resolved: set = set()
+        unresolved = dict(dependencies)
+        while unresolved:
+            ready = [name for name, required in unresolved.items() if required <= resolved]
+            if not ready:
+                raise StepGraphError(
+                    f"Steps depend on each other in a cycle: {', '.join(sorted(unresolved))}."
+                )
+            for name in ready:
+                resolved.add(name)
+                unresolved.pop(name)
+
+    @staticmethod
+    def _log_critical_path_report(report: dict):
+        critical_path_s = sum(step["duration_s"] for step in report["critical_path"])
+        logger.info(
+            f"Installation steps took {report['total_s']:.1f}s. "
+            f"Critical path ({critical_path_s:.1f}s):"
+        )
+        for step in report["critical_path"]:
+            if not step["skipped"]:
+                logger.info(f"  {step['step']}: {step['duration_s']:.1f}s")
+        off_critical_path = [step for step in report["off_critical_path"] if not step["skipped"]]
+        if off_critical_path:
+            logger.info(
+                "Steps off the critical path: "
+                + ", ".join(  # noqa: W503
+                    f"{step['step']} ({step['duration_s']:.1f}s)" for step in off_critical_path
+                )
+            )
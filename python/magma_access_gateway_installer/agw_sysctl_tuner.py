@@ -0,0 +1,181 @@
+#!/snap/magma-access-gateway/current/bin/python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+from subprocess import check_call
+
+logger = logging.getLogger("magma_access_gateway_installer")
+
+
+class AGWInstallerSysctlTuner:
+    SYSCTL_CONFIG_FILE = "/etc/sysctl.d/99-magma-agw.conf"
+    CONNTRACK_MODPROBE_CONFIG_FILE = "/etc/modprobe.d/magma-nf-conntrack.conf"
+    # systemd-sysctl applies sysctl.d only after systemd-modules-load loaded these modules,
+    # so that nf_conntrack and sctp keys aren't lost on boot
+    MODULES_LOAD_CONFIG_FILE = "/etc/modules-load.d/magma-agw.conf"
+    CONNTRACK_HASHSIZE_PARAMETER = "/sys/module/nf_conntrack/parameters/hashsize"
+    PROC_SYS = "/proc/sys"
+    KERNEL_MODULES = ["nf_conntrack", "sctp"]
+    PAGE_SIZE = 4096
+    CONNTRACK_ENTRIES_PER_SUBSCRIBER = 128
+    MIN_CONNTRACK_MAX = 262144
+    CONNTRACK_MAX_TO_HASHSIZE_RATIO = 4
+    NETDEV_BACKLOG_PER_SUBSCRIBER = 4
+    MIN_NETDEV_BACKLOG = 5000
+    MAX_NETDEV_BACKLOG = 262144
+    SOCKET_BUFFER_PER_ENODEB = 256 * 1024
+    MIN_SOCKET_BUFFER = 16 * 1024 * 1024
+    MAX_SOCKET_BUFFER = 128 * 1024 * 1024
+    SCTP_DEFAULT_SOCKET_BUFFER = 256 * 1024
+    MIN_SCTP_MEM_PAGES = 32768
+    MIN_SOMAXCONN = 4096
+
+    def __init__(self, target_subscribers: int, target_enodebs: int):
+        self.target_subscribers = target_subscribers
+        self.target_enodebs = target_enodebs
+
+    def compute_sysctl_values(self) -> dict:
+        """Computes kernel networking sysctl values for target subscriber and eNodeB counts."""
+        socket_buffer = self._clamp(
+            self.target_enodebs * self.SOCKET_BUFFER_PER_ENODEB,
+            self.MIN_SOCKET_BUFFER,
+            self.MAX_SOCKET_BUFFER,
+        )
+        sctp_mem_pages = max(
+            self.target_enodebs * 2 * self.SCTP_DEFAULT_SOCKET_BUFFER // self.PAGE_SIZE,
+            self.MIN_SCTP_MEM_PAGES,
+        )
+        return {
+            "net.netfilter.nf_conntrack_max": self.compute_conntrack_max(),
+            "net.core.rmem_max": socket_buffer,
+            "net.core.wmem_max": socket_buffer,
+            "net.core.netdev_max_backlog": self._clamp(
+                self.target_subscribers * self.NETDEV_BACKLOG_PER_SUBSCRIBER,
+                self.MIN_NETDEV_BACKLOG,
+                self.MAX_NETDEV_BACKLOG,
+            ),
+            "net.core.somaxconn": max(self.target_enodebs * 4, self.MIN_SOMAXCONN),
+            "net.sctp.sctp_mem": (
+                f"{sctp_mem_pages // 2} {sctp_mem_pages * 3 // 4} {sctp_mem_pages}"
+            ),
+            "net.sctp.sctp_rmem": f"4096 {self.SCTP_DEFAULT_SOCKET_BUFFER} {socket_buffer}",
+            "net.sctp.sctp_wmem": f"4096 {self.SCTP_DEFAULT_SOCKET_BUFFER} {socket_buffer}",
+        }
+
+    def compute_conntrack_max(self) -> int:
+        """Computes conntrack table size rounded up to a power of 2."""
+        conntrack_max = max(
+            self.target_subscribers * self.CONNTRACK_ENTRIES_PER_SUBSCRIBER,
+            self.MIN_CONNTRACK_MAX,
+        )
+        return 1 << (conntrack_max - 1).bit_length()
+
+    def compute_conntrack_hashsize(self) -> int:
+        """Computes conntrack hash table size matching computed conntrack table size."""
+        return self.compute_conntrack_max() // self.CONNTRACK_MAX_TO_HASHSIZE_RATIO
+
+    def tune_sysctl(self):
+        """Persists computed sysctl values in /etc/sysctl.d/ and applies them live.
+
+        Kernel modules owning the tuned keys are loaded at boot via /etc/modules-load.d/.
+        """
+        logger.info(
+            "Tuning kernel networking stack for "
+            f"{self.target_subscribers} subscribers and {self.target_enodebs} eNodeBs..."
+        )
+        for kernel_module in self.KERNEL_MODULES:
+            check_call(["modprobe", kernel_module])
+        self._write_modules_load_config()
+        self._write_conntrack_modprobe_config()
+        self._write_sysctl_config()
+        self._apply_conntrack_hashsize()
+        logger.info(f"Applying {self.SYSCTL_CONFIG_FILE}...")
+        check_call(["sysctl", "-p", self.SYSCTL_CONFIG_FILE])
+
+    def report(self) -> list:
+        """Logs current value against the target for each tuned setting.
+
+        Kernel modules loaded at boot are reported too, so the report also tells whether
+        the settings will survive a reboot.
+
+        :returns:
+            list: names of settings which current value doesn't match the target
+        """
+        logger.info("Kernel networking sysctl report:")
+        targets = {key: str(value) for key, value in self.compute_sysctl_values().items()}
+        targets["nf_conntrack hashsize"] = str(self.compute_conntrack_hashsize())
+        targets["modules loaded at boot"] = " ".join(self.KERNEL_MODULES)
+        mismatches = []
+        for key, target in targets.items():
+            current = self._get_current_value(key)
+            status = "OK" if current == target else "MISMATCH"
+            logger.info(f"  {key}: current={current} target={target} {status}")
+            if current != target:
+                mismatches.append(key)
+        for mismatch in mismatches:
+            logger.warning(f"Kernel setting {mismatch} doesn't match its target!")
+        return mismatches
+
+    def _write_sysctl_config(self):
+        """Writes computed sysctl values to /etc/sysctl.d/."""
+        logger.info(f"Writing {self.SYSCTL_CONFIG_FILE}...")
+        with open(self.SYSCTL_CONFIG_FILE, "w") as sysctl_config:
+            sysctl_config.write(
+                "# This is the sysctl config written by magma-access-gateway snap\n"
+                f"# Target subscribers: {self.target_subscribers}\n"
+                f"# Target eNodeBs: {self.target_enodebs}\n"
+            )
+            for key, value in self.compute_sysctl_values().items():
+                sysctl_config.write(f"{key} = {value}\n")
+
+    def _write_modules_load_config(self):
+        """Makes kernel modules owning the tuned keys load at boot."""
+        logger.info(f"Writing {self.MODULES_LOAD_CONFIG_FILE}...")
+        with open(self.MODULES_LOAD_CONFIG_FILE, "w") as modules_load_config:
+            modules_load_config.write(
+                "# This is the modules-load config written by magma-access-gateway snap\n"
+            )
+            for kernel_module in self.KERNEL_MODULES:
+                modules_load_config.write(f"{kernel_module}\n")
+
+    def _write_conntrack_modprobe_config(self):
+        """Persists conntrack hash table size as nf_conntrack module option."""
+        with open(self.CONNTRACK_MODPROBE_CONFIG_FILE, "w") as modprobe_config:
+            modprobe_config.write(
+                f"options nf_conntrack hashsize={self.compute_conntrack_hashsize()}\n"
+            )
+
+    def _apply_conntrack_hashsize(self):
+        """Resizes conntrack hash table of the running kernel."""
+        with open(self.CONNTRACK_HASHSIZE_PARAMETER, "w") as hashsize:
+            hashsize.write(str(self.compute_conntrack_hashsize()))
+
+    def _get_current_value(self, key: str) -> str:
+        """Returns current value of a sysctl or conntrack hash size with whitespace normalized."""
+        if key == "modules loaded at boot":
+            return " ".join(self._get_modules_loaded_at_boot())
+        if key == "nf_conntrack hashsize":
+            path = self.CONNTRACK_HASHSIZE_PARAMETER
+        else:
+            path = os.path.join(self.PROC_SYS, *key.split("."))
+        try:
+            with open(path, "r") as current_value:
+                return " ".join(current_value.read().split())
+        except OSError:
+            return ""
+
+    def _get_modules_loaded_at_boot(self) -> list:
+        """Returns tuned kernel modules listed in Magma's modules-load config."""
+        try:
+            with open(self.MODULES_LOAD_CONFIG_FILE, "r") as modules_load_config:
+                listed = {line.strip() for line in modules_load_config}
+        except OSError:
+            return []
+        return [kernel_module for kernel_module in self.KERNEL_MODULES if kernel_module in listed]
+
+    @staticmethod
+    def _clamp(value: int, minimum: int, maximum: int) -> int:
+        """Limits value to a given range."""
+        return max(minimum, min(value, maximum))
@@ -2,19 +2,30 @@
 # Copyright 2022 Canonical Ltd.
 # See LICENSE file for licensing details.
 
-""" The Access Gateway (AGW) provides network services and policy enforcement. In an LTE network,
-  the AGW implements an evolved packet core (EPC), and a combination of an AAA and a PGW. It works
-  with existing, unmodified commercial radio hardware.
-  For detailed description visit https://docs.magmacore.org/docs/next/lte/architecture_overview.
+"""The Access Gateway (AGW) provides network services and policy enforcement. In an LTE network,
+the AGW implements an evolved packet core (EPC), and a combination of an AAA and a PGW. It works
+with existing, unmodified commercial radio hardware.
+For detailed description visit https://docs.magmacore.org/docs/next/lte/architecture_overview.
 """
 
 import logging
 import sys
+from argparse import ArgumentParser, Namespace
+from subprocess import CalledProcessError
 
 from systemd.journal import JournalHandler  # type: ignore[import]
 
+from .agw_cgroup_footprint import AGWCgroupFootprintReport
+from .agw_host_performance import AGWHostPerformanceReport
+from .agw_interface_statistics import AGWInterfaceStatisticsReport
+from .agw_journal_signatures import AGWJournalSignatureReport
+from .agw_orc8r_heartbeat import AGWOrc8rHeartbeatReport
+from .agw_ovs_performance import AGWOVSPerformanceReport
 from .agw_post_install import AGWPostInstallChecks
 from .agw_post_install_errors import PostInstallError
+from .agw_redis_performance import AGWRedisPerformanceReport, RedisReplyError
+from .agw_sctp_performance import AGWSCTPPerformanceReport
+from .agw_startup_critical_path import AGWStartupCriticalPathReport
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -31,6 +42,7 @@ def main():
         logger.info("Starting Magma AGW post-installation checks...")
         agw_post_install_checks = AGWPostInstallChecks()
         agw_post_install_checks.check_whether_required_interfaces_are_configured()
+        agw_post_install_checks.check_interface_error_rates()
         agw_post_install_checks.check_eth0_internet_connectivity()
         agw_post_install_checks.check_ovs_has_not_unsupported_gpt_error()
         agw_post_install_checks.check_whether_required_services_are_running()
@@ -38,6 +50,359 @@ def main():
         agw_post_install_checks.check_whether_root_certificate_exists()
         agw_post_install_checks.check_control_proxy()
         agw_post_install_checks.check_connectivity_with_orc8r()
+        agw_post_install_checks.check_orc8r_heartbeat_regularity()
+        agw_post_install_checks.check_datapath_performance()
+        agw_post_install_checks.check_ovs_tuning()
+        agw_post_install_checks.check_sysctl_tuning()
+        agw_post_install_checks.check_host_performance()
+        agw_post_install_checks.check_redis_performance()
+        agw_post_install_checks.check_cgroup_footprint()
         logger.info("Magma AGW post-installation checks finished successfully.")
     except PostInstallError:
+        logger.info(
+            "To find known failures in Magma services logs, execute: "
+            "magma-access-gateway.diagnostics journal-signatures"
+        )
         sys.exit(1)
+
+
+def diagnostics():
+    args = diagnostics_arguments_parser(sys.argv[1:])
+    {
+        "ovs-performance": ovs_performance_diagnostics,
+        "host-performance": host_performance_diagnostics,
+        "redis-performance": redis_performance_diagnostics,
+        "startup-critical-path": startup_critical_path_diagnostics,
+        "journal-signatures": journal_signatures_diagnostics,
+        "orc8r-heartbeat": orc8r_heartbeat_diagnostics,
+        "sctp-performance": sctp_performance_diagnostics,
+        "interface-statistics": interface_statistics_diagnostics,
+        "cgroup-footprint": cgroup_footprint_diagnostics,
+    }[args.command](args)
+
+
+def ovs_performance_diagnostics(args: Namespace):
+    ovs_performance_report = AGWOVSPerformanceReport(
+        args.bridge, args.interval, args.miss_ratio_threshold
+    )
+    try:
+        ovs_performance_report.log_report(ovs_performance_report.collect())
+    except (CalledProcessError, OSError) as e:
+        logger.error(f"OVS datapath performance couldn't be measured: {e}")
+        sys.exit(1)
+
+
+def host_performance_diagnostics(args: Namespace):
+    host_performance_report = AGWHostPerformanceReport(args.interval)
+    host_performance_report.log_report(host_performance_report.collect())
+
+
+def redis_performance_diagnostics(args: Namespace):
+    redis_performance_report = AGWRedisPerformanceReport(
+        args.port, args.samples, args.latency_threshold_ms
+    )
+    try:
+        redis_performance_report.log_report(redis_performance_report.collect())
+    except (OSError, RedisReplyError) as e:
+        logger.error(f"Redis performance couldn't be measured: {e}")
+        sys.exit(1)
+
+
+def startup_critical_path_diagnostics(args: Namespace):
+    startup_critical_path_report = AGWStartupCriticalPathReport()
+    report = startup_critical_path_report.collect()
+    startup_critical_path_report.log_report(report)
+    if args.graphviz:
+        try:
+            startup_critical_path_report.write_graphviz(report, args.graphviz)
+        except (OSError, CalledProcessError) as e:
+            logger.error(f"Startup graph couldn't be written: {e}")
+            sys.exit(1)
+
+
+def journal_signatures_diagnostics(args: Namespace):
+    journal_signature_report = AGWJournalSignatureReport()
+    journal_signature_report.log_report(journal_signature_report.collect())
+
+
+def orc8r_heartbeat_diagnostics(args: Namespace):
+    orc8r_heartbeat_report = AGWOrc8rHeartbeatReport(args.gap_threshold_ratio)
+    report = orc8r_heartbeat_report.collect()
+    orc8r_heartbeat_report.log_report(report)
+    if args.metrics_file:
+        try:
+            orc8r_heartbeat_report.write_metrics(report, args.metrics_file)
+        except OSError as e:
+            logger.error(f"Orc8r heartbeat metrics couldn't be written: {e}")
+            sys.exit(1)
+
+
+def sctp_performance_diagnostics(args: Namespace):
+    sctp_performance_report = AGWSCTPPerformanceReport(
+        args.interval, args.retransmission_ratio_threshold
+    )
+    try:
+        while True:
+            sctp_performance_report.log_report(sctp_performance_report.collect())
+            if not args.watch:
+                break
+    except KeyboardInterrupt:
+        pass
+
+
+def interface_statistics_diagnostics(args: Namespace):
+    interface_statistics_report = AGWInterfaceStatisticsReport(
+        args.interfaces,
+        args.interval,
+        args.warning_ratio,
+        args.failure_ratio,
+        args.warning_carrier_flaps,
+        args.failure_carrier_flaps,
+        args.min_packets,
+    )
+    report = interface_statistics_report.collect()
+    interface_statistics_report.log_report(report)
+    for failed_item in report["failed"]:
+        logger.error(failed_item)
+    if report["failed"]:
+        sys.exit(1)
+
+
+def cgroup_footprint_diagnostics(args: Namespace):
+    cgroup_footprint_report = AGWCgroupFootprintReport(
+        args.baseline_file, args.memory_growth_ratio
+    )
+    report = cgroup_footprint_report.collect()
+    cgroup_footprint_report.log_report(report)
+    if args.save_baseline:
+        try:
+            cgroup_footprint_report.save_baseline(report)
+        except OSError as e:
+            logger.error(f"Magma services footprint baseline couldn't be saved: {e}")
+            sys.exit(1)
+
+
+def diagnostics_arguments_parser(cli_arguments: list):
+    cli_options = ArgumentParser()
+    commands = cli_options.add_subparsers(dest="command", required=True)
+    ovs_performance = commands.add_parser(
+        "ovs-performance",
+        help="Reports OVS datapath and OpenFlow table counters and flags high miss ratios.",
+    )
+    ovs_performance.add_argument(
+        "--bridge",
+        dest="bridge",
+        required=False,
+        default=AGWOVSPerformanceReport.OVS_BRIDGE,
+        help="OVS bridge which OpenFlow tables should be reported.",
+    )
+    ovs_performance.add_argument(
+        "--interval",
+        dest="interval",
+        type=int,
+        required=False,
+        default=AGWOVSPerformanceReport.SAMPLING_INTERVAL,
+        help="Number of seconds between two samples of OVS counters.",
+    )
+    ovs_performance.add_argument(
+        "--miss-ratio-threshold",
+        dest="miss_ratio_threshold",
+        type=float,
+        required=False,
+        default=AGWOVSPerformanceReport.MISS_RATIO_THRESHOLD,
+        help="Miss ratio above which datapath or OpenFlow table is flagged. Example: 0.1.",
+    )
+    host_performance = commands.add_parser(
+        "host-performance",
+        help="Reports CPU governor, frequency, throttling and hugepages of the host.",
+    )
+    host_performance.add_argument(
+        "--interval",
+        dest="interval",
+        type=int,
+        required=False,
+        default=AGWHostPerformanceReport.SAMPLING_INTERVAL,
+        help="Number of seconds between two samples of CPU thermal throttling counters.",
+    )
+    redis_performance = commands.add_parser(
+        "redis-performance",
+        help="Reports Redis latency percentiles, memory usage and slow log entries.",
+    )
+    redis_performance.add_argument(
+        "--port",
+        dest="port",
+        type=int,
+        required=False,
+        help="Port of Magma's Redis. Defaults to the socket or port Magma services use, "
+        "configured in /etc/magma/redis.yml.",
+    )
+    redis_performance.add_argument(
+        "--samples",
+        dest="samples",
+        type=int,
+        required=False,
+        default=AGWRedisPerformanceReport.SAMPLES,
+        help="Number of times each of PING, SET and GET commands is executed.",
+    )
+    redis_performance.add_argument(
+        "--latency-threshold-ms",
+        dest="latency_threshold_ms",
+        type=float,
+        required=False,
+        default=AGWRedisPerformanceReport.LATENCY_THRESHOLD_MS,
+        help="99th percentile latency above which a command is flagged. Example: 2.0.",
+    )
+    startup_critical_path = commands.add_parser(
+        "startup-critical-path",
+        help="Reports startup timeline and critical path of Magma services up to the first "
+        "Orc8r heartbeat in the current boot.",
+    )
+    startup_critical_path.add_argument(
+        "--graphviz",
+        dest="graphviz",
+        required=False,
+        help="Path to write the startup graph to. Rendered with dot in the format given by "
+        "the extension, e.g. startup.svg, or written as Graphviz source for .dot.",
+    )
+    commands.add_parser(
+        "journal-signatures",
+        help="Scans current boot's journal of Magma services and sctpd for known failures "
+        "and reports their counts, first and last occurrence and remediation hints.",
+    )
+    orc8r_heartbeat = commands.add_parser(
+        "orc8r-heartbeat",
+        help="Reports interval histogram, jitter, longest gap and time since last success of "
+        "magmad's Orc8r heartbeats and checkins in the current boot.",
+    )
+    orc8r_heartbeat.add_argument(
+        "--gap-threshold-ratio",
+        dest="gap_threshold_ratio",
+        type=float,
+        required=False,
+        default=AGWOrc8rHeartbeatReport.GAP_THRESHOLD_RATIO,
+        help="Multiple of mean interval above which a gap is flagged. Example: 3.0.",
+    )
+    orc8r_heartbeat.add_argument(
+        "--metrics-file",
+        dest="metrics_file",
+        required=False,
+        help="File to write statistics to in Prometheus text format, e.g. "
+        "/var/lib/prometheus/node-exporter/magma_orc8r_heartbeat.prom.",
+    )
+    sctp_performance = commands.add_parser(
+        "sctp-performance",
+        help="Reports state, RTO and retransmission rate of SCTP associations with eNodeBs "
+        "and SCTP retransmission, timeout and association churn rates.",
+    )
+    sctp_performance.add_argument(
+        "--interval",
+        dest="interval",
+        type=int,
+        required=False,
+        default=AGWSCTPPerformanceReport.SAMPLING_INTERVAL,
+        help="Number of seconds between two samples of SCTP counters.",
+    )
+    sctp_performance.add_argument(
+        "--retransmission-ratio-threshold",
+        dest="retransmission_ratio_threshold",
+        type=float,
+        required=False,
+        default=AGWSCTPPerformanceReport.RETRANSMISSION_RATIO_THRESHOLD,
+        help="Ratio of retransmitted to sent chunks above which SCTP is flagged. Example: 0.01.",
+    )
+    sctp_performance.add_argument(
+        "--watch",
+        dest="watch",
+        action="store_true",
+        help="Keep reporting every interval until interrupted.",
+    )
+    interface_statistics = commands.add_parser(
+        "interface-statistics",
+        help="Reports error, drop, FIFO overrun and carrier flap rates of Magma AGW interfaces.",
+    )
+    interface_statistics.add_argument(
+        "--interfaces",
+        dest="interfaces",
+        nargs="+",
+        required=False,
+        default=AGWPostInstallChecks.MAGMA_AGW_INTERFACES,
+        help="Interfaces to sample. Example: eth0 eth1.",
+    )
+    interface_statistics.add_argument(
+        "--interval",
+        dest="interval",
+        type=int,
+        required=False,
+        default=AGWInterfaceStatisticsReport.SAMPLING_INTERVAL,
+        help="Number of seconds between two samples of interface counters.",
+    )
+    interface_statistics.add_argument(
+        "--warning-ratio",
+        dest="warning_ratio",
+        type=float,
+        required=False,
+        default=AGWInterfaceStatisticsReport.WARNING_RATIO,
+        help="Ratio of errors, drops or FIFO overruns to handled packets above which "
+        "an interface is flagged. Example: 0.001.",
+    )
+    interface_statistics.add_argument(
+        "--failure-ratio",
+        dest="failure_ratio",
+        type=float,
+        required=False,
+        default=AGWInterfaceStatisticsReport.FAILURE_RATIO,
+        help="Ratio of errors, drops or FIFO overruns to handled packets above which "
+        "the check fails. Example: 0.01.",
+    )
+    interface_statistics.add_argument(
+        "--warning-carrier-flaps",
+        dest="warning_carrier_flaps",
+        type=int,
+        required=False,
+        default=AGWInterfaceStatisticsReport.WARNING_CARRIER_FLAPS,
+        help="Number of carrier changes within the interval at which an interface is flagged.",
+    )
+    interface_statistics.add_argument(
+        "--failure-carrier-flaps",
+        dest="failure_carrier_flaps",
+        type=int,
+        required=False,
+        default=AGWInterfaceStatisticsReport.FAILURE_CARRIER_FLAPS,
+        help="Number of carrier changes within the interval at which the check fails.",
+    )
+    interface_statistics.add_argument(
+        "--min-packets",
+        dest="min_packets",
+        type=int,
+        required=False,
+        default=AGWInterfaceStatisticsReport.MIN_PACKETS,
+        help="Number of packets an interface must handle within the interval before its "
+        "error, drop and FIFO overrun ratios are judged.",
+    )
+    cgroup_footprint = commands.add_parser(
+        "cgroup-footprint",
+        help="Reports memory, CPU, IO and task footprint of Magma services from their cgroups "
+        "and flags growth since the baseline stored after installation.",
+    )
+    cgroup_footprint.add_argument(
+        "--baseline-file",
+        dest="baseline_file",
+        required=False,
+        default=AGWCgroupFootprintReport.BASELINE_FILE,
+        help="JSON file the baseline is read from and saved to.",
+    )
+    cgroup_footprint.add_argument(
+        "--memory-growth-ratio",
+        dest="memory_growth_ratio",
+        type=float,
+        required=False,
+        default=AGWCgroupFootprintReport.MEMORY_GROWTH_RATIO,
+        help="Multiple of baseline memory usage above which a service is flagged. Example: 1.5.",
+    )
+    cgroup_footprint.add_argument(
+        "--save-baseline",
+        dest="save_baseline",
+        action="store_true",
+        help="Store current footprint as the new baseline, e.g. after an upgrade.",
+    )
+    return cli_options.parse_args(cli_arguments)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from subprocess import check_output
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWCgroupFootprintReport:
+    """Reports CPU, memory, IO and task footprint of Magma services from their cgroups.
+
+    Both the unified (v2) and the legacy (v1) cgroup hierarchies are supported. Report taken
+    right after installation is stored as a baseline and later reports flag services whose
+    memory, CPU usage or task count grew well beyond it, as well as services which restarted.
+    """
+
+    MAGMA_UNITS = "magma@*"
+    UNIT_PROPERTIES = [
+        "Id",
+        "ActiveState",
+        "ControlGroup",
+        "NRestarts",
+        "ActiveEnterTimestampMonotonic",
+    ]
+    SYS_FS_CGROUP = "/sys/fs/cgroup"
+    BASELINE_FILE = "/var/opt/magma/cgroup_footprint_baseline.json"
+    MEMORY_GROWTH_RATIO = 1.5
+    MEMORY_GROWTH_MIN_BYTES = 32 * 1024 * 1024
+    CPU_GROWTH_RATIO = 2.0
+    CPU_GROWTH_MIN_PERCENT = 5.0
+    TASKS_GROWTH_RATIO = 2.0
+    TASKS_GROWTH_MIN = 10
+
+    def __init__(
+        self,
+        baseline_file: str = BASELINE_FILE,
+        memory_growth_ratio: float = MEMORY_GROWTH_RATIO,
+    ):
+        """
+        :param baseline_file: JSON file the baseline is read from and saved to
+        :param memory_growth_ratio: multiple of baseline memory above which a service is flagged
+        """
+        self.baseline_file = baseline_file
+        self.memory_growth_ratio = memory_growth_ratio
+
+    def collect(self) -> dict:
+        """Reads cgroup accounting of running Magma services and compares it with the baseline.
+
+        :returns:
+            dict: per-service footprint, baseline (None if there's none yet) and flagged items
+        """
+        services = {
+            name: self._get_footprint(unit)
+            for name, unit in sorted(self._get_units().items())
+            if unit["state"] == "active" and unit["control_group"]
+        }
+        baseline = self._load_baseline()
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "services": services,
+            "baseline": baseline,
+            "flagged": self._flag(services, baseline["services"]) if baseline else [],
+        }
+
+    def log_report(self, report: dict):
+        """Logs per-service footprint in a human readable form."""
+        if report["baseline"]:
+            logger.info(f"Comparing with baseline from {report['baseline']['created']}.")
+        for name, footprint in report["services"].items():
+            logger.info(
+                f"{name}: memory={self._format_bytes(footprint['memory_current'])} "
+                f"peak={self._format_bytes(footprint['memory_peak'])} "
+                f"cpu={self._format_number(footprint['cpu_percent'], '%')} "
+                f"io read={self._format_bytes(footprint['io_read_bytes'])} "
+                f"written={self._format_bytes(footprint['io_write_bytes'])} "
+                f"tasks={footprint['tasks']} restarts={footprint['restarts']}"
+            )
+        for flagged_item in report["flagged"]:
+            logger.warning(flagged_item)
+
+    def save_baseline(self, report: dict):
+        """Atomically stores the report as the baseline for later reports.
+
+        :raises:
+            OSError: if baseline file can't be written
+        """
+        temporary_baseline_file = f"{self.baseline_file}.tmp"
+        with open(temporary_baseline_file, "w") as baseline:
+            json.dump({"created": report["created"], "services": report["services"]}, baseline)
+        os.replace(temporary_baseline_file, self.baseline_file)
+        logger.info(f"Magma services footprint baseline saved to {self.baseline_file}.")
+
+    def _get_units(self) -> dict:
+        """Returns state, control group, restart count and activation time of Magma units."""
+        show_output = check_output(
+            [
+                "systemctl",
+                "show",
+                self.MAGMA_UNITS,
+                f"--property={','.join(self.UNIT_PROPERTIES)}",
+            ]
+        ).decode("utf-8")
+        units = {}
+        for block in show_output.strip().split("\n\n"):
+            properties = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+            if not properties.get("Id"):
+                continue
+            units[os.path.splitext(properties["Id"])[0]] = {
+                "state": properties.get("ActiveState", ""),
+                "control_group": properties.get("ControlGroup", ""),
+                "restarts": self._to_int(properties.get("NRestarts")),
+                "active_since_us": self._to_int(properties.get("ActiveEnterTimestampMonotonic")),
+            }
+        return units
+
+    def _get_footprint(self, unit: dict) -> dict:
+        """Reads memory, CPU, IO and task accounting of a unit's cgroup."""
+        if os.path.exists(os.path.join(self.SYS_FS_CGROUP, "cgroup.controllers")):
+            footprint = self._read_unified_cgroup(unit["control_group"])
+        else:
+            footprint = self._read_legacy_cgroups(unit["control_group"])
+        cpu_usage_us = footprint.pop("cpu_usage_us")
+        active_for_us = time.monotonic() * 1000000 - (unit["active_since_us"] or 0)
+        footprint["cpu_percent"] = (
+            round(100 * cpu_usage_us / active_for_us, 2)
+            if cpu_usage_us is not None and unit["active_since_us"] and active_for_us > 0
+            else None
+        )
+        footprint["restarts"] = unit["restarts"]
+        return footprint
+
+    def _read_unified_cgroup(self, control_group: str) -> dict:
+        cgroup_dir = os.path.join(self.SYS_FS_CGROUP, control_group.lstrip("/"))
+        cpu_stat = self._read_keyed_file(os.path.join(cgroup_dir, "cpu.stat"))
+        io_stat = self._read_file(os.path.join(cgroup_dir, "io.stat"))
+        return {
+            "memory_current": self._read_int(os.path.join(cgroup_dir, "memory.current")),
+            "memory_peak": self._read_int(os.path.join(cgroup_dir, "memory.peak")),
+            "cpu_usage_us": cpu_stat.get("usage_usec"),
+            "io_read_bytes": self._sum_io_stat(io_stat, "rbytes"),
+            "io_write_bytes": self._sum_io_stat(io_stat, "wbytes"),
+            "tasks": self._read_int(os.path.join(cgroup_dir, "pids.current")),
+        }
+
+    def _read_legacy_cgroups(self, control_group: str) -> dict:
+        def controller_file(controller: str, name: str) -> str:
+            return os.path.join(self.SYS_FS_CGROUP, controller, control_group.lstrip("/"), name)
+
+        cpu_usage_ns = self._read_int(controller_file("cpuacct", "cpuacct.usage"))
+        io_service_bytes = self._read_file(
+            controller_file("blkio", "blkio.throttle.io_service_bytes")
+        )
+        return {
+            "memory_current": self._read_int(controller_file("memory", "memory.usage_in_bytes")),
+            "memory_peak": self._read_int(controller_file("memory", "memory.max_usage_in_bytes")),
+            "cpu_usage_us": cpu_usage_ns // 1000 if cpu_usage_ns is not None else None,
+            "io_read_bytes": self._sum_blkio(io_service_bytes, "Read"),
+            "io_write_bytes": self._sum_blkio(io_service_bytes, "Write"),
+            "tasks": self._read_int(controller_file("pids", "pids.current")),
+        }
+
+    def _flag(self, services: dict, baseline_services: dict) -> list:
+        """Flags services whose footprint grew well beyond the baseline or which restarted."""
+        flagged = []
+        for name, footprint in services.items():
+            if not (baseline := baseline_services.get(name)):
+                continue
+            for key, description, ratio, minimum in [
+                (
+                    "memory_current",
+                    "memory usage",
+                    self.memory_growth_ratio,
+                    self.MEMORY_GROWTH_MIN_BYTES,
+                ),
+                (
+                    "memory_peak",
+                    "peak memory usage",
+                    self.memory_growth_ratio,
+                    self.MEMORY_GROWTH_MIN_BYTES,
+                ),
+                (
+                    "cpu_percent",
+                    "average CPU usage",
+                    self.CPU_GROWTH_RATIO,
+                    self.CPU_GROWTH_MIN_PERCENT,
+                ),
+                ("tasks", "task count", self.TASKS_GROWTH_RATIO, self.TASKS_GROWTH_MIN),
+            ]:
+                if self._grew(footprint[key], baseline.get(key), ratio, minimum):
+                    flagged.append(
+                        f"{name} {description} grew from {baseline[key]} to {footprint[key]} "
+                        "since baseline!"
+                    )
+            if (footprint["restarts"] or 0) > (baseline.get("restarts") or 0):
+                flagged.append(
+                    f"{name} restarted {footprint['restarts'] - (baseline.get('restarts') or 0)} "
+                    "times since baseline!"
+                )
+        return flagged
+
+    @staticmethod
+    def _grew(current, baseline, ratio: float, minimum: float) -> bool:
+        """Checks whether value grew both by given ratio and by given absolute minimum."""
+        if current is None or baseline is None:
+            return False
+        return current > baseline * ratio and current - baseline > minimum
+
+    def _load_baseline(self):
+        """Returns stored baseline or None if there's none or it can't be read."""
+        try:
+            with open(self.baseline_file, "r") as baseline:
+                return json.load(baseline)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Magma services footprint baseline couldn't be read: {e}")
+            return None
+
+    @staticmethod
+    def _sum_io_stat(io_stat: str, key: str):
+        """Sums given key of all devices in io.stat, e.g. `8:0 rbytes=1024 wbytes=0 ...`."""
+        if io_stat is None:
+            return None
+        return sum(
+            int(field.split("=", 1)[1])
+            for line in io_stat.splitlines()
+            for field in line.split()[1:]
+            if field.startswith(f"{key}=")
+        )
+
+    @staticmethod
+    def _sum_blkio(io_service_bytes: str, operation: str):
+        """Sums given operation of all devices in blkio.throttle.io_service_bytes."""
+        if io_service_bytes is None:
+            return None
+        return sum(
+            int(fields[2])
+            for fields in (line.split() for line in io_service_bytes.splitlines())
+            if len(fields) == 3 and fields[1] == operation
+        )
+
+    def _read_keyed_file(self, path: str) -> dict:
+        content = self._read_file(path) or ""
+        return {
+            fields[0]: int(fields[1])
+            for fields in (line.split() for line in content.splitlines())
+            if len(fields) == 2 and fields[1].isdigit()
+        }
+
+    def _read_int(self, path: str):
+        return self._to_int(self._read_file(path))
+
+    @staticmethod
+    def _read_file(path: str):
+        """Returns content of a file or None if it can't be read."""
+        try:
+            with open(path, "r") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _to_int(value):
+        try:
+            return int(value.strip())
+        except (AttributeError, ValueError):
+            return None
+
+    @staticmethod
+    def _format_bytes(value) -> str:
+        return "-" if value is None else f"{value / 1024 / 1024:.1f}MiB"
+
+    @staticmethod
+    def _format_number(value, unit: str) -> str:
+        return "-" if value is None else f"{value}{unit}"
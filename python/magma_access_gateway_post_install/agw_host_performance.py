@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import glob
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWHostPerformanceReport:
+    TMPFILES_CONFIG_FILE = "/etc/tmpfiles.d/magma-host-performance.conf"
+    HUGEPAGES_SYSCTL_CONFIG_FILE = "/etc/sysctl.d/99-magma-hugepages.conf"
+    SYS_CPU = "/sys/devices/system/cpu"
+    PROC_MEMINFO = "/proc/meminfo"
+    SAMPLING_INTERVAL = 10
+    CPU_GOVERNOR = "performance"
+    THROTTLED_FREQUENCY_RATIO = 0.8
+    NR_HUGEPAGES_REGEX = re.compile(r"^vm\.nr_hugepages\s*=\s*(\d+)", re.MULTILINE)
+    HUGEPAGES_TOTAL_REGEX = re.compile(r"^HugePages_Total:\s+(\d+)", re.MULTILINE)
+    THROTTLE_COUNTERS = ["core_throttle_count", "package_throttle_count"]
+
+    def __init__(self, interval: int = SAMPLING_INTERVAL):
+        self.interval = interval
+
+    def collect(self) -> dict:
+        """Reads CPU governor, frequency and hugepages of the host and samples throttling twice.
+
+        Throttling counters are cumulative since boot, so only throttling which happens between
+        the two samples is flagged.
+
+        :returns:
+            dict: per-CPU state, hugepages state and flagged items
+        """
+        cpu_dirs = sorted(glob.glob(os.path.join(self.SYS_CPU, "cpu[0-9]*")))
+        logger.info(f"Sampling CPU thermal throttling counters over {self.interval} seconds...")
+        first_sample = {cpu_dir: self._get_throttle_counters(cpu_dir) for cpu_dir in cpu_dirs}
+        time.sleep(self.interval)
+        cpus = {
+            os.path.basename(cpu_dir): self._get_cpu_state(cpu_dir, first_sample[cpu_dir])
+            for cpu_dir in cpu_dirs
+        }
+        hugepages = {
+            "total": self._get_total_hugepages(),
+            "target": self._get_target_hugepages(),
+        }
+        return {
+            "interval": self.interval,
+            "cpus": cpus,
+            "hugepages": hugepages,
+            "flagged": self._flag_cpus(cpus) + self._flag_hugepages(hugepages),
+        }
+
+    def log_report(self, report: dict):
+        """Logs host performance report in a human readable form."""
+        for cpu, state in report["cpus"].items():
+            logger.info(
+                f"{cpu}: governor={state['governor']} "
+                f"frequency={state['cur_freq']}/{state['max_freq']} kHz "
+                f"core throttles={state['core_throttle_count']} "
+                f"(+{state['core_throttles']} in {report['interval']}s) "
+                f"package throttles={state['package_throttle_count']} "
+                f"(+{state['package_throttles']} in {report['interval']}s)"
+            )
+        logger.info(
+            f"HugePages_Total: current={report['hugepages']['total']} "
+            f"target={report['hugepages']['target']}"
+        )
+        for flagged_item in report["flagged"]:
+            logger.warning(flagged_item)
+
+    def _get_cpu_state(self, cpu_dir: str, first_sample: dict) -> dict:
+        """Reads governor, frequencies and thermal throttling counters of a single CPU.
+
+        Number of throttling events since the first sample is reported next to each counter.
+        """
+        counters = self._get_throttle_counters(cpu_dir)
+        return {
+            "governor": self._read_file(os.path.join(cpu_dir, "cpufreq", "scaling_governor")),
+            "cur_freq": self._read_int(os.path.join(cpu_dir, "cpufreq", "scaling_cur_freq")),
+            "max_freq": self._read_int(os.path.join(cpu_dir, "cpufreq", "scaling_max_freq")),
+            **counters,
+            "core_throttles": (
+                counters["core_throttle_count"] - first_sample["core_throttle_count"]
+            ),
+            "package_throttles": (
+                counters["package_throttle_count"] - first_sample["package_throttle_count"]
+            ),
+        }
+
+    def _get_throttle_counters(self, cpu_dir: str) -> dict:
+        """Reads cumulative thermal throttling counters of a single CPU."""
+        return {
+            counter: self._read_int(os.path.join(cpu_dir, "thermal_throttle", counter))
+            for counter in self.THROTTLE_COUNTERS
+        }
+
+    def _flag_cpus(self, cpus: dict) -> list:
+        """Flags CPUs with unexpected governor and CPUs throttled during the sampling interval."""
+        flagged = []
+        governor_tuned = os.path.exists(self.TMPFILES_CONFIG_FILE)
+        for cpu, state in cpus.items():
+            if governor_tuned and state["governor"] and state["governor"] != self.CPU_GOVERNOR:
+                flagged.append(
+                    f"{cpu} governor is {state['governor']} instead of {self.CPU_GOVERNOR}!"
+                )
+            if throttles := state["core_throttles"] + state["package_throttles"]:
+                flagged.append(
+                    f"{cpu} was thermally throttled {throttles} times in {self.interval} seconds!"
+                )
+            if state["governor"] == self.CPU_GOVERNOR and self._runs_below_max_frequency(state):
+                flagged.append(
+                    f"{cpu} runs at {state['cur_freq']} kHz "
+                    f"which is well below its maximum of {state['max_freq']} kHz!"
+                )
+        return flagged
+
+    def _runs_below_max_frequency(self, cpu_state: dict) -> bool:
+        """Checks whether CPU runs well below the maximum frequency its governor may pick.
+
+        Turbo frequencies above scaling_max_freq aren't expected of an idle CPU.
+        """
+        if not cpu_state["cur_freq"] or not cpu_state["max_freq"]:
+            return False
+        return cpu_state["cur_freq"] < self.THROTTLED_FREQUENCY_RATIO * cpu_state["max_freq"]
+
+    @staticmethod
+    def _flag_hugepages(hugepages: dict) -> list:
+        """Flags hugepages reservation which is smaller than configured."""
+        if hugepages["target"] is not None and hugepages["total"] < hugepages["target"]:
+            return [
+                f"Only {hugepages['total']} out of {hugepages['target']} hugepages are reserved!"
+            ]
+        return []
+
+    def _get_total_hugepages(self) -> int:
+        """Returns number of hugepages currently reserved."""
+        if match := self.HUGEPAGES_TOTAL_REGEX.search(self._read_file(self.PROC_MEMINFO)):
+            return int(match.group(1))
+        return 0
+
+    def _get_target_hugepages(self):
+        """Returns number of hugepages configured by the installer or None if not configured."""
+        hugepages_config = self._read_file(self.HUGEPAGES_SYSCTL_CONFIG_FILE)
+        if match := self.NR_HUGEPAGES_REGEX.search(hugepages_config):
+            return int(match.group(1))
+        return None
+
+    def _read_int(self, path: str) -> int:
+        """Returns integer content of a file or 0 if it can't be read."""
+        content = self._read_file(path)
+        return int(content) if content.isdigit() else 0
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        """Returns stripped content of a file or an empty string if it can't be read."""
+        try:
+            with open(path, "r") as file:
+                return file.read().strip()
+        except OSError:
+            return ""
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+import time
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWInterfaceStatisticsReport:
+    """Reports error, drop, FIFO overrun and carrier flap rates of network interfaces.
+
+    Counters from /sys/class/net/<interface>/statistics and carrier_changes are sampled twice.
+    Ratios are computed against packets the interface handled within the interval, which
+    already include dropped ones. They are only judged once the interface handled at least
+    `min_packets` packets, so stray frames on an idle interface don't fail the check.
+    """
+
+    SYS_CLASS_NET = "/sys/class/net"
+    SAMPLING_INTERVAL = 5
+    WARNING_RATIO = 0.001
+    FAILURE_RATIO = 0.01
+    WARNING_CARRIER_FLAPS = 1
+    FAILURE_CARRIER_FLAPS = 3
+    MIN_PACKETS = 1000
+    PACKET_COUNTERS = ["rx_packets", "tx_packets"]
+    PROBLEM_COUNTERS = {
+        "errors": ["rx_errors", "tx_errors"],
+        "drops": ["rx_dropped", "tx_dropped"],
+        "fifo_overruns": ["rx_fifo_errors", "tx_fifo_errors", "rx_over_errors"],
+    }
+
+    def __init__(
+        self,
+        interfaces: list,
+        interval: int = SAMPLING_INTERVAL,
+        warning_ratio: float = WARNING_RATIO,
+        failure_ratio: float = FAILURE_RATIO,
+        warning_carrier_flaps: int = WARNING_CARRIER_FLAPS,
+        failure_carrier_flaps: int = FAILURE_CARRIER_FLAPS,
+        min_packets: int = MIN_PACKETS,
+    ):
+        self.interfaces = interfaces
+        self.interval = interval
+        self.warning_ratio = warning_ratio
+        self.failure_ratio = failure_ratio
+        self.warning_carrier_flaps = warning_carrier_flaps
+        self.failure_carrier_flaps = failure_carrier_flaps
+        self.min_packets = min_packets
+
+    def collect(self) -> dict:
+        """Samples interface counters twice and computes rates and ratios.
+
+        :returns:
+            dict: per-interface rates and ratios, flagged items and failed items
+        """
+        logger.info(f"Sampling interface counters over {self.interval} seconds...")
+        first_counters = {
+            interface: self._get_counters(interface) for interface in self.interfaces
+        }
+        time.sleep(self.interval)
+        interfaces = {
+            interface: self._compute_rates(
+                first_counters[interface], self._get_counters(interface)
+            )
+            for interface in self.interfaces
+        }
+        flagged: list = []
+        failed: list = []
+        for interface, rates in interfaces.items():
+            self._flag(interface, rates, flagged, failed)
+        return {
+            "interval": self.interval,
+            "interfaces": interfaces,
+            "flagged": flagged,
+            "failed": failed,
+        }
+
+    def log_report(self, report: dict):
+        """Logs interface statistics report in a human readable form.
+
+        Failed items aren't logged, it's up to the caller to report them as errors.
+        """
+        for interface, rates in report["interfaces"].items():
+            if rates is None:
+                logger.info(f"{interface}: statistics unavailable")
+                continue
+            logger.info(
+                f"{interface}: packets={rates['packet_rate']:.1f}/s "
+                + " ".join(  # noqa: W503
+                    f"{problem}={rates[f'{problem}_rate']:.1f}/s "
+                    f"({rates[f'{problem}_ratio']:.4f})"
+                    for problem in self.PROBLEM_COUNTERS
+                )
+                + f" carrier flaps={rates['carrier_flaps']} in {report['interval']}s"  # noqa: W503
+            )
+        for flagged_item in report["flagged"]:
+            logger.warning(flagged_item)
+
+    def _get_counters(self, interface: str):
+        """Reads statistics counters and carrier changes of an interface.
+
+        Returns None if the interface doesn't exist.
+        """
+        interface_dir = os.path.join(self.SYS_CLASS_NET, interface)
+        if not os.path.isdir(os.path.join(interface_dir, "statistics")):
+            return None
+        counter_names = self.PACKET_COUNTERS + [
+            counter for counters in self.PROBLEM_COUNTERS.values() for counter in counters
+        ]
+        counters = {
+            counter: self._read_int(os.path.join(interface_dir, "statistics", counter))
+            for counter in counter_names
+        }
+        counters["carrier_changes"] = self._read_int(
+            os.path.join(interface_dir, "carrier_changes")
+        )
+        return counters
+
+    def _compute_rates(self, first_counters, second_counters):
+        """Computes per-second rates and ratios to handled packets between two samples."""
+        if first_counters is None or second_counters is None:
+            return None
+
+        def delta(counter_names: list) -> int:
+            return sum(
+                max(second_counters[name] - first_counters[name], 0) for name in counter_names
+            )
+
+        packets = delta(self.PACKET_COUNTERS)
+        rates = {"packets": packets, "packet_rate": packets / self.interval}
+        for problem, counter_names in self.PROBLEM_COUNTERS.items():
+            problem_count = delta(counter_names)
+            rates[f"{problem}_rate"] = problem_count / self.interval
+            rates[f"{problem}_ratio"] = problem_count / packets if packets else 0.0
+        rates["carrier_flaps"] = delta(["carrier_changes"])
+        return rates
+
+    def _flag(self, interface: str, rates, flagged: list, failed: list):
+        """Sorts rates exceeding warning and failure thresholds into flagged and failed items."""
+        if rates is None:
+            flagged.append(f"{interface} statistics are unavailable!")
+            return
+        # Too few packets to tell a problem from a few stray frames on an idle interface
+        judged_problems = (
+            list(self.PROBLEM_COUNTERS) if rates["packets"] >= self.min_packets else []
+        )
+        for problem in judged_problems:
+            ratio = rates[f"{problem}_ratio"]
+            message = (
+                f"{interface} {problem.replace('_', ' ')} ratio is {ratio:.4f} "
+                f"({rates[f'{problem}_rate']:.1f}/s)!"
+            )
+            if ratio > self.failure_ratio:
+                failed.append(message)
+            elif ratio > self.warning_ratio:
+                flagged.append(message)
+        message = f"{interface} carrier flapped {rates['carrier_flaps']} times!"
+        if rates["carrier_flaps"] >= self.failure_carrier_flaps:
+            failed.append(message)
+        elif rates["carrier_flaps"] >= self.warning_carrier_flaps:
+            flagged.append(message)
+
+    @staticmethod
+    def _read_int(path: str) -> int:
+        """Returns integer content of a file or 0 if it can't be read."""
+        try:
+            with open(path, "r") as file:
+                return int(file.read().strip())
+        except (OSError, ValueError):
+            return 0
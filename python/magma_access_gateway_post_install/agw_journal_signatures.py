@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import re
+from subprocess import check_output
+
+from systemd import journal  # type: ignore[import]
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWJournalSignatureReport:
+    """Scans current boot's journal of Magma services for known failure signatures.
+
+    All signatures are combined into a single regular expression, so each journal entry is
+    matched once, and only counters and first and last occurrence of each signature are kept.
+    Entries logged by the services and entries logged by systemd about them are both scanned.
+    """
+
+    MAGMA_UNITS = "magma@*"
+    NON_MAGMA_UNITS = ["sctpd.service"]
+    MAX_MESSAGE_LENGTH = 200
+    SIGNATURES = [
+        {
+            "name": "ovs_gtp_device",
+            "pattern": r"could not add network device",
+            "hint": "OVS can't create GTP port. Make sure the kernel is 5.4 and "
+            "openvswitch-datapath-dkms module is loaded.",
+        },
+        {
+            "name": "ovs_db_connection",
+            "pattern": r"db\.sock: database connection failed|no bridge named",
+            "hint": "Open vSwitch isn't running or Magma bridges are missing. "
+            "Check openvswitch-switch service and /etc/network/interfaces.d.",
+        },
+        {
+            "name": "orc8r_certificate",
+            "pattern": r"certificate verify failed|CERTIFICATE_VERIFY_FAILED",
+            "hint": "TLS with Orchestrator fails. Make sure /var/opt/magma/certs/rootCA.pem "
+            "is the Orchestrator's root CA and the system clock is correct.",
+        },
+        {
+            "name": "orc8r_bootstrap",
+            "pattern": r"bootstrap(?:ping)? (?:failed|error)",
+            "hint": "Gateway can't bootstrap. Make sure it is registered in Orchestrator with "
+            "hardware ID and challenge key from `show_gateway_info.py`.",
+        },
+        {
+            "name": "orc8r_unavailable",
+            "pattern": r"StatusCode\.UNAVAILABLE|failed to connect to all addresses",
+            "hint": "Orchestrator is unreachable. Check DNS resolution of the Orchestrator "
+            "domain and addresses in /var/opt/magma/configs/control_proxy.yml.",
+        },
+        {
+            "name": "redis_connection",
+            "pattern": r"Error \d+ connecting to [\w.]+:\d+|redis\.exceptions\.ConnectionError",
+            "hint": "Services can't reach Redis. Check magma@redis service.",
+        },
+        {
+            "name": "sctp_bind",
+            "pattern": r"sctp.*(?:Address already in use|Cannot assign requested address)",
+            "hint": "SCTP server can't bind S1 address. Make sure S1 interface has its IP "
+            "address and no other SCTP server is running.",
+        },
+        {
+            "name": "missing_config",
+            "pattern": r"No such file or directory: '/(?:etc|var/opt)/magma/",
+            "hint": "Magma configuration file is missing. Re-run "
+            "`magma-access-gateway.configure`.",
+        },
+        {
+            "name": "python_traceback",
+            "pattern": r"Traceback \(most recent call last\)",
+            "hint": "Service raised an unhandled exception. Check the entries logged right "
+            "after the first occurrence with `journalctl -u <unit>`.",
+        },
+        {
+            "name": "core_dump",
+            "pattern": r"code=dumped|dumped core",
+            "hint": "Service crashed. Inspect the core dump with `coredumpctl info <unit>`.",
+        },
+        {
+            "name": "restart_loop",
+            "pattern": r"Start request repeated too quickly",
+            "hint": "Service keeps failing on start and systemd gave up restarting it. "
+            "Check its first error, then `systemctl reset-failed` and start it again.",
+        },
+    ]
+
+    def __init__(self):
+        self.signatures_regex = re.compile(
+            "|".join(
+                f"(?P<signature_{index}>{signature['pattern']})"
+                for index, signature in enumerate(self.SIGNATURES)
+            ),
+            re.IGNORECASE,
+        )
+
+    def collect(self) -> dict:
+        """Streams this boot's journal of Magma units and sctpd and matches known signatures.
+
+        :returns:
+            dict: number of scanned entries and matched signatures with their occurrences
+        """
+        units = self._get_units()
+        matches: dict = {}
+        scanned = 0
+        for entry in self._get_journal_reader(units):
+            scanned += 1
+            message = entry.get("MESSAGE", "")
+            if isinstance(message, bytes):
+                message = message.decode("utf-8", errors="replace")
+            if not (match := self.signatures_regex.search(message)):
+                continue
+            occurrence = {
+                "timestamp": str(entry.get("__REALTIME_TIMESTAMP", "")),
+                "unit": entry.get("UNIT") or entry.get("_SYSTEMD_UNIT", ""),
+                "message": message[: self.MAX_MESSAGE_LENGTH],
+            }
+            signature = self.SIGNATURES[self._get_matched_signature_index(match)]
+            if signature["name"] not in matches:
+                matches[signature["name"]] = {
+                    "signature": signature["name"],
+                    "hint": signature["hint"],
+                    "count": 0,
+                    "first": occurrence,
+                }
+            matches[signature["name"]]["count"] += 1
+            matches[signature["name"]]["last"] = occurrence
+        return {"units": units, "scanned": scanned, "signatures": list(matches.values())}
+
+    @staticmethod
+    def log_report(report: dict):
+        """Logs matched signatures with their occurrences and remediation hints."""
+        logger.info(
+            f"Scanned {report['scanned']} journal entries of {len(report['units'])} units."
+        )
+        if not report["signatures"]:
+            logger.info("No known failure signatures found.")
+        for signature in sorted(report["signatures"], key=lambda item: -item["count"]):
+            logger.warning(f"{signature['signature']}: {signature['count']} occurrences")
+            for occurrence in ["first", "last"]:
+                logger.warning(
+                    f"  {occurrence}: {signature[occurrence]['timestamp']} "
+                    f"{signature[occurrence]['unit']}: {signature[occurrence]['message']}"
+                )
+            logger.warning(f"  hint: {signature['hint']}")
+
+    def _get_units(self) -> list:
+        """Returns Magma units loaded by systemd and other units to scan."""
+        list_units_output = check_output(
+            ["systemctl", "list-units", self.MAGMA_UNITS, "--all", "--plain", "--no-legend"]
+        ).decode("utf-8")
+        magma_units = [line.split()[0] for line in list_units_output.splitlines() if line.strip()]
+        return sorted(magma_units) + self.NON_MAGMA_UNITS
+
+    @staticmethod
+    def _get_journal_reader(units: list):
+        """Returns reader of this boot's entries logged by given units or by systemd about them."""
+        journal_reader = journal.Reader()
+        for index, field in enumerate(["_SYSTEMD_UNIT", "UNIT"]):
+            if index:
+                journal_reader.add_disjunction()
+            journal_reader.this_boot()
+            for unit in units:
+                journal_reader.add_match(**{field: unit})
+        return journal_reader
+
+    @staticmethod
+    def _get_matched_signature_index(match: re.Match) -> int:
+        """Returns index of the signature whose named group matched the message."""
+        matched_group = next(
+            name for name, value in match.groupdict().items() if value is not None
+        )
+        return int(matched_group.rsplit("_", 1)[1])
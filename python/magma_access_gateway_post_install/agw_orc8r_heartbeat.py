@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import math
+import os
+from datetime import datetime
+
+from systemd import journal  # type: ignore[import]
+
+from .agw_orc8r_messages import GOT_HEARTBEAT_MSG, ORC8R_CHECKIN_SUCCESSFUL_MSG
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWOrc8rHeartbeatReport:
+    """Reports regularity of magmad's successful heartbeats and checkins with Orchestrator.
+
+    Intervals between consecutive successes are aggregated while streaming the journal, so memory
+    use doesn't depend on uptime. Longest gap and time since last success are flagged once they
+    exceed mean interval times the gap threshold ratio.
+    """
+
+    MAGMAD_SYSLOG_IDENTIFIER = "magmad"
+    SUCCESS_MESSAGES = {
+        "heartbeat": GOT_HEARTBEAT_MSG,
+        "checkin": ORC8R_CHECKIN_SUCCESSFUL_MSG,
+    }
+    INTERVAL_BUCKETS = [5, 10, 30, 60, 120, 300, 600]
+    GAP_THRESHOLD_RATIO = 3.0
+    METRICS_PREFIX = "magma_agw_orc8r"
+
+    def __init__(self, gap_threshold_ratio: float = GAP_THRESHOLD_RATIO):
+        """
+        :param gap_threshold_ratio: multiple of mean interval above which a gap is flagged
+        """
+        self.gap_threshold_ratio = gap_threshold_ratio
+
+    def collect(self) -> dict:
+        """Computes interval statistics of heartbeats and checkins logged by magmad this boot.
+
+        :returns:
+            dict: statistics of each kind of success and flagged items
+        """
+        statistics = {kind: self._new_statistics() for kind in self.SUCCESS_MESSAGES}
+        last_success: dict = {}
+        for entry in self._get_journal_reader():
+            for kind, success_message in self.SUCCESS_MESSAGES.items():
+                if success_message in entry["MESSAGE"]:
+                    timestamp = entry["__REALTIME_TIMESTAMP"]
+                    if kind in last_success:
+                        self._add_interval(
+                            statistics[kind], (timestamp - last_success[kind]).total_seconds()
+                        )
+                    statistics[kind]["successes"] += 1
+                    last_success[kind] = timestamp
+        now = datetime.now()
+        for kind, kind_statistics in statistics.items():
+            self._finalize(
+                kind_statistics, now - last_success[kind] if kind in last_success else None
+            )
+        return {"statistics": statistics, "flagged": self._flag(statistics)}
+
+    def log_report(self, report: dict):
+        """Logs heartbeat and checkin interval statistics in a human readable form."""
+        for kind, statistics in report["statistics"].items():
+            if not statistics["successes"]:
+                logger.info(f"Orc8r {kind}: no successes this boot")
+                continue
+            logger.info(
+                f"Orc8r {kind}: successes={statistics['successes']} "
+                f"mean interval={self._format_seconds(statistics['mean_interval_s'])} "
+                f"jitter={self._format_seconds(statistics['jitter_s'])} "
+                f"longest gap={self._format_seconds(statistics['longest_gap_s'])} "
+                f"since last success={self._format_seconds(statistics['since_last_success_s'])}"
+            )
+            histogram = ", ".join(
+                f"<={bucket}s: {count}"
+                for bucket, count in zip(self.INTERVAL_BUCKETS, statistics["histogram"])
+            )
+            logger.info(
+                f"  intervals: {histogram}, >{self.INTERVAL_BUCKETS[-1]}s: "
+                f"{statistics['intervals'] - sum(statistics['histogram'])}"
+            )
+        for flagged_item in report["flagged"]:
+            logger.warning(flagged_item)
+
+    def to_prometheus(self, report: dict) -> str:
+        """Returns statistics in Prometheus text exposition format."""
+        prefix = self.METRICS_PREFIX
+        lines = [
+            f"# HELP {prefix}_success_interval_seconds Interval between consecutive successes.",
+            f"# TYPE {prefix}_success_interval_seconds histogram",
+        ]
+        for kind, statistics in report["statistics"].items():
+            cumulative = 0
+            for bucket, count in zip(self.INTERVAL_BUCKETS, statistics["histogram"]):
+                cumulative += count
+                lines.append(
+                    f'{prefix}_success_interval_seconds_bucket{{kind="{kind}",le="{bucket}"}} '
+                    f"{cumulative}"
+                )
+            lines += [
+                f'{prefix}_success_interval_seconds_bucket{{kind="{kind}",le="+Inf"}} '
+                f"{statistics['intervals']}",
+                f'{prefix}_success_interval_seconds_sum{{kind="{kind}"}} '
+                f"{round(statistics['intervals_sum_s'], 3)}",
+                f'{prefix}_success_interval_seconds_count{{kind="{kind}"}} '
+                f"{statistics['intervals']}",
+            ]
+        for metric, key, help_text in [
+            ("successes", "successes", "Successes logged by magmad this boot."),
+            ("success_jitter_seconds", "jitter_s", "Standard deviation of intervals."),
+            ("success_longest_gap_seconds", "longest_gap_s", "Longest interval."),
+            ("seconds_since_last_success", "since_last_success_s", "Time since last success."),
+        ]:
+            lines += [
+                f"# HELP {prefix}_{metric} {help_text}",
+                f"# TYPE {prefix}_{metric} gauge",
+            ]
+            lines += [
+                f'{prefix}_{metric}{{kind="{kind}"}} {statistics[key]}'
+                for kind, statistics in report["statistics"].items()
+                if statistics[key] is not None
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, report: dict, metrics_file: str):
+        """Atomically writes statistics in Prometheus text format.
+
+        File can be picked up e.g. by node exporter's textfile collector.
+
+        :raises:
+            OSError: if metrics file can't be written
+        """
+        temporary_metrics_file = f"{metrics_file}.tmp"
+        with open(temporary_metrics_file, "w") as metrics:
+            metrics.write(self.to_prometheus(report))
+        os.replace(temporary_metrics_file, metrics_file)
+        logger.info(f"Orc8r heartbeat metrics written to {metrics_file}.")
+
+    def _new_statistics(self) -> dict:
+        return {
+            "successes": 0,
+            "intervals": 0,
+            "intervals_sum_s": 0.0,
+            "intervals_sum_of_squares": 0.0,
+            "histogram": [0] * len(self.INTERVAL_BUCKETS),
+            "mean_interval_s": None,
+            "jitter_s": None,
+            "longest_gap_s": None,
+            "since_last_success_s": None,
+        }
+
+    def _add_interval(self, statistics: dict, interval_s: float):
+        statistics["intervals"] += 1
+        statistics["intervals_sum_s"] += interval_s
+        statistics["intervals_sum_of_squares"] += interval_s**2
+        statistics["longest_gap_s"] = max(statistics["longest_gap_s"] or 0.0, interval_s)
+        for index, bucket in enumerate(self.INTERVAL_BUCKETS):
+            if interval_s <= bucket:
+                statistics["histogram"][index] += 1
+                break
+
+    @staticmethod
+    def _finalize(statistics: dict, since_last_success):
+        """Computes mean interval, jitter and time since last success."""
+        if since_last_success is not None:
+            statistics["since_last_success_s"] = round(since_last_success.total_seconds(), 3)
+        if not statistics["intervals"]:
+            return
+        mean = statistics["intervals_sum_s"] / statistics["intervals"]
+        variance = statistics["intervals_sum_of_squares"] / statistics["intervals"] - mean**2
+        statistics["mean_interval_s"] = round(mean, 3)
+        statistics["jitter_s"] = round(math.sqrt(max(variance, 0.0)), 3)
+        statistics["longest_gap_s"] = round(statistics["longest_gap_s"], 3)
+
+    def _flag(self, statistics: dict) -> list:
+        """Flags gaps much longer than mean interval and missing successes."""
+        flagged = []
+        if not any(kind_statistics["successes"] for kind_statistics in statistics.values()):
+            return ["magmad hasn't reached Orc8r in the current boot!"]
+        for kind, kind_statistics in statistics.items():
+            if kind_statistics["mean_interval_s"] is None:
+                continue
+            threshold_s = kind_statistics["mean_interval_s"] * self.gap_threshold_ratio
+            if kind_statistics["longest_gap_s"] > threshold_s:
+                flagged.append(
+                    f"Longest gap between Orc8r {kind}s is {kind_statistics['longest_gap_s']}s, "
+                    f"mean interval is {kind_statistics['mean_interval_s']}s!"
+                )
+            if kind_statistics["since_last_success_s"] > threshold_s:
+                flagged.append(
+                    f"Last Orc8r {kind} was {kind_statistics['since_last_success_s']}s ago, "
+                    f"mean interval is {kind_statistics['mean_interval_s']}s!"
+                )
+        return flagged
+
+    def _get_journal_reader(self):
+        journal_reader = journal.Reader()
+        journal_reader.log_level(journal.LOG_INFO)
+        journal_reader.this_boot()
+        journal_reader.add_match(SYSLOG_IDENTIFIER=self.MAGMAD_SYSLOG_IDENTIFIER)
+        return journal_reader
+
+    @staticmethod
+    def _format_seconds(seconds) -> str:
+        return "-" if seconds is None else f"{seconds:.1f}s"
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+# Messages logged by magmad once it successfully communicated with the Orchestrator.
+# All checks looking for them in the journal import them from here, so they can't drift apart.
+GOT_HEARTBEAT_MSG = "[SyncRPC] Got heartBeat from cloud"
+ORC8R_CHECKIN_SUCCESSFUL_MSG = "Checkin Successful! Successfully sent states to the cloud!"
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import re
+import time
+from subprocess import check_output
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWOVSPerformanceReport:
+    OVS_BRIDGE = "gtp_br0"
+    OPENFLOW_VERSION = "OpenFlow14"
+    SAMPLING_INTERVAL = 10
+    MISS_RATIO_THRESHOLD = 0.1
+    DATAPATH_LOOKUPS_REGEX = re.compile(r"lookups: hit:(\d+) missed:(\d+) lost:(\d+)")
+    DATAPATH_FLOWS_REGEX = re.compile(r"flows: (\d+)")
+    DATAPATH_MASKS_REGEX = re.compile(r"masks: hit:(\d+) total:(\d+)")
+    OPENFLOW_TABLE_REGEX = re.compile(
+        r"table (\d+)[^\n]*:\s*\n\s*active=(\d+), lookup=(\d+), matched=(\d+)"
+    )
+
+    def __init__(
+        self,
+        bridge: str = OVS_BRIDGE,
+        interval: int = SAMPLING_INTERVAL,
+        miss_ratio_threshold: float = MISS_RATIO_THRESHOLD,
+    ):
+        self.bridge = bridge
+        self.interval = interval
+        self.miss_ratio_threshold = miss_ratio_threshold
+
+    def collect(self) -> dict:
+        """Samples OVS datapath and OpenFlow table counters twice and computes rates.
+
+        :returns:
+            dict: datapath and per-table counters, rates, miss ratios and flagged items
+        """
+        logger.info(f"Sampling OVS counters over {self.interval} seconds...")
+        first_datapath_sample = self._get_datapath_counters()
+        first_tables_sample = self._get_openflow_table_counters()
+        time.sleep(self.interval)
+        second_datapath_sample = self._get_datapath_counters()
+        second_tables_sample = self._get_openflow_table_counters()
+        datapath = self._compute_datapath_rates(first_datapath_sample, second_datapath_sample)
+        tables = self._compute_table_rates(first_tables_sample, second_tables_sample)
+        return {
+            "interval": self.interval,
+            "datapath": datapath,
+            "tables": tables,
+            "flagged": self._flag_miss_ratios(datapath, tables),
+        }
+
+    def log_report(self, report: dict):
+        """Logs OVS performance report in a human readable form."""
+        datapath = report["datapath"]
+        logger.info(
+            f"OVS datapath: hit={datapath['hit']} missed={datapath['missed']} "
+            f"lost={datapath['lost']} flows={datapath['flows']} masks={datapath['masks']}"
+        )
+        logger.info(
+            f"OVS datapath rates: hit={datapath['hit_rate']:.1f}/s "
+            f"missed={datapath['missed_rate']:.1f}/s lost={datapath['lost_rate']:.1f}/s "
+            f"miss ratio={datapath['miss_ratio']:.3f}"
+        )
+        for table in sorted(report["tables"], key=lambda t: t["lookup_rate"], reverse=True):
+            logger.info(
+                f"{self.bridge} table {table['table']}: active={table['active']} "
+                f"lookups={table['lookup_rate']:.1f}/s matches={table['matched_rate']:.1f}/s "
+                f"miss ratio={table['miss_ratio']:.3f}"
+            )
+        for flagged_item in report["flagged"]:
+            logger.warning(
+                f"{flagged_item} miss ratio exceeds threshold of {self.miss_ratio_threshold}!"
+            )
+
+    def _get_datapath_counters(self) -> dict:
+        """Parses datapath hit/miss/lost, megaflow and mask counters from dpctl/show."""
+        dpctl_show = check_output(["sudo", "ovs-appctl", "dpctl/show"]).decode("utf-8")
+        hit, missed, lost = self._search_counters(self.DATAPATH_LOOKUPS_REGEX, dpctl_show, 3)
+        (flows,) = self._search_counters(self.DATAPATH_FLOWS_REGEX, dpctl_show, 1)
+        _, masks = self._search_counters(self.DATAPATH_MASKS_REGEX, dpctl_show, 2)
+        return {"hit": hit, "missed": missed, "lost": lost, "flows": flows, "masks": masks}
+
+    def _get_openflow_table_counters(self) -> dict:
+        """Parses per-table lookup and match counters of the OVS bridge from dump-tables."""
+        dump_tables = check_output(
+            ["sudo", "ovs-ofctl", "-O", self.OPENFLOW_VERSION, "dump-tables", self.bridge]
+        ).decode("utf-8")
+        return {
+            int(table): {"active": int(active), "lookup": int(lookup), "matched": int(matched)}
+            for table, active, lookup, matched in self.OPENFLOW_TABLE_REGEX.findall(dump_tables)
+        }
+
+    def _compute_datapath_rates(self, first_sample: dict, second_sample: dict) -> dict:
+        """Computes datapath counter rates and miss ratio between two samples."""
+        deltas = {
+            counter: max(second_sample[counter] - first_sample[counter], 0)
+            for counter in ("hit", "missed", "lost")
+        }
+        datapath = dict(second_sample)
+        for counter, delta in deltas.items():
+            datapath[f"{counter}_rate"] = delta / self.interval
+        datapath["miss_ratio"] = self._ratio(deltas["missed"], deltas["hit"] + deltas["missed"])
+        return datapath
+
+    def _compute_table_rates(self, first_sample: dict, second_sample: dict) -> list:
+        """Computes lookup and match rates and miss ratio for each OpenFlow table."""
+        tables = []
+        for table, counters in second_sample.items():
+            previous_counters = first_sample.get(table, {"lookup": 0, "matched": 0})
+            lookups = max(counters["lookup"] - previous_counters["lookup"], 0)
+            matches = max(counters["matched"] - previous_counters["matched"], 0)
+            tables.append(
+                {
+                    "table": table,
+                    "active": counters["active"],
+                    "lookup_rate": lookups / self.interval,
+                    "matched_rate": matches / self.interval,
+                    "miss_ratio": self._ratio(lookups - matches, lookups),
+                }
+            )
+        return tables
+
+    def _flag_miss_ratios(self, datapath: dict, tables: list) -> list:
+        """Returns names of datapath/tables whose miss ratio exceeds configured threshold."""
+        flagged = []
+        if datapath["miss_ratio"] > self.miss_ratio_threshold:
+            flagged.append("OVS datapath")
+        flagged.extend(
+            f"{self.bridge} table {table['table']}"
+            for table in tables
+            if table["miss_ratio"] > self.miss_ratio_threshold
+        )
+        return flagged
+
+    @staticmethod
+    def _search_counters(regex: re.Pattern, text: str, number_of_counters: int) -> tuple:
+        """Returns integer counters matched by given regex or zeros if nothing matched."""
+        if match := regex.search(text):
+            return tuple(int(counter) for counter in match.groups())
+        return (0,) * number_of_counters
+
+    @staticmethod
+    def _ratio(numerator: int, denominator: int) -> float:
+        """Returns numerator/denominator or 0 if denominator is 0."""
+        return numerator / denominator if denominator else 0.0
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+from subprocess import check_output
+
+import yaml
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWOVSTuningReport:
+    OVS_TUNING_FILE = "/var/opt/magma/ovs_tuning.yml"
+
+    def __init__(self, ovs_tuning_file: str = OVS_TUNING_FILE):
+        self.ovs_tuning_file = ovs_tuning_file
+
+    def collect(self) -> dict:
+        """Compares Open_vSwitch other_config in effect with values applied by the installer.
+
+        :returns:
+            dict: whether OVS was tuned, current and target value of each setting and flagged items
+        """
+        if not os.path.exists(self.ovs_tuning_file):
+            return {"tuned": False, "settings": [], "flagged": []}
+        with open(self.ovs_tuning_file, "r") as ovs_tuning_file:
+            targets = (yaml.safe_load(ovs_tuning_file) or {}).get("other_config", {})
+        settings = [
+            {"key": key, "current": self._get_current_value(key), "target": str(target)}
+            for key, target in targets.items()
+        ]
+        return {
+            "tuned": True,
+            "settings": settings,
+            "flagged": [
+                setting["key"] for setting in settings if setting["current"] != setting["target"]
+            ],
+        }
+
+    def log_report(self, report: dict):
+        """Logs OVS tuning report in a human readable form."""
+        if not report["tuned"]:
+            logger.info("Open vSwitch wasn't tuned during installation. Skipping.")
+            return
+        for setting in report["settings"]:
+            status = "OK" if setting["key"] not in report["flagged"] else "MISMATCH"
+            logger.info(
+                f"Open vSwitch {setting['key']}: current={setting['current']} "
+                f"target={setting['target']} {status}"
+            )
+        for flagged_item in report["flagged"]:
+            logger.warning(
+                f"Open vSwitch setting {flagged_item} doesn't match the value applied during "
+                "installation!"
+            )
+
+    @staticmethod
+    def _get_current_value(key: str) -> str:
+        """Returns current other_config value or an empty string if it's not set."""
+        return (
+            check_output(
+                [
+                    "sudo",
+                    "ovs-vsctl",
+                    "--if-exists",
+                    "get",
+                    "Open_vSwitch",
+                    ".",
+                    f"other_config:{key}",
+                ]
+            )
+            .decode("utf-8")
+            .strip()
+            .strip('"')
+        )
@@ -5,21 +5,33 @@
 import logging
 import os
 import time
-from subprocess import DEVNULL, call, check_output
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import DEVNULL, CalledProcessError, call, check_output
 
 import yaml
 from ping3 import ping  # type: ignore[import]
 from systemd import journal  # type: ignore[import]
 
+from .agw_cgroup_footprint import AGWCgroupFootprintReport
+from .agw_host_performance import AGWHostPerformanceReport
+from .agw_interface_statistics import AGWInterfaceStatisticsReport
+from .agw_orc8r_heartbeat import AGWOrc8rHeartbeatReport
+from .agw_orc8r_messages import GOT_HEARTBEAT_MSG, ORC8R_CHECKIN_SUCCESSFUL_MSG
+from .agw_ovs_performance import AGWOVSPerformanceReport
+from .agw_ovs_tuning import AGWOVSTuningReport
 from .agw_post_install_errors import (
     AGWConfigurationError,
     AGWControlProxyConfigFileMissingError,
     AGWControlProxyConfigurationError,
+    AGWInterfaceErrorRateError,
     AGWPackagesMissingError,
     AGWRootCertificateMissingError,
     AGWServicesNotRunningError,
     Orc8rConnectivityError,
 )
+from .agw_redis_performance import AGWRedisPerformanceReport, RedisReplyError
+from .agw_sctp_performance import AGWSCTPPerformanceReport
+from .agw_sysctl_tuning import AGWSysctlTuningReport
 
 logger = logging.getLogger("magma_access_gateway_post_install")
 
@@ -60,8 +72,6 @@ class AGWPostInstallChecks:
         "fluentd_address",
         "fluentd_port",
     ]
-    GOT_HEARTBEAT_MSG = "[SyncRPC] Got heartBeat from cloud"
-    ORC8R_CHECKIN_SUCCESSFUL_MSG = "Checkin Successful! Successfully sent states to the cloud!"
     TIMEOUT_WAITING_FOR_SERVICE = 60
     WAIT_FOR_SERVICE_INTERVAL = 10
 
@@ -86,6 +96,19 @@ class AGWPostInstallChecks:
                 "  - Problem with Open vSwitch installation."
             )
 
+    def check_interface_error_rates(self):
+        """Checks error, drop, FIFO overrun and carrier flap rates of Magma AGW interfaces.
+
+        :raises:
+            AGWInterfaceErrorRateError: if any rate exceeds its failure threshold
+        """
+        logger.info("Checking network interfaces error rates...")
+        interface_statistics_report = AGWInterfaceStatisticsReport(self.MAGMA_AGW_INTERFACES)
+        report = interface_statistics_report.collect()
+        interface_statistics_report.log_report(report)
+        if report["failed"]:
+            raise AGWInterfaceErrorRateError(report["failed"])
+
     @staticmethod
     def check_ovs_has_not_unsupported_gpt_error():
         """Checks whether ovs has unsupported gtp error.
@@ -175,16 +198,88 @@ class AGWPostInstallChecks:
             any(
                 entry["MESSAGE"]
                 for entry in journal_reader
-                if self.GOT_HEARTBEAT_MSG in entry["MESSAGE"]
+                if GOT_HEARTBEAT_MSG in entry["MESSAGE"]
             )
             or any(  # noqa: W503
                 entry["MESSAGE"]
                 for entry in journal_reader
-                if self.ORC8R_CHECKIN_SUCCESSFUL_MSG in entry["MESSAGE"]
+                if ORC8R_CHECKIN_SUCCESSFUL_MSG in entry["MESSAGE"]
             )
         ):
             raise Orc8rConnectivityError()
 
+    @staticmethod
+    def check_orc8r_heartbeat_regularity():
+        """Reports intervals between Orc8r heartbeats and checkins and flags long gaps."""
+        logger.info("Checking regularity of Orc8r heartbeats and checkins...")
+        orc8r_heartbeat_report = AGWOrc8rHeartbeatReport()
+        orc8r_heartbeat_report.log_report(orc8r_heartbeat_report.collect())
+
+    @staticmethod
+    def check_datapath_performance():
+        """Reports OVS datapath and OpenFlow table miss ratios and SCTP associations.
+
+        Both reports wait between two samples of their counters, so they're sampled concurrently.
+        """
+        logger.info("Checking OVS datapath performance and SCTP associations...")
+        ovs_performance_report = AGWOVSPerformanceReport()
+        sctp_performance_report = AGWSCTPPerformanceReport()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ovs_performance = executor.submit(ovs_performance_report.collect)
+            sctp_performance = executor.submit(sctp_performance_report.collect)
+        try:
+            ovs_performance_report.log_report(ovs_performance.result())
+        except (CalledProcessError, OSError) as e:
+            logger.warning(f"OVS datapath performance couldn't be measured: {e}")
+        sctp_performance_report.log_report(sctp_performance.result())
+
+    @staticmethod
+    def check_ovs_tuning():
+        """Verifies Open vSwitch other_config still matches values applied during installation."""
+        logger.info("Checking Open vSwitch tuning...")
+        ovs_tuning_report = AGWOVSTuningReport()
+        ovs_tuning_report.log_report(ovs_tuning_report.collect())
+
+    @staticmethod
+    def check_sysctl_tuning():
+        """Verifies kernel settings persisted during installation survived the reboot."""
+        logger.info("Checking kernel networking stack tuning...")
+        sysctl_tuning_report = AGWSysctlTuningReport()
+        sysctl_tuning_report.log_report(sysctl_tuning_report.collect())
+
+    @staticmethod
+    def check_host_performance():
+        """Verifies CPU governor and hugepages and warns when CPU is throttled during the check."""
+        logger.info("Checking host performance settings...")
+        host_performance_report = AGWHostPerformanceReport()
+        host_performance_report.log_report(host_performance_report.collect())
+
+    @staticmethod
+    def check_redis_performance():
+        """Reports Redis latency percentiles, memory usage and slow log entries."""
+        logger.info("Checking Redis performance...")
+        redis_performance_report = AGWRedisPerformanceReport()
+        try:
+            redis_performance_report.log_report(redis_performance_report.collect())
+        except (OSError, RedisReplyError) as e:
+            logger.warning(f"Redis performance couldn't be measured: {e}")
+
+    @staticmethod
+    def check_cgroup_footprint():
+        """Reports CPU and memory footprint of Magma services and flags growth since install.
+
+        First run after installation stores the footprint as a baseline.
+        """
+        logger.info("Checking Magma services footprint...")
+        cgroup_footprint_report = AGWCgroupFootprintReport()
+        report = cgroup_footprint_report.collect()
+        cgroup_footprint_report.log_report(report)
+        if report["baseline"] is None:
+            try:
+                cgroup_footprint_report.save_baseline(report)
+            except OSError as e:
+                logger.warning(f"Magma services footprint baseline couldn't be saved: {e}")
+
     @staticmethod
     def _get_interface_state(interface_name):
         """Gets interface state from operstate file."""
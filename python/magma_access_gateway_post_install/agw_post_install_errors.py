@@ -72,3 +72,15 @@ class Orc8rConnectivityError(PostInstallError):
             "Please follow Access Gateway Configuration section of Magma AGW documentation "
             "(https://docs.magmacore.org/docs/next/lte/deploy_config_agw) and retry."
         )
+
+
+class AGWInterfaceErrorRateError(PostInstallError):
+    def __init__(self, failed_items: list):
+        failed = "\n".join(f"  - {failed_item}" for failed_item in failed_items)
+        super().__init__(
+            f"Following interfaces are losing packets or flapping:\n{failed}\n"
+            "Most common reasons for this error include:\n"
+            "  - Faulty cable, transceiver or switch port.\n"
+            "  - Duplex or MTU mismatch with the peer.\n"
+            "  - NIC ring buffers too small for the traffic."
+        )
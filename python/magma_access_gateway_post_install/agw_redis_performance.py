@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import socket
+import time
+
+import yaml
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class RedisReplyError(Exception):
+    pass
+
+
+class AGWRedisPerformanceReport:
+    REDIS_CONFIG_FILE = "/etc/magma/redis.yml"
+    REDIS_HOST = "127.0.0.1"
+    DEFAULT_REDIS_PORT = 6380
+    SAMPLES = 1000
+    LATENCY_THRESHOLD_MS = 2.0
+    MEMORY_USAGE_THRESHOLD = 0.8
+    FRAGMENTATION_RATIO_THRESHOLD = 1.5
+    # Below this, fragmentation ratio is dominated by allocator overhead and means nothing.
+    # Same as the default of Redis' active-defrag-ignore-bytes.
+    FRAGMENTATION_MIN_USED_MEMORY = 100 * 1024 * 1024
+    SLOWLOG_ENTRIES = 10
+    PROBE_KEY = "magma_agw_post_install_latency_probe"
+    PERCENTILES = [50, 95, 99]
+    CONNECTION_TIMEOUT = 5
+
+    def __init__(
+        self,
+        port: int = None,  # type: ignore[assignment]
+        samples: int = SAMPLES,
+        latency_threshold_ms: float = LATENCY_THRESHOLD_MS,
+    ):
+        redis_config = self._load_redis_config()
+        # Explicitly given port takes precedence over the socket Magma services use
+        self.unix_socket = None if port else redis_config.get("unixsocket")
+        self.host = str(redis_config.get("bind", self.REDIS_HOST)).split()[0]
+        self.port = port or int(redis_config.get("port", self.DEFAULT_REDIS_PORT))
+        self.samples = samples
+        self.latency_threshold_ms = latency_threshold_ms
+
+    def collect(self) -> dict:
+        """Measures PING, GET and SET latency and reads memory usage and slow log of Redis.
+
+        :returns:
+            dict: latency percentiles, memory usage, slow log entries and flagged items
+        """
+        logger.info(f"Measuring Redis latency over {self.samples} samples...")
+        with self._connect() as connection:
+            redis_file = connection.makefile("rwb")
+            latency = {
+                "PING": self._measure_latency(redis_file, ["PING"]),
+                "SET": self._measure_latency(
+                    redis_file, ["SET", self.PROBE_KEY, "probe", "PX", "60000"]
+                ),
+                "GET": self._measure_latency(redis_file, ["GET", self.PROBE_KEY]),
+            }
+            self._execute(redis_file, ["DEL", self.PROBE_KEY])
+            memory = self._get_memory_usage(redis_file)
+            slowlog = self._get_slowlog(redis_file)
+        flagged = self._flag_latency(latency) + self._flag_memory(memory)
+        return {
+            "latency": latency,
+            "memory": memory,
+            "slowlog": slowlog,
+            "flagged": flagged + self._flag_slowlog(slowlog),
+        }
+
+    def log_report(self, report: dict):
+        """Logs Redis performance report in a human readable form."""
+        for command, percentiles in report["latency"].items():
+            latencies = " ".join(f"{key}={value:.3f}ms" for key, value in percentiles.items())
+            logger.info(f"Redis {command} latency: {latencies}")
+        memory = report["memory"]
+        logger.info(
+            f"Redis memory: used={memory['used_memory']} maxmemory={memory['maxmemory']} "
+            f"policy={memory['maxmemory_policy']} "
+            f"fragmentation ratio={memory['mem_fragmentation_ratio']}"
+        )
+        logger.info(f"Redis slow log entries: {len(report['slowlog'])}")
+        for flagged_item in report["flagged"]:
+            logger.warning(flagged_item)
+
+    def _measure_latency(self, redis_file, command: list) -> dict:
+        """Executes command repeatedly and returns latency percentiles in milliseconds."""
+        latencies = []
+        for _ in range(self.samples):
+            start = time.perf_counter()
+            self._execute(redis_file, command)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        percentiles = {
+            f"p{percentile}": latencies[round(percentile / 100 * (len(latencies) - 1))]
+            for percentile in self.PERCENTILES
+        }
+        percentiles["max"] = latencies[-1]
+        return percentiles
+
+    def _get_memory_usage(self, redis_file) -> dict:
+        """Parses memory usage, memory limit and fragmentation from INFO memory."""
+        info = self._parse_info(self._execute(redis_file, ["INFO", "memory"]))
+        return {
+            "used_memory": int(info.get("used_memory", 0)),
+            "maxmemory": int(info.get("maxmemory", 0)),
+            "maxmemory_policy": info.get("maxmemory_policy", ""),
+            "mem_fragmentation_ratio": float(info.get("mem_fragmentation_ratio", 0)),
+        }
+
+    def _get_slowlog(self, redis_file) -> list:
+        """Returns most recent slow log entries as dicts."""
+        return [
+            {"id": entry[0], "duration_us": entry[2], "command": " ".join(entry[3])}
+            for entry in self._execute(redis_file, ["SLOWLOG", "GET", str(self.SLOWLOG_ENTRIES)])
+        ]
+
+    def _flag_latency(self, latency: dict) -> list:
+        """Flags commands which 99th latency percentile exceeds the threshold."""
+        return [
+            f"Redis {command} p99 latency of {percentiles['p99']:.3f}ms "
+            f"exceeds threshold of {self.latency_threshold_ms}ms!"
+            for command, percentiles in latency.items()
+            if percentiles["p99"] > self.latency_threshold_ms
+        ]
+
+    def _flag_memory(self, memory: dict) -> list:
+        """Flags missing memory limit, high memory usage and high fragmentation of used memory."""
+        flagged = []
+        if not memory["maxmemory"]:
+            flagged.append("Redis has no memory limit set!")
+        elif memory["used_memory"] > self.MEMORY_USAGE_THRESHOLD * memory["maxmemory"]:
+            flagged.append(
+                f"Redis uses {memory['used_memory']} out of {memory['maxmemory']} bytes "
+                "of its memory limit!"
+            )
+        fragmentation_ratio = memory["mem_fragmentation_ratio"]
+        if (
+            memory["used_memory"] >= self.FRAGMENTATION_MIN_USED_MEMORY
+            and fragmentation_ratio > self.FRAGMENTATION_RATIO_THRESHOLD  # noqa: W503
+        ):
+            flagged.append(
+                f"Redis memory fragmentation ratio of {fragmentation_ratio} "
+                f"exceeds {self.FRAGMENTATION_RATIO_THRESHOLD}!"
+            )
+        return flagged
+
+    @staticmethod
+    def _flag_slowlog(slowlog: list) -> list:
+        """Flags every slow log entry."""
+        return [
+            f"Slow Redis command: {entry['command']} took {entry['duration_us']}us!"
+            for entry in slowlog
+        ]
+
+    def _execute(self, redis_file, command: list):
+        """Sends a command using Redis serialization protocol and returns parsed reply."""
+        request = f"*{len(command)}\r\n".encode()
+        for argument in command:
+            encoded_argument = str(argument).encode()
+            request += f"${len(encoded_argument)}\r\n".encode() + encoded_argument + b"\r\n"
+        redis_file.write(request)
+        redis_file.flush()
+        return self._read_reply(redis_file)
+
+    def _read_reply(self, redis_file):
+        """Reads a single reply of Redis serialization protocol.
+
+        :raises:
+            RedisReplyError: if Redis replies with an error or connection gets closed
+        """
+        line = redis_file.readline()
+        if not line:
+            raise RedisReplyError("Connection closed by Redis")
+        reply_type, payload = line[:1], line[1:].rstrip(b"\r\n").decode()
+        if reply_type == b"+":
+            return payload
+        if reply_type == b"-":
+            raise RedisReplyError(payload)
+        if reply_type == b":":
+            return int(payload)
+        if reply_type == b"$":
+            if int(payload) < 0:
+                return None
+            return redis_file.read(int(payload) + 2)[:-2].decode()
+        if reply_type == b"*":
+            return [self._read_reply(redis_file) for _ in range(max(int(payload), 0))]
+        raise RedisReplyError(f"Unexpected Redis reply: {line!r}")
+
+    @staticmethod
+    def _parse_info(info: str) -> dict:
+        """Parses key:value lines of INFO command's reply."""
+        return dict(
+            line.split(":", 1)
+            for line in info.splitlines()
+            if ":" in line and not line.startswith("#")
+        )
+
+    def _connect(self) -> socket.socket:
+        """Connects to Redis the same way Magma services do, as configured in redis.yml."""
+        if not self.unix_socket:
+            return socket.create_connection(
+                (self.host, self.port), timeout=self.CONNECTION_TIMEOUT
+            )
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(self.CONNECTION_TIMEOUT)
+        try:
+            connection.connect(self.unix_socket)
+        except OSError:
+            connection.close()
+            raise
+        return connection
+
+    def _load_redis_config(self) -> dict:
+        """Returns configuration of Magma's Redis from /etc/magma/redis.yml."""
+        try:
+            with open(self.REDIS_CONFIG_FILE, "r") as redis_config_file:
+                return yaml.safe_load(redis_config_file) or {}
+        except OSError:
+            return {}
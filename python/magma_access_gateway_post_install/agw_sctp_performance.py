@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+import time
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWSCTPPerformanceReport:
+    """Reports state of SCTP associations with eNodeBs and SCTP retransmissions and timeouts.
+
+    Per-association state and retransmitted data chunks come from /proc/net/sctp/assocs, RTO
+    of each association's primary path from /proc/net/sctp/remaddr and stack-wide counters
+    from /proc/net/sctp/snmp. Counters are sampled twice to compute rates.
+    """
+
+    PROC_NET_SCTP = "/proc/net/sctp"
+    SAMPLING_INTERVAL = 10
+    RETRANSMISSION_RATIO_THRESHOLD = 0.01
+    ESTABLISHED = "ESTABLISHED"
+    ASSOCIATION_STATES = [
+        "CLOSED",
+        "COOKIE_WAIT",
+        "COOKIE_ECHOED",
+        ESTABLISHED,
+        "SHUTDOWN_PENDING",
+        "SHUTDOWN_SENT",
+        "SHUTDOWN_RECEIVED",
+        "SHUTDOWN_ACK_SENT",
+    ]
+    ASSOCS_LEADING_FIELDS = 13
+    ASSOCS_TRAILING_FIELDS = 11
+    RETRANSMISSION_COUNTERS = ["SctpT3Retransmits", "SctpFastRetransmits", "SctpPmtudRetransmits"]
+    TIMEOUT_COUNTERS = [
+        "SctpT1InitExpireds",
+        "SctpT1CookieExpireds",
+        "SctpT3RtxExpireds",
+        "SctpT4RtoExpireds",
+    ]
+    SENT_CHUNKS_COUNTERS = ["SctpOutOrderChunks", "SctpOutUnorderChunks"]
+    CHURN_COUNTERS = ["SctpActiveEstabs", "SctpPassiveEstabs", "SctpAborteds", "SctpShutdowns"]
+
+    def __init__(
+        self,
+        interval: int = SAMPLING_INTERVAL,
+        retransmission_ratio_threshold: float = RETRANSMISSION_RATIO_THRESHOLD,
+    ):
+        self.interval = interval
+        self.retransmission_ratio_threshold = retransmission_ratio_threshold
+
+    def collect(self) -> dict:
+        """Samples SCTP associations and counters twice and computes rates.
+
+        :returns:
+            dict: per-association state, RTO and retransmission rate, stack-wide rates
+                and flagged items
+        """
+        if not os.path.exists(os.path.join(self.PROC_NET_SCTP, "snmp")):
+            return {
+                "interval": self.interval,
+                "associations": [],
+                "stack": {},
+                "flagged": ["SCTP kernel module isn't loaded!"],
+            }
+        logger.info(f"Sampling SCTP counters over {self.interval} seconds...")
+        first_associations = self._get_associations()
+        first_counters = self._get_snmp_counters()
+        time.sleep(self.interval)
+        associations = self._get_associations()
+        counters = self._get_snmp_counters()
+        for key, association in associations.items():
+            previous = first_associations.get(key, {"retransmitted_chunks": 0})
+            association["retransmission_rate"] = (
+                max(association["retransmitted_chunks"] - previous["retransmitted_chunks"], 0)
+                / self.interval  # noqa: W503
+            )
+        stack = self._compute_stack_rates(first_counters, counters)
+        return {
+            "interval": self.interval,
+            "associations": list(associations.values()),
+            "stack": stack,
+            "flagged": self._flag(list(associations.values()), stack),
+        }
+
+    def log_report(self, report: dict):
+        """Logs SCTP report in a human readable form."""
+        for association in report["associations"]:
+            logger.info(
+                f"SCTP association {association['assoc_id']} with {association['peer']}: "
+                f"state={association['state']} rto={association['rto_ms']} ms "
+                f"heartbeat interval={association['heartbeat_interval_ms']} ms "
+                f"retransmissions={association['retransmission_rate']:.1f}/s"
+            )
+        if stack := report["stack"]:
+            logger.info(
+                f"SCTP: established={stack['established']} "
+                f"retransmissions={stack['retransmission_rate']:.1f}/s "
+                f"retransmission ratio={stack['retransmission_ratio']:.3f} "
+                f"timeouts={stack['timeout_rate']:.1f}/s "
+                f"association churn={stack['churn']} in {report['interval']}s"
+            )
+        for flagged_item in report["flagged"]:
+            logger.warning(flagged_item)
+
+    def _get_associations(self) -> dict:
+        """Parses associations from /proc/net/sctp/assocs, keyed by association ID and peer."""
+        rtos = self._get_remote_address_rtos()
+        associations = {}
+        for line in self._read_file(os.path.join(self.PROC_NET_SCTP, "assocs")).splitlines()[1:]:
+            local_part, separator, remote_part = line.partition("<->")
+            local_fields = local_part.split()
+            remote_fields = remote_part.split()
+            if not separator or len(local_fields) < self.ASSOCS_LEADING_FIELDS:
+                continue
+            remote_addresses = remote_fields[: -self.ASSOCS_TRAILING_FIELDS]
+            trailing_fields = remote_fields[-self.ASSOCS_TRAILING_FIELDS :]  # noqa: E203
+            primary_address = next(
+                (address for address in remote_addresses if address.startswith("*")),
+                remote_addresses[0] if remote_addresses else "",
+            ).lstrip("*")
+            assoc_id = int(local_fields[6])
+            state = int(local_fields[4])
+            peer = f"{primary_address}:{local_fields[12]}"
+            associations[(assoc_id, peer)] = {
+                "assoc_id": assoc_id,
+                "peer": peer,
+                "state": (
+                    self.ASSOCIATION_STATES[state]
+                    if state < len(self.ASSOCIATION_STATES)
+                    else str(state)
+                ),
+                "rto_ms": rtos.get((assoc_id, primary_address)),
+                "heartbeat_interval_ms": int(trailing_fields[0]),
+                "retransmitted_chunks": int(trailing_fields[6]),
+            }
+        return associations
+
+    def _get_remote_address_rtos(self) -> dict:
+        """Parses RTO of each remote address from /proc/net/sctp/remaddr."""
+        rtos = {}
+        for line in self._read_file(os.path.join(self.PROC_NET_SCTP, "remaddr")).splitlines()[1:]:
+            fields = line.split()
+            if len(fields) >= 4 and fields[1].isdigit() and fields[3].isdigit():
+                rtos[(int(fields[1]), fields[0])] = int(fields[3])
+        return rtos
+
+    def _get_snmp_counters(self) -> dict:
+        """Parses stack-wide counters from /proc/net/sctp/snmp."""
+        counters = {}
+        for line in self._read_file(os.path.join(self.PROC_NET_SCTP, "snmp")).splitlines():
+            fields = line.split()
+            if len(fields) == 2 and fields[1].isdigit():
+                counters[fields[0]] = int(fields[1])
+        return counters
+
+    def _compute_stack_rates(self, first_counters: dict, second_counters: dict) -> dict:
+        """Computes retransmission and timeout rates and association churn between samples."""
+
+        def delta(counter_names: list) -> int:
+            return sum(
+                max(second_counters.get(name, 0) - first_counters.get(name, 0), 0)
+                for name in counter_names
+            )
+
+        retransmissions = delta(self.RETRANSMISSION_COUNTERS)
+        sent_chunks = delta(self.SENT_CHUNKS_COUNTERS)
+        return {
+            "established": second_counters.get("SctpCurrEstab", 0),
+            "retransmission_rate": retransmissions / self.interval,
+            "retransmission_ratio": retransmissions / sent_chunks if sent_chunks else 0.0,
+            "timeout_rate": delta(self.TIMEOUT_COUNTERS) / self.interval,
+            "churn": delta(self.CHURN_COUNTERS),
+        }
+
+    def _flag(self, associations: list, stack: dict) -> list:
+        """Flags associations which aren't established, retransmissions, timeouts and churn."""
+        flagged = [
+            f"SCTP association with {association['peer']} is {association['state']}!"
+            for association in associations
+            if association["state"] != self.ESTABLISHED
+        ]
+        if stack["retransmission_ratio"] > self.retransmission_ratio_threshold:
+            flagged.append(
+                f"SCTP retransmission ratio {stack['retransmission_ratio']:.3f} exceeds "
+                f"threshold of {self.retransmission_ratio_threshold}!"
+            )
+        if stack["timeout_rate"]:
+            flagged.append(f"SCTP timers expired {stack['timeout_rate']:.1f} times per second!")
+        if stack["churn"]:
+            flagged.append(
+                f"{stack['churn']} SCTP associations were set up or torn down "
+                f"in {self.interval} seconds!"
+            )
+        return flagged
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        """Returns content of a file or an empty string if it can't be read."""
+        try:
+            with open(path, "r") as file:
+                return file.read()
+        except OSError:
+            return ""
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+from subprocess import check_output
+
+from systemd import journal  # type: ignore[import]
+
+from .agw_orc8r_messages import GOT_HEARTBEAT_MSG, ORC8R_CHECKIN_SUCCESSFUL_MSG
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWStartupCriticalPathReport:
+    """Reports startup timeline and critical path of Magma services in the current boot.
+
+    Timestamps are monotonic, i.e. seconds since boot. Each unit's predecessor on the critical
+    path is the Magma unit it is ordered after (After=) which became active last before the unit
+    started. The path ends with magmad's first Orc8r heartbeat, if there was one.
+    """
+
+    MAGMA_UNITS = "magma@*"
+    MAGMAD_UNIT = "magma@magmad"
+    MAGMAD_SYSLOG_IDENTIFIER = "magmad"
+    FIRST_HEARTBEAT = "first Orc8r heartbeat"
+    HEARTBEAT_MESSAGES = [GOT_HEARTBEAT_MSG, ORC8R_CHECKIN_SUCCESSFUL_MSG]
+    UNIT_PROPERTIES = [
+        "Id",
+        "After",
+        "ActiveState",
+        "InactiveExitTimestampMonotonic",
+        "ExecMainStartTimestampMonotonic",
+        "ActiveEnterTimestampMonotonic",
+    ]
+    GRAPHVIZ_SOURCE_EXTENSION = ".dot"
+
+    def collect(self) -> dict:
+        """Reads systemd timestamps of Magma units and first magmad heartbeat of current boot.
+
+        :returns:
+            dict: timeline of units, first heartbeat, critical path and flagged items
+        """
+        units = self._get_units()
+        magmad_start_s = units.get(self.MAGMAD_UNIT, {}).get("activating_s") or 0.0
+        first_heartbeat_s = self._get_first_heartbeat(magmad_start_s)
+        started_units = [unit for unit in units.values() if unit["activating_s"] is not None]
+        return {
+            "units": sorted(started_units, key=lambda unit: unit["activating_s"]),
+            "first_heartbeat_s": first_heartbeat_s,
+            "critical_path": self._get_critical_path(units, first_heartbeat_s),
+            "flagged": self._flag(units, first_heartbeat_s),
+        }
+
+    def log_report(self, report: dict):
+        """Logs startup timeline and critical path in a human readable form."""
+        start = self._get_start(report)
+        logger.info("Magma services startup timeline (seconds since first unit started):")
+        for unit in report["units"]:
+            exec_start = self._format_time(unit["exec_start_s"], start)
+            active = self._format_time(unit["active_s"], start)
+            logger.info(
+                f"  {unit['name']}: activating={self._format_time(unit['activating_s'], start)} "
+                f"exec_start={exec_start} active={active}"
+            )
+        if report["first_heartbeat_s"] is not None:
+            logger.info(
+                f"  {self.FIRST_HEARTBEAT}: "
+                f"{self._format_time(report['first_heartbeat_s'], start)}"
+            )
+        logger.info("Critical path:")
+        for step in report["critical_path"]:
+            logger.info(
+                f"  {step['name']}: +{step['ready_s'] - step['start_s']:.3f}s "
+                f"(ready at {self._format_time(step['ready_s'], start)})"
+            )
+        for flagged_item in report["flagged"]:
+            logger.warning(flagged_item)
+
+    def write_graphviz(self, report: dict, output: str):
+        """Writes startup graph as Graphviz source or renders it with dot.
+
+        Format of the rendering is taken from output's extension, e.g. svg or png. Output
+        with .dot extension gets the Graphviz source.
+
+        :raises:
+            OSError: if output can't be written or dot isn't available
+            CalledProcessError: if dot fails to render the graph
+        """
+        source = self.to_graphviz(report)
+        if output.endswith(self.GRAPHVIZ_SOURCE_EXTENSION):
+            with open(output, "w") as graphviz_source:
+                graphviz_source.write(source)
+        else:
+            output_format = output.rsplit(".", 1)[-1] if "." in output else "svg"
+            check_output(["dot", f"-T{output_format}", "-o", output], input=source.encode())
+        logger.info(f"Startup graph written to {output}.")
+
+    def to_graphviz(self, report: dict) -> str:
+        """Returns Graphviz source of the startup graph with critical path in red."""
+        start = self._get_start(report)
+        critical_path = [step["name"] for step in report["critical_path"]]
+        names = {unit["name"] for unit in report["units"]}
+        lines = ["digraph magma_startup {", "  rankdir=LR;", "  node [shape=box];"]
+        for unit in report["units"]:
+            color = ", color=red" if unit["name"] in critical_path else ""
+            label = f"{unit['name']}\\nactive at {self._format_time(unit['active_s'], start)}"
+            lines.append(f'  "{unit["name"]}" [label="{label}"{color}];')
+            for dependency in unit["after"]:
+                if dependency in names:
+                    on_path = self._is_critical_edge(critical_path, dependency, unit["name"])
+                    style = " [color=red, penwidth=2]" if on_path else ""
+                    lines.append(f'  "{dependency}" -> "{unit["name"]}"{style};')
+        if report["first_heartbeat_s"] is not None:
+            label = (
+                f"{self.FIRST_HEARTBEAT}\\nat "
+                f"{self._format_time(report['first_heartbeat_s'], start)}"
+            )
+            lines.append(f'  "{self.FIRST_HEARTBEAT}" [label="{label}", color=red];')
+            lines.append(
+                f'  "{self.MAGMAD_UNIT}" -> "{self.FIRST_HEARTBEAT}" [color=red, penwidth=2];'
+            )
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def _get_units(self) -> dict:
+        """Returns timestamps and ordering dependencies of Magma units."""
+        show_output = check_output(
+            [
+                "systemctl",
+                "show",
+                self.MAGMA_UNITS,
+                f"--property={','.join(self.UNIT_PROPERTIES)}",
+            ]
+        ).decode("utf-8")
+        units = {}
+        for block in show_output.strip().split("\n\n"):
+            properties = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+            if not properties.get("Id"):
+                continue
+            name = self._unit_name(properties["Id"])
+            units[name] = {
+                "name": name,
+                "state": properties.get("ActiveState", ""),
+                "after": [self._unit_name(unit) for unit in properties.get("After", "").split()],
+                "activating_s": self._to_seconds(properties.get("InactiveExitTimestampMonotonic")),
+                "exec_start_s": self._to_seconds(
+                    properties.get("ExecMainStartTimestampMonotonic")
+                ),
+                "active_s": self._to_seconds(properties.get("ActiveEnterTimestampMonotonic")),
+            }
+        return units
+
+    def _get_first_heartbeat(self, since_s: float):
+        """Returns seconds since boot of magmad's first Orc8r heartbeat after given time or None.
+
+        Heartbeats of magmad instances started before the current one are ignored.
+        """
+        journal_reader = journal.Reader()
+        journal_reader.log_level(journal.LOG_INFO)
+        journal_reader.this_boot()
+        journal_reader.add_match(SYSLOG_IDENTIFIER=self.MAGMAD_SYSLOG_IDENTIFIER)
+        for entry in journal_reader:
+            timestamp_s = entry["__MONOTONIC_TIMESTAMP"][0].total_seconds()
+            if timestamp_s >= since_s and any(
+                message in entry["MESSAGE"] for message in self.HEARTBEAT_MESSAGES
+            ):
+                return timestamp_s
+        return None
+
+    def _get_critical_path(self, units: dict, first_heartbeat_s) -> list:
+        """Walks back from the last milestone through units each unit waited for."""
+        active_units = {name: unit for name, unit in units.items() if unit["active_s"]}
+        critical_path = []
+        if first_heartbeat_s is not None and self.MAGMAD_UNIT in active_units:
+            critical_path.append(
+                {
+                    "name": self.FIRST_HEARTBEAT,
+                    "start_s": active_units[self.MAGMAD_UNIT]["active_s"],
+                    "ready_s": first_heartbeat_s,
+                }
+            )
+            unit = active_units[self.MAGMAD_UNIT]
+        elif active_units:
+            unit = max(active_units.values(), key=lambda active_unit: active_unit["active_s"])
+        else:
+            return []
+        while unit:
+            critical_path.insert(
+                0,
+                {
+                    "name": unit["name"],
+                    "start_s": unit["activating_s"],
+                    "ready_s": unit["active_s"],
+                },
+            )
+            unit = self._get_blocking_unit(unit, active_units, critical_path)
+        return critical_path
+
+    @staticmethod
+    def _get_blocking_unit(unit: dict, active_units: dict, critical_path: list):
+        """Returns unit ordered before given one which became active last before it started."""
+        on_path = [step["name"] for step in critical_path]
+        candidates = [
+            active_units[name]
+            for name in unit["after"]
+            if name in active_units
+            and name not in on_path  # noqa: W503
+            and active_units[name]["active_s"] <= unit["activating_s"]  # noqa: W503
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda candidate: candidate["active_s"])
+
+    def _flag(self, units: dict, first_heartbeat_s) -> list:
+        """Flags Magma units which aren't active and missing Orc8r heartbeat."""
+        flagged = [
+            f"{name} is {unit['state'] or 'unknown'}!"
+            for name, unit in sorted(units.items())
+            if unit["state"] != "active"
+        ]
+        if first_heartbeat_s is None:
+            flagged.append(f"{self.MAGMAD_UNIT} hasn't reached Orc8r in the current boot!")
+        return flagged
+
+    @staticmethod
+    def _get_start(report: dict) -> float:
+        """Returns seconds since boot at which the first Magma unit started."""
+        return min((unit["activating_s"] for unit in report["units"]), default=0.0)
+
+    @staticmethod
+    def _format_time(seconds, start: float) -> str:
+        return "-" if seconds is None else f"{seconds - start:.3f}s"
+
+    @staticmethod
+    def _is_critical_edge(critical_path: list, source: str, target: str) -> bool:
+        return any(
+            critical_path[index : index + 2] == [source, target]  # noqa: E203
+            for index in range(len(critical_path) - 1)
+        )
+
+    @staticmethod
+    def _unit_name(unit: str) -> str:
+        return unit[: -len(".service")] if unit.endswith(".service") else unit
+
+    @staticmethod
+    def _to_seconds(microseconds):
+        """Converts systemd monotonic timestamp to seconds, None if the event didn't happen."""
+        if not (microseconds or "").isdigit() or not int(microseconds):
+            return None
+        return int(microseconds) / 1000000
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+import os
+
+logger = logging.getLogger("magma_access_gateway_post_install")
+
+
+class AGWSysctlTuningReport:
+    SYSCTL_CONFIG_FILE = "/etc/sysctl.d/99-magma-agw.conf"
+    PROC_SYS = "/proc/sys"
+
+    def __init__(self, sysctl_config_file: str = SYSCTL_CONFIG_FILE):
+        self.sysctl_config_file = sysctl_config_file
+
+    def collect(self) -> dict:
+        """Compares kernel settings in effect with the ones persisted by the installer.
+
+        :returns:
+            dict: whether kernel was tuned, current and target value of each setting
+                and flagged items
+        """
+        if not os.path.exists(self.sysctl_config_file):
+            return {"tuned": False, "settings": [], "flagged": []}
+        settings = [
+            {"key": key, "current": self._get_current_value(key), "target": target}
+            for key, target in self._load_targets().items()
+        ]
+        return {
+            "tuned": True,
+            "settings": settings,
+            "flagged": [
+                setting["key"] for setting in settings if setting["current"] != setting["target"]
+            ],
+        }
+
+    def log_report(self, report: dict):
+        """Logs kernel tuning report in a human readable form."""
+        if not report["tuned"]:
+            logger.info("Kernel networking stack wasn't tuned during installation. Skipping.")
+            return
+        for setting in report["settings"]:
+            status = "OK" if setting["key"] not in report["flagged"] else "MISMATCH"
+            logger.info(
+                f"{setting['key']}: current={setting['current'] or '<missing>'} "
+                f"target={setting['target']} {status}"
+            )
+        for flagged_item in report["flagged"]:
+            logger.warning(
+                f"Kernel setting {flagged_item} doesn't match {self.sysctl_config_file}!"
+            )
+        if any(not setting["current"] for setting in report["settings"]):
+            logger.warning(
+                "Some kernel settings are missing. Make sure kernel modules owning them are "
+                "loaded at boot, e.g. listed in /etc/modules-load.d/."
+            )
+
+    def _load_targets(self) -> dict:
+        """Parses `key = value` lines of the sysctl config with whitespace normalized."""
+        targets = {}
+        with open(self.sysctl_config_file, "r") as sysctl_config:
+            for line in sysctl_config:
+                key, separator, value = line.partition("=")
+                if separator and not line.lstrip().startswith(("#", ";")):
+                    targets[key.strip()] = " ".join(value.split())
+        return targets
+
+    def _get_current_value(self, key: str) -> str:
+        """Returns current value of a sysctl or an empty string if it doesn't exist."""
+        try:
+            with open(os.path.join(self.PROC_SYS, *key.split(".")), "r") as current_value:
+                return " ".join(current_value.read().split())
+        except OSError:
+            return ""
@@ -30,6 +30,17 @@ setup(
         ],
         "magma_access_gateway_installer": [
             "resources/netplan_config.yaml.j2",
+            "resources/pipelined_performance_profiles.yaml",
+            "resources/hardware_requirements.yaml",
+            "resources/nic_tuning.sh.j2",
+            "resources/magma-nic-tuning.service.j2",
+            "resources/redis_tuning.sh.j2",
+            "resources/magma-redis-tuning.conf.j2",
+            "resources/resource_control_profiles.yaml",
+            "resources/magma-resource-control.conf.j2",
+            # Fetched and verified against the pinned fingerprint by the snap build
+            "resources/magma-archive-keyring.gpg",
+            "resources/magma-archive-keyring.fingerprint",
         ],
     },
     packages=[
@@ -40,8 +51,13 @@ setup(
     entry_points={
         "console_scripts": [
             "install-agw=magma_access_gateway_installer:main",
+            "bundle-agw=magma_access_gateway_installer:bundle",
+            "build-agw-dkms-module-cache=magma_access_gateway_installer:build_dkms_module_cache",
+            "activate-agw-interfaces=magma_access_gateway_installer:activate_interfaces",
+            "verify-agw-resource-control=magma_access_gateway_installer:verify_resource_control",
             "configure-agw=magma_access_gateway_configurator:main",
             "agw-postinstall=magma_access_gateway_post_install:main",
+            "agw-diagnostics=magma_access_gateway_post_install:diagnostics",
         ],
     },
 )
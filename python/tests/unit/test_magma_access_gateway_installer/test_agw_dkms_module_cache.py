@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, call, patch
+
+from magma_access_gateway_installer.agw_dkms_module_cache import (
+    AGWInstallerDKMSModuleCache,
+)
+from magma_access_gateway_installer.agw_installation_errors import (
+    DKMSModuleCacheError,
+)
+
+
+@patch(
+    "magma_access_gateway_installer.agw_dkms_module_cache.os.uname",
+    Mock(return_value=Mock(release="5.4.0-131-generic", machine="x86_64")),
+)
+class TestAGWInstallerDKMSModuleCache(unittest.TestCase):
+    TEST_PACKAGE_VERSION = "2.15.4-10"
+    APT_CACHE_POLICY = b"""openvswitch-datapath-dkms:
+  Installed: (none)
+  Candidate: 2.15.4-10
+  Version table:
+     2.15.4-10 500
+        500 https://linuxfoundation.jfrog.io/artifactory/magma-packages focal-1.8.0/main amd64 Packages
+"""  # noqa: E501
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tempdir.name, "cache")
+        self.lib_modules_dir = os.path.join(self.tempdir.name, "modules")
+        self.dkms_conf = os.path.join(self.tempdir.name, "dkms.conf")
+        with open(self.dkms_conf, "w") as dkms_conf:
+            dkms_conf.write('PACKAGE_NAME="openvswitch"\nPACKAGE_VERSION="2.15.4"\n')
+        self.patcher = patch.object(
+            AGWInstallerDKMSModuleCache, "LIB_MODULES_DIR", self.lib_modules_dir
+        )
+        self.patcher.start()
+        self.dkms_module_cache = AGWInstallerDKMSModuleCache(self.cache_dir)
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        self.tempdir.cleanup()
+
+    def test_given_package_version_with_epoch_when_get_cache_file_then_epoch_separator_is_escaped(
+        self,
+    ):
+        self.assertEqual(
+            self.dkms_module_cache.get_cache_file("1:2.15.4-10", "5.4.0-131-generic", "x86_64"),
+            os.path.join(
+                self.cache_dir,
+                "openvswitch-datapath-dkms_1%3a2.15.4-10_5.4.0-131-generic_x86_64.dkms.tar.gz",
+            ),
+        )
+
+    @patch("magma_access_gateway_installer.agw_dkms_module_cache.check_call")
+    @patch(
+        "magma_access_gateway_installer.agw_dkms_module_cache.check_output",
+        Mock(return_value=APT_CACHE_POLICY),
+    )
+    def test_given_prebuilt_module_matching_running_kernel_when_load_prebuilt_module_then_it_is_loaded_into_dkms_tree(  # noqa: E501
+        self, mocked_check_call
+    ):
+        cache_file = self.dkms_module_cache.get_cache_file(
+            self.TEST_PACKAGE_VERSION, "5.4.0-131-generic", "x86_64"
+        )
+        os.makedirs(self.cache_dir)
+        open(cache_file, "w").close()
+
+        self.assertTrue(self.dkms_module_cache.load_prebuilt_module())
+        mocked_check_call.assert_called_once_with(["dkms", "ldtarball", f"--archive={cache_file}"])
+
+    @patch("magma_access_gateway_installer.agw_dkms_module_cache.check_call")
+    @patch(
+        "magma_access_gateway_installer.agw_dkms_module_cache.check_output",
+        Mock(return_value=APT_CACHE_POLICY),
+    )
+    def test_given_prebuilt_module_built_for_different_kernel_when_load_prebuilt_module_then_module_is_left_for_dkms_to_build(  # noqa: E501
+        self, mocked_check_call
+    ):
+        os.makedirs(self.cache_dir)
+        open(
+            self.dkms_module_cache.get_cache_file(
+                self.TEST_PACKAGE_VERSION, "5.4.0-125-generic", "x86_64"
+            ),
+            "w",
+        ).close()
+
+        self.assertFalse(self.dkms_module_cache.load_prebuilt_module())
+        mocked_check_call.assert_not_called()
+
+    @patch("magma_access_gateway_installer.agw_dkms_module_cache.check_call")
+    @patch("magma_access_gateway_installer.agw_dkms_module_cache.check_output")
+    def test_given_headers_of_kernel_not_installed_when_populate_then_dkmsmodulecacheerror_is_raised(  # noqa: E501
+        self, mocked_check_output, mocked_check_call
+    ):
+        mocked_check_output.side_effect = lambda command: {
+            "-W": b"install ok installed 2.15.4-10",
+            "-L": f"/usr/src/openvswitch-2.15.4\n{self.dkms_conf}\n".encode(),
+        }[command[1]]
+
+        with self.assertRaises(DKMSModuleCacheError):
+            self.dkms_module_cache.populate(["5.4.0-131-generic"])
+        mocked_check_call.assert_not_called()
+
+    @patch("magma_access_gateway_installer.agw_dkms_module_cache.check_call")
+    @patch("magma_access_gateway_installer.agw_dkms_module_cache.check_output")
+    def test_given_module_not_built_for_kernel_when_populate_then_module_is_built_and_written_to_cache(  # noqa: E501
+        self, mocked_check_output, mocked_check_call
+    ):
+        os.makedirs(os.path.join(self.lib_modules_dir, "5.4.0-125-generic", "build"))
+        mocked_check_output.side_effect = lambda command: {
+            "-W": b"install ok installed 2.15.4-10",
+            "-L": f"/usr/src/openvswitch-2.15.4\n{self.dkms_conf}\n".encode(),
+            "status": b"openvswitch, 2.15.4: added\n",
+        }[command[1]]
+
+        cache_files = self.dkms_module_cache.populate(["5.4.0-125-generic"])
+
+        cache_file = self.dkms_module_cache.get_cache_file(
+            self.TEST_PACKAGE_VERSION, "5.4.0-125-generic", "x86_64"
+        )
+        self.assertEqual(cache_files, [cache_file])
+        self.assertEqual(
+            mocked_check_call.call_args_list,
+            [
+                call(
+                    [
+                        "dkms",
+                        "build",
+                        "-m",
+                        "openvswitch",
+                        "-v",
+                        "2.15.4",
+                        "-k",
+                        "5.4.0-125-generic",
+                    ]
+                ),
+                call(
+                    [
+                        "dkms",
+                        "mktarball",
+                        "-m",
+                        "openvswitch",
+                        "-v",
+                        "2.15.4",
+                        "-k",
+                        "5.4.0-125-generic",
+                        "--binaries-only",
+                        f"--archive={cache_file}",
+                    ]
+                ),
+            ],
+        )
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import json
+import logging
+import os
+import socket
+import stat
+import tempfile
+import unittest
+from subprocess import CalledProcessError
+
+from magma_access_gateway_installer.agw_event_stream import AGWInstallerEventStream
+from magma_access_gateway_installer.agw_installation_errors import EventStreamError
+
+
+class TestAGWInstallerEventStream(unittest.TestCase):
+    FAKE_APT_SCRIPT = """#!/usr/bin/env python3
+import os
+import sys
+
+status_fd = int(sys.argv[2].split("=")[1])
+os.write(
+    status_fd,
+    b"dlstatus:1:20.5:Retrieving file 1 of 2\\n"
+    b"dlstatus:2:61:Retrieving file 2 of 2\\n"
+    b"pmstatus:magma:85.7143:Unpacking magma (1.8.0)\\n"
+    b"pmconffile:/etc/magma/pipelined.yml:'old' 'new' 1 1\\n"
+    b"pmerror:/var/cache/apt/archives/magma.deb:90:dependency problems\\n",
+)
+sys.exit(int(os.environ["FAKE_APT_EXIT_CODE"]))
+"""
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.stream_file = os.path.join(self.tempdir.name, "events.jsonl")
+        self.fake_apt = os.path.join(self.tempdir.name, "apt")
+        with open(self.fake_apt, "w") as fake_apt:
+            fake_apt.write(self.FAKE_APT_SCRIPT)
+        os.chmod(self.fake_apt, stat.S_IRWXU)
+
+    def tearDown(self) -> None:
+        os.environ.pop("FAKE_APT_EXIT_CODE", None)
+        self.tempdir.cleanup()
+
+    def _read_events(self) -> list:
+        with open(self.stream_file, "r") as stream_file:
+            return [json.loads(line) for line in stream_file]
+
+    def test_given_no_destination_when_emit_then_event_stream_is_disabled_and_nothing_is_written(  # noqa: E501
+        self,
+    ):
+        event_stream = AGWInstallerEventStream()
+
+        event_stream.emit("install_start")
+
+        self.assertFalse(event_stream.enabled)
+
+    def test_given_file_destination_when_step_succeeds_then_step_start_and_step_end_events_are_written(  # noqa: E501
+        self,
+    ):
+        event_stream = AGWInstallerEventStream(self.stream_file)
+
+        with event_stream.step("update_apt_cache"):
+            pass
+
+        events = self._read_events()
+        self.assertEqual(
+            [(event["event"], event["step"]) for event in events],
+            [("step_start", "update_apt_cache"), ("step_end", "update_apt_cache")],
+        )
+        self.assertEqual(events[1]["status"], "succeeded")
+        self.assertIn("duration_s", events[1])
+        self.assertEqual(events[0]["host"], socket.gethostname())
+
+    def test_given_file_destination_when_step_fails_then_failed_step_end_event_is_written_and_exception_is_reraised(  # noqa: E501
+        self,
+    ):
+        event_stream = AGWInstallerEventStream(self.stream_file)
+
+        with self.assertRaises(ValueError):
+            with event_stream.step("start_magma"):
+                raise ValueError("magma@magma failed to start")
+
+        step_end = self._read_events()[-1]
+        self.assertEqual(step_end["status"], "failed")
+        self.assertEqual(step_end["error"], "magma@magma failed to start")
+
+    def test_given_fd_destination_when_emit_then_event_is_written_to_file_descriptor(self):
+        read_fd, write_fd = os.pipe()
+        event_stream = AGWInstallerEventStream(f"fd:{write_fd}")
+
+        event_stream.emit("install_start", magma_version="focal-1.8.0")
+        os.close(write_fd)
+
+        with os.fdopen(read_fd, "r") as pipe:
+            event = json.loads(pipe.readline())
+        self.assertEqual(event["event"], "install_start")
+        self.assertEqual(event["magma_version"], "focal-1.8.0")
+
+    def test_given_unix_socket_destination_when_emit_then_event_is_sent_over_the_socket(self):
+        socket_path = os.path.join(self.tempdir.name, "events.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(socket_path)
+            server.listen(1)
+            event_stream = AGWInstallerEventStream(f"unix:{socket_path}")
+            connection, _ = server.accept()
+            with connection:
+                event_stream.emit("reboot")
+                event = json.loads(connection.makefile("r").readline())
+
+        self.assertEqual(event["event"], "reboot")
+
+    def test_given_unreachable_unix_socket_when_event_stream_is_opened_then_event_stream_error_is_raised(  # noqa: E501
+        self,
+    ):
+        with self.assertRaises(EventStreamError):
+            AGWInstallerEventStream(f"unix:{self.tempdir.name}/missing.sock")
+
+    def test_given_destination_closed_when_emit_then_event_stream_is_disabled_without_raising(
+        self,
+    ):
+        read_fd, write_fd = os.pipe()
+        event_stream = AGWInstallerEventStream(f"fd:{write_fd}")
+        os.close(read_fd)
+
+        event_stream.emit("install_start")
+        os.close(write_fd)
+
+        self.assertFalse(event_stream.enabled)
+
+    def test_given_apt_reporting_status_when_run_apt_then_download_install_progress_and_errors_are_written(  # noqa: E501
+        self,
+    ):
+        os.environ["FAKE_APT_EXIT_CODE"] = "0"
+        event_stream = AGWInstallerEventStream(self.stream_file)
+
+        event_stream.run_apt([self.fake_apt, "-qq", "install", "-y", "magma"], "magma")
+
+        events = self._read_events()
+        self.assertEqual(
+            [
+                (event["event"], event.get("stage"), event.get("percent"), event["message"])
+                for event in events
+            ],
+            [
+                ("apt_progress", "download", 20.5, "Retrieving file 1 of 2"),
+                ("apt_progress", "download", 61.0, "Retrieving file 2 of 2"),
+                ("apt_progress", "install", 85.7, "Unpacking magma (1.8.0)"),
+                ("error", None, None, "dependency problems"),
+            ],
+        )
+        self.assertTrue(all(event["package"] == "magma" for event in events))
+
+    def test_given_apt_fails_when_run_apt_then_called_process_error_is_raised(self):
+        os.environ["FAKE_APT_EXIT_CODE"] = "100"
+        event_stream = AGWInstallerEventStream(self.stream_file)
+
+        with self.assertRaises(CalledProcessError):
+            event_stream.run_apt([self.fake_apt, "-qq", "install", "-y", "magma"], "magma")
+
+    def test_given_log_handler_when_installer_logs_error_then_error_event_is_written(self):
+        event_stream = AGWInstallerEventStream(self.stream_file)
+        test_logger = logging.getLogger("test_agw_event_stream")
+        test_logger.addHandler(event_stream.log_handler())
+        self.addCleanup(test_logger.handlers.clear)
+
+        test_logger.info("Installing magma package...")
+        test_logger.error("ERROR: Invalid user. Exiting installation!")
+
+        self.assertEqual(
+            [(event["event"], event["message"]) for event in self._read_events()],
+            [("error", "ERROR: Invalid user. Exiting installation!")],
+        )
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, call, patch
+
+from magma_access_gateway_installer.agw_host_performance_tuner import (
+    AGWInstallerHostPerformanceTuner,
+)
+
+
+class TestAGWInstallerHostPerformanceTuner(unittest.TestCase):
+    TEST_CPUS = ["cpu0", "cpu1"]
+    TEST_CSTATES = ["state0", "state1", "state2", "state3"]
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sys_cpu = os.path.join(self.tempdir.name, "sys", "devices", "system", "cpu")
+        self.proc_meminfo = os.path.join(self.tempdir.name, "meminfo")
+        self.tmpfiles_config_file = os.path.join(self.tempdir.name, "magma-host-performance.conf")
+        self.hugepages_config_file = os.path.join(self.tempdir.name, "99-magma-hugepages.conf")
+        for cpu in self.TEST_CPUS:
+            self._write(
+                os.path.join(self.sys_cpu, cpu, "cpufreq", "scaling_governor"), "powersave"
+            )
+            for state in self.TEST_CSTATES:
+                self._write(os.path.join(self.sys_cpu, cpu, "cpuidle", state, "disable"), "0")
+        self._write(self.proc_meminfo, "MemTotal:       16314128 kB\nHugePages_Total:       0\n")
+        self.patches = [
+            patch.object(AGWInstallerHostPerformanceTuner, "SYS_CPU", self.sys_cpu),
+            patch.object(AGWInstallerHostPerformanceTuner, "PROC_MEMINFO", self.proc_meminfo),
+            patch.object(
+                AGWInstallerHostPerformanceTuner, "TMPFILES_CONFIG_FILE", self.tmpfiles_config_file
+            ),
+            patch.object(
+                AGWInstallerHostPerformanceTuner,
+                "HUGEPAGES_SYSCTL_CONFIG_FILE",
+                self.hugepages_config_file,
+            ),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    @staticmethod
+    def _write(path: str, content: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(content)
+
+    @patch("magma_access_gateway_installer.agw_host_performance_tuner.call", Mock(return_value=0))
+    @patch("magma_access_gateway_installer.agw_host_performance_tuner.check_call")
+    def test_given_max_cstate_when_tune_host_then_governor_deep_cstates_and_hugepages_are_persisted_and_applied(  # noqa: E501
+        self, mocked_check_call
+    ):
+        host_performance_tuner = AGWInstallerHostPerformanceTuner(hugepages=512, max_cstate=1)
+
+        host_performance_tuner.tune_host()
+
+        with open(self.tmpfiles_config_file, "r") as tmpfiles_config:
+            tmpfiles_config_content = tmpfiles_config.read()
+        with open(self.hugepages_config_file, "r") as hugepages_config:
+            hugepages_config_content = hugepages_config.read()
+        self.assertIn(
+            f"w {self.sys_cpu}/cpu*/cpufreq/scaling_governor - - - - performance\n",
+            tmpfiles_config_content,
+        )
+        self.assertNotIn("state1/disable", tmpfiles_config_content)
+        self.assertIn(
+            f"w {self.sys_cpu}/cpu*/cpuidle/state2/disable - - - - 1\n", tmpfiles_config_content
+        )
+        self.assertIn(
+            f"w {self.sys_cpu}/cpu*/cpuidle/state3/disable - - - - 1\n", tmpfiles_config_content
+        )
+        self.assertIn("vm.nr_hugepages = 512\n", hugepages_config_content)
+        mocked_check_call.assert_has_calls(
+            [
+                call(["systemd-tmpfiles", "--create", self.tmpfiles_config_file]),
+                call(["systemctl", "disable", "ondemand"]),
+                call(["sysctl", "-p", self.hugepages_config_file]),
+            ]
+        )
+
+    @patch("magma_access_gateway_installer.agw_host_performance_tuner.call", Mock(return_value=0))
+    @patch("magma_access_gateway_installer.agw_host_performance_tuner.check_call")
+    def test_given_no_cpufreq_and_no_max_cstate_when_tune_host_then_only_hugepages_are_reserved(
+        self, mocked_check_call
+    ):
+        for cpu in self.TEST_CPUS:
+            os.remove(os.path.join(self.sys_cpu, cpu, "cpufreq", "scaling_governor"))
+        host_performance_tuner = AGWInstallerHostPerformanceTuner(hugepages=512)
+
+        host_performance_tuner.tune_host()
+
+        self.assertFalse(os.path.exists(self.tmpfiles_config_file))
+        mocked_check_call.assert_called_once_with(["sysctl", "-p", self.hugepages_config_file])
+
+    def test_given_host_not_tuned_when_report_then_mismatched_settings_are_returned(self):
+        host_performance_tuner = AGWInstallerHostPerformanceTuner(hugepages=512, max_cstate=2)
+        self._write(
+            os.path.join(self.sys_cpu, "cpu0", "cpufreq", "scaling_governor"), "performance"
+        )
+        self._write(os.path.join(self.sys_cpu, "cpu0", "cpuidle", "state3", "disable"), "1")
+
+        self.assertEqual(
+            host_performance_tuner.report(),
+            ["cpu1 governor", "cpu1 state3 disabled", "HugePages_Total"],
+        )
+
+    def test_given_host_tuned_when_report_then_no_mismatches_are_returned(self):
+        host_performance_tuner = AGWInstallerHostPerformanceTuner(hugepages=512, max_cstate=2)
+        for cpu in self.TEST_CPUS:
+            self._write(
+                os.path.join(self.sys_cpu, cpu, "cpufreq", "scaling_governor"), "performance"
+            )
+            self._write(os.path.join(self.sys_cpu, cpu, "cpuidle", "state3", "disable"), "1")
+        self._write(self.proc_meminfo, "HugePages_Total:     512\nHugePages_Free:      512\n")
+
+        self.assertEqual(host_performance_tuner.report(), [])
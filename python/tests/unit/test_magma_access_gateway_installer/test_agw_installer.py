@@ -5,11 +5,19 @@
 import os
 import tempfile
 import unittest
+from subprocess import CalledProcessError
 from unittest.mock import MagicMock, Mock, PropertyMock, call, mock_open, patch
 
 import ruamel.yaml
 
+from magma_access_gateway_installer.agw_installation_errors import (
+    InterfaceActivationError,
+    MagmaAptSigningKeyError,
+    MissingMagmaAptKeyPinError,
+    PipelinedPerformanceProfileError,
+)
 from magma_access_gateway_installer.agw_installer import AGWInstaller
+from magma_access_gateway_installer.agw_step_executor import AGWInstallerStepExecutor
 
 
 class TestAGWInstaller(unittest.TestCase):
@@ -61,6 +69,49 @@ access_control:
     ):
         self.assertEqual(self.agw_installer.install(), None)
 
+    @patch("magma_access_gateway_installer.agw_installer.check_call")
+    @patch.object(AGWInstaller, "apply_pipelined_performance_profile")
+    @patch(
+        "magma_access_gateway_installer.agw_installer.check_output",
+        return_value=APT_LIST_WITH_MAGMA,
+    )
+    def test_given_magma_agw_installed_and_performance_profile_when_install_then_profile_is_applied_and_pipelined_is_restarted(  # noqa: E501
+        self, _, mock_apply_pipelined_performance_profile, mock_check_call
+    ):
+        self.agw_installer.install(performance_profile="high-throughput")
+
+        mock_apply_pipelined_performance_profile.assert_called_once_with("high-throughput")
+        mock_check_call.assert_called_once_with(["service", "magma@pipelined", "restart"])
+
+    @patch(
+        "magma_access_gateway_installer.agw_installer.check_output",
+        return_value=APT_LIST_WITH_MAGMA,
+    )
+    def test_given_magma_agw_installed_from_offline_bundle_when_agw_installer_then_apt_sources_are_restored(  # noqa: E501
+        self, _
+    ):
+        mock_offline_bundle = Mock()
+
+        AGWInstaller(mock_offline_bundle).install()
+
+        mock_offline_bundle.restore_apt_sources.assert_called_once()
+
+    @patch("magma_access_gateway_installer.agw_installer.check_output", MagicMock())
+    def test_given_installation_from_offline_bundle_fails_when_install_then_apt_sources_are_restored(  # noqa: E501
+        self,
+    ):
+        mock_offline_bundle = Mock()
+        agw_installer = AGWInstaller(mock_offline_bundle)
+        failing_step = AGWInstallerStepExecutor.define_step(
+            "install_magma_agw", Mock(side_effect=CalledProcessError(100, "apt"))
+        )
+
+        with patch.object(agw_installer, "get_installation_steps", return_value=[failing_step]):
+            with self.assertRaises(CalledProcessError):
+                agw_installer.install()
+
+        mock_offline_bundle.restore_apt_sources.assert_called_once()
+
     @patch("magma_access_gateway_installer.agw_installer.check_call")
     def test_given_magma_agw_not_installed_when_update_apt_cache_then_apt_update_is_called(
         self, mock_check_call
@@ -144,13 +195,18 @@ access_control:
         new_callable=PropertyMock,
     )
     @patch("magma_access_gateway_installer.agw_installer.check_call", Mock())
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstaller._install_magma_apt_signing_key",  # noqa: E501
+        Mock(),
+    )
     @patch("magma_access_gateway_installer.agw_installer.os.path.exists", return_value=False)
-    def test_given_magma_apt_repo_not_configured_when_configure_apt_for_magma_agw_deb_package_installation_then_new_apt_repo_config_file_is_created(  # noqa: E501
+    def test_given_magma_apt_repo_not_configured_when_configure_apt_for_magma_agw_deb_package_installation_then_new_apt_repo_config_file_signed_by_magma_keyring_is_created(  # noqa: E501
         self, _, mock_magma_version, mock_open_file
     ):
         mock_magma_version.return_value = self.TEST_MAGMA_VERSION
         expected_apt_repo_config_file_content = (
-            "deb https://linuxfoundation.jfrog.io/artifactory/magma-packages "
+            "deb [signed-by=/usr/share/keyrings/magma-archive-keyring.gpg] "
+            "https://linuxfoundation.jfrog.io/artifactory/magma-packages "
             f"{self.TEST_MAGMA_VERSION} main"
         )
 
@@ -163,40 +219,12 @@ access_control:
             call(expected_apt_repo_config_file_content) in mock_open_file().write.mock_calls
         )
 
-    @patch("magma_access_gateway_installer.agw_installer.open", new_callable=mock_open)
-    @patch("magma_access_gateway_installer.agw_installer.check_call")
-    @patch("magma_access_gateway_installer.agw_installer.os.path.exists", return_value=False)
-    def test_given_magma_apt_repo_not_configured_when_configure_apt_for_magma_agw_deb_package_installation_then_unvalidated_apt_signing_key_is_added(  # noqa: E501
-        self, _, mock_check_call, mock_open_file
-    ):
-        expected_99insecurehttpsrepo_content = """Acquire::https::linuxfoundation.jfrog.io/artifactory/magma-packages {
-Verify-Peer "false";
-Verify-Host "false";
-};
-"""  # noqa: E501
-
-        self.agw_installer.configure_apt_for_magma_agw_deb_package_installation()
-
-        self.assertTrue(
-            call(
-                [
-                    "apt-key",
-                    "adv",
-                    "--fetch-keys",
-                    "https://linuxfoundation.jfrog.io/artifactory/api/security/keypair/magmaci/public",  # noqa: E501
-                ]
-            )
-            in mock_check_call.mock_calls
-        )
-        self.assertTrue(
-            call("/etc/apt/apt.conf.d/99insecurehttpsrepo", "w") in mock_open_file.mock_calls
-        )
-        self.assertTrue(
-            call(expected_99insecurehttpsrepo_content) in mock_open_file().write.mock_calls
-        )
-
     @patch("magma_access_gateway_installer.agw_installer.check_call")
     @patch("magma_access_gateway_installer.agw_installer.open", new_callable=mock_open)
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstaller._install_magma_apt_signing_key",  # noqa: E501
+        Mock(),
+    )
     @patch("magma_access_gateway_installer.agw_installer.os.path.exists", return_value=False)
     def test_given_magma_apt_repo_not_configured_when_configure_apt_for_magma_agw_deb_package_installation_then_apt_cache_is_updated(  # noqa: E501
         self, _, __, mock_check_call
@@ -218,6 +246,93 @@ Verify-Host "false";
 
         mock_check_call.assert_has_calls(expected_apt_calls)
 
+    def test_given_installation_steps_when_dependencies_are_resolved_then_dst_root_ca_x3_fix_and_wireshark_preseed_depend_on_no_other_step(  # noqa: E501
+        self,
+    ):
+        executor = AGWInstallerStepExecutor(
+            self.agw_installer.get_skipped_prerequisite_steps()
+            + self.agw_installer.get_installation_steps()  # noqa: W503
+        )
+
+        self.assertEqual(
+            executor.dependencies["forbid_usage_of_expired_dst_root_ca_x3_certificate"], set()
+        )
+        self.assertEqual(executor.dependencies["preconfigure_wireshark_suid_property"], set())
+        self.assertEqual(
+            executor.dependencies["install_magma_agw"],
+            {
+                "configure_network",
+                "install_runtime_dependencies",
+                "preconfigure_wireshark_suid_property",
+                "load_prebuilt_openvswitch_module",
+            },
+        )
+
+    def test_given_installation_steps_when_dependencies_are_resolved_then_every_step_using_apt_waits_for_network_configuration(  # noqa: E501
+        self,
+    ):
+        executor = AGWInstallerStepExecutor(
+            self.agw_installer.get_skipped_prerequisite_steps()
+            + self.agw_installer.get_installation_steps()  # noqa: W503
+        )
+
+        for step in executor.steps:
+            if "dpkg" in step["locks"] and "network" in step["locks"]:
+                self.assertIn("configure_network", executor.dependencies[step["name"]])
+
+    def test_given_ovs_tuner_when_installation_steps_are_resolved_then_ovs_is_tuned_after_it_starts_and_before_magma_starts(  # noqa: E501
+        self,
+    ):
+        executor = AGWInstallerStepExecutor(
+            self.agw_installer.get_skipped_prerequisite_steps()
+            + self.agw_installer.get_installation_steps(ovs_tuner=Mock())  # noqa: W503
+        )
+
+        self.assertEqual(executor.dependencies["tune_open_vswitch"], {"start_open_vswitch"})
+        self.assertIn("tune_open_vswitch", executor.dependencies["start_magma"])
+
+    @patch("magma_access_gateway_installer.agw_installer.check_output", MagicMock())
+    def test_given_prerequisite_steps_when_install_then_prerequisite_steps_run_before_installation_completes(  # noqa: E501
+        self,
+    ):
+        mock_prerequisite_step = Mock()
+        with patch.object(self.agw_installer, "get_installation_steps", return_value=[]):
+            self.agw_installer.install(
+                no_reboot=True,
+                prerequisite_steps=[
+                    AGWInstallerStepExecutor.define_step(
+                        "create_magma_user", mock_prerequisite_step
+                    )
+                ],
+            )
+
+        mock_prerequisite_step.assert_called_once()
+
+    @patch("magma_access_gateway_installer.agw_installer.check_call")
+    def test_given_event_stream_enabled_when_install_magma_agw_then_apt_is_run_reporting_progress_to_event_stream(  # noqa: E501
+        self, mock_check_call
+    ):
+        mock_event_stream = Mock()
+        mock_event_stream.enabled = True
+
+        AGWInstaller(event_stream=mock_event_stream).install_magma_agw()
+
+        mock_check_call.assert_not_called()
+        mock_event_stream.run_apt.assert_called_once_with(
+            [
+                "apt",
+                '-o "Dpkg::Options::=--force-confdef"',
+                '-o "Dpkg::Options::=--force-confold"',
+                '-o "Dpkg::Options::=--force-overwrite"',
+                "-qq",
+                "install",
+                "-y",
+                "--no-install-recommends",
+                "magma",
+            ],
+            "magma",
+        )
+
     @patch("magma_access_gateway_installer.agw_installer.check_call")
     def test_given_magma_agw_not_installed_when_preconfigure_wireshark_suid_property_then_correct_configuration_is_sent_to_debconf_database(  # noqa: E501
         self, mock_check_call
@@ -249,38 +364,126 @@ Verify-Host "false";
 
         mock_check_call.assert_called_once_with(["service", "openvswitch-switch", "start"])
 
+    @patch("magma_access_gateway_installer.agw_installer.AGWInstallerInterfaceActivator")
     @patch("magma_access_gateway_installer.agw_installer.check_call")
     def test_given_magma_installation_process_when_start_magma_then_magma_services_are_stopped_interfaces_are_brought_up_and_magma_services_are_started(  # noqa: E501
-        self, mock_check_call
+        self, mock_check_call, mock_interface_activator
     ):
-        expected_calls = [call(["service", "magma@*", "stop"])]
-        expected_calls.extend(
-            [
-                call(["ifup", magma_interface])
-                for magma_interface in self.agw_installer.MAGMA_INTERFACES
-            ]
-        )
-        expected_calls.append(call(["service", "magma@magma", "start"]))
+        mock_interface_activator.return_value.activate.return_value = {
+            magma_interface: {"up": True}
+            for magma_interface in self.agw_installer.MAGMA_INTERFACES
+        }
 
         self.agw_installer.start_magma()
 
-        mock_check_call.assert_has_calls(expected_calls)
+        mock_interface_activator.assert_called_once_with(self.agw_installer.MAGMA_INTERFACES)
+        mock_check_call.assert_has_calls(
+            [call(["service", "magma@*", "stop"]), call(["service", "magma@magma", "start"])]
+        )
+
+    @patch("magma_access_gateway_installer.agw_installer.AGWInstallerInterfaceActivator")
+    @patch("magma_access_gateway_installer.agw_installer.check_call")
+    def test_given_magma_interface_not_reported_up_when_start_magma_then_interface_activation_error_is_raised_and_magma_is_not_started(  # noqa: E501
+        self, mock_check_call, mock_interface_activator
+    ):
+        mock_interface_activator.return_value.activate.return_value = {
+            "gtp_br0": {"up": True},
+            "mtr0": {"up": False},
+        }
+
+        with self.assertRaises(InterfaceActivationError):
+            self.agw_installer.start_magma()
+
+        self.assertNotIn(call(["service", "magma@magma", "start"]), mock_check_call.call_args_list)
 
     @patch("magma_access_gateway_installer.agw_installer.os.system")
     @patch("magma_access_gateway_installer.agw_installer.check_call", Mock())
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstallerInterfaceActivator", MagicMock()
+    )
     @patch("magma_access_gateway_installer.agw_installer.check_output", MagicMock())
+    @patch.object(AGWInstaller, "_install_magma_apt_signing_key", Mock())
     @patch("magma_access_gateway_installer.agw_installer.open", mock_open())
     @patch("magma_access_gateway_installer.agw_installer.time.sleep", Mock())
-    def test_given_magma_not_installed_when_install_then_system_goes_for_reboot_once_installation_is_done(  # noqa: E501
-        self, mock_os_system
+    @patch("magma_access_gateway_installer.agw_installer.AGWInstallerLiveActivation")
+    def test_given_magma_not_installed_and_reboot_required_when_install_then_system_goes_for_reboot_once_installation_is_done(  # noqa: E501
+        self, mock_live_activation, mock_os_system
     ):
+        mock_live_activation().get_reboot_reasons.return_value = [
+            "Packages require a reboot: linux-image-5.4.0-124-generic."
+        ]
+
         self.agw_installer.install()
 
         mock_os_system.assert_called_once_with("reboot")
+        mock_live_activation().activate.assert_not_called()
 
     @patch("magma_access_gateway_installer.agw_installer.os.system")
     @patch("magma_access_gateway_installer.agw_installer.check_call", Mock())
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstallerInterfaceActivator", MagicMock()
+    )
     @patch("magma_access_gateway_installer.agw_installer.check_output", MagicMock())
+    @patch.object(AGWInstaller, "_install_magma_apt_signing_key", Mock())
+    @patch("magma_access_gateway_installer.agw_installer.open", mock_open())
+    @patch("magma_access_gateway_installer.agw_installer.time.sleep", Mock())
+    @patch("magma_access_gateway_installer.agw_installer.AGWInstallerLiveActivation")
+    def test_given_magma_not_installed_and_no_reboot_required_when_install_then_magma_is_activated_live_without_reboot(  # noqa: E501
+        self, mock_live_activation, mock_os_system
+    ):
+        mock_live_activation().get_reboot_reasons.return_value = []
+        mock_live_activation().activate.return_value = []
+
+        self.agw_installer.install()
+
+        mock_live_activation().activate.assert_called_once()
+        mock_os_system.assert_not_called()
+
+    @patch("magma_access_gateway_installer.agw_installer.os.system")
+    @patch("magma_access_gateway_installer.agw_installer.check_call", Mock())
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstallerInterfaceActivator", MagicMock()
+    )
+    @patch("magma_access_gateway_installer.agw_installer.check_output", MagicMock())
+    @patch.object(AGWInstaller, "_install_magma_apt_signing_key", Mock())
+    @patch("magma_access_gateway_installer.agw_installer.open", mock_open())
+    @patch("magma_access_gateway_installer.agw_installer.time.sleep", Mock())
+    @patch("magma_access_gateway_installer.agw_installer.AGWInstallerLiveActivation")
+    def test_given_live_activation_not_verified_when_install_then_system_goes_for_reboot(
+        self, mock_live_activation, mock_os_system
+    ):
+        mock_live_activation().get_reboot_reasons.return_value = []
+        mock_live_activation().activate.return_value = ["Service magma@magma is not active."]
+
+        self.agw_installer.install()
+
+        mock_os_system.assert_called_once_with("reboot")
+
+    @patch("magma_access_gateway_installer.agw_installer.os.system")
+    @patch("magma_access_gateway_installer.agw_installer.check_call", Mock())
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstallerInterfaceActivator", MagicMock()
+    )
+    @patch("magma_access_gateway_installer.agw_installer.check_output", MagicMock())
+    @patch.object(AGWInstaller, "_install_magma_apt_signing_key", Mock())
+    @patch("magma_access_gateway_installer.agw_installer.open", mock_open())
+    @patch("magma_access_gateway_installer.agw_installer.time.sleep", Mock())
+    @patch("magma_access_gateway_installer.agw_installer.AGWInstallerLiveActivation")
+    def test_given_always_reboot_when_install_then_system_goes_for_reboot_without_checking_if_it_is_required(  # noqa: E501
+        self, mock_live_activation, mock_os_system
+    ):
+        self.agw_installer.install(always_reboot=True)
+
+        mock_os_system.assert_called_once_with("reboot")
+        mock_live_activation.assert_not_called()
+
+    @patch("magma_access_gateway_installer.agw_installer.os.system")
+    @patch("magma_access_gateway_installer.agw_installer.check_call", Mock())
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstallerInterfaceActivator", MagicMock()
+    )
+    @patch("magma_access_gateway_installer.agw_installer.check_output", MagicMock())
+    @patch.object(AGWInstaller, "_install_magma_apt_signing_key", Mock())
     @patch("magma_access_gateway_installer.agw_installer.open", mock_open())
     @patch("magma_access_gateway_installer.agw_installer.time.sleep", Mock())
     def test_given_magma_not_installed_and_no_reboot_specified_when_install_then_system_does_not_reboot_once_installation_is_done(  # noqa: E501
@@ -328,3 +531,206 @@ access_control:
                 config = self.yaml.load(fake_pipelined)
 
             self.assertEqual(config, self.yaml.load(expected_pipelined_config))
+
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstaller.PIPELINED_CONFIG_FILE",
+        new_callable=PropertyMock,
+    )
+    def test_given_pipelined_config_file_when_apply_pipelined_performance_profile_then_profile_settings_are_written_and_comments_are_preserved(  # noqa: E501
+        self, mocked_pipelined_config_file
+    ):
+        with tempfile.TemporaryDirectory() as tempdir:
+            tmpfilepath = os.path.join(tempdir, "fake_pipelined.yml")
+            with open(tmpfilepath, "w") as fake_pipelined:
+                fake_pipelined.write(self.TEST_PIPELINED_CONFIG)
+
+            mocked_pipelined_config_file.return_value = tmpfilepath
+            self.agw_installer.apply_pipelined_performance_profile("high-throughput")
+
+            with open(tmpfilepath, "r") as fake_pipelined:
+                config_content = fake_pipelined.read()
+
+        config = self.yaml.load(config_content)
+        self.assertIn("# Blocks access to all AGW local IPs from UEs.", config_content)
+        self.assertEqual(config["enforcement"]["poll_interval"], 30)
+        self.assertFalse(config["ipfix"]["enabled"])
+        self.assertFalse(config["dpi"]["enabled"])
+
+    @patch("magma_access_gateway_installer.agw_installer.os.path.exists", Mock(return_value=True))
+    @patch("magma_access_gateway_installer.agw_installer.open")
+    @patch(
+        "magma_access_gateway_installer.agw_installer.AGWInstaller._load_pipelined_config",
+        Mock(return_value={"ipfix": {"enabled": True}}),
+    )
+    def test_given_pipelined_config_file_when_preview_pipelined_performance_profile_then_pipelined_config_is_not_written(  # noqa: E501
+        self, mocked_open
+    ):
+        self.agw_installer.preview_pipelined_performance_profile("high-throughput")
+
+        mocked_open.assert_not_called()
+
+    @patch.object(AGWInstaller, "PIPELINED_CONFIG_FILE", "/nonexistent/pipelined.yml")
+    def test_given_pipelined_config_file_missing_when_preview_pipelined_performance_profile_then_pipelined_performance_profile_error_is_raised(  # noqa: E501
+        self,
+    ):
+        with self.assertRaises(PipelinedPerformanceProfileError):
+            self.agw_installer.preview_pipelined_performance_profile("high-throughput")
+
+    @patch("magma_access_gateway_installer.agw_installer.open", new_callable=mock_open)
+    def test_given_package_downloader_with_ranked_magma_mirrors_when_configure_private_apt_repository_then_best_mirror_is_used(  # noqa: E501
+        self, mock_open_file
+    ):
+        mock_package_downloader = Mock()
+        mock_package_downloader.best_mirror.return_value = "http://mirror.example/magma-packages"
+
+        AGWInstaller(
+            package_downloader=mock_package_downloader
+        )._configure_private_apt_repository_to_install_magma_agw_from()
+
+        mock_open_file().write.assert_called_once_with(
+            f"deb [signed-by={AGWInstaller.MAGMA_APT_KEYRING}] "
+            f"http://mirror.example/magma-packages {AGWInstaller.MAGMA_VERSION} main"
+        )
+
+
+class TestAGWInstallerMagmaAptSigningKey(unittest.TestCase):
+    PINNED_FINGERPRINT = "0123456789ABCDEF0123456789ABCDEF01234567"
+    OTHER_FINGERPRINT = "FEDCBA9876543210FEDCBA9876543210FEDCBA98"
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.magma_apt_keyring = os.path.join(self.tempdir.name, "magma-archive-keyring.gpg")
+        self.pinned_keyring = os.path.join(self.tempdir.name, "pinned-keyring.gpg")
+        self.pinned_fingerprint_file = os.path.join(self.tempdir.name, "pinned.fingerprint")
+        self.insecure_apt_config_file = os.path.join(self.tempdir.name, "99insecurehttpsrepo")
+        with open(self.pinned_keyring, "wb") as pinned_keyring:
+            pinned_keyring.write(b"pinned keyring")
+        with open(self.pinned_fingerprint_file, "w") as pinned_fingerprint_file:
+            pinned_fingerprint_file.write(f"{self.PINNED_FINGERPRINT.lower()}\n")
+        self.patches = [
+            patch.object(AGWInstaller, "MAGMA_APT_KEYRING", self.magma_apt_keyring),
+            patch.object(AGWInstaller, "PINNED_MAGMA_APT_KEYRING", self.pinned_keyring),
+            patch.object(
+                AGWInstaller, "PINNED_MAGMA_APT_KEY_FINGERPRINT_FILE", self.pinned_fingerprint_file
+            ),
+            patch.object(AGWInstaller, "INSECURE_APT_CONFIG_FILE", self.insecure_apt_config_file),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+        self.agw_installer = AGWInstaller()
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    @staticmethod
+    def _gpg_output(fingerprints: dict):
+        """Returns check_output side effect emulating gpg for keyrings with given fingerprints."""
+
+        def gpg(command: list, input: bytes = None):  # type: ignore[assignment]
+            if "--dearmor" in command:
+                return b"fetched keyring"
+            with open(command[-1], "rb") as keyring:
+                fingerprint = fingerprints[keyring.read()]
+            return f"pub:-:4096:1:0123456789ABCDEF:1600000000:::-:::scESC::::::23::0:\nfpr:::::::::{fingerprint}:\n".encode()  # noqa: E501
+
+        return gpg
+
+    @patch("magma_access_gateway_installer.agw_installer.urllib.request.urlopen")
+    @patch("magma_access_gateway_installer.agw_installer.check_output")
+    def test_given_shipped_keyring_matching_pinned_fingerprint_when_install_magma_apt_signing_key_then_shipped_keyring_is_installed_without_fetching(  # noqa: E501
+        self, mock_check_output, mock_urlopen
+    ):
+        mock_check_output.side_effect = self._gpg_output(
+            {b"pinned keyring": self.PINNED_FINGERPRINT}
+        )
+
+        self.agw_installer._install_magma_apt_signing_key()
+
+        with open(self.magma_apt_keyring, "rb") as magma_apt_keyring:
+            self.assertEqual(magma_apt_keyring.read(), b"pinned keyring")
+        mock_urlopen.assert_not_called()
+
+    @patch("magma_access_gateway_installer.agw_installer.urllib.request.urlopen")
+    @patch("magma_access_gateway_installer.agw_installer.check_output")
+    def test_given_shipped_keyring_not_matching_pinned_fingerprint_when_install_magma_apt_signing_key_then_key_is_fetched_and_installed(  # noqa: E501
+        self, mock_check_output, mock_urlopen
+    ):
+        mock_urlopen.return_value.__enter__.return_value.read.return_value = b"armored key"
+        mock_check_output.side_effect = self._gpg_output(
+            {
+                b"pinned keyring": self.OTHER_FINGERPRINT,
+                b"fetched keyring": self.PINNED_FINGERPRINT,
+            }
+        )
+
+        self.agw_installer._install_magma_apt_signing_key()
+
+        mock_urlopen.assert_called_once_with(
+            "https://linuxfoundation.jfrog.io/artifactory/api/security/keypair/magmaci/public",
+            timeout=AGWInstaller.MAGMA_APT_KEY_FETCH_TIMEOUT,
+        )
+        mock_check_output.assert_any_call(["gpg", "--dearmor"], input=b"armored key")
+        with open(self.magma_apt_keyring, "rb") as magma_apt_keyring:
+            self.assertEqual(magma_apt_keyring.read(), b"fetched keyring")
+
+    @patch("magma_access_gateway_installer.agw_installer.urllib.request.urlopen")
+    @patch("magma_access_gateway_installer.agw_installer.check_output")
+    def test_given_fetched_key_not_matching_pinned_fingerprint_when_install_magma_apt_signing_key_then_magma_apt_signing_key_error_is_raised_and_key_is_removed(  # noqa: E501
+        self, mock_check_output, mock_urlopen
+    ):
+        os.remove(self.pinned_keyring)
+        mock_urlopen.return_value.__enter__.return_value.read.return_value = b"armored key"
+        mock_check_output.side_effect = self._gpg_output(
+            {b"fetched keyring": self.OTHER_FINGERPRINT}
+        )
+
+        with self.assertRaises(MagmaAptSigningKeyError):
+            self.agw_installer._install_magma_apt_signing_key()
+
+        self.assertFalse(os.path.exists(self.magma_apt_keyring))
+
+    @patch("magma_access_gateway_installer.agw_installer.urllib.request.urlopen")
+    @patch("magma_access_gateway_installer.agw_installer.check_output")
+    def test_given_no_fingerprint_pinned_when_install_magma_apt_signing_key_then_missing_magma_apt_key_pin_error_is_raised_and_no_key_is_trusted(  # noqa: E501
+        self, mock_check_output, mock_urlopen
+    ):
+        with open(self.pinned_fingerprint_file, "w") as pinned_fingerprint_file:
+            pinned_fingerprint_file.write("# Fingerprint of the Magma apt signing key\n")
+
+        with self.assertRaises(MissingMagmaAptKeyPinError):
+            self.agw_installer._install_magma_apt_signing_key()
+
+        mock_urlopen.assert_not_called()
+        self.assertFalse(os.path.exists(self.magma_apt_keyring))
+
+    @patch("magma_access_gateway_installer.agw_installer.urllib.request.urlopen")
+    @patch("magma_access_gateway_installer.agw_installer.check_output")
+    def test_given_no_fingerprint_pinned_and_operator_provided_fingerprint_when_install_magma_apt_signing_key_then_key_matching_operator_provided_fingerprint_is_installed(  # noqa: E501
+        self, mock_check_output, mock_urlopen
+    ):
+        os.remove(self.pinned_keyring)
+        with open(self.pinned_fingerprint_file, "w") as pinned_fingerprint_file:
+            pinned_fingerprint_file.write("# Fingerprint of the Magma apt signing key\n")
+        mock_urlopen.return_value.__enter__.return_value.read.return_value = b"armored key"
+        mock_check_output.side_effect = self._gpg_output(
+            {b"fetched keyring": self.PINNED_FINGERPRINT}
+        )
+
+        AGWInstaller(
+            magma_apt_key_fingerprint=self.PINNED_FINGERPRINT.lower()
+        )._install_magma_apt_signing_key()
+
+        with open(self.magma_apt_keyring, "rb") as magma_apt_keyring:
+            self.assertEqual(magma_apt_keyring.read(), b"fetched keyring")
+
+    def test_given_insecure_apt_config_left_by_older_installer_when_remove_insecure_magma_apt_repository_config_then_config_is_removed(  # noqa: E501
+        self,
+    ):
+        with open(self.insecure_apt_config_file, "w") as insecure_apt_config:
+            insecure_apt_config.write('Verify-Peer "false";\n')
+
+        self.agw_installer._remove_insecure_magma_apt_repository_config()
+
+        self.assertFalse(os.path.exists(self.insecure_apt_config_file))
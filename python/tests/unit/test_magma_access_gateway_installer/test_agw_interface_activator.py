@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import socket
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from magma_access_gateway_installer.agw_interface_activator import (
+    AGWInstallerInterfaceActivator,
+)
+
+
+def link_message(name: str, up: bool) -> bytes:
+    """Returns RTM_NEWLINK netlink message reporting state of given interface."""
+    activator = AGWInstallerInterfaceActivator
+    encoded_name = name.encode() + b"\0"
+    attributes = b""
+    for attribute_type, value in [
+        (activator.IFLA_IFNAME, encoded_name),
+        (activator.IFLA_OPERSTATE, bytes([activator.IF_OPER_UP if up else 2])),
+    ]:
+        attribute = activator.RTATTR_HEADER.pack(
+            activator.RTATTR_HEADER.size + len(value), attribute_type
+        )
+        attribute += value
+        attributes += attribute + b"\0" * (-len(attribute) % 4)
+    payload = activator.IFINFOMSG.pack(socket.AF_UNSPEC, 1, 1, activator.IFF_UP if up else 0, 0)
+    payload += attributes
+    return (
+        activator.NLMSG_HEADER.pack(
+            activator.NLMSG_HEADER.size + len(payload), activator.RTM_NEWLINK, 0, 0, 0
+        )
+        + payload  # noqa: W503
+    )
+
+
+def link_dump_done_message() -> bytes:
+    """Returns NLMSG_DONE netlink message ending a dump."""
+    activator = AGWInstallerInterfaceActivator
+    return activator.NLMSG_HEADER.pack(
+        activator.NLMSG_HEADER.size + 4, activator.NLMSG_DONE, 0, 0, 0
+    ) + struct.pack("=i", 0)
+
+
+class TestAGWInstallerInterfaceActivator(unittest.TestCase):
+    TEST_INTERFACES_CONFIG = """auto gtp_br0
+iface gtp_br0 inet static
+    address 192.168.128.1
+    netmask 255.255.255.0
+    ovs_type OVSBridge
+    ovs_ports mtr0
+
+allow-gtp_br0 mtr0
+iface mtr0 inet static
+    address 10.1.0.1
+    netmask 255.255.255.0
+    ovs_type OVSIntPort
+    ovs_bridge gtp_br0
+"""
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.interfaces_file = os.path.join(self.tempdir.name, "interfaces")
+        self.interfaces_dir = os.path.join(self.tempdir.name, "interfaces.d")
+        os.mkdir(self.interfaces_dir)
+        with open(os.path.join(self.interfaces_dir, "gtp"), "w") as interfaces_config:
+            interfaces_config.write(self.TEST_INTERFACES_CONFIG)
+        self.kernel_socket, self.netlink_socket = socket.socketpair(
+            socket.AF_UNIX, socket.SOCK_DGRAM
+        )
+        self.ifup_calls: list = []
+        for name, value in [
+            ("INTERFACES_FILE", self.interfaces_file),
+            ("INTERFACES_DIR", self.interfaces_dir),
+        ]:
+            patcher = patch.object(AGWInstallerInterfaceActivator, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(
+            AGWInstallerInterfaceActivator,
+            "_open_netlink_socket",
+            lambda _: self.netlink_socket,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.kernel_socket.close()
+        self.netlink_socket.close()
+        self.tempdir.cleanup()
+
+    def _reply_to_link_dump(self, *messages: bytes):
+        self.kernel_socket.send(b"".join(messages) + link_dump_done_message())
+
+    def _ifup(self, interfaces_coming_up: list, exit_code: int = 0):
+        def ifup(command, **kwargs):
+            self.ifup_calls.append(command[1])
+            if command[1] in interfaces_coming_up:
+                self.kernel_socket.send(link_message(command[1], True))
+            return exit_code
+
+        return ifup
+
+    def test_given_interfaces_config_with_ovs_ports_when_get_dependencies_then_ports_depend_on_their_bridges(  # noqa: E501
+        self,
+    ):
+        activator = AGWInstallerInterfaceActivator(["gtp_br0", "mtr0", "uplink_br0"])
+
+        self.assertEqual(activator.get_dependencies(), {"mtr0": ["gtp_br0"]})
+
+    def test_given_multiple_link_messages_when_parse_link_messages_then_name_and_state_of_each_link_are_returned(  # noqa: E501
+        self,
+    ):
+        data = link_message("gtp_br0", True) + link_message("uplink_br0", False)
+
+        self.assertEqual(
+            AGWInstallerInterfaceActivator.parse_link_messages(data),
+            [("gtp_br0", True), ("uplink_br0", False)],
+        )
+
+    def test_given_interfaces_reported_up_over_netlink_when_activate_then_ports_are_brought_up_after_their_bridges_and_time_to_up_is_reported(  # noqa: E501
+        self,
+    ):
+        self._reply_to_link_dump()
+        activator = AGWInstallerInterfaceActivator(["mtr0", "gtp_br0", "uplink_br0"], timeout=5)
+
+        with patch(
+            "magma_access_gateway_installer.agw_interface_activator.call",
+            side_effect=self._ifup(["gtp_br0", "mtr0", "uplink_br0"]),
+        ):
+            report = activator.activate()
+
+        self.assertLess(self.ifup_calls.index("gtp_br0"), self.ifup_calls.index("mtr0"))
+        for interface in ["mtr0", "gtp_br0", "uplink_br0"]:
+            self.assertTrue(report[interface]["up"])
+            self.assertFalse(report[interface]["already_up"])
+            self.assertIsNotNone(report[interface]["time_to_up_s"])
+
+    def test_given_interface_already_up_when_activate_then_ifup_is_not_called(self):
+        self._reply_to_link_dump(link_message("uplink_br0", True))
+        activator = AGWInstallerInterfaceActivator(["uplink_br0"], timeout=5)
+
+        with patch(
+            "magma_access_gateway_installer.agw_interface_activator.call",
+            side_effect=self._ifup(["uplink_br0"]),
+        ):
+            report = activator.activate()
+
+        self.assertEqual(self.ifup_calls, [])
+        self.assertTrue(report["uplink_br0"]["already_up"])
+
+    def test_given_ifup_succeeds_but_interface_not_reported_up_when_activate_then_interface_is_reported_down(  # noqa: E501
+        self,
+    ):
+        self._reply_to_link_dump()
+        activator = AGWInstallerInterfaceActivator(["ipfix0"], timeout=0.3)
+
+        with patch(
+            "magma_access_gateway_installer.agw_interface_activator.call",
+            side_effect=self._ifup([]),
+        ):
+            report = activator.activate()
+
+        self.assertFalse(report["ipfix0"]["up"])
+        self.assertIn("not reported up", report["ipfix0"]["error"])
+
+    def test_given_ifup_fails_but_interface_reported_up_when_activate_then_interface_is_reported_up(  # noqa: E501
+        self,
+    ):
+        self._reply_to_link_dump()
+        activator = AGWInstallerInterfaceActivator(["dhcp0"], timeout=5)
+
+        with patch(
+            "magma_access_gateway_installer.agw_interface_activator.call",
+            side_effect=self._ifup(["dhcp0"], exit_code=1),
+        ):
+            report = activator.activate()
+
+        self.assertTrue(report["dhcp0"]["up"])
+
+    def test_given_bridge_not_reported_up_when_activate_then_its_port_is_not_brought_up(self):
+        self._reply_to_link_dump()
+        activator = AGWInstallerInterfaceActivator(["gtp_br0", "mtr0"], timeout=0.3)
+
+        with patch(
+            "magma_access_gateway_installer.agw_interface_activator.call",
+            side_effect=self._ifup(["mtr0"]),
+        ):
+            report = activator.activate()
+
+        self.assertEqual(self.ifup_calls, ["gtp_br0"])
+        self.assertFalse(report["mtr0"]["up"])
+        self.assertEqual(report["mtr0"]["error"], "gtp_br0 didn't come up.")
+
+    def test_given_link_dump_request_when_activate_then_rtm_getlink_dump_is_sent(self):
+        self._reply_to_link_dump()
+        activator = AGWInstallerInterfaceActivator([], timeout=0.1)
+
+        activator.activate()
+
+        _, message_type, flags, _, _ = struct.unpack_from("=LHHLL", self.kernel_socket.recv(64))
+        self.assertEqual(message_type, AGWInstallerInterfaceActivator.RTM_GETLINK)
+        self.assertTrue(flags & AGWInstallerInterfaceActivator.NLM_F_DUMP)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from magma_access_gateway_installer.agw_interface_selector import (
+    AGWInstallerInterfaceSelector,
+)
+
+
+class TestAGWInstallerInterfaceSelector(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sys_class_net_patcher = patch.object(
+            AGWInstallerInterfaceSelector, "SYS_CLASS_NET", self.tempdir.name
+        )
+        self.sys_class_net_patcher.start()
+
+    def tearDown(self) -> None:
+        self.sys_class_net_patcher.stop()
+        self.tempdir.cleanup()
+
+    def _create_interface(
+        self,
+        name: str,
+        speed: int = 1000,
+        carrier: bool = True,
+        rx_queues: int = 1,
+        numa_node: int = 0,
+        driver: str = "ixgbe",
+    ):
+        interface_dir = os.path.join(self.tempdir.name, name)
+        device_dir = os.path.join(interface_dir, "device")
+        os.makedirs(device_dir)
+        for queue in range(rx_queues):
+            os.makedirs(os.path.join(interface_dir, "queues", f"rx-{queue}"))
+        for file_name, content in [
+            ("speed", str(speed)),
+            ("duplex", "full"),
+            ("carrier", "1" if carrier else "0"),
+            (os.path.join("device", "numa_node"), str(numa_node)),
+        ]:
+            with open(os.path.join(interface_dir, file_name), "w") as sysfs_file:
+                sysfs_file.write(f"{content}\n")
+        if driver:
+            driver_dir = os.path.join(self.tempdir.name, "drivers", driver)
+            os.makedirs(driver_dir, exist_ok=True)
+            os.symlink(driver_dir, os.path.join(device_dir, "driver"))
+
+    def test_given_interfaces_with_different_speeds_when_select_then_fastest_interface_is_sgi(
+        self,
+    ):
+        self._create_interface("enp1s0", speed=1000)
+        self._create_interface("enp2s0", speed=10000)
+        self._create_interface("enp3s0", speed=100)
+        interface_selector = AGWInstallerInterfaceSelector(["enp1s0", "enp2s0", "enp3s0"])
+
+        self.assertEqual(interface_selector.select(), ("enp2s0", "enp1s0"))
+
+    def test_given_remaining_interfaces_on_different_numa_nodes_when_select_then_s1_on_sgi_numa_node_is_preferred(  # noqa: E501
+        self,
+    ):
+        self._create_interface("enp1s0", speed=25000, numa_node=1)
+        self._create_interface("enp2s0", speed=10000, numa_node=0)
+        self._create_interface("enp3s0", speed=1000, numa_node=1)
+        interface_selector = AGWInstallerInterfaceSelector(["enp1s0", "enp2s0", "enp3s0"])
+
+        self.assertEqual(interface_selector.select(), ("enp1s0", "enp3s0"))
+
+    def test_given_fast_interface_without_carrier_when_rank_interfaces_then_it_is_ranked_last(
+        self,
+    ):
+        self._create_interface("enp1s0", speed=10000, carrier=False)
+        self._create_interface("enp2s0", speed=1000, rx_queues=4)
+        self._create_interface("enp3s0", speed=1000, rx_queues=1)
+        interface_selector = AGWInstallerInterfaceSelector(["enp1s0", "enp2s0", "enp3s0"])
+
+        self.assertEqual(
+            [interface["name"] for interface in interface_selector.rank_interfaces()],
+            ["enp2s0", "enp3s0", "enp1s0"],
+        )
+
+    def test_given_virtual_interface_when_rank_interfaces_then_only_physical_interfaces_are_ranked(  # noqa: E501
+        self,
+    ):
+        self._create_interface("enp1s0", speed=1000)
+        self._create_interface("enp2s0", speed=1000)
+        self._create_interface("br0", speed=-1, driver="")
+        interface_selector = AGWInstallerInterfaceSelector(["br0", "enp1s0", "enp2s0"])
+
+        self.assertEqual(
+            [interface["name"] for interface in interface_selector.rank_interfaces()],
+            ["enp1s0", "enp2s0"],
+        )
+
+    def test_given_sgi_chosen_by_operator_when_select_then_operator_choice_is_kept_and_only_s1_is_selected(  # noqa: E501
+        self,
+    ):
+        self._create_interface("enp1s0", speed=1000)
+        self._create_interface("enp2s0", speed=10000)
+        interface_selector = AGWInstallerInterfaceSelector(["enp1s0", "enp2s0"])
+
+        self.assertEqual(interface_selector.select(sgi="enp1s0"), ("enp1s0", "enp2s0"))
+
+    def test_given_s1_chosen_by_operator_when_select_then_sgi_is_selected_among_other_interfaces(  # noqa: E501
+        self,
+    ):
+        self._create_interface("enp1s0", speed=1000)
+        self._create_interface("enp2s0", speed=10000)
+        interface_selector = AGWInstallerInterfaceSelector(["enp1s0", "enp2s0"])
+
+        self.assertEqual(interface_selector.select(s1="enp2s0"), ("enp1s0", "enp2s0"))
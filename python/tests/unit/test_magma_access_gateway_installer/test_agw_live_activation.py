@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, call, patch
+
+from magma_access_gateway_installer.agw_live_activation import (
+    AGWInstallerLiveActivation,
+)
+
+
+class TestAGWInstallerLiveActivation(unittest.TestCase):
+    TEST_NETPLAN_CONFIG = """network:
+  ethernets:
+    eth0:
+      dhcp4: true
+      match:
+        macaddress: aa:bb:cc:dd:ee:ff
+      set-name: eth0
+    eth1:
+      dhcp4: true
+      match:
+        macaddress: ff:ee:dd:cc:bb:aa
+      set-name: eth1
+  version: 2
+"""
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sys_class_net = os.path.join(self.tempdir.name, "net")
+        self.sys_module = os.path.join(self.tempdir.name, "module")
+        self.reboot_required_file = os.path.join(self.tempdir.name, "reboot-required")
+        self.reboot_required_packages_file = os.path.join(
+            self.tempdir.name, "reboot-required.pkgs"
+        )
+        self.netplan_config_file = os.path.join(self.tempdir.name, "99-magma-config.yaml")
+        os.makedirs(self.sys_class_net)
+        os.makedirs(self.sys_module)
+        with open(self.netplan_config_file, "w") as netplan_config:
+            netplan_config.write(self.TEST_NETPLAN_CONFIG)
+        self.patches = [
+            patch.object(AGWInstallerLiveActivation, "SYS_CLASS_NET", self.sys_class_net),
+            patch.object(AGWInstallerLiveActivation, "SYS_MODULE", self.sys_module),
+            patch.object(
+                AGWInstallerLiveActivation, "REBOOT_REQUIRED_FILE", self.reboot_required_file
+            ),
+            patch.object(
+                AGWInstallerLiveActivation,
+                "REBOOT_REQUIRED_PACKAGES_FILE",
+                self.reboot_required_packages_file,
+            ),
+            patch.object(
+                AGWInstallerLiveActivation, "MAGMA_NETPLAN_CONFIG_FILE", self.netplan_config_file
+            ),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+        self.live_activation = AGWInstallerLiveActivation(["gtp_br0", "uplink_br0"])
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    def _create_interface(self, name: str, mac_address: str = "00:00:00:00:00:00"):
+        os.makedirs(os.path.join(self.sys_class_net, name))
+        with open(os.path.join(self.sys_class_net, name, "address"), "w") as address:
+            address.write(f"{mac_address}\n")
+
+    def _load_module(self, name: str, srcversion: str = "ABCDEF0123456789"):
+        os.makedirs(os.path.join(self.sys_module, name))
+        with open(os.path.join(self.sys_module, name, "srcversion"), "w") as module_srcversion:
+            module_srcversion.write(f"{srcversion}\n")
+
+    @patch("magma_access_gateway_installer.agw_live_activation.check_output")
+    def test_given_interfaces_already_named_and_nothing_pending_when_get_reboot_reasons_then_no_reasons_are_returned(  # noqa: E501
+        self, mock_check_output
+    ):
+        self._create_interface("eth0", "aa:bb:cc:dd:ee:ff")
+        self._create_interface("eth1", "FF:EE:DD:CC:BB:AA")
+        self._load_module("openvswitch")
+        mock_check_output.return_value = b"ABCDEF0123456789\n"
+
+        self.assertEqual(self.live_activation.get_reboot_reasons(), [])
+
+    def test_given_interface_pending_netplan_rename_when_get_reboot_reasons_then_rename_is_returned(  # noqa: E501
+        self,
+    ):
+        self._create_interface("enp1s0", "aa:bb:cc:dd:ee:ff")
+        self._create_interface("eth1", "ff:ee:dd:cc:bb:aa")
+
+        self.assertEqual(
+            self.live_activation.get_reboot_reasons(),
+            ["Interface enp1s0 is renamed to eth0 on the next boot."],
+        )
+
+    def test_given_reboot_required_by_new_kernel_when_get_reboot_reasons_then_packages_are_returned(  # noqa: E501
+        self,
+    ):
+        with open(self.reboot_required_file, "w") as reboot_required:
+            reboot_required.write("*** System restart required ***\n")
+        with open(self.reboot_required_packages_file, "w") as reboot_required_packages:
+            reboot_required_packages.write("linux-base\nlinux-base\n")
+
+        self.assertEqual(
+            self.live_activation.get_reboot_reasons(),
+            ["Packages require a reboot: linux-base."],
+        )
+
+    @patch("magma_access_gateway_installer.agw_live_activation.check_output")
+    def test_given_loaded_module_differs_from_installed_one_when_get_reboot_reasons_then_stale_module_is_returned(  # noqa: E501
+        self, mock_check_output
+    ):
+        self._load_module("openvswitch", "ABCDEF0123456789")
+        mock_check_output.return_value = b"9876543210FEDCBA\n"
+
+        self.assertEqual(
+            self.live_activation.get_reboot_reasons(),
+            ["Loaded openvswitch kernel module differs from the installed one."],
+        )
+
+    @patch("magma_access_gateway_installer.agw_live_activation.AGWInstallerInterfaceActivator")
+    @patch("magma_access_gateway_installer.agw_live_activation.check_call")
+    def test_given_module_not_loaded_and_service_inactive_when_activate_then_module_is_loaded_and_service_started(  # noqa: E501
+        self, mock_check_call, mock_interface_activator
+    ):
+        mock_interface_activator.return_value.activate.return_value = {
+            "gtp_br0": {"up": True},
+            "uplink_br0": {"up": True},
+        }
+        mock_check_call.side_effect = lambda command: (
+            self._load_module("openvswitch") if command[0] == "modprobe" else None
+        )
+        self._create_interface("gtp_br0")
+        self._create_interface("uplink_br0")
+
+        with patch.object(
+            AGWInstallerLiveActivation,
+            "_service_is_active",
+            Mock(side_effect=[True, False, True, True]),
+        ):
+            failures = self.live_activation.activate()
+
+        self.assertEqual(failures, [])
+        mock_check_call.assert_has_calls(
+            [call(["modprobe", "openvswitch"]), call(["systemctl", "start", "magma@magma"])]
+        )
+        mock_interface_activator.assert_called_once_with(["gtp_br0", "uplink_br0"])
+
+    @patch("magma_access_gateway_installer.agw_live_activation.AGWInstallerInterfaceActivator")
+    @patch("magma_access_gateway_installer.agw_live_activation.check_call", Mock())
+    def test_given_magma_interface_not_reported_up_when_activate_then_failure_is_returned(
+        self, mock_interface_activator
+    ):
+        mock_interface_activator.return_value.activate.return_value = {
+            "gtp_br0": {"up": True},
+            "uplink_br0": {"up": False},
+        }
+        self._load_module("openvswitch")
+        self._create_interface("gtp_br0")
+        self._create_interface("uplink_br0")
+
+        with patch.object(
+            AGWInstallerLiveActivation, "_service_is_active", Mock(return_value=True)
+        ):
+            failures = self.live_activation.activate()
+
+        self.assertEqual(failures, ["Interface uplink_br0 is not up."])
+
+    @patch("magma_access_gateway_installer.agw_live_activation.call", Mock(return_value=0))
+    def test_given_missing_magma_interface_when_verify_then_failure_is_returned(self):
+        self._load_module("openvswitch")
+        self._create_interface("gtp_br0")
+
+        self.assertEqual(self.live_activation.verify(), ["Interface uplink_br0 doesn't exist."])
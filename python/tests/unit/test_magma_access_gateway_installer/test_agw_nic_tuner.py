@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from subprocess import CalledProcessError
+from unittest.mock import Mock, PropertyMock, call, patch
+
+from magma_access_gateway_installer.agw_nic_tuner import AGWInstallerNICTuner
+
+
+class TestAGWInstallerNICTuner(unittest.TestCase):
+    TEST_INTERFACE = "eth0"
+    TEST_MAC_ADDRESS = "aa:bb:cc:dd:ee:ff"
+    ETHTOOL_CHANNELS = b"""Channel parameters for eth0:
+Pre-set maximums:
+RX:		0
+TX:		0
+Other:		1
+Combined:	8
+Current hardware settings:
+RX:		0
+TX:		0
+Other:		1
+Combined:	1
+"""
+    ETHTOOL_RINGS = b"""Ring parameters for eth0:
+Pre-set maximums:
+RX:		4096
+RX Mini:	0
+RX Jumbo:	0
+TX:		4096
+Current hardware settings:
+RX:		256
+RX Mini:	0
+RX Jumbo:	0
+TX:		256
+"""
+    ETHTOOL_FEATURES = b"""Features for eth0:
+rx-checksumming: on
+tx-checksumming: on
+  tx-checksum-ipv4: off [fixed]
+scatter-gather: on
+tcp-segmentation-offload: on
+generic-segmentation-offload: on
+generic-receive-offload: off
+large-receive-offload: off [fixed]
+"""
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sys_class_net = os.path.join(self.tempdir.name, "sys", "class", "net")
+        self.proc_irq = os.path.join(self.tempdir.name, "proc", "irq")
+        interface_dir = os.path.join(self.sys_class_net, self.TEST_INTERFACE)
+        os.makedirs(os.path.join(interface_dir, "device", "msi_irqs"))
+        self._write(os.path.join(interface_dir, "address"), self.TEST_MAC_ADDRESS)
+        self._write(os.path.join(interface_dir, "device", "numa_node"), "-1")
+        self._write(os.path.join(interface_dir, "device", "local_cpulist"), "0-3")
+        for irq in [30, 31, 32]:
+            self._write(os.path.join(interface_dir, "device", "msi_irqs", str(irq)), "msix")
+            self._write(os.path.join(self.proc_irq, str(irq), "smp_affinity_list"), "0")
+        for queue in ["rx-0", "tx-0", "tx-1"]:
+            mask_file = "rps_cpus" if queue.startswith("rx") else "xps_cpus"
+            self._write(os.path.join(interface_dir, "queues", queue, mask_file), "00000000")
+        self.nic_tuner = AGWInstallerNICTuner([self.TEST_INTERFACE])
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    @staticmethod
+    def _write(path: str, content: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(content)
+
+    def _patch_sys_class_net(self):
+        return patch.object(AGWInstallerNICTuner, "SYS_CLASS_NET", self.sys_class_net)
+
+    def _patch_proc_irq(self):
+        return patch.object(AGWInstallerNICTuner, "PROC_IRQ", self.proc_irq)
+
+    def _ethtool_output(self, command: list):
+        return {
+            "-l": self.ETHTOOL_CHANNELS,
+            "-g": self.ETHTOOL_RINGS,
+            "-k": self.ETHTOOL_FEATURES,
+        }[command[1]]
+
+    @patch("magma_access_gateway_installer.agw_nic_tuner.check_output")
+    def test_given_interface_with_multiqueue_nic_when_probe_interface_then_channels_rings_offloads_numa_node_and_irqs_are_reported(  # noqa: E501
+        self, mocked_check_output
+    ):
+        mocked_check_output.side_effect = self._ethtool_output
+        with self._patch_sys_class_net(), self._patch_proc_irq():
+            capabilities = self.nic_tuner.probe_interface(self.TEST_INTERFACE)
+
+        self.assertEqual(capabilities["mac_address"], self.TEST_MAC_ADDRESS)
+        self.assertEqual(capabilities["max_combined"], 8)
+        self.assertEqual(capabilities["combined"], 1)
+        self.assertEqual(capabilities["max_rx_ring"], 4096)
+        self.assertEqual(capabilities["rx_ring"], 256)
+        self.assertEqual(capabilities["max_tx_ring"], 4096)
+        self.assertEqual(capabilities["tx_ring"], 256)
+        self.assertEqual(
+            capabilities["offloads"], {"rx": "on", "tx": "on", "gso": "on", "gro": "off"}
+        )
+        self.assertEqual(capabilities["numa_node"], 0)
+        self.assertEqual(capabilities["local_cpus"], [0, 1, 2, 3])
+        self.assertEqual(capabilities["irqs"], [30, 31, 32])
+        self.assertEqual(capabilities["tx_queues"], ["tx-0", "tx-1"])
+
+    @patch("magma_access_gateway_installer.agw_nic_tuner.check_output")
+    def test_given_nic_not_supporting_channels_and_rings_when_probe_interface_then_channels_and_rings_are_not_reported(  # noqa: E501
+        self, mocked_check_output
+    ):
+        mocked_check_output.side_effect = CalledProcessError(1, "ethtool")
+        with self._patch_sys_class_net(), self._patch_proc_irq():
+            capabilities = self.nic_tuner.probe_interface(self.TEST_INTERFACE)
+
+        self.assertIsNone(capabilities["max_combined"])
+        self.assertIsNone(capabilities["max_rx_ring"])
+        self.assertEqual(capabilities["offloads"], {})
+
+    def test_given_nic_capabilities_when_compute_targets_then_queues_are_limited_to_local_cpus_and_rings_are_maximized(  # noqa: E501
+        self,
+    ):
+        capabilities = {
+            "mac_address": self.TEST_MAC_ADDRESS,
+            "max_combined": 8,
+            "max_rx_ring": 4096,
+            "max_tx_ring": 2048,
+            "local_cpus": [0, 1, 2, 3, 32],
+        }
+
+        targets = self.nic_tuner.compute_targets(capabilities)
+
+        self.assertEqual(targets["combined"], 5)
+        self.assertEqual(targets["rx_ring"], 4096)
+        self.assertEqual(targets["tx_ring"], 2048)
+        self.assertEqual(targets["offloads"], {"rx": "on", "tx": "on", "gso": "on", "gro": "on"})
+        self.assertEqual(targets["rps_mask"], "00000001,0000000f")
+        self.assertEqual(
+            targets["xps_masks"],
+            ["00000001", "00000002", "00000004", "00000008", "00000001,00000000"],
+        )
+
+    @patch("magma_access_gateway_installer.agw_nic_tuner.call", Mock(return_value=0))
+    @patch("magma_access_gateway_installer.agw_nic_tuner.check_call")
+    @patch("magma_access_gateway_installer.agw_nic_tuner.check_output")
+    def test_given_interface_when_tune_nics_then_tuning_script_and_service_are_written_and_service_is_enabled(  # noqa: E501
+        self, mocked_check_output, mocked_check_call
+    ):
+        mocked_check_output.side_effect = self._ethtool_output
+        script_path = os.path.join(self.tempdir.name, "magma-nic-tuning.sh")
+        service_path = os.path.join(self.tempdir.name, "magma-nic-tuning.service")
+        with self._patch_sys_class_net(), self._patch_proc_irq(), patch.object(
+            AGWInstallerNICTuner, "NIC_TUNING_SCRIPT", script_path
+        ), patch.object(AGWInstallerNICTuner, "NIC_TUNING_SERVICE_FILE", service_path):
+            self.nic_tuner.tune_nics()
+
+        with open(script_path, "r") as script:
+            script_content = script.read()
+        with open(service_path, "r") as service:
+            service_content = service.read()
+        self.assertIn(f'grep -q -i -x "{self.TEST_MAC_ADDRESS}"', script_content)
+        self.assertIn('ethtool -L "$iface" combined 4', script_content)
+        self.assertIn('ethtool -G "$iface" rx 4096 tx 4096', script_content)
+        self.assertIn('ethtool -K "$iface" rx on tx on gso on gro on', script_content)
+        self.assertIn("cpus=(0 1 2 3)", script_content)
+        self.assertIn("echo 0000000f >", script_content)
+        self.assertIn("xps_masks=(00000001 00000002 00000004 00000008)", script_content)
+        self.assertIn(f"ExecStart=/bin/bash {script_path}", service_content)
+        mocked_check_call.assert_has_calls(
+            [
+                call(["systemctl", "disable", "--now", "irqbalance"]),
+                call(["systemctl", "daemon-reload"]),
+                call(["systemctl", "enable", "magma-nic-tuning"]),
+                call(["systemctl", "restart", "magma-nic-tuning"]),
+            ]
+        )
+
+    @patch("magma_access_gateway_installer.agw_nic_tuner.call", Mock(return_value=1))
+    @patch("magma_access_gateway_installer.agw_nic_tuner.check_call")
+    def test_given_irqbalance_not_installed_when_disable_irqbalance_then_it_is_not_disabled(
+        self, mocked_check_call
+    ):
+        self.nic_tuner._disable_irqbalance()
+
+        mocked_check_call.assert_not_called()
+
+    @patch("magma_access_gateway_installer.agw_nic_tuner.check_output")
+    def test_given_untuned_interface_when_verify_then_mismatched_settings_are_returned(
+        self, mocked_check_output
+    ):
+        mocked_check_output.side_effect = self._ethtool_output
+        with self._patch_sys_class_net(), self._patch_proc_irq():
+            targets = {
+                self.TEST_INTERFACE: self.nic_tuner.compute_targets(
+                    self.nic_tuner.probe_interface(self.TEST_INTERFACE)
+                )
+            }
+            mismatches = self.nic_tuner.verify(targets)
+
+        self.assertEqual(
+            mismatches,
+            [
+                "eth0 combined queues",
+                "eth0 RX ring",
+                "eth0 TX ring",
+                "eth0 gro",
+                "eth0 IRQ 31 affinity",
+                "eth0 IRQ 32 affinity",
+                "eth0 rx-0 RPS mask",
+                "eth0 tx-0 XPS mask",
+                "eth0 tx-1 XPS mask",
+            ],
+        )
+
+    @patch(
+        "magma_access_gateway_installer.agw_nic_tuner.AGWInstallerNICTuner.probe_interface",
+    )
+    @patch(
+        "magma_access_gateway_installer.agw_nic_tuner.AGWInstallerNICTuner.PROC_IRQ",
+        new_callable=PropertyMock,
+    )
+    def test_given_tuned_interface_when_verify_then_no_mismatches_are_returned(
+        self, mocked_proc_irq, mocked_probe_interface
+    ):
+        mocked_proc_irq.return_value = self.proc_irq
+        interface_dir = os.path.join(self.sys_class_net, self.TEST_INTERFACE)
+        for irq, cpu in [(30, "0"), (31, "1"), (32, "2")]:
+            self._write(os.path.join(self.proc_irq, str(irq), "smp_affinity_list"), cpu)
+        self._write(os.path.join(interface_dir, "queues", "rx-0", "rps_cpus"), "0000000f")
+        self._write(os.path.join(interface_dir, "queues", "tx-0", "xps_cpus"), "00000001")
+        self._write(os.path.join(interface_dir, "queues", "tx-1", "xps_cpus"), "00000002")
+        mocked_probe_interface.return_value = {
+            "combined": 4,
+            "rx_ring": 4096,
+            "tx_ring": 4096,
+            "offloads": {"rx": "on", "tx": "on", "gso": "on", "gro": "on"},
+            "irqs": [30, 31, 32],
+            "rx_queues": ["rx-0"],
+            "tx_queues": ["tx-0", "tx-1"],
+        }
+        targets = {
+            self.TEST_INTERFACE: {
+                "mac_address": self.TEST_MAC_ADDRESS,
+                "combined": 4,
+                "rx_ring": 4096,
+                "tx_ring": 4096,
+                "offloads": {"rx": "on", "tx": "on", "gso": "on", "gro": "on"},
+                "cpus": [0, 1, 2, 3],
+                "rps_mask": "0000000f",
+                "xps_masks": ["00000001", "00000002", "00000004", "00000008"],
+            }
+        }
+
+        with patch.object(AGWInstallerNICTuner, "SYS_CLASS_NET", self.sys_class_net):
+            self.assertEqual(self.nic_tuner.verify(targets), [])
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import yaml
+
+from magma_access_gateway_installer.agw_installation_errors import OfflineBundleError
+from magma_access_gateway_installer.agw_offline_bundle import (
+    AGWInstallerOfflineBundle,
+)
+
+
+class TestAGWInstallerOfflineBundle(unittest.TestCase):
+    TEST_MAGMA_VERSION = "focal-1.8.0"
+    TEST_FINGERPRINT = "0123456789ABCDEF0123456789ABCDEF01234567"
+    GPG_SHOW_KEYS_OUTPUT = f"fpr:::::::::{TEST_FINGERPRINT}:\n".encode()
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.bundle_path = os.path.join(self.tempdir.name, "bundle.tar.gz")
+        self.bundle_dir = os.path.join(self.tempdir.name, "magma-agw-bundle")
+        self.magma_apt_repository_config_file = os.path.join(self.tempdir.name, "magma.list")
+        self.magma_apt_repository_config_backup_file = os.path.join(
+            self.tempdir.name, "magma.list.bak"
+        )
+        self.offline_apt_config_file = os.path.join(self.tempdir.name, "99magma-offline-bundle")
+        self.patches = [
+            patch.object(AGWInstallerOfflineBundle, "BUNDLE_DIR", self.bundle_dir),
+            patch.object(
+                AGWInstallerOfflineBundle,
+                "MAGMA_APT_REPOSITORY_CONFIG_FILE",
+                self.magma_apt_repository_config_file,
+            ),
+            patch.object(
+                AGWInstallerOfflineBundle,
+                "MAGMA_APT_REPOSITORY_CONFIG_BACKUP_FILE",
+                self.magma_apt_repository_config_backup_file,
+            ),
+            patch.object(
+                AGWInstallerOfflineBundle, "OFFLINE_APT_CONFIG_FILE", self.offline_apt_config_file
+            ),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    def _write_bundle(self, entries: dict):
+        with tarfile.open(self.bundle_path, "w:gz") as bundle:
+            for name, content in entries.items():
+                tar_info = tarfile.TarInfo(name)
+                tar_info.size = len(content)
+                bundle.addfile(tar_info, io.BytesIO(content))
+
+    def _write_valid_bundle(self, magma_version: str = TEST_MAGMA_VERSION):
+        manifest = {
+            "magma_version": magma_version,
+            "key_fingerprint": self.TEST_FINGERPRINT,
+            "packages": ["magma_1.8.0_amd64.deb"],
+        }
+        self._write_bundle(
+            {
+                "./bundle.yaml": yaml.safe_dump(manifest).encode(),
+                "./magma-bundle-keyring.gpg": b"keyring",
+                "./magma_1.8.0_amd64.deb": b"deb",
+            }
+        )
+
+    @patch("magma_access_gateway_installer.agw_offline_bundle.check_output")
+    def test_given_valid_bundle_when_configure_apt_source_then_bundle_is_extracted_and_configured_as_the_only_apt_source(  # noqa: E501
+        self, mock_check_output
+    ):
+        mock_check_output.return_value = self.GPG_SHOW_KEYS_OUTPUT
+        self._write_valid_bundle()
+
+        AGWInstallerOfflineBundle(self.bundle_path).configure_apt_source(
+            self.TEST_MAGMA_VERSION, self.TEST_FINGERPRINT.lower()
+        )
+
+        self.assertTrue(os.path.isfile(os.path.join(self.bundle_dir, "magma_1.8.0_amd64.deb")))
+        with open(self.magma_apt_repository_config_file, "r") as magma_apt_repo:
+            self.assertEqual(
+                magma_apt_repo.read(),
+                f"deb [signed-by={self.bundle_dir}/magma-bundle-keyring.gpg] "
+                f"file:{self.bundle_dir} ./",
+            )
+        with open(self.offline_apt_config_file, "r") as offline_apt_config:
+            self.assertIn(
+                f'Dir::Etc::sourcelist "{self.magma_apt_repository_config_file}";',
+                offline_apt_config.read(),
+            )
+
+    @patch("magma_access_gateway_installer.agw_offline_bundle.check_output")
+    def test_given_bundle_for_different_magma_version_when_configure_apt_source_then_offline_bundle_error_is_raised(  # noqa: E501
+        self, mock_check_output
+    ):
+        mock_check_output.return_value = self.GPG_SHOW_KEYS_OUTPUT
+        self._write_valid_bundle(magma_version="focal-1.7.0")
+
+        with self.assertRaises(OfflineBundleError):
+            AGWInstallerOfflineBundle(self.bundle_path).configure_apt_source(
+                self.TEST_MAGMA_VERSION, self.TEST_FINGERPRINT
+            )
+
+        self.assertFalse(os.path.exists(self.magma_apt_repository_config_file))
+
+    @patch("magma_access_gateway_installer.agw_offline_bundle.check_output")
+    def test_given_bundle_signed_with_unexpected_key_when_configure_apt_source_then_offline_bundle_error_is_raised(  # noqa: E501
+        self, mock_check_output
+    ):
+        mock_check_output.return_value = self.GPG_SHOW_KEYS_OUTPUT
+        self._write_valid_bundle()
+
+        with self.assertRaises(OfflineBundleError):
+            AGWInstallerOfflineBundle(self.bundle_path).configure_apt_source(
+                self.TEST_MAGMA_VERSION, "FEDCBA9876543210FEDCBA9876543210FEDCBA98"
+            )
+
+    @patch("magma_access_gateway_installer.agw_offline_bundle.check_output")
+    def test_given_no_key_fingerprint_when_configure_apt_source_then_offline_bundle_error_is_raised_and_bundle_is_not_trusted(  # noqa: E501
+        self, mock_check_output
+    ):
+        mock_check_output.return_value = self.GPG_SHOW_KEYS_OUTPUT
+        self._write_valid_bundle()
+
+        with self.assertRaises(OfflineBundleError):
+            AGWInstallerOfflineBundle(self.bundle_path).configure_apt_source(
+                self.TEST_MAGMA_VERSION, ""
+            )
+
+        self.assertFalse(os.path.exists(self.magma_apt_repository_config_file))
+        self.assertFalse(os.path.exists(self.offline_apt_config_file))
+
+    def test_given_bundle_with_entry_outside_of_bundle_dir_when_configure_apt_source_then_offline_bundle_error_is_raised(  # noqa: E501
+        self,
+    ):
+        self._write_bundle({"../evil.sh": b"rm -rf /"})
+
+        with self.assertRaises(OfflineBundleError):
+            AGWInstallerOfflineBundle(self.bundle_path).configure_apt_source(
+                self.TEST_MAGMA_VERSION, self.TEST_FINGERPRINT
+            )
+
+        self.assertFalse(os.path.exists(os.path.join(self.tempdir.name, "evil.sh")))
+
+    def test_given_offline_apt_config_when_restore_apt_sources_then_offline_apt_config_is_removed(  # noqa: E501
+        self,
+    ):
+        with open(self.offline_apt_config_file, "w") as offline_apt_config:
+            offline_apt_config.write('Dir::Etc::sourceparts "-";\n')
+
+        AGWInstallerOfflineBundle(self.bundle_path).restore_apt_sources()
+
+        self.assertFalse(os.path.exists(self.offline_apt_config_file))
+
+    @patch("magma_access_gateway_installer.agw_offline_bundle.check_output")
+    def test_given_magma_apt_source_configured_before_bundle_when_restore_apt_sources_then_original_magma_apt_source_is_restored(  # noqa: E501
+        self, mock_check_output
+    ):
+        mock_check_output.return_value = self.GPG_SHOW_KEYS_OUTPUT
+        self._write_valid_bundle()
+        artifactory_source = "deb https://artifactory.magmacore.org/artifactory/debian-test focal-1.8.0 main"  # noqa: E501
+        with open(self.magma_apt_repository_config_file, "w") as magma_apt_repo:
+            magma_apt_repo.write(artifactory_source)
+        offline_bundle = AGWInstallerOfflineBundle(self.bundle_path)
+        offline_bundle.configure_apt_source(self.TEST_MAGMA_VERSION, self.TEST_FINGERPRINT)
+        offline_bundle.configure_apt_source(self.TEST_MAGMA_VERSION, self.TEST_FINGERPRINT)
+
+        offline_bundle.restore_apt_sources()
+
+        with open(self.magma_apt_repository_config_file, "r") as magma_apt_repo:
+            self.assertEqual(magma_apt_repo.read(), artifactory_source)
+        self.assertFalse(os.path.exists(self.magma_apt_repository_config_backup_file))
+
+    @patch("magma_access_gateway_installer.agw_offline_bundle.check_output")
+    def test_given_no_magma_apt_source_configured_before_bundle_when_restore_apt_sources_then_bundle_apt_source_is_removed(  # noqa: E501
+        self, mock_check_output
+    ):
+        mock_check_output.return_value = self.GPG_SHOW_KEYS_OUTPUT
+        self._write_valid_bundle()
+        offline_bundle = AGWInstallerOfflineBundle(self.bundle_path)
+        offline_bundle.configure_apt_source(self.TEST_MAGMA_VERSION, self.TEST_FINGERPRINT)
+
+        offline_bundle.restore_apt_sources()
+
+        self.assertFalse(os.path.exists(self.magma_apt_repository_config_file))
+
+    @patch("magma_access_gateway_installer.agw_offline_bundle.check_output")
+    @patch("magma_access_gateway_installer.agw_offline_bundle.check_call")
+    def test_given_no_signing_key_when_build_then_signed_repository_with_manifest_is_written_using_ephemeral_key(  # noqa: E501
+        self, mock_check_call, mock_check_output
+    ):
+        def check_call(command: list, env: dict = None):  # type: ignore[assignment]
+            if command[0] == "apt-get":
+                archives_dir = command[command.index("install") - 1].split("=", 1)[1]
+                with open(os.path.join(archives_dir, "magma_1.8.0_amd64.deb"), "wb") as deb:
+                    deb.write(b"deb")
+            elif "--output" in command:
+                with open(command[command.index("--output") + 1], "wb") as gpg_output:
+                    gpg_output.write(b"gpg")
+
+        def check_output(command: list, cwd: str = None):  # type: ignore[assignment]
+            return self.GPG_SHOW_KEYS_OUTPUT if command[0] == "gpg" else command[-2].encode()
+
+        mock_check_call.side_effect = check_call
+        mock_check_output.side_effect = check_output
+
+        fingerprint = AGWInstallerOfflineBundle(self.bundle_path).build(
+            self.TEST_MAGMA_VERSION, ["magma", "ethtool"]
+        )
+
+        self.assertEqual(fingerprint, self.TEST_FINGERPRINT)
+        with tarfile.open(self.bundle_path, "r:gz") as bundle:
+            names = {os.path.normpath(name) for name in bundle.getnames()}
+            manifest = yaml.safe_load(bundle.extractfile("./bundle.yaml"))  # type: ignore[arg-type]  # noqa: E501
+        self.assertTrue(
+            {
+                "Packages",
+                "Release",
+                "InRelease",
+                "Release.gpg",
+                "magma-bundle-keyring.gpg",
+                "magma_1.8.0_amd64.deb",
+            }.issubset(names)
+        )
+        self.assertNotIn("partial", names)
+        self.assertEqual(
+            manifest,
+            {
+                "magma_version": self.TEST_MAGMA_VERSION,
+                "key_fingerprint": self.TEST_FINGERPRINT,
+                "packages": ["magma_1.8.0_amd64.deb"],
+            },
+        )
+        key_generation_call = next(
+            call for call in mock_check_call.call_args_list if "--quick-gen-key" in call.args[0]
+        )
+        self.assertIn("GNUPGHOME", key_generation_call.kwargs["env"])
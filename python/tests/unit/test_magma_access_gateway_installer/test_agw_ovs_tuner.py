@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import yaml
+
+from magma_access_gateway_installer.agw_ovs_tuner import AGWInstallerOVSTuner
+
+
+class TestAGWInstallerOVSTuner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.ovs_tuning_file = os.path.join(self.tempdir.name, "magma", "ovs_tuning.yml")
+        self.patcher = patch.object(AGWInstallerOVSTuner, "OVS_TUNING_FILE", self.ovs_tuning_file)
+        self.patcher.start()
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        self.tempdir.cleanup()
+
+    def test_given_dual_core_host_and_default_subscribers_when_compute_other_config_then_ovs_defaults_are_kept_for_flow_limit_and_max_idle(  # noqa: E501
+        self,
+    ):
+        self.assertEqual(
+            AGWInstallerOVSTuner(1000, cpus=2).compute_other_config(),
+            {
+                "n-handler-threads": "1",
+                "n-revalidator-threads": "1",
+                "flow-limit": "200000",
+                "max-idle": "10000",
+            },
+        )
+
+    def test_given_large_host_and_many_subscribers_when_compute_other_config_then_threads_and_flow_limit_are_capped(  # noqa: E501
+        self,
+    ):
+        self.assertEqual(
+            AGWInstallerOVSTuner(50000, cpus=32).compute_other_config(),
+            {
+                "n-handler-threads": "8",
+                "n-revalidator-threads": "4",
+                "flow-limit": "2000000",
+                "max-idle": "2000",
+            },
+        )
+
+    @patch("magma_access_gateway_installer.agw_ovs_tuner.check_call")
+    def test_given_ovs_running_when_tune_ovs_then_other_config_is_set_and_stored_for_post_install_checks(  # noqa: E501
+        self, mocked_check_call
+    ):
+        AGWInstallerOVSTuner(4000, cpus=8).tune_ovs()
+
+        mocked_check_call.assert_called_once_with(
+            [
+                "ovs-vsctl",
+                "set",
+                "Open_vSwitch",
+                ".",
+                "other_config:n-handler-threads=5",
+                "other_config:n-revalidator-threads=3",
+                "other_config:flow-limit=400000",
+                "other_config:max-idle=2500",
+            ]
+        )
+        with open(self.ovs_tuning_file, "r") as ovs_tuning_file:
+            self.assertEqual(
+                yaml.safe_load(ovs_tuning_file),
+                {
+                    "other_config": {
+                        "n-handler-threads": "5",
+                        "n-revalidator-threads": "3",
+                        "flow-limit": "400000",
+                        "max-idle": "2500",
+                    }
+                },
+            )
+
+    @patch("magma_access_gateway_installer.agw_ovs_tuner.check_output")
+    def test_given_values_reported_by_ovs_when_report_then_only_mismatched_settings_are_returned(  # noqa: E501
+        self, mocked_check_output
+    ):
+        current_values = {
+            "other_config:n-handler-threads": b'"5"\n',
+            "other_config:n-revalidator-threads": b'"3"\n',
+            "other_config:flow-limit": b"\n",
+            "other_config:max-idle": b'"2500"\n',
+        }
+        mocked_check_output.side_effect = lambda command: current_values[command[-1]]
+
+        self.assertEqual(AGWInstallerOVSTuner(4000, cpus=8).report(), ["flow-limit"])
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import hashlib
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from magma_access_gateway_installer.agw_package_downloader import (
+    AGWInstallerPackageDownloader,
+)
+
+
+class MirrorStandInHandler(BaseHTTPRequestHandler):
+    """Serves files of a mirror stand-in, optionally delayed or stalled after headers."""
+
+    def do_GET(self):  # noqa: N802
+        content = self.server.files.get(self.path)  # type: ignore[attr-defined]
+        time.sleep(self.server.delay)  # type: ignore[attr-defined]
+        if content is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if self.server.stall:  # type: ignore[attr-defined]
+            self.wfile.write(content[:1])
+            self.wfile.flush()
+            self.server.release.wait()  # type: ignore[attr-defined]
+            return
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class MirrorStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, files: dict, delay: float = 0, stall: bool = False):
+        super().__init__(("127.0.0.1", 0), MirrorStandInHandler)
+        self.files = files
+        self.delay = delay
+        self.stall = stall
+        self.release = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/ubuntu"
+
+
+class TestAGWInstallerPackageDownloader(unittest.TestCase):
+    PROBE_PATH = "dists/focal/Release"
+    PACKAGE_PATH = "pool/main/e/ethtool/ethtool_5.4-1_amd64.deb"
+    PACKAGE_CONTENT = b"ethtool package content" * 100
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch.object(AGWInstallerPackageDownloader, "APT_ARCHIVES_DIR", self.tempdir.name),
+            patch.object(AGWInstallerPackageDownloader, "STALL_TIMEOUT", 0.5),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    def _start_mirror(
+        self, files: dict = None, **kwargs  # type: ignore[assignment]
+    ) -> MirrorStandIn:
+        default_files = {
+            f"/ubuntu/{self.PROBE_PATH}": b"Release" * 1000,
+            f"/ubuntu/{self.PACKAGE_PATH}": self.PACKAGE_CONTENT,
+        }
+        mirror = MirrorStandIn(files or default_files, **kwargs)
+        threading.Thread(target=mirror.serve_forever, daemon=True).start()
+        self.addCleanup(mirror.server_close)
+        self.addCleanup(mirror.shutdown)
+        self.addCleanup(mirror.release.set)
+        return mirror
+
+    @staticmethod
+    def _unreachable_mirror_url() -> str:
+        with socket.socket() as unused_socket:
+            unused_socket.bind(("127.0.0.1", 0))
+            return f"http://127.0.0.1:{unused_socket.getsockname()[1]}/ubuntu"
+
+    def _print_uris_output(self, mirror_url: str, content: bytes = PACKAGE_CONTENT) -> bytes:
+        return (
+            f"'{mirror_url}/{self.PACKAGE_PATH}' ethtool_5.4-1_amd64.deb {len(content)} "
+            f"SHA256:{hashlib.sha256(content).hexdigest()}\n"
+        ).encode()
+
+    def _package_downloader(self, mirrors: list) -> AGWInstallerPackageDownloader:
+        return AGWInstallerPackageDownloader(
+            {AGWInstallerPackageDownloader.UBUNTU_REPOSITORY: mirrors},
+            {AGWInstallerPackageDownloader.UBUNTU_REPOSITORY: self.PROBE_PATH},
+            connections=2,
+        )
+
+    def test_given_fast_slow_and_unreachable_mirrors_when_select_mirrors_then_mirrors_are_ranked_by_speed_and_unreachable_is_dropped(  # noqa: E501
+        self,
+    ):
+        slow_mirror = self._start_mirror(delay=0.2)
+        fast_mirror = self._start_mirror()
+        unreachable_mirror_url = self._unreachable_mirror_url()
+        package_downloader = self._package_downloader(
+            [unreachable_mirror_url, slow_mirror.url, fast_mirror.url]
+        )
+
+        probe_results = package_downloader.select_mirrors()
+
+        self.assertEqual(
+            package_downloader.ranked_mirrors[AGWInstallerPackageDownloader.UBUNTU_REPOSITORY],
+            [fast_mirror.url, slow_mirror.url],
+        )
+        self.assertFalse(
+            probe_results[AGWInstallerPackageDownloader.UBUNTU_REPOSITORY][-1]["reachable"]
+        )
+        self.assertEqual(
+            package_downloader.best_mirror(
+                AGWInstallerPackageDownloader.UBUNTU_REPOSITORY, "default"
+            ),
+            fast_mirror.url,
+        )
+
+    def test_given_no_reachable_mirror_when_best_mirror_then_default_is_returned(self):
+        package_downloader = self._package_downloader([self._unreachable_mirror_url()])
+
+        package_downloader.select_mirrors()
+
+        self.assertEqual(
+            package_downloader.best_mirror(
+                AGWInstallerPackageDownloader.UBUNTU_REPOSITORY, "default"
+            ),
+            "default",
+        )
+
+    @patch("magma_access_gateway_installer.agw_package_downloader.check_output")
+    def test_given_best_mirror_stalls_when_prefetch_then_package_is_downloaded_from_next_mirror(
+        self, mock_check_output
+    ):
+        stalled_mirror = self._start_mirror(stall=True)
+        healthy_mirror = self._start_mirror()
+        package_downloader = self._package_downloader([stalled_mirror.url, healthy_mirror.url])
+        package_downloader.ranked_mirrors[AGWInstallerPackageDownloader.UBUNTU_REPOSITORY] = [
+            stalled_mirror.url,
+            healthy_mirror.url,
+        ]
+        mock_check_output.return_value = self._print_uris_output(stalled_mirror.url)
+
+        failed = package_downloader.prefetch(["ethtool"])
+
+        self.assertEqual(failed, [])
+        with open(os.path.join(self.tempdir.name, "ethtool_5.4-1_amd64.deb"), "rb") as package:
+            self.assertEqual(package.read(), self.PACKAGE_CONTENT)
+
+    @patch("magma_access_gateway_installer.agw_package_downloader.check_output")
+    def test_given_mirror_serving_corrupted_package_when_prefetch_then_package_is_downloaded_from_next_mirror(  # noqa: E501
+        self, mock_check_output
+    ):
+        corrupted_content = self.PACKAGE_CONTENT.replace(b"ethtool", b"corrupt")
+        corrupted_mirror = self._start_mirror({f"/ubuntu/{self.PACKAGE_PATH}": corrupted_content})
+        healthy_mirror = self._start_mirror()
+        package_downloader = self._package_downloader([corrupted_mirror.url, healthy_mirror.url])
+        package_downloader.ranked_mirrors[AGWInstallerPackageDownloader.UBUNTU_REPOSITORY] = [
+            corrupted_mirror.url,
+            healthy_mirror.url,
+        ]
+        mock_check_output.return_value = self._print_uris_output(corrupted_mirror.url)
+
+        failed = package_downloader.prefetch(["ethtool"])
+
+        self.assertEqual(failed, [])
+        with open(os.path.join(self.tempdir.name, "ethtool_5.4-1_amd64.deb"), "rb") as package:
+            self.assertEqual(package.read(), self.PACKAGE_CONTENT)
+
+    @patch("magma_access_gateway_installer.agw_package_downloader.check_output")
+    def test_given_package_missing_on_all_mirrors_when_prefetch_then_package_is_left_for_apt(
+        self, mock_check_output
+    ):
+        empty_mirror = self._start_mirror({"/ubuntu/none": b""})
+        package_downloader = self._package_downloader([empty_mirror.url])
+        package_downloader.ranked_mirrors[AGWInstallerPackageDownloader.UBUNTU_REPOSITORY] = [
+            empty_mirror.url
+        ]
+        mock_check_output.return_value = self._print_uris_output(self._unreachable_mirror_url())
+
+        failed = package_downloader.prefetch(["ethtool"])
+
+        self.assertEqual(failed, ["ethtool_5.4-1_amd64.deb"])
+        self.assertEqual(os.listdir(self.tempdir.name), [])
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import unittest
+
+import ruamel.yaml
+
+from magma_access_gateway_installer.agw_installation_errors import (
+    PipelinedPerformanceProfileError,
+)
+from magma_access_gateway_installer.agw_pipelined_profile import (
+    AGWPipelinedPerformanceProfile,
+)
+
+
+class TestAGWPipelinedPerformanceProfile(unittest.TestCase):
+    TEST_PIPELINED_CONFIG = """# Pipeline application level configs
+static_services: [
+  # Services are listed in order of priority.
+  'arpd', 'access_control', 'ipfix', 'proxy', 'dpi',
+]
+enforcement:
+  # Poll interval for enforcement stats in seconds.
+  poll_interval: 15
+ipfix:
+  enabled: true
+  probability: 65
+"""
+
+    def setUp(self) -> None:
+        self.yaml = ruamel.yaml.YAML()
+        self.pipelined_config = self.yaml.load(self.TEST_PIPELINED_CONFIG)
+
+    def test_given_unknown_profile_name_when_agw_pipelined_performance_profile_then_pipelined_performance_profile_error_is_raised(  # noqa: E501
+        self,
+    ):
+        with self.assertRaises(PipelinedPerformanceProfileError):
+            AGWPipelinedPerformanceProfile("does-not-exist")
+
+    def test_given_profiles_shipped_with_snap_when_load_profiles_then_each_profile_has_a_version(  # noqa: E501
+        self,
+    ):
+        profiles = AGWPipelinedPerformanceProfile.load_profiles()
+
+        self.assertIn("high-throughput", profiles)
+        for profile in profiles.values():
+            self.assertIsInstance(profile["version"], int)
+
+    def test_given_high_throughput_profile_when_diff_then_changed_keys_are_listed_with_current_and_target_values(  # noqa: E501
+        self,
+    ):
+        profile = AGWPipelinedPerformanceProfile("high-throughput")
+
+        changes = profile.diff(self.pipelined_config)
+
+        self.assertIn(("enforcement.poll_interval", 15, 30), changes)
+        self.assertIn(("ipfix.enabled", True, False), changes)
+        self.assertIn(("dpi.enabled", None, False), changes)
+        self.assertIn(
+            (
+                "static_services",
+                ["arpd", "access_control", "ipfix", "proxy", "dpi"],
+                ["arpd", "access_control", "proxy"],
+            ),
+            changes,
+        )
+
+    def test_given_high_throughput_profile_when_apply_then_diff_is_empty_and_validation_passes(
+        self,
+    ):
+        profile = AGWPipelinedPerformanceProfile("high-throughput")
+
+        profile.apply(self.pipelined_config)
+
+        self.assertEqual(profile.diff(self.pipelined_config), [])
+        profile.validate(self.pipelined_config)
+
+    def test_given_high_throughput_profile_when_apply_then_unrelated_keys_are_preserved(self):
+        profile = AGWPipelinedPerformanceProfile("high-throughput")
+
+        profile.apply(self.pipelined_config)
+
+        self.assertEqual(self.pipelined_config["ipfix"]["probability"], 65)
+        self.assertEqual(self.pipelined_config["dpi"], {"enabled": False})
+
+    def test_given_pipelined_config_not_matching_profile_when_validate_then_pipelined_performance_profile_error_is_raised(  # noqa: E501
+        self,
+    ):
+        profile = AGWPipelinedPerformanceProfile("high-throughput")
+
+        with self.assertRaises(PipelinedPerformanceProfileError):
+            profile.validate(self.pipelined_config)
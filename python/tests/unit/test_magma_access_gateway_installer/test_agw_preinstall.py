@@ -2,12 +2,17 @@
 # Copyright 2022 Canonical Ltd.
 # See LICENSE file for licensing details.
 
+import os
+import tempfile
 import unittest
-from unittest.mock import PropertyMock, call, mock_open, patch
+from unittest.mock import Mock, PropertyMock, call, mock_open, patch
 
 from magma_access_gateway_installer.agw_installation_errors import (
+    ArgumentError,
+    InsufficientHardwareError,
     InvalidNumberOfInterfacesError,
     InvalidUserError,
+    PreinstallChecksError,
     UnsupportedKernelVersionError,
     UnsupportedOSError,
 )
@@ -16,8 +21,8 @@ from magma_access_gateway_installer.agw_preinstall import AGWInstallerPreinstall
 
 class TestAGWInstallerPreinstall(unittest.TestCase):
     TEST_NETWORK_INTERFACES = ["eth0", "eth1"]
-    VALID_TEST_USER = b"root"
-    INVALID_TEST_USER = b"test_user"
+    VALID_TEST_USER_ID = 0
+    INVALID_TEST_USER_ID = 1000
     INVALID_OS = """NAME="Red Hat Enterprise Linux"
 VERSION="8.4 (Ootpa)"
 ID="rhel"
@@ -39,20 +44,39 @@ VERSION_ID="20.04"
 """
     INVALID_TEST_NETWORK_INTERFACES = ["test1"]
     UNSUPPORTED_KERNEL_VERSION = "5.15.0-1045-aws"
+    MEASUREMENTS_MEETING_REQUIREMENTS = {
+        "cpus": 8,
+        "memory_gb": 15.5,
+        "free_disk_gb": 100.0,
+        "sequential_write_mb_per_s": 500.0,
+        "fsync_latency_ms": 1.5,
+    }
 
     def setUp(self) -> None:
         self.agw_preinstall = AGWInstallerPreinstall(self.TEST_NETWORK_INTERFACES)
 
     @patch(
-        "magma_access_gateway_installer.agw_preinstall.check_output",
-        return_value=INVALID_TEST_USER,
+        "magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall._kernel_version_is_supported",  # noqa: E501
+        new_callable=PropertyMock,
+    )
+    @patch(
+        "magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall._ubuntu_is_installed",  # noqa: E501
+        new_callable=PropertyMock,
+    )
+    @patch(
+        "magma_access_gateway_installer.agw_preinstall.os.geteuid",
+        return_value=INVALID_TEST_USER_ID,
     )
     def test_given_installation_user_is_not_root_when_preinstall_checks_then_invalid_user_error_is_raised(  # noqa: E501
-        self, _
+        self, _, __, ___
     ):
         with self.assertRaises(InvalidUserError):
             self.agw_preinstall.preinstall_checks()
 
+    @patch(
+        "magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall._kernel_version_is_supported",  # noqa: E501
+        new_callable=PropertyMock,
+    )
     @patch(
         "magma_access_gateway_installer.agw_preinstall.open",
         new_callable=mock_open,
@@ -63,11 +87,15 @@ VERSION_ID="20.04"
         new_callable=PropertyMock,
     )
     def test_given_os_is_not_ubuntu_when_preinstall_checks_then_unsupported_os_error_is_raised(
-        self, _, __
+        self, _, __, ___
     ):
         with self.assertRaises(UnsupportedOSError):
             self.agw_preinstall.preinstall_checks()
 
+    @patch(
+        "magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall._kernel_version_is_supported",  # noqa: E501
+        new_callable=PropertyMock,
+    )
     @patch(
         "magma_access_gateway_installer.agw_preinstall.open",
         new_callable=mock_open,
@@ -78,7 +106,7 @@ VERSION_ID="20.04"
         new_callable=PropertyMock,
     )
     def test_given_os_is_ubuntu_in_unsupported_version_when_preinstall_checks_then_unsupported_os_error_is_raised(  # noqa: E501
-        self, _, __
+        self, _, __, ___
     ):
         with self.assertRaises(UnsupportedOSError):
             self.agw_preinstall.preinstall_checks()
@@ -92,8 +120,8 @@ VERSION_ID="20.04"
         new_callable=PropertyMock,
     )
     @patch(
-        "magma_access_gateway_installer.agw_preinstall.check_output",
-        return_value=UNSUPPORTED_KERNEL_VERSION.encode("utf-8"),
+        "magma_access_gateway_installer.agw_preinstall.os.uname",
+        return_value=Mock(release=UNSUPPORTED_KERNEL_VERSION),
     )
     def test_given_not_supported_kernel_version_when_preinstall_checks_then_unsupported_kernel_version_error_is_raised(  # noqa: E501
         self, _, __, ___
@@ -120,6 +148,36 @@ VERSION_ID="20.04"
         with self.assertRaises(InvalidNumberOfInterfacesError):
             agw_preinstall.preinstall_checks()
 
+    @patch(
+        "magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall._kernel_version_is_supported",  # noqa: E501
+        new_callable=PropertyMock,
+        return_value=False,
+    )
+    @patch(
+        "magma_access_gateway_installer.agw_preinstall.open",
+        new_callable=mock_open,
+        read_data=INVALID_OS,
+    )
+    @patch(
+        "magma_access_gateway_installer.agw_preinstall.os.geteuid",
+        return_value=INVALID_TEST_USER_ID,
+    )
+    def test_given_several_preconditions_not_met_when_preinstall_checks_then_all_failed_preconditions_are_reported_together(  # noqa: E501
+        self, _, __, ___
+    ):
+        agw_preinstall = AGWInstallerPreinstall(self.INVALID_TEST_NETWORK_INTERFACES)
+
+        with self.assertRaises(PreinstallChecksError) as error:
+            agw_preinstall.preinstall_checks()
+
+        for failed_precondition in [
+            InvalidUserError,
+            UnsupportedOSError,
+            UnsupportedKernelVersionError,
+            InvalidNumberOfInterfacesError,
+        ]:
+            self.assertIn(failed_precondition.MESSAGE, error.exception._message)
+
     @patch("magma_access_gateway_installer.agw_preinstall.check_call")
     def test_given_system_meeting_installation_requirements_when_install_required_system_packages_then_apt_installs_required_packages(  # noqa: E501
         self, mock_check_call
@@ -143,8 +201,8 @@ VERSION_ID="20.04"
         read_data=VALID_UBUNTU_VERSION,
     )
     @patch(
-        "magma_access_gateway_installer.agw_preinstall.check_output",
-        return_value=VALID_TEST_USER,
+        "magma_access_gateway_installer.agw_preinstall.os.geteuid",
+        return_value=VALID_TEST_USER_ID,
     )
     def test_given_system_meets_installation_requirements_when_preinstall_checks_then_preinstall_check_are_completed_without_errors(  # noqa: E501
         self, _, __, mocked_logger, ___
@@ -152,3 +210,117 @@ VERSION_ID="20.04"
         self.agw_preinstall.preinstall_checks()
 
         mocked_logger.assert_called_with("Magma AGW pre-install checks completed.")
+
+    def test_given_magma_data_dir_when_measure_hardware_then_cpus_memory_disk_space_and_write_performance_are_measured(  # noqa: E501
+        self,
+    ):
+        with tempfile.TemporaryDirectory() as tempdir:
+            magma_data_dir = os.path.join(tempdir, "var", "opt", "magma")
+            proc_meminfo = os.path.join(tempdir, "meminfo")
+            with open(proc_meminfo, "w") as meminfo:
+                meminfo.write("MemTotal:        4030000 kB\nMemFree:         3000000 kB\n")
+            with patch.object(
+                AGWInstallerPreinstall, "MAGMA_DATA_DIR", magma_data_dir
+            ), patch.object(AGWInstallerPreinstall, "PROC_MEMINFO", proc_meminfo), patch.object(
+                AGWInstallerPreinstall, "SEQUENTIAL_WRITE_SIZE", 4 * 1024 * 1024
+            ):
+                measurements = self.agw_preinstall.measure_hardware()
+
+            self.assertEqual(os.listdir(magma_data_dir), [])
+        self.assertEqual(measurements["cpus"], os.cpu_count())
+        self.assertAlmostEqual(measurements["memory_gb"], 3.84, places=2)
+        self.assertGreater(measurements["free_disk_gb"], 0)
+        self.assertGreater(measurements["sequential_write_mb_per_s"], 0)
+        self.assertGreaterEqual(measurements["fsync_latency_ms"], 0)
+
+    @patch("magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall.measure_hardware")
+    def test_given_sd_card_backed_host_with_single_cpu_when_hardware_checks_then_all_failures_are_reported_together(  # noqa: E501
+        self, mocked_measure_hardware
+    ):
+        mocked_measure_hardware.return_value = dict(
+            self.MEASUREMENTS_MEETING_REQUIREMENTS,
+            cpus=1,
+            sequential_write_mb_per_s=12.0,
+            fsync_latency_ms=80.0,
+        )
+
+        with self.assertRaises(InsufficientHardwareError) as error:
+            self.agw_preinstall.hardware_checks()
+
+        self.assertIn("cpus: measured 1.0, expected at least 2", error.exception._message)
+        self.assertIn(
+            "sequential_write_mb_per_s: measured 12.0, expected at least 20",
+            error.exception._message,
+        )
+        self.assertIn(
+            "fsync_latency_ms: measured 80.0, expected at most 50", error.exception._message
+        )
+
+    @patch("magma_access_gateway_installer.agw_preinstall.logger.warning")
+    @patch("magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall.measure_hardware")
+    def test_given_host_below_recommended_level_when_hardware_checks_then_warnings_are_logged_and_no_error_is_raised(  # noqa: E501
+        self, mocked_measure_hardware, mocked_logger_warning
+    ):
+        mocked_measure_hardware.return_value = dict(
+            self.MEASUREMENTS_MEETING_REQUIREMENTS, free_disk_gb=15.0, fsync_latency_ms=20.0
+        )
+
+        self.agw_preinstall.hardware_checks()
+
+        mocked_logger_warning.assert_has_calls(
+            [
+                call(
+                    "Hardware below recommended level. "
+                    "free_disk_gb: measured 15.0, expected at least 20"
+                ),
+                call(
+                    "Hardware below recommended level. "
+                    "fsync_latency_ms: measured 20.0, expected at most 10"
+                ),
+            ]
+        )
+
+    @patch("magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall.measure_hardware")
+    def test_given_custom_hardware_requirements_when_hardware_checks_then_custom_thresholds_are_used(  # noqa: E501
+        self, mocked_measure_hardware
+    ):
+        mocked_measure_hardware.return_value = self.MEASUREMENTS_MEETING_REQUIREMENTS
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml") as custom_requirements:
+            custom_requirements.write("cpus:\n  fail_below: 16\n")
+            custom_requirements.flush()
+
+            with self.assertRaises(InsufficientHardwareError):
+                self.agw_preinstall.hardware_checks(custom_requirements.name)
+
+    @patch("magma_access_gateway_installer.agw_preinstall.logger.warning")
+    @patch("magma_access_gateway_installer.agw_preinstall.AGWInstallerPreinstall.measure_hardware")
+    def test_given_host_meeting_documented_minimum_when_hardware_checks_then_no_warnings_are_logged(  # noqa: E501
+        self, mocked_measure_hardware, mocked_logger_warning
+    ):
+        mocked_measure_hardware.return_value = dict(
+            self.MEASUREMENTS_MEETING_REQUIREMENTS, cpus=2, memory_gb=3.8
+        )
+
+        self.agw_preinstall.hardware_checks()
+
+        mocked_logger_warning.assert_not_called()
+
+    def test_given_custom_hardware_requirements_with_thresholds_not_being_a_mapping_when_load_hardware_requirements_then_argument_error_is_raised(  # noqa: E501
+        self,
+    ):
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml") as custom_requirements:
+            custom_requirements.write("cpus: 16\n")
+            custom_requirements.flush()
+
+            with self.assertRaises(ArgumentError):
+                self.agw_preinstall.load_hardware_requirements(custom_requirements.name)
+
+    def test_given_custom_hardware_requirements_with_unknown_metric_when_load_hardware_requirements_then_argument_error_is_raised(  # noqa: E501
+        self,
+    ):
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml") as custom_requirements:
+            custom_requirements.write("gpus:\n  fail_below: 1\n")
+            custom_requirements.flush()
+
+            with self.assertRaises(ArgumentError):
+                self.agw_preinstall.load_hardware_requirements(custom_requirements.name)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, call, patch
+
+from magma_access_gateway_installer.agw_redis_tuner import AGWInstallerRedisTuner
+
+
+class TestAGWInstallerRedisTuner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.proc_meminfo = os.path.join(self.tempdir.name, "meminfo")
+        self.redis_config_file = os.path.join(self.tempdir.name, "redis.yml")
+        self.redis_tuning_script = os.path.join(self.tempdir.name, "magma-redis-tuning.sh")
+        self.redis_drop_in_file = os.path.join(
+            self.tempdir.name, "magma@redis.service.d", "magma-redis-tuning.conf"
+        )
+        with open(self.proc_meminfo, "w") as meminfo:
+            meminfo.write("MemTotal:        8388608 kB\nMemFree:         4194304 kB\n")
+        self.patches = [
+            patch.object(AGWInstallerRedisTuner, "PROC_MEMINFO", self.proc_meminfo),
+            patch.object(AGWInstallerRedisTuner, "REDIS_CONFIG_FILE", self.redis_config_file),
+            patch.object(AGWInstallerRedisTuner, "REDIS_TUNING_SCRIPT", self.redis_tuning_script),
+            patch.object(AGWInstallerRedisTuner, "REDIS_DROP_IN_FILE", self.redis_drop_in_file),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    def test_given_no_maxmemory_requested_when_compute_maxmemory_then_quarter_of_ram_is_used(self):
+        redis_tuner = AGWInstallerRedisTuner()
+
+        self.assertEqual(redis_tuner.compute_maxmemory(), 2 * 1024 * 1024 * 1024)
+
+    def test_given_maxmemory_requested_when_compute_settings_then_requested_maxmemory_and_noeviction_are_used(  # noqa: E501
+        self,
+    ):
+        redis_tuner = AGWInstallerRedisTuner(maxmemory_mb=512)
+
+        settings = redis_tuner.compute_settings()
+
+        self.assertEqual(settings["maxmemory"], 512 * 1024 * 1024)
+        self.assertEqual(settings["maxmemory-policy"], "noeviction")
+        self.assertEqual(settings["appendonly"], "yes")
+        self.assertEqual(settings["appendfsync"], "everysec")
+
+    def test_given_custom_port_in_redis_config_when_get_redis_port_then_custom_port_is_returned(
+        self,
+    ):
+        with open(self.redis_config_file, "w") as redis_config:
+            redis_config.write("bind: 127.0.0.1\nport: 6390\n")
+
+        self.assertEqual(AGWInstallerRedisTuner().get_redis_port(), 6390)
+
+    @patch("magma_access_gateway_installer.agw_redis_tuner.call", Mock(return_value=3))
+    @patch("magma_access_gateway_installer.agw_redis_tuner.check_call")
+    def test_given_redis_not_running_when_tune_redis_then_tuning_script_and_drop_in_are_written_and_nothing_is_applied(  # noqa: E501
+        self, mocked_check_call
+    ):
+        AGWInstallerRedisTuner(maxmemory_mb=512).tune_redis()
+
+        with open(self.redis_tuning_script, "r") as redis_tuning_script:
+            redis_tuning_script_content = redis_tuning_script.read()
+        with open(self.redis_drop_in_file, "r") as redis_drop_in:
+            redis_drop_in_content = redis_drop_in.read()
+        self.assertIn("redis-cli -p 6380 ping", redis_tuning_script_content)
+        self.assertIn(
+            'redis-cli -p 6380 config set maxmemory "536870912"', redis_tuning_script_content
+        )
+        self.assertIn(
+            'redis-cli -p 6380 config set maxmemory-policy "noeviction"',
+            redis_tuning_script_content,
+        )
+        self.assertIn(
+            f"ExecStartPost=-/bin/bash {self.redis_tuning_script}", redis_drop_in_content
+        )
+        mocked_check_call.assert_called_once_with(["systemctl", "daemon-reload"])
+
+    @patch("magma_access_gateway_installer.agw_redis_tuner.call", Mock(return_value=0))
+    @patch("magma_access_gateway_installer.agw_redis_tuner.check_call")
+    def test_given_redis_running_when_tune_redis_then_tuning_script_is_run(
+        self, mocked_check_call
+    ):
+        AGWInstallerRedisTuner(maxmemory_mb=512).tune_redis()
+
+        mocked_check_call.assert_has_calls(
+            [
+                call(["systemctl", "daemon-reload"]),
+                call(["/bin/bash", self.redis_tuning_script]),
+            ]
+        )
+
+    @patch("magma_access_gateway_installer.agw_redis_tuner.call", Mock(return_value=0))
+    @patch("magma_access_gateway_installer.agw_redis_tuner.check_output")
+    def test_given_redis_running_with_default_eviction_policy_when_report_then_eviction_policy_is_returned(  # noqa: E501
+        self, mocked_check_output
+    ):
+        redis_tuner = AGWInstallerRedisTuner(maxmemory_mb=512)
+        current_settings = {
+            key: str(value) for key, value in redis_tuner.compute_settings().items()
+        }
+        current_settings["maxmemory-policy"] = "allkeys-lru"
+        mocked_check_output.side_effect = lambda command: (
+            f"{command[-1]}\n{current_settings[command[-1]]}\n".encode()
+        )
+
+        self.assertEqual(redis_tuner.report(), ["maxmemory-policy"])
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, call, patch
+
+from magma_access_gateway_installer.agw_installation_errors import (
+    ResourceControlProfileError,
+)
+from magma_access_gateway_installer.agw_resource_control_tuner import (
+    AGWInstallerResourceControlTuner,
+)
+
+
+class TestAGWInstallerResourceControlTuner(unittest.TestCase):
+    TEST_PROFILES = {
+        "test": {
+            "version": 2,
+            "services": {
+                "magma@pipelined": {
+                    "CPUWeight": 1000,
+                    "CPUAffinity": "0-1",
+                    "Nice": -10,
+                    "MemoryMax": "25%",
+                },
+                "magma@enodebd": {"CPUWeight": 50, "MemoryHigh": "256M"},
+            },
+        }
+    }
+
+    PIPELINED_CGROUP = "system.slice/system-magma.slice/magma@pipelined.service"
+    ENODEBD_CGROUP = "system.slice/system-magma.slice/magma@enodebd.service"
+    SHOW_OUTPUTS = {
+        "magma@pipelined.service": f"LoadState=loaded\nControlGroup=/{PIPELINED_CGROUP}\n"
+        "CPUWeight=1000\nCPUAffinity=0 1\nNice=0\nMemoryMax=1073741824\n",
+        "magma@enodebd.service": f"LoadState=loaded\nControlGroup=/{ENODEBD_CGROUP}\n"
+        "CPUWeight=50\nMemoryHigh=268435456\n",
+    }
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.proc_meminfo = os.path.join(self.tempdir.name, "meminfo")
+        with open(self.proc_meminfo, "w") as meminfo:
+            meminfo.write("MemTotal:        4194304 kB\nMemFree:         2097152 kB\n")
+        self.sys_fs_cgroup = os.path.join(self.tempdir.name, "cgroup")
+        os.mkdir(self.sys_fs_cgroup)
+        self.patches = [
+            patch.object(AGWInstallerResourceControlTuner, "PROC_MEMINFO", self.proc_meminfo),
+            patch.object(
+                AGWInstallerResourceControlTuner, "SYSTEMD_SYSTEM_DIR", self.tempdir.name
+            ),
+            patch.object(AGWInstallerResourceControlTuner, "SYS_FS_CGROUP", self.sys_fs_cgroup),
+            patch.object(
+                AGWInstallerResourceControlTuner,
+                "load_profiles",
+                Mock(return_value=self.TEST_PROFILES),
+            ),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def _write_cgroup_file(self, control_group: str, file_name: str, content: str):
+        cgroup_dir = os.path.join(self.sys_fs_cgroup, control_group)
+        os.makedirs(cgroup_dir, exist_ok=True)
+        with open(os.path.join(cgroup_dir, file_name), "w") as cgroup_file:
+            cgroup_file.write(content)
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    def test_given_profiles_shipped_with_snap_when_load_profiles_then_only_supported_directives_are_used(  # noqa: E501
+        self,
+    ):
+        for patcher in self.patches:
+            patcher.stop()
+        self.patches = []
+
+        for profile_name in AGWInstallerResourceControlTuner.load_profiles():
+            AGWInstallerResourceControlTuner(profile_name)
+
+    def test_given_unknown_profile_when_init_then_resourcecontrolprofileerror_is_raised(self):
+        with self.assertRaises(ResourceControlProfileError):
+            AGWInstallerResourceControlTuner("unknown")
+
+    @patch("magma_access_gateway_installer.agw_resource_control_tuner.call")
+    @patch("magma_access_gateway_installer.agw_resource_control_tuner.check_call")
+    def test_given_pipelined_running_when_tune_resource_control_then_drop_ins_are_written_and_cgroup_settings_are_applied_to_running_service(  # noqa: E501
+        self, mocked_check_call, mocked_call
+    ):
+        mocked_call.side_effect = lambda command, stderr: 0 if "magma@pipelined" in command else 3
+
+        AGWInstallerResourceControlTuner("test").tune_resource_control()
+
+        with open(
+            os.path.join(
+                self.tempdir.name, "magma@pipelined.service.d", "magma-resource-control.conf"
+            ),
+            "r",
+        ) as drop_in:
+            self.assertEqual(
+                drop_in.read(),
+                "# This is the resource control drop-in written by magma-access-gateway snap\n"
+                "# Profile: test (version 2)\n"
+                "[Service]\n"
+                "CPUWeight=1000\n"
+                "CPUAffinity=0-1\n"
+                "Nice=-10\n"
+                "MemoryMax=25%\n",
+            )
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(
+                    self.tempdir.name, "magma@enodebd.service.d", "magma-resource-control.conf"
+                )
+            )
+        )
+        self.assertEqual(
+            mocked_check_call.call_args_list,
+            [
+                call(["systemctl", "daemon-reload"]),
+                call(
+                    [
+                        "systemctl",
+                        "set-property",
+                        "--runtime",
+                        "magma@pipelined.service",
+                        "CPUWeight=1000",
+                        "MemoryMax=25%",
+                    ]
+                ),
+            ],
+        )
+
+    @patch("magma_access_gateway_installer.agw_resource_control_tuner.check_output")
+    def test_given_values_in_effect_on_unified_cgroup_hierarchy_when_report_then_only_mismatched_settings_are_returned(  # noqa: E501
+        self, mocked_check_output
+    ):
+        self._write_cgroup_file("", "cgroup.controllers", "cpu io memory pids\n")
+        self._write_cgroup_file(self.PIPELINED_CGROUP, "memory.max", "1073741824\n")
+        self._write_cgroup_file(self.ENODEBD_CGROUP, "memory.high", "268435456\n")
+        mocked_check_output.side_effect = lambda command: self.SHOW_OUTPUTS[command[2]].encode()
+
+        mismatches = AGWInstallerResourceControlTuner("test").report()
+
+        self.assertEqual(mismatches, ["magma@pipelined Nice"])
+
+    @patch("magma_access_gateway_installer.agw_resource_control_tuner.check_output")
+    def test_given_memory_limit_configured_but_not_in_effect_on_unified_cgroup_hierarchy_when_report_then_it_is_returned_as_mismatch(  # noqa: E501
+        self, mocked_check_output
+    ):
+        self._write_cgroup_file("", "cgroup.controllers", "cpu io memory pids\n")
+        self._write_cgroup_file(self.PIPELINED_CGROUP, "memory.max", "max\n")
+        self._write_cgroup_file(self.ENODEBD_CGROUP, "memory.high", "268435456\n")
+        mocked_check_output.side_effect = lambda command: self.SHOW_OUTPUTS[command[2]].encode()
+
+        mismatches = AGWInstallerResourceControlTuner("test").report()
+
+        self.assertEqual(mismatches, ["magma@pipelined Nice", "magma@pipelined MemoryMax"])
+
+    @patch("magma_access_gateway_installer.agw_resource_control_tuner.check_output")
+    def test_given_legacy_cgroup_hierarchy_when_report_then_memory_max_is_read_from_memory_controller_and_memory_high_is_not_returned_as_mismatch(  # noqa: E501
+        self, mocked_check_output
+    ):
+        self._write_cgroup_file(
+            os.path.join("memory", self.PIPELINED_CGROUP),
+            "memory.limit_in_bytes",
+            "9223372036854771712\n",
+        )
+        mocked_check_output.side_effect = lambda command: self.SHOW_OUTPUTS[command[2]].encode()
+
+        with self.assertLogs("magma_access_gateway_installer", level="WARNING") as logs:
+            mismatches = AGWInstallerResourceControlTuner("test").report()
+
+        self.assertEqual(mismatches, ["magma@pipelined Nice", "magma@pipelined MemoryMax"])
+        self.assertIn("magma@enodebd MemoryHigh: target=256M NOT ENFORCED", "\n".join(logs.output))
+
+    @patch("magma_access_gateway_installer.agw_resource_control_tuner.check_output")
+    def test_given_service_not_running_when_report_then_memory_limits_configured_in_systemd_are_used(  # noqa: E501
+        self, mocked_check_output
+    ):
+        self._write_cgroup_file("", "cgroup.controllers", "cpu io memory pids\n")
+        mocked_check_output.side_effect = lambda command: (
+            self.SHOW_OUTPUTS[command[2]]
+            .replace(f"ControlGroup=/{self.PIPELINED_CGROUP}", "ControlGroup=")
+            .encode()
+        )
+
+        mismatches = AGWInstallerResourceControlTuner("test").report()
+
+        self.assertEqual(mismatches, ["magma@pipelined Nice"])
+
+    @patch("magma_access_gateway_installer.agw_resource_control_tuner.check_output")
+    def test_given_services_not_installed_yet_when_report_then_they_are_skipped(
+        self, mocked_check_output
+    ):
+        mocked_check_output.return_value = b"LoadState=not-found\nCPUWeight=[not set]\n"
+
+        self.assertEqual(AGWInstallerResourceControlTuner("test").report(), [])
@@ -2,6 +2,7 @@
 # Copyright 2022 Canonical Ltd.
 # See LICENSE file for licensing details.
 
+import grp
 import pwd
 import unittest
 from unittest.mock import Mock, mock_open, patch
@@ -15,8 +16,8 @@ class TestAGWInstallerServiceUserCreator(unittest.TestCase):
     MAGMA_USER_DETAILS = pwd.struct_passwd(
         ("magma", "x", 1001, 1001, ",,,", "/home/magma", "/bin/bash")
     )
-    MAGMA_USER_NOT_IN_SUDO_GROUP = b"magma : magma\n"
-    MAGMA_USER_IN_SUDO_GROUP = b"magma : magma sudo\n"
+    SUDO_GROUP_WITHOUT_MAGMA_USER = grp.struct_group(("sudo", "x", 27, ["ubuntu"]))
+    SUDO_GROUP_WITH_MAGMA_USER = grp.struct_group(("sudo", "x", 27, ["ubuntu", "magma"]))
     ETC_SUDOERS_WITH_MAGMA_USER = """Defaults	env_reset
 Defaults	mail_badpass
 Defaults	secure_path="/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin:/snap/bin"
@@ -74,10 +75,8 @@ root	ALL=(ALL:ALL) ALL
 
         mock_check_call.assert_not_called()
 
-    @patch(
-        "magma_access_gateway_installer.agw_service_user_creator.check_output",
-        Mock(return_value=MAGMA_USER_NOT_IN_SUDO_GROUP),
-    )
+    @patch("grp.getgrnam", Mock(return_value=SUDO_GROUP_WITHOUT_MAGMA_USER))
+    @patch("pwd.getpwnam", Mock(return_value=MAGMA_USER_DETAILS))
     @patch("magma_access_gateway_installer.agw_service_user_creator.check_call")
     def test_given_magma_user_not_in_sudo_group_when_add_magma_user_to_sudo_group_then_user_is_added_to_sudo_group(  # noqa: E501
         self, mock_check_call
@@ -88,10 +87,8 @@ root	ALL=(ALL:ALL) ALL
             ["adduser", self.agw_service_user_creator.MAGMA_USER, "sudo"]
         )
 
-    @patch(
-        "magma_access_gateway_installer.agw_service_user_creator.check_output",
-        Mock(return_value=MAGMA_USER_IN_SUDO_GROUP),
-    )
+    @patch("grp.getgrnam", Mock(return_value=SUDO_GROUP_WITH_MAGMA_USER))
+    @patch("pwd.getpwnam", Mock(return_value=MAGMA_USER_DETAILS))
     @patch("magma_access_gateway_installer.agw_service_user_creator.check_call")
     def test_given_magma_user_in_sudo_group_when_add_magma_user_to_sudo_group_then_adduser_is_not_called(  # noqa: E501
         self, mock_check_call
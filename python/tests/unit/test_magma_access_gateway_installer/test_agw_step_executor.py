@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, Mock
+
+from magma_access_gateway_installer.agw_installation_errors import StepGraphError
+from magma_access_gateway_installer.agw_step_executor import AGWInstallerStepExecutor
+
+define_step = AGWInstallerStepExecutor.define_step
+
+
+class TestAGWInstallerStepExecutor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.events: list = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def _tracked(self, name: str, duration: float = 0.0):
+        def run():
+            with self.lock:
+                self.events.append(f"{name}:start")
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(duration)
+            with self.lock:
+                self.running -= 1
+                self.events.append(f"{name}:end")
+
+        return run
+
+    def test_given_independent_steps_when_run_then_steps_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        steps = [
+            define_step("create_magma_user", barrier.wait),
+            define_step("preconfigure_wireshark_suid_property", barrier.wait),
+        ]
+
+        AGWInstallerStepExecutor(steps).run()
+
+        self.assertFalse(barrier.broken)
+
+    def test_given_max_parallel_steps_is_one_when_run_then_steps_run_one_by_one(self):
+        steps = [
+            define_step(f"step_{index}", self._tracked(f"step_{index}", 0.01))
+            for index in range(3)
+        ]
+
+        AGWInstallerStepExecutor(steps, max_parallel_steps=1).run()
+
+        self.assertEqual(self.max_running, 1)
+
+    def test_given_step_depending_on_outputs_of_other_steps_when_run_then_step_starts_after_they_finish(  # noqa: E501
+        self,
+    ):
+        steps = [
+            define_step(
+                "install_magma_agw",
+                self._tracked("install_magma_agw"),
+                inputs=["runtime_dependencies", "debconf_preseed"],
+            ),
+            define_step(
+                "install_runtime_dependencies",
+                self._tracked("install_runtime_dependencies", 0.02),
+                outputs=["runtime_dependencies"],
+            ),
+            define_step(
+                "preconfigure_wireshark_suid_property",
+                self._tracked("preconfigure_wireshark_suid_property", 0.01),
+                outputs=["debconf_preseed"],
+            ),
+        ]
+
+        AGWInstallerStepExecutor(steps).run()
+
+        self.assertEqual(self.events[-2:], ["install_magma_agw:start", "install_magma_agw:end"])
+
+    def test_given_steps_sharing_lock_when_run_then_they_never_run_at_the_same_time(self):
+        steps = [
+            define_step(
+                f"apt_step_{index}", self._tracked(f"apt_step_{index}", 0.01), locks=["dpkg"]
+            )
+            for index in range(3)
+        ]
+
+        AGWInstallerStepExecutor(steps).run()
+
+        self.assertEqual(self.max_running, 1)
+
+    def test_given_skipped_step_when_run_then_it_is_not_run_and_its_dependents_are(self):
+        skipped_step = Mock()
+        dependent_step = Mock()
+        steps = [
+            define_step("start_magma", dependent_step, inputs=["pipelined_config"]),
+            define_step(
+                "configure_pipelined", skipped_step, outputs=["pipelined_config"], skip=True
+            ),
+        ]
+
+        report = AGWInstallerStepExecutor(steps).run()
+
+        skipped_step.assert_not_called()
+        dependent_step.assert_called_once()
+        self.assertTrue(report["critical_path"][0]["skipped"])
+
+    def test_given_failing_step_when_run_then_its_dependents_are_not_run_and_its_exception_is_raised(  # noqa: E501
+        self,
+    ):
+        dependent_step = Mock()
+        steps = [
+            define_step(
+                "install_magma_agw",
+                Mock(side_effect=RuntimeError("apt failed")),
+                outputs=["magma_package"],
+            ),
+            define_step("start_open_vswitch", dependent_step, inputs=["magma_package"]),
+        ]
+
+        with self.assertRaises(RuntimeError):
+            AGWInstallerStepExecutor(steps).run()
+
+        dependent_step.assert_not_called()
+
+    def test_given_input_not_provided_by_any_step_when_executor_is_created_then_step_graph_error_is_raised(  # noqa: E501
+        self,
+    ):
+        with self.assertRaises(StepGraphError):
+            AGWInstallerStepExecutor([define_step("start_magma", Mock(), inputs=["openvswitch"])])
+
+    def test_given_steps_depending_on_each_other_when_executor_is_created_then_step_graph_error_is_raised(  # noqa: E501
+        self,
+    ):
+        steps = [
+            define_step("step_a", Mock(), inputs=["b"], outputs=["a"]),
+            define_step("step_b", Mock(), inputs=["a"], outputs=["b"]),
+        ]
+
+        with self.assertRaises(StepGraphError):
+            AGWInstallerStepExecutor(steps)
+
+    def test_given_duplicate_step_names_when_executor_is_created_then_step_graph_error_is_raised(
+        self,
+    ):
+        with self.assertRaises(StepGraphError):
+            AGWInstallerStepExecutor([define_step("step", Mock()), define_step("step", Mock())])
+
+    def test_given_chain_of_steps_and_short_independent_step_when_run_then_chain_is_reported_as_critical_path(  # noqa: E501
+        self,
+    ):
+        steps = [
+            define_step("update_apt_cache", self._tracked("a", 0.05), outputs=["apt_cache"]),
+            define_step("install_magma_agw", self._tracked("b", 0.1), inputs=["apt_cache"]),
+            define_step("create_magma_user", self._tracked("c", 0.01)),
+        ]
+
+        report = AGWInstallerStepExecutor(steps).run()
+
+        self.assertEqual(
+            [step["step"] for step in report["critical_path"]],
+            ["update_apt_cache", "install_magma_agw"],
+        )
+        self.assertEqual(
+            [step["step"] for step in report["off_critical_path"]], ["create_magma_user"]
+        )
+        self.assertGreaterEqual(report["total_s"], 0.15)
+
+    def test_given_event_stream_when_run_then_each_step_and_critical_path_are_reported(self):
+        event_stream = MagicMock()
+        steps = [define_step("update_apt_cache", Mock())]
+
+        AGWInstallerStepExecutor(steps, event_stream=event_stream).run()
+
+        event_stream.step.assert_called_once_with("update_apt_cache")
+        self.assertEqual(event_stream.emit.call_args.args[0], "critical_path")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import call, patch
+
+from magma_access_gateway_installer.agw_sysctl_tuner import AGWInstallerSysctlTuner
+
+
+class TestAGWInstallerSysctlTuner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sysctl_config_file = os.path.join(self.tempdir.name, "99-magma-agw.conf")
+        self.modprobe_config_file = os.path.join(self.tempdir.name, "magma-nf-conntrack.conf")
+        self.modules_load_config_file = os.path.join(self.tempdir.name, "magma-agw.conf")
+        self.hashsize_parameter = os.path.join(self.tempdir.name, "hashsize")
+        self.proc_sys = os.path.join(self.tempdir.name, "proc", "sys")
+        self.patches = [
+            patch.object(AGWInstallerSysctlTuner, "SYSCTL_CONFIG_FILE", self.sysctl_config_file),
+            patch.object(
+                AGWInstallerSysctlTuner,
+                "CONNTRACK_MODPROBE_CONFIG_FILE",
+                self.modprobe_config_file,
+            ),
+            patch.object(
+                AGWInstallerSysctlTuner, "CONNTRACK_HASHSIZE_PARAMETER", self.hashsize_parameter
+            ),
+            patch.object(AGWInstallerSysctlTuner, "PROC_SYS", self.proc_sys),
+            patch.object(
+                AGWInstallerSysctlTuner, "MODULES_LOAD_CONFIG_FILE", self.modules_load_config_file
+            ),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    def _write_proc_sys(self, key: str, value: str):
+        path = os.path.join(self.proc_sys, *key.split("."))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as proc_sys_file:
+            proc_sys_file.write(value)
+
+    def test_given_small_site_when_compute_sysctl_values_then_minimum_values_are_used(self):
+        sysctl_tuner = AGWInstallerSysctlTuner(target_subscribers=10, target_enodebs=1)
+
+        sysctl_values = sysctl_tuner.compute_sysctl_values()
+
+        self.assertEqual(sysctl_values["net.netfilter.nf_conntrack_max"], 262144)
+        self.assertEqual(sysctl_values["net.core.rmem_max"], 16777216)
+        self.assertEqual(sysctl_values["net.core.wmem_max"], 16777216)
+        self.assertEqual(sysctl_values["net.core.netdev_max_backlog"], 5000)
+        self.assertEqual(sysctl_values["net.core.somaxconn"], 4096)
+        self.assertEqual(sysctl_values["net.sctp.sctp_mem"], "16384 24576 32768")
+
+    def test_given_large_site_when_compute_sysctl_values_then_values_scale_with_subscribers_and_enodebs(  # noqa: E501
+        self,
+    ):
+        sysctl_tuner = AGWInstallerSysctlTuner(target_subscribers=10000, target_enodebs=300)
+
+        sysctl_values = sysctl_tuner.compute_sysctl_values()
+
+        self.assertEqual(sysctl_values["net.netfilter.nf_conntrack_max"], 2097152)
+        self.assertEqual(sysctl_values["net.core.rmem_max"], 78643200)
+        self.assertEqual(sysctl_values["net.core.netdev_max_backlog"], 40000)
+        self.assertEqual(sysctl_values["net.sctp.sctp_mem"], "19200 28800 38400")
+        self.assertEqual(sysctl_values["net.sctp.sctp_rmem"], "4096 262144 78643200")
+        self.assertEqual(sysctl_tuner.compute_conntrack_hashsize(), 524288)
+
+    @patch("magma_access_gateway_installer.agw_sysctl_tuner.check_call")
+    def test_given_target_counts_when_tune_sysctl_then_sysctl_and_modprobe_configs_are_written_and_applied(  # noqa: E501
+        self, mocked_check_call
+    ):
+        sysctl_tuner = AGWInstallerSysctlTuner(target_subscribers=10, target_enodebs=1)
+
+        sysctl_tuner.tune_sysctl()
+
+        with open(self.sysctl_config_file, "r") as sysctl_config:
+            sysctl_config_content = sysctl_config.read()
+        with open(self.modprobe_config_file, "r") as modprobe_config:
+            modprobe_config_content = modprobe_config.read()
+        with open(self.hashsize_parameter, "r") as hashsize:
+            hashsize_content = hashsize.read()
+        with open(self.modules_load_config_file, "r") as modules_load_config:
+            modules_load_config_content = modules_load_config.read()
+        self.assertIn("net.netfilter.nf_conntrack_max = 262144\n", sysctl_config_content)
+        self.assertIn("net.sctp.sctp_wmem = 4096 262144 16777216\n", sysctl_config_content)
+        self.assertEqual(modprobe_config_content, "options nf_conntrack hashsize=65536\n")
+        self.assertEqual(hashsize_content, "65536")
+        self.assertTrue(modules_load_config_content.endswith("nf_conntrack\nsctp\n"))
+        mocked_check_call.assert_has_calls(
+            [
+                call(["modprobe", "nf_conntrack"]),
+                call(["modprobe", "sctp"]),
+                call(["sysctl", "-p", self.sysctl_config_file]),
+            ]
+        )
+
+    def test_given_some_settings_not_applied_when_report_then_mismatched_settings_are_returned(
+        self,
+    ):
+        sysctl_tuner = AGWInstallerSysctlTuner(target_subscribers=10, target_enodebs=1)
+        for key, value in sysctl_tuner.compute_sysctl_values().items():
+            self._write_proc_sys(key, str(value).replace(" ", "\t"))
+        self._write_proc_sys("net.core.netdev_max_backlog", "1000\n")
+        with open(self.hashsize_parameter, "w") as hashsize:
+            hashsize.write("65536\n")
+        with open(self.modules_load_config_file, "w") as modules_load_config:
+            modules_load_config.write("nf_conntrack\nsctp\n")
+
+        self.assertEqual(sysctl_tuner.report(), ["net.core.netdev_max_backlog"])
+
+    def test_given_sctp_not_loaded_at_boot_when_report_then_lost_sctp_settings_and_modules_load_config_are_reported(  # noqa: E501
+        self,
+    ):
+        sysctl_tuner = AGWInstallerSysctlTuner(target_subscribers=10, target_enodebs=1)
+        for key, value in sysctl_tuner.compute_sysctl_values().items():
+            if not key.startswith("net.sctp."):
+                self._write_proc_sys(key, str(value))
+        with open(self.hashsize_parameter, "w") as hashsize:
+            hashsize.write("65536\n")
+        with open(self.modules_load_config_file, "w") as modules_load_config:
+            modules_load_config.write("nf_conntrack\n")
+
+        self.assertEqual(
+            sysctl_tuner.report(),
+            [
+                "net.sctp.sctp_mem",
+                "net.sctp.sctp_rmem",
+                "net.sctp.sctp_wmem",
+                "modules loaded at boot",
+            ],
+        )
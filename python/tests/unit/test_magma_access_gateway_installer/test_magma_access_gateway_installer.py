@@ -3,11 +3,13 @@
 # See LICENSE file for licensing details.
 
 import pathlib
+import tempfile
 import unittest
 from argparse import Namespace
 from unittest.mock import MagicMock, Mock, patch
 
 import magma_access_gateway_installer
+from magma_access_gateway_installer.agw_step_executor import AGWInstallerStepExecutor
 
 
 class TestAGWInstallerInit(unittest.TestCase):
@@ -248,10 +250,159 @@ man-db/focal,now 2.9.1-1 amd64 [installed,automatic]\n
             dns=self.DNS_LIST_WITH_VALID_ADDRESS,
             sgi=self.VALID_TEST_SGi_INTERFACE_NAME,
             s1=self.VALID_TEST_S1_INTERFACE_NAME,
+            performance_profile=None,
+            preview_performance_profile=False,
+            target_subscribers=1000,
+            target_enodebs=10,
+            hugepages=256,
+            max_cstate=None,
+            redis_maxmemory_mb=None,
+            bundle=None,
+            bundle_key_fingerprint=None,
+            dkms_module_cache=None,
+            magma_mirrors=None,
+            ubuntu_mirrors=None,
+            download_connections=4,
+            no_reboot=False,
+            always_reboot=False,
+            max_parallel_steps=4,
         )
 
         self.assertEqual(magma_access_gateway_installer.validate_args(test_args), None)
 
+    def test_given_bundle_key_fingerprint_without_bundle_when_validate_offline_bundle_then_argument_error_is_raised(  # noqa: E501
+        self,
+    ):
+        test_args = Namespace(bundle=None, bundle_key_fingerprint="0123456789ABCDEF")
+
+        with self.assertRaises(magma_access_gateway_installer.ArgumentError):
+            magma_access_gateway_installer.validate_offline_bundle(test_args)
+
+    def test_given_bundle_without_key_fingerprint_when_validate_offline_bundle_then_argument_error_is_raised(  # noqa: E501
+        self,
+    ):
+        with tempfile.NamedTemporaryFile() as bundle:
+            test_args = Namespace(bundle=bundle.name, bundle_key_fingerprint=None)
+
+            with self.assertRaises(magma_access_gateway_installer.ArgumentError):
+                magma_access_gateway_installer.validate_offline_bundle(test_args)
+
+    def test_given_nonexistent_bundle_when_validate_offline_bundle_then_argument_error_is_raised(
+        self,
+    ):
+        test_args = Namespace(bundle="/nonexistent/bundle.tar.gz", bundle_key_fingerprint=None)
+
+        with self.assertRaises(magma_access_gateway_installer.ArgumentError):
+            magma_access_gateway_installer.validate_offline_bundle(test_args)
+
+    def test_given_nonexistent_dkms_module_cache_when_validate_dkms_module_cache_then_argument_error_is_raised(  # noqa: E501
+        self,
+    ):
+        test_args = Namespace(dkms_module_cache="/nonexistent/dkms-module-cache")
+
+        with self.assertRaises(magma_access_gateway_installer.ArgumentError):
+            magma_access_gateway_installer.validate_dkms_module_cache(test_args)
+
+    def test_given_tune_ovs_not_passed_when_configure_ovs_tuner_then_open_vswitch_is_not_tuned(
+        self,
+    ):
+        test_args = Namespace(tune_ovs=False, target_subscribers=100)
+
+        self.assertIsNone(magma_access_gateway_installer.configure_ovs_tuner(test_args))
+
+    @patch("magma_access_gateway_installer.network_interfaces", TEST_INTERFACES_LIST)
+    def test_given_negative_max_cstate_when_validate_args_then_argument_error_is_raised(self):
+        test_args = Namespace(
+            sgi_ipv4_address=None,
+            sgi_ipv4_gateway=None,
+            sgi_ipv6_address=None,
+            sgi_ipv6_gateway=None,
+            s1_ipv4_address=None,
+            s1_ipv6_address=None,
+            dns=self.DNS_LIST_WITH_VALID_ADDRESS,
+            sgi=self.VALID_TEST_SGi_INTERFACE_NAME,
+            s1=self.VALID_TEST_S1_INTERFACE_NAME,
+            performance_profile=None,
+            preview_performance_profile=False,
+            target_subscribers=1000,
+            target_enodebs=10,
+            hugepages=256,
+            max_cstate=-1,
+        )
+
+        with self.assertRaises(magma_access_gateway_installer.ArgumentError):
+            magma_access_gateway_installer.validate_args(test_args)
+
+    @patch("magma_access_gateway_installer.network_interfaces", TEST_INTERFACES_LIST)
+    def test_given_non_positive_redis_maxmemory_when_validate_args_then_argument_error_is_raised(
+        self,
+    ):
+        test_args = Namespace(
+            sgi_ipv4_address=None,
+            sgi_ipv4_gateway=None,
+            sgi_ipv6_address=None,
+            sgi_ipv6_gateway=None,
+            s1_ipv4_address=None,
+            s1_ipv6_address=None,
+            dns=self.DNS_LIST_WITH_VALID_ADDRESS,
+            sgi=self.VALID_TEST_SGi_INTERFACE_NAME,
+            s1=self.VALID_TEST_S1_INTERFACE_NAME,
+            performance_profile=None,
+            preview_performance_profile=False,
+            target_subscribers=1000,
+            target_enodebs=10,
+            hugepages=256,
+            max_cstate=None,
+            redis_maxmemory_mb=0,
+        )
+
+        with self.assertRaises(magma_access_gateway_installer.ArgumentError):
+            magma_access_gateway_installer.validate_args(test_args)
+
+    @patch("magma_access_gateway_installer.network_interfaces", TEST_INTERFACES_LIST)
+    def test_given_non_positive_target_enodebs_when_validate_args_then_argument_error_is_raised(
+        self,
+    ):
+        test_args = Namespace(
+            sgi_ipv4_address=None,
+            sgi_ipv4_gateway=None,
+            sgi_ipv6_address=None,
+            sgi_ipv6_gateway=None,
+            s1_ipv4_address=None,
+            s1_ipv6_address=None,
+            dns=self.DNS_LIST_WITH_VALID_ADDRESS,
+            sgi=self.VALID_TEST_SGi_INTERFACE_NAME,
+            s1=self.VALID_TEST_S1_INTERFACE_NAME,
+            performance_profile=None,
+            preview_performance_profile=False,
+            target_subscribers=1000,
+            target_enodebs=0,
+        )
+
+        with self.assertRaises(magma_access_gateway_installer.ArgumentError):
+            magma_access_gateway_installer.validate_args(test_args)
+
+    @patch("magma_access_gateway_installer.network_interfaces", TEST_INTERFACES_LIST)
+    def test_given_preview_performance_profile_without_performance_profile_when_validate_args_then_argument_error_is_raised(  # noqa: E501
+        self,
+    ):
+        test_args = Namespace(
+            sgi_ipv4_address=None,
+            sgi_ipv4_gateway=None,
+            sgi_ipv6_address=None,
+            sgi_ipv6_gateway=None,
+            s1_ipv4_address=None,
+            s1_ipv6_address=None,
+            dns=self.DNS_LIST_WITH_VALID_ADDRESS,
+            sgi=self.VALID_TEST_SGi_INTERFACE_NAME,
+            s1=self.VALID_TEST_S1_INTERFACE_NAME,
+            performance_profile=None,
+            preview_performance_profile=True,
+        )
+
+        with self.assertRaises(magma_access_gateway_installer.ArgumentError):
+            magma_access_gateway_installer.validate_args(test_args)
+
     @patch("magma_access_gateway_installer.get_mac_address")
     def test_given_valid_cli_arguments_when_generate_network_config_then_correct_network_config_is_created(  # noqa: E501
         self, mocked_get_mac_address
@@ -341,11 +492,12 @@ man-db/focal,now 2.9.1-1 amd64 [installed,automatic]\n
     @patch("magma_access_gateway_installer.validate_args", Mock())
     @patch("magma_access_gateway_installer.AGWInstallerPreinstall", Mock())
     @patch("magma_access_gateway_installer.AGWInstallerServiceUserCreator", Mock())
-    @patch("magma_access_gateway_installer.AGWInstaller", Mock())
+    @patch("magma_access_gateway_installer.AGWInstaller")
     def test_given_skip_networking_cli_argument_passed_when_main_then_configure_network_is_not_run(
-        self, mocked_configure_network
+        self, mocked_agw_installer, mocked_configure_network
     ):
         magma_access_gateway_installer.main()
+        AGWInstallerStepExecutor(mocked_agw_installer().install.call_args.args[4]).run()
 
         self.assertFalse(mocked_configure_network.called)
 
@@ -354,14 +506,67 @@ man-db/focal,now 2.9.1-1 amd64 [installed,automatic]\n
     @patch("magma_access_gateway_installer.validate_args", Mock())
     @patch("magma_access_gateway_installer.AGWInstallerPreinstall", Mock())
     @patch("magma_access_gateway_installer.AGWInstallerServiceUserCreator", Mock())
-    @patch("magma_access_gateway_installer.AGWInstaller", Mock())
+    @patch("magma_access_gateway_installer.AGWInstaller")
     def test_given_skip_networking_cli_argument_not_passed_when_main_then_configure_network_is_run(
-        self, mocked_configure_network
+        self, mocked_agw_installer, mocked_configure_network
     ):
         magma_access_gateway_installer.main()
+        AGWInstallerStepExecutor(mocked_agw_installer().install.call_args.args[4]).run()
 
         self.assertTrue(mocked_configure_network.called)
 
+    def test_given_prerequisite_steps_when_dependencies_are_resolved_then_magma_user_is_created_after_system_packages_are_installed(  # noqa: E501
+        self,
+    ):
+        args = magma_access_gateway_installer.cli_arguments_parser(
+            ["--sgi", "eth0", "--s1", "eth1"]
+        )
+        executor = AGWInstallerStepExecutor(
+            magma_access_gateway_installer.get_prerequisite_steps(args, Mock())
+        )
+
+        self.assertEqual(
+            executor.dependencies["create_magma_user"], {"install_required_system_packages"}
+        )
+
+    @patch("magma_access_gateway_installer.configure_network", Mock())
+    @patch("sys.argv", ["test.py"])
+    @patch("magma_access_gateway_installer.validate_args", Mock())
+    @patch("magma_access_gateway_installer.AGWInstallerPreinstall")
+    @patch("magma_access_gateway_installer.AGWInstallerServiceUserCreator", Mock())
+    @patch("magma_access_gateway_installer.AGWInstaller")
+    def test_given_insufficient_hardware_when_main_then_nothing_is_installed(
+        self, mocked_agw_installer, mocked_agw_preinstall
+    ):
+        mocked_agw_preinstall().hardware_checks.side_effect = (
+            magma_access_gateway_installer.AGWInstallationError("Insufficient hardware.")
+        )
+
+        magma_access_gateway_installer.main()
+
+        mocked_agw_preinstall().install_required_system_packages.assert_not_called()
+        mocked_agw_installer().install.assert_not_called()
+
+    @patch("magma_access_gateway_installer.configure_network", Mock())
+    @patch(
+        "sys.argv",
+        ["test.py", "--performance-profile", "high-throughput", "--preview-performance-profile"],
+    )
+    @patch("magma_access_gateway_installer.validate_args", Mock())
+    @patch("magma_access_gateway_installer.AGWInstallerPreinstall")
+    @patch("magma_access_gateway_installer.AGWInstallerServiceUserCreator", Mock())
+    @patch("magma_access_gateway_installer.AGWInstaller")
+    def test_given_preview_performance_profile_cli_argument_passed_when_main_then_profile_is_previewed_and_nothing_is_installed(  # noqa: E501
+        self, mocked_agw_installer, mocked_agw_preinstall
+    ):
+        magma_access_gateway_installer.main()
+
+        mocked_agw_installer().preview_pipelined_performance_profile.assert_called_once_with(
+            "high-throughput"
+        )
+        mocked_agw_installer().install.assert_not_called()
+        mocked_agw_preinstall().install_required_system_packages.assert_not_called()
+
     @patch("magma_access_gateway_installer.network_interfaces", TEST_INTERFACES_LIST)
     def test_given_not_specified_sgi_and_s1_and_no_eth_and_eth1_in_the_system_when_cli_arguments_parser_then_first_two_interfaces_are_assigned_as_sgi_and_s1(  # noqa: E501
         self,
@@ -379,3 +584,18 @@ man-db/focal,now 2.9.1-1 amd64 [installed,automatic]\n
 
         self.assertEqual(parsed_args.sgi, "eth0")
         self.assertEqual(parsed_args.s1, "eth1")
+
+    @patch("magma_access_gateway_installer.network_interfaces", ["abc", "eth0", "def", "eth1"])
+    @patch("magma_access_gateway_installer.AGWInstallerInterfaceSelector")
+    def test_given_auto_select_interfaces_and_specified_sgi_when_cli_arguments_parser_then_only_s1_is_selected_automatically(  # noqa: E501
+        self, mocked_interface_selector
+    ):
+        mocked_interface_selector().select.return_value = ("def", "abc")
+
+        parsed_args = magma_access_gateway_installer.cli_arguments_parser(
+            ["--auto-select-interfaces", "--sgi", "def"]
+        )
+
+        mocked_interface_selector().select.assert_called_once_with("def", None)
+        self.assertEqual(parsed_args.sgi, "def")
+        self.assertEqual(parsed_args.s1, "abc")
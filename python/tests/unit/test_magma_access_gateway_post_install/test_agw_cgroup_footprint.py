@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from magma_access_gateway_post_install.agw_cgroup_footprint import (
+    AGWCgroupFootprintReport,
+)
+
+MIB = 1024 * 1024
+
+
+class TestAGWCgroupFootprintReport(unittest.TestCase):
+    SYSTEMCTL_SHOW_OUTPUT = b"""Id=magma@mme.service
+ActiveState=active
+ControlGroup=/system.slice/system-magma.slice/magma@mme.service
+NRestarts=0
+ActiveEnterTimestampMonotonic=100000000
+
+Id=magma@pipelined.service
+ActiveState=active
+ControlGroup=/system.slice/system-magma.slice/magma@pipelined.service
+NRestarts=2
+ActiveEnterTimestampMonotonic=100000000
+
+Id=magma@dnsd.service
+ActiveState=inactive
+ControlGroup=
+NRestarts=0
+ActiveEnterTimestampMonotonic=0
+"""
+    MONOTONIC_NOW_S = 200
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cgroup_root = os.path.join(self.tempdir.name, "cgroup")
+        self.baseline_file = os.path.join(self.tempdir.name, "baseline.json")
+        self.patcher = patch.object(AGWCgroupFootprintReport, "SYS_FS_CGROUP", self.cgroup_root)
+        self.patcher.start()
+        self.cgroup_footprint_report = AGWCgroupFootprintReport(baseline_file=self.baseline_file)
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        self.tempdir.cleanup()
+
+    def _write_cgroup_files(self, service: str, files: dict, controller: str = ""):
+        cgroup_dir = os.path.join(
+            self.cgroup_root, controller, "system.slice/system-magma.slice", f"{service}.service"
+        )
+        os.makedirs(cgroup_dir, exist_ok=True)
+        for name, content in files.items():
+            with open(os.path.join(cgroup_dir, name), "w") as cgroup_file:
+                cgroup_file.write(content)
+
+    def _write_unified_cgroup(self, service: str, memory_current: int, tasks: int = 5):
+        with open(os.path.join(self.cgroup_root, "cgroup.controllers"), "w") as controllers:
+            controllers.write("cpu io memory pids\n")
+        self._write_cgroup_files(
+            service,
+            {
+                "memory.current": f"{memory_current}\n",
+                "memory.peak": f"{memory_current + MIB}\n",
+                "cpu.stat": "usage_usec 10000000\nuser_usec 8000000\nsystem_usec 2000000\n",
+                "io.stat": "8:0 rbytes=1024 wbytes=4096 rios=1 wios=2\n"
+                "8:16 rbytes=1024 wbytes=0 rios=1 wios=0\n",
+                "pids.current": f"{tasks}\n",
+            },
+        )
+
+    def _collect(self) -> dict:
+        with patch(
+            "magma_access_gateway_post_install.agw_cgroup_footprint.check_output",
+            Mock(return_value=self.SYSTEMCTL_SHOW_OUTPUT),
+        ), patch(
+            "magma_access_gateway_post_install.agw_cgroup_footprint.time.monotonic",
+            Mock(return_value=self.MONOTONIC_NOW_S),
+        ):
+            return self.cgroup_footprint_report.collect()
+
+    def test_given_unified_cgroup_hierarchy_when_collect_then_footprint_of_running_services_is_reported(  # noqa: E501
+        self,
+    ):
+        os.makedirs(self.cgroup_root)
+        self._write_unified_cgroup("magma@mme", 100 * MIB)
+        self._write_unified_cgroup("magma@pipelined", 200 * MIB)
+
+        report = self._collect()
+
+        self.assertEqual(list(report["services"]), ["magma@mme", "magma@pipelined"])
+        self.assertEqual(
+            report["services"]["magma@mme"],
+            {
+                "memory_current": 100 * MIB,
+                "memory_peak": 101 * MIB,
+                "io_read_bytes": 2048,
+                "io_write_bytes": 4096,
+                "tasks": 5,
+                "cpu_percent": 10.0,
+                "restarts": 0,
+            },
+        )
+        self.assertIsNone(report["baseline"])
+        self.assertEqual(report["flagged"], [])
+
+    def test_given_legacy_cgroup_hierarchy_when_collect_then_footprint_is_read_from_controllers(  # noqa: E501
+        self,
+    ):
+        for service in ["magma@mme", "magma@pipelined"]:
+            self._write_cgroup_files(
+                service,
+                {"memory.usage_in_bytes": f"{50 * MIB}\n", "memory.max_usage_in_bytes": "0\n"},
+                "memory",
+            )
+            self._write_cgroup_files(service, {"cpuacct.usage": "5000000000\n"}, "cpuacct")
+            self._write_cgroup_files(
+                service,
+                {
+                    "blkio.throttle.io_service_bytes": "8:0 Read 512\n8:0 Write 256\n"
+                    "8:0 Total 768\nTotal 768\n"
+                },
+                "blkio",
+            )
+            self._write_cgroup_files(service, {"pids.current": "3\n"}, "pids")
+
+        report = self._collect()
+
+        footprint = report["services"]["magma@pipelined"]
+        self.assertEqual(footprint["memory_current"], 50 * MIB)
+        self.assertEqual(footprint["cpu_percent"], 5.0)
+        self.assertEqual((footprint["io_read_bytes"], footprint["io_write_bytes"]), (512, 256))
+        self.assertEqual(footprint["tasks"], 3)
+
+    def test_given_baseline_when_collect_then_memory_growth_task_growth_and_restarts_are_flagged(  # noqa: E501
+        self,
+    ):
+        os.makedirs(self.cgroup_root)
+        self._write_unified_cgroup("magma@mme", 100 * MIB)
+        self._write_unified_cgroup("magma@pipelined", 200 * MIB)
+        self.cgroup_footprint_report.save_baseline(self._collect())
+        self._write_unified_cgroup("magma@mme", 110 * MIB)
+        self._write_unified_cgroup("magma@pipelined", 400 * MIB, tasks=40)
+        with open(self.baseline_file, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+        baseline["services"]["magma@pipelined"]["restarts"] = 0
+        with open(self.baseline_file, "w") as baseline_file:
+            json.dump(baseline, baseline_file)
+
+        report = self._collect()
+
+        self.assertEqual(
+            report["flagged"],
+            [
+                f"magma@pipelined memory usage grew from {200 * MIB} to {400 * MIB} "
+                "since baseline!",
+                f"magma@pipelined peak memory usage grew from {201 * MIB} to {401 * MIB} "
+                "since baseline!",
+                "magma@pipelined task count grew from 5 to 40 since baseline!",
+                "magma@pipelined restarted 2 times since baseline!",
+            ],
+        )
+        self.assertFalse(os.path.exists(f"{self.baseline_file}.tmp"))
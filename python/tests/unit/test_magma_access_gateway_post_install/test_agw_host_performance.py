@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from magma_access_gateway_post_install.agw_host_performance import (
+    AGWHostPerformanceReport,
+)
+
+
+class TestAGWHostPerformanceReport(unittest.TestCase):
+    TEST_INTERVAL = 5
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sys_cpu = os.path.join(self.tempdir.name, "sys", "devices", "system", "cpu")
+        self.proc_meminfo = os.path.join(self.tempdir.name, "meminfo")
+        self.tmpfiles_config_file = os.path.join(self.tempdir.name, "magma-host-performance.conf")
+        self.hugepages_config_file = os.path.join(self.tempdir.name, "99-magma-hugepages.conf")
+        for cpu in ["cpu0", "cpu1"]:
+            self._write_cpu(cpu, "performance", cur_freq="2000000", max_freq="2100000")
+        self._write(self.proc_meminfo, "HugePages_Total:     256\n")
+        self.patches = [
+            patch.object(AGWHostPerformanceReport, "SYS_CPU", self.sys_cpu),
+            patch.object(AGWHostPerformanceReport, "PROC_MEMINFO", self.proc_meminfo),
+            patch.object(
+                AGWHostPerformanceReport, "TMPFILES_CONFIG_FILE", self.tmpfiles_config_file
+            ),
+            patch.object(
+                AGWHostPerformanceReport,
+                "HUGEPAGES_SYSCTL_CONFIG_FILE",
+                self.hugepages_config_file,
+            ),
+            patch("magma_access_gateway_post_install.agw_host_performance.time.sleep", Mock()),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+        self.host_performance_report = AGWHostPerformanceReport(self.TEST_INTERVAL)
+
+    def tearDown(self) -> None:
+        for patcher in self.patches:
+            patcher.stop()
+        self.tempdir.cleanup()
+
+    @staticmethod
+    def _write(path: str, content: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(content)
+
+    def _write_cpu(
+        self,
+        cpu: str,
+        governor: str,
+        cur_freq: str,
+        max_freq: str,
+        core_throttle_count: str = "0",
+        package_throttle_count: str = "0",
+    ):
+        cpu_dir = os.path.join(self.sys_cpu, cpu)
+        self._write(os.path.join(cpu_dir, "cpufreq", "scaling_governor"), f"{governor}\n")
+        self._write(os.path.join(cpu_dir, "cpufreq", "scaling_cur_freq"), f"{cur_freq}\n")
+        self._write(os.path.join(cpu_dir, "cpufreq", "scaling_max_freq"), f"{max_freq}\n")
+        self._write(
+            os.path.join(cpu_dir, "thermal_throttle", "core_throttle_count"), core_throttle_count
+        )
+        self._write(
+            os.path.join(cpu_dir, "thermal_throttle", "package_throttle_count"),
+            package_throttle_count,
+        )
+
+    def test_given_host_tuned_by_installer_when_collect_then_cpus_and_hugepages_are_reported_and_nothing_is_flagged(  # noqa: E501
+        self,
+    ):
+        self._write(self.tmpfiles_config_file, "w /sys/devices/system/cpu/cpu*/...\n")
+        self._write(self.hugepages_config_file, "vm.nr_hugepages = 256\n")
+
+        report = self.host_performance_report.collect()
+
+        self.assertEqual(
+            report["cpus"]["cpu0"],
+            {
+                "governor": "performance",
+                "cur_freq": 2000000,
+                "max_freq": 2100000,
+                "core_throttle_count": 0,
+                "package_throttle_count": 0,
+                "core_throttles": 0,
+                "package_throttles": 0,
+            },
+        )
+        self.assertEqual(report["hugepages"], {"total": 256, "target": 256})
+        self.assertEqual(report["flagged"], [])
+
+    def test_given_governor_reset_and_hugepages_missing_when_collect_then_both_are_flagged(self):
+        self._write(self.tmpfiles_config_file, "w /sys/devices/system/cpu/cpu*/...\n")
+        self._write(self.hugepages_config_file, "vm.nr_hugepages = 512\n")
+        self._write_cpu("cpu1", "powersave", cur_freq="800000", max_freq="2100000")
+
+        report = self.host_performance_report.collect()
+
+        self.assertEqual(
+            report["flagged"],
+            [
+                "cpu1 governor is powersave instead of performance!",
+                "Only 256 out of 512 hugepages are reserved!",
+            ],
+        )
+
+    def test_given_host_not_tuned_by_installer_when_collect_then_governor_and_hugepages_are_not_flagged(  # noqa: E501
+        self,
+    ):
+        self._write_cpu("cpu1", "powersave", cur_freq="800000", max_freq="2100000")
+
+        report = self.host_performance_report.collect()
+
+        self.assertIsNone(report["hugepages"]["target"])
+        self.assertEqual(report["flagged"], [])
+
+    def test_given_idle_cpu_below_its_turbo_frequency_when_collect_then_frequency_is_not_flagged(
+        self,
+    ):
+        self._write(os.path.join(self.sys_cpu, "cpu1", "cpufreq", "cpuinfo_max_freq"), "3500000\n")
+
+        self.assertEqual(self.host_performance_report.collect()["flagged"], [])
+
+    @patch("magma_access_gateway_post_install.agw_host_performance.time.sleep")
+    def test_given_cpu_throttled_during_sampling_interval_when_collect_then_throttling_and_low_frequency_are_flagged(  # noqa: E501
+        self, mocked_sleep
+    ):
+        self._write_cpu(
+            "cpu1",
+            "performance",
+            cur_freq="1200000",
+            max_freq="2100000",
+            package_throttle_count="3",
+        )
+        mocked_sleep.side_effect = lambda interval: self._write_cpu(
+            "cpu1",
+            "performance",
+            cur_freq="1200000",
+            max_freq="2100000",
+            core_throttle_count="1",
+            package_throttle_count="5",
+        )
+
+        report = self.host_performance_report.collect()
+
+        mocked_sleep.assert_called_once_with(self.TEST_INTERVAL)
+        self.assertEqual(report["cpus"]["cpu1"]["package_throttles"], 2)
+        self.assertEqual(
+            report["flagged"],
+            [
+                "cpu1 was thermally throttled 3 times in 5 seconds!",
+                "cpu1 runs at 1200000 kHz which is well below its maximum of 2100000 kHz!",
+            ],
+        )
+
+    def test_given_cpu_throttled_only_before_sampling_interval_when_collect_then_throttling_is_not_flagged(  # noqa: E501
+        self,
+    ):
+        self._write_cpu(
+            "cpu1",
+            "performance",
+            cur_freq="2000000",
+            max_freq="2100000",
+            core_throttle_count="7",
+            package_throttle_count="3",
+        )
+
+        report = self.host_performance_report.collect()
+
+        self.assertEqual(report["cpus"]["cpu1"]["core_throttle_count"], 7)
+        self.assertEqual(report["flagged"], [])
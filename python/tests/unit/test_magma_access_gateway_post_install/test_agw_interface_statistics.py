@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from magma_access_gateway_post_install.agw_interface_statistics import (
+    AGWInterfaceStatisticsReport,
+)
+
+
+class TestAGWInterfaceStatisticsReport(unittest.TestCase):
+    TEST_INTERVAL = 10
+    TEST_INTERFACES = ["eth0", "eth1"]
+    IDLE_COUNTERS = {
+        "rx_packets": 0,
+        "tx_packets": 0,
+        "rx_errors": 0,
+        "tx_errors": 0,
+        "rx_dropped": 0,
+        "tx_dropped": 0,
+        "rx_fifo_errors": 0,
+        "tx_fifo_errors": 0,
+        "rx_over_errors": 0,
+        "carrier_changes": 2,
+    }
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.patcher = patch.object(
+            AGWInterfaceStatisticsReport, "SYS_CLASS_NET", self.tempdir.name
+        )
+        self.patcher.start()
+        self.interface_statistics_report = AGWInterfaceStatisticsReport(
+            self.TEST_INTERFACES, interval=self.TEST_INTERVAL
+        )
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        self.tempdir.cleanup()
+
+    def _write_counters(self, interface: str, counters: dict):
+        interface_dir = os.path.join(self.tempdir.name, interface)
+        os.makedirs(os.path.join(interface_dir, "statistics"), exist_ok=True)
+        for counter, value in counters.items():
+            counter_path = (
+                os.path.join(interface_dir, counter)
+                if counter == "carrier_changes"
+                else os.path.join(interface_dir, "statistics", counter)
+            )
+            with open(counter_path, "w") as counter_file:
+                counter_file.write(f"{value}\n")
+
+    def _collect_between(self, first_counters: dict, second_counters: dict) -> dict:
+        for interface, counters in first_counters.items():
+            self._write_counters(interface, counters)
+
+        def _write_second_sample(_):
+            for interface, counters in second_counters.items():
+                self._write_counters(interface, counters)
+
+        with patch(
+            "magma_access_gateway_post_install.agw_interface_statistics.time.sleep",
+            _write_second_sample,
+        ):
+            return self.interface_statistics_report.collect()
+
+    def test_given_healthy_interfaces_when_collect_then_rates_are_reported_and_nothing_is_flagged(  # noqa: E501
+        self,
+    ):
+        report = self._collect_between(
+            {"eth0": self.IDLE_COUNTERS, "eth1": self.IDLE_COUNTERS},
+            {
+                "eth0": dict(self.IDLE_COUNTERS, rx_packets=60000, tx_packets=40000, rx_dropped=5),
+                "eth1": self.IDLE_COUNTERS,
+            },
+        )
+
+        self.assertEqual(report["interfaces"]["eth0"]["packet_rate"], 10000.0)
+        self.assertEqual(report["interfaces"]["eth0"]["drops_rate"], 0.5)
+        self.assertEqual(report["interfaces"]["eth1"]["drops_ratio"], 0.0)
+        self.assertEqual(report["flagged"], [])
+        self.assertEqual(report["failed"], [])
+
+    def test_given_interfaces_dropping_packets_and_flapping_when_collect_then_warning_and_failure_thresholds_are_applied(  # noqa: E501
+        self,
+    ):
+        report = self._collect_between(
+            {"eth0": self.IDLE_COUNTERS, "eth1": self.IDLE_COUNTERS},
+            {
+                "eth0": dict(self.IDLE_COUNTERS, rx_packets=10000, rx_dropped=200),
+                "eth1": dict(
+                    self.IDLE_COUNTERS, rx_packets=10000, rx_fifo_errors=50, carrier_changes=3
+                ),
+            },
+        )
+
+        self.assertEqual(report["failed"], ["eth0 drops ratio is 0.0200 (20.0/s)!"])
+        self.assertEqual(
+            report["flagged"],
+            [
+                "eth1 fifo overruns ratio is 0.0050 (5.0/s)!",
+                "eth1 carrier flapped 1 times!",
+            ],
+        )
+
+    def test_given_idle_interface_with_stray_drops_when_collect_then_its_ratios_are_not_judged(  # noqa: E501
+        self,
+    ):
+        report = self._collect_between(
+            {"eth0": self.IDLE_COUNTERS, "eth1": self.IDLE_COUNTERS},
+            {
+                "eth0": dict(self.IDLE_COUNTERS, rx_packets=60000, tx_packets=40000),
+                "eth1": dict(self.IDLE_COUNTERS, rx_packets=3, rx_dropped=1),
+            },
+        )
+
+        self.assertAlmostEqual(report["interfaces"]["eth1"]["drops_ratio"], 1 / 3)
+        self.assertEqual(report["flagged"], [])
+        self.assertEqual(report["failed"], [])
+
+    def test_given_missing_interface_when_collect_then_its_statistics_are_flagged_as_unavailable(  # noqa: E501
+        self,
+    ):
+        report = self._collect_between(
+            {"eth0": self.IDLE_COUNTERS}, {"eth0": dict(self.IDLE_COUNTERS, carrier_changes=12)}
+        )
+
+        self.assertIsNone(report["interfaces"]["eth1"])
+        self.assertEqual(report["flagged"], ["eth1 statistics are unavailable!"])
+        self.assertEqual(report["failed"], ["eth0 carrier flapped 10 times!"])
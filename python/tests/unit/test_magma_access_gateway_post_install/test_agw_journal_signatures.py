@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import unittest
+from datetime import datetime
+from unittest.mock import Mock, call, patch
+
+from magma_access_gateway_post_install.agw_journal_signatures import (
+    AGWJournalSignatureReport,
+)
+
+
+class TestAGWJournalSignatureReport(unittest.TestCase):
+    SYSTEMCTL_LIST_UNITS_OUTPUT = b"""magma@magmad.service loaded active running Magma magmad
+magma@mme.service    loaded failed failed  Magma OAI MME
+"""
+
+    def setUp(self) -> None:
+        self.journal_reader = Mock()
+        self.journal_signature_report = AGWJournalSignatureReport()
+
+    @staticmethod
+    def _journal_entry(message, unit: str = "magma@magmad.service", second: int = 0) -> dict:
+        return {
+            "MESSAGE": message,
+            "_SYSTEMD_UNIT": unit,
+            "__REALTIME_TIMESTAMP": datetime(2022, 9, 1, 10, 0, second),
+        }
+
+    def _collect(self, journal_entries: list) -> dict:
+        self.journal_reader.__iter__ = Mock(return_value=iter(journal_entries))
+        with patch(
+            "magma_access_gateway_post_install.agw_journal_signatures.check_output",
+            Mock(return_value=self.SYSTEMCTL_LIST_UNITS_OUTPUT),
+        ), patch(
+            "magma_access_gateway_post_install.agw_journal_signatures.journal.Reader",
+            Mock(return_value=self.journal_reader),
+        ):
+            return self.journal_signature_report.collect()
+
+    def test_given_journal_with_known_failures_when_collect_then_counts_first_and_last_occurrences_and_hints_are_reported(  # noqa: E501
+        self,
+    ):
+        report = self._collect(
+            [
+                self._journal_entry("[SyncRPC] Got heartBeat from cloud", second=1),
+                self._journal_entry(
+                    "[SyncRPC] Failed: StatusCode.UNAVAILABLE failed to connect to all addresses",
+                    second=2,
+                ),
+                self._journal_entry(
+                    "ovs-vsctl: Error: could not add network device gtp0 to ofproto",
+                    unit="magma@pipelined.service",
+                    second=3,
+                ),
+                self._journal_entry("Bootstrap failed: Deadline Exceeded", second=4),
+                self._journal_entry("statusCode.unavailable", second=5),
+            ]
+        )
+
+        signatures = {signature["signature"]: signature for signature in report["signatures"]}
+        self.assertEqual(report["scanned"], 5)
+        self.assertEqual(
+            {name: signature["count"] for name, signature in signatures.items()},
+            {"orc8r_unavailable": 2, "ovs_gtp_device": 1, "orc8r_bootstrap": 1},
+        )
+        self.assertEqual(
+            signatures["orc8r_unavailable"]["first"]["timestamp"], "2022-09-01 10:00:02"
+        )
+        self.assertEqual(
+            signatures["orc8r_unavailable"]["last"]["timestamp"], "2022-09-01 10:00:05"
+        )
+        self.assertEqual(signatures["ovs_gtp_device"]["first"]["unit"], "magma@pipelined.service")
+        self.assertIn("kernel is 5.4", signatures["ovs_gtp_device"]["hint"])
+
+    def test_given_systemd_entry_about_crashed_unit_when_collect_then_core_dump_is_reported_for_that_unit(  # noqa: E501
+        self,
+    ):
+        report = self._collect(
+            [
+                {
+                    "MESSAGE": "magma@mme.service: Main process exited, code=dumped",
+                    "_SYSTEMD_UNIT": "init.scope",
+                    "UNIT": "magma@mme.service",
+                }
+            ]
+        )
+
+        self.assertEqual(report["signatures"][0]["signature"], "core_dump")
+        self.assertEqual(report["signatures"][0]["first"]["unit"], "magma@mme.service")
+
+    def test_given_long_undecodable_message_when_collect_then_stored_message_is_decoded_and_truncated(  # noqa: E501
+        self,
+    ):
+        report = self._collect(
+            [self._journal_entry(b"Traceback (most recent call last)\xff" * 20)]
+        )
+
+        message = report["signatures"][0]["first"]["message"]
+        self.assertEqual(len(message), AGWJournalSignatureReport.MAX_MESSAGE_LENGTH)
+        self.assertIn("�", message)
+
+    def test_given_loaded_magma_units_when_collect_then_journal_is_filtered_to_this_boot_and_magma_units_and_sctpd(  # noqa: E501
+        self,
+    ):
+        report = self._collect([])
+
+        self.assertEqual(
+            report["units"], ["magma@magmad.service", "magma@mme.service", "sctpd.service"]
+        )
+        self.journal_reader.add_match.assert_has_calls(
+            [call(_SYSTEMD_UNIT=unit) for unit in report["units"]]
+            + [call(UNIT=unit) for unit in report["units"]]  # noqa: W503
+        )
+        self.assertEqual(self.journal_reader.this_boot.call_count, 2)
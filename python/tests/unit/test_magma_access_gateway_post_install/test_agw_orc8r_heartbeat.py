@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from magma_access_gateway_post_install.agw_orc8r_heartbeat import (
+    AGWOrc8rHeartbeatReport,
+)
+
+
+class TestAGWOrc8rHeartbeatReport(unittest.TestCase):
+    HEARTBEAT_MSG = "[SyncRPC] Got heartBeat from cloud"
+    CHECKIN_MSG = "Checkin Successful! Successfully sent states to the cloud!"
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.orc8r_heartbeat_report = AGWOrc8rHeartbeatReport()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    @staticmethod
+    def _journal_entries(message: str, seconds_ago: list) -> list:
+        now = datetime.now()
+        return [
+            {"MESSAGE": message, "__REALTIME_TIMESTAMP": now - timedelta(seconds=seconds)}
+            for seconds in seconds_ago
+        ]
+
+    def _collect(self, journal_entries: list) -> dict:
+        journal_reader = Mock()
+        journal_reader.__iter__ = Mock(
+            return_value=iter(
+                sorted(journal_entries, key=lambda entry: entry["__REALTIME_TIMESTAMP"])
+            )
+        )
+        with patch(
+            "magma_access_gateway_post_install.agw_orc8r_heartbeat.journal.Reader",
+            Mock(return_value=journal_reader),
+        ):
+            return self.orc8r_heartbeat_report.collect()
+
+    def test_given_regular_heartbeats_when_collect_then_interval_statistics_are_reported_and_nothing_is_flagged(  # noqa: E501
+        self,
+    ):
+        report = self._collect(
+            self._journal_entries(self.HEARTBEAT_MSG, [120, 90, 60, 30, 1])
+            + self._journal_entries("Just some random log message.", [45])  # noqa: W503
+        )
+
+        heartbeat = report["statistics"]["heartbeat"]
+        self.assertEqual(heartbeat["successes"], 5)
+        self.assertEqual(heartbeat["intervals"], 4)
+        self.assertAlmostEqual(heartbeat["mean_interval_s"], 29.75, places=1)
+        self.assertAlmostEqual(heartbeat["longest_gap_s"], 30.0, places=1)
+        self.assertEqual(heartbeat["histogram"], [0, 0, 4, 0, 0, 0, 0])
+        self.assertLess(heartbeat["since_last_success_s"], 5)
+        self.assertEqual(report["flagged"], [])
+
+    def test_given_irregular_heartbeats_when_collect_then_jitter_is_reported_and_long_gap_is_flagged(  # noqa: E501
+        self,
+    ):
+        report = self._collect(
+            self._journal_entries(self.HEARTBEAT_MSG, [1000, 990, 980, 970, 960, 950, 400, 390])
+        )
+
+        heartbeat = report["statistics"]["heartbeat"]
+        self.assertAlmostEqual(heartbeat["longest_gap_s"], 550.0, places=1)
+        self.assertGreater(heartbeat["jitter_s"], 100)
+        self.assertEqual(len(report["flagged"]), 2)
+        self.assertTrue(report["flagged"][0].startswith("Longest gap between Orc8r heartbeats"))
+        self.assertTrue(report["flagged"][1].startswith("Last Orc8r heartbeat was"))
+
+    def test_given_no_successes_this_boot_when_collect_then_missing_connectivity_is_flagged(self):
+        report = self._collect([])
+
+        self.assertEqual(report["flagged"], ["magmad hasn't reached Orc8r in the current boot!"])
+        self.assertIsNone(report["statistics"]["checkin"]["since_last_success_s"])
+
+    def test_given_report_when_write_metrics_then_prometheus_histogram_and_gauges_are_written(
+        self,
+    ):
+        report = self._collect(self._journal_entries(self.CHECKIN_MSG, [700, 100, 40]))
+        metrics_file = os.path.join(self.tempdir.name, "magma_orc8r_heartbeat.prom")
+
+        self.orc8r_heartbeat_report.write_metrics(report, metrics_file)
+
+        with open(metrics_file, "r") as metrics:
+            lines = metrics.read().splitlines()
+        self.assertIn(
+            'magma_agw_orc8r_success_interval_seconds_bucket{kind="checkin",le="60"} 1', lines
+        )
+        self.assertIn(
+            'magma_agw_orc8r_success_interval_seconds_bucket{kind="checkin",le="600"} 2', lines
+        )
+        self.assertIn('magma_agw_orc8r_success_interval_seconds_count{kind="checkin"} 2', lines)
+        self.assertIn('magma_agw_orc8r_successes{kind="heartbeat"} 0', lines)
+        self.assertFalse(os.path.exists(f"{metrics_file}.tmp"))
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import unittest
+from unittest.mock import Mock, call, patch
+
+from magma_access_gateway_post_install.agw_ovs_performance import (
+    AGWOVSPerformanceReport,
+)
+
+
+class TestAGWOVSPerformanceReport(unittest.TestCase):
+    TEST_INTERVAL = 10
+    TEST_MISS_RATIO_THRESHOLD = 0.2
+    DPCTL_SHOW_FIRST_SAMPLE = b"""system@ovs-system:
+  lookups: hit:1000 missed:100 lost:0
+  flows: 20
+  masks: hit:5000 total:4 hit/pkt:4.55
+  port 0: ovs-system (internal)
+  port 1: gtp_br0 (internal)
+"""
+    DPCTL_SHOW_SECOND_SAMPLE = b"""system@ovs-system:
+  lookups: hit:1900 missed:200 lost:10
+  flows: 25
+  masks: hit:9000 total:5 hit/pkt:4.29
+  port 0: ovs-system (internal)
+  port 1: gtp_br0 (internal)
+"""
+    DUMP_TABLES_FIRST_SAMPLE = b"""OFPST_TABLE reply (OF1.4) (xid=0x2):
+  table 0:
+    active=10, lookup=1000, matched=1000
+
+  table 1 ("ingress"):
+    active=5, lookup=500, matched=450
+
+  tables 2...253: ditto
+"""
+    DUMP_TABLES_SECOND_SAMPLE = b"""OFPST_TABLE reply (OF1.4) (xid=0x2):
+  table 0:
+    active=12, lookup=2000, matched=2000
+
+  table 1 ("ingress"):
+    active=6, lookup=1500, matched=950
+
+  tables 2...253: ditto
+"""
+
+    def setUp(self) -> None:
+        self.ovs_performance_report = AGWOVSPerformanceReport(
+            interval=self.TEST_INTERVAL, miss_ratio_threshold=self.TEST_MISS_RATIO_THRESHOLD
+        )
+
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.time.sleep", Mock())
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.check_output")
+    def test_given_ovs_counters_sampled_twice_when_collect_then_datapath_rates_and_miss_ratio_are_computed(  # noqa: E501
+        self, mocked_check_output
+    ):
+        mocked_check_output.side_effect = [
+            self.DPCTL_SHOW_FIRST_SAMPLE,
+            self.DUMP_TABLES_FIRST_SAMPLE,
+            self.DPCTL_SHOW_SECOND_SAMPLE,
+            self.DUMP_TABLES_SECOND_SAMPLE,
+        ]
+
+        report = self.ovs_performance_report.collect()
+
+        self.assertEqual(report["datapath"]["flows"], 25)
+        self.assertEqual(report["datapath"]["masks"], 5)
+        self.assertEqual(report["datapath"]["hit_rate"], 90)
+        self.assertEqual(report["datapath"]["missed_rate"], 10)
+        self.assertEqual(report["datapath"]["lost_rate"], 1)
+        self.assertEqual(report["datapath"]["miss_ratio"], 0.1)
+
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.time.sleep", Mock())
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.check_output")
+    def test_given_ovs_counters_sampled_twice_when_collect_then_tables_with_miss_ratio_above_threshold_are_flagged(  # noqa: E501
+        self, mocked_check_output
+    ):
+        mocked_check_output.side_effect = [
+            self.DPCTL_SHOW_FIRST_SAMPLE,
+            self.DUMP_TABLES_FIRST_SAMPLE,
+            self.DPCTL_SHOW_SECOND_SAMPLE,
+            self.DUMP_TABLES_SECOND_SAMPLE,
+        ]
+
+        report = self.ovs_performance_report.collect()
+
+        self.assertEqual(
+            report["tables"],
+            [
+                {
+                    "table": 0,
+                    "active": 12,
+                    "lookup_rate": 100,
+                    "matched_rate": 100,
+                    "miss_ratio": 0,
+                },
+                {
+                    "table": 1,
+                    "active": 6,
+                    "lookup_rate": 100,
+                    "matched_rate": 50,
+                    "miss_ratio": 0.5,
+                },
+            ],
+        )
+        self.assertEqual(report["flagged"], ["gtp_br0 table 1"])
+
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.time.sleep")
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.check_output")
+    def test_given_ovs_performance_report_when_collect_then_ovs_commands_are_called_twice_with_configured_interval_between_samples(  # noqa: E501
+        self, mocked_check_output, mocked_sleep
+    ):
+        mocked_check_output.side_effect = [
+            self.DPCTL_SHOW_FIRST_SAMPLE,
+            self.DUMP_TABLES_FIRST_SAMPLE,
+            self.DPCTL_SHOW_SECOND_SAMPLE,
+            self.DUMP_TABLES_SECOND_SAMPLE,
+        ]
+        expected_ovs_calls = [
+            call(["sudo", "ovs-appctl", "dpctl/show"]),
+            call(["sudo", "ovs-ofctl", "-O", "OpenFlow14", "dump-tables", "gtp_br0"]),
+        ]
+
+        self.ovs_performance_report.collect()
+
+        mocked_check_output.assert_has_calls(expected_ovs_calls * 2)
+        mocked_sleep.assert_called_once_with(self.TEST_INTERVAL)
+
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.time.sleep", Mock())
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.check_output")
+    def test_given_no_traffic_between_samples_when_collect_then_miss_ratios_are_zero_and_nothing_is_flagged(  # noqa: E501
+        self, mocked_check_output
+    ):
+        mocked_check_output.side_effect = [
+            self.DPCTL_SHOW_FIRST_SAMPLE,
+            self.DUMP_TABLES_FIRST_SAMPLE,
+        ] * 2
+
+        report = self.ovs_performance_report.collect()
+
+        self.assertEqual(report["datapath"]["miss_ratio"], 0)
+        self.assertEqual(report["flagged"], [])
+
+    @patch("magma_access_gateway_post_install.agw_ovs_performance.logger.warning")
+    def test_given_report_with_flagged_items_when_log_report_then_warning_is_logged_for_each_flagged_item(  # noqa: E501
+        self, mocked_logger_warning
+    ):
+        test_report = {
+            "interval": self.TEST_INTERVAL,
+            "datapath": {
+                "hit": 1,
+                "missed": 1,
+                "lost": 0,
+                "flows": 1,
+                "masks": 1,
+                "hit_rate": 0.1,
+                "missed_rate": 0.1,
+                "lost_rate": 0,
+                "miss_ratio": 0.5,
+            },
+            "tables": [],
+            "flagged": ["OVS datapath"],
+        }
+
+        self.ovs_performance_report.log_report(test_report)
+
+        mocked_logger_warning.assert_called_once_with(
+            "OVS datapath miss ratio exceeds threshold of 0.2!"
+        )
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from magma_access_gateway_post_install.agw_ovs_tuning import AGWOVSTuningReport
+
+
+class TestAGWOVSTuningReport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.ovs_tuning_file = os.path.join(self.tempdir.name, "ovs_tuning.yml")
+        self.ovs_tuning_report = AGWOVSTuningReport(self.ovs_tuning_file)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    @patch("magma_access_gateway_post_install.agw_ovs_tuning.check_output")
+    def test_given_ovs_not_tuned_during_installation_when_collect_then_nothing_is_flagged(
+        self, mocked_check_output
+    ):
+        report = self.ovs_tuning_report.collect()
+
+        self.assertEqual(report, {"tuned": False, "settings": [], "flagged": []})
+        mocked_check_output.assert_not_called()
+
+    @patch("magma_access_gateway_post_install.agw_ovs_tuning.check_output")
+    def test_given_other_config_reset_after_installation_when_collect_then_reset_settings_are_flagged(  # noqa: E501
+        self, mocked_check_output
+    ):
+        with open(self.ovs_tuning_file, "w") as ovs_tuning_file:
+            ovs_tuning_file.write(
+                "# This is the Open vSwitch tuning written by magma-access-gateway snap\n"
+                "other_config:\n"
+                "  n-handler-threads: '5'\n"
+                "  max-idle: '2500'\n"
+            )
+        current_values = {
+            "other_config:n-handler-threads": b'"5"\n',
+            "other_config:max-idle": b"\n",
+        }
+        mocked_check_output.side_effect = lambda command: current_values[command[-1]]
+
+        report = self.ovs_tuning_report.collect()
+
+        self.assertTrue(report["tuned"])
+        self.assertEqual(report["flagged"], ["max-idle"])
@@ -3,6 +3,7 @@
 # See LICENSE file for licensing details.
 
 import unittest
+from subprocess import CalledProcessError
 from unittest.mock import Mock, PropertyMock, mock_open, patch
 
 from magma_access_gateway_post_install import main as access_gateway_post_install_main
@@ -10,6 +11,7 @@ from magma_access_gateway_post_install.agw_post_install import (
     AGWConfigurationError,
     AGWControlProxyConfigFileMissingError,
     AGWControlProxyConfigurationError,
+    AGWInterfaceErrorRateError,
     AGWPackagesMissingError,
     AGWPostInstallChecks,
     AGWRootCertificateMissingError,
@@ -122,6 +124,22 @@ class TestAGWPostInstallChecks(unittest.TestCase):
         with self.assertRaises(AGWConfigurationError):
             self.agw_post_install.check_whether_required_interfaces_are_configured()
 
+    @patch(
+        "magma_access_gateway_post_install.agw_post_install.AGWInterfaceStatisticsReport.collect"
+    )
+    def test_given_interface_rate_above_failure_threshold_when_check_interface_error_rates_then_agwinterfaceerrorrateerror_is_raised(  # noqa: E501
+        self, mocked_collect
+    ):
+        mocked_collect.return_value = {
+            "interval": 5,
+            "interfaces": {},
+            "flagged": [],
+            "failed": ["eth1 drops ratio is 0.0200 (20.0/s)!"],
+        }
+
+        with self.assertRaises(AGWInterfaceErrorRateError):
+            self.agw_post_install.check_interface_error_rates()
+
     @patch(
         "magma_access_gateway_post_install.agw_post_install.check_output",
         return_value=OVS_SHOW_OUTPUT_WITH_ERROR.encode("utf-8"),
@@ -132,6 +150,22 @@ class TestAGWPostInstallChecks(unittest.TestCase):
         with self.assertRaises(AGWConfigurationError):
             self.agw_post_install.check_ovs_has_not_unsupported_gpt_error()
 
+    @patch("magma_access_gateway_post_install.agw_post_install.logger.warning")
+    @patch("magma_access_gateway_post_install.agw_post_install.AGWSCTPPerformanceReport", Mock())
+    @patch(
+        "magma_access_gateway_post_install.agw_ovs_performance.check_output",
+        Mock(side_effect=CalledProcessError(1, "ovs-appctl")),
+    )
+    def test_given_ovs_counters_unavailable_when_check_datapath_performance_then_warning_is_logged_and_no_error_is_raised(  # noqa: E501
+        self, mocked_logger_warning
+    ):
+        self.agw_post_install.check_datapath_performance()
+
+        self.assertIn(
+            "OVS datapath performance couldn't be measured",
+            mocked_logger_warning.call_args.args[0],
+        )
+
     @patch(
         "magma_access_gateway_post_install.agw_post_install.ping",
         Mock(return_value=None),
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import socketserver
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import yaml
+
+from magma_access_gateway_post_install.agw_redis_performance import (
+    AGWRedisPerformanceReport,
+    RedisReplyError,
+)
+
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    """Answers a small subset of Redis commands using Redis serialization protocol."""
+
+    def handle(self):
+        while command := self._read_command():
+            self.wfile.write(self.server.reply(command))  # type: ignore[attr-defined]
+
+    def _read_command(self) -> list:
+        header = self.rfile.readline()
+        if not header:
+            return []
+        arguments = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            arguments.append(self.rfile.read(length + 2)[:-2].decode())
+        return arguments
+
+
+class RedisStandInMixin:
+    daemon_threads = True
+
+    def _init_redis_stand_in(self, info_memory: str, slowlog: bytes):
+        self.info_memory = info_memory
+        self.slowlog = slowlog
+        self.store: dict = {}
+        self.commands: list = []
+
+    def reply(self, command: list) -> bytes:
+        self.commands.append(command)
+        name = command[0].upper()
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name == "SET":
+            self.store[command[1]] = command[2]
+            return b"+OK\r\n"
+        if name == "GET":
+            value = self.store.get(command[1])
+            return f"${len(value)}\r\n{value}\r\n".encode() if value else b"$-1\r\n"
+        if name == "DEL":
+            return f":{int(self.store.pop(command[1], None) is not None)}\r\n".encode()
+        if name == "INFO":
+            return f"${len(self.info_memory)}\r\n{self.info_memory}\r\n".encode()
+        if name == "SLOWLOG":
+            return self.slowlog
+        return f"-ERR unknown command '{command[0]}'\r\n".encode()
+
+
+class RedisStandIn(RedisStandInMixin, socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+
+    def __init__(self, info_memory: str, slowlog: bytes):
+        super().__init__(("127.0.0.1", 0), RedisStandInHandler)
+        self._init_redis_stand_in(info_memory, slowlog)
+
+
+class UnixRedisStandIn(RedisStandInMixin, socketserver.ThreadingUnixStreamServer):
+    def __init__(self, unix_socket: str, info_memory: str, slowlog: bytes):
+        super().__init__(unix_socket, RedisStandInHandler)
+        self._init_redis_stand_in(info_memory, slowlog)
+
+
+class TestAGWRedisPerformanceReport(unittest.TestCase):
+    INFO_MEMORY = (
+        "# Memory\r\n"
+        "used_memory:1048576\r\n"
+        "used_memory_human:1.00M\r\n"
+        "maxmemory:536870912\r\n"
+        "maxmemory_policy:noeviction\r\n"
+        "mem_fragmentation_ratio:1.10\r\n"
+    )
+    EMPTY_SLOWLOG = b"*0\r\n"
+    SLOWLOG_WITH_ENTRY = (
+        b"*1\r\n"
+        b"*6\r\n:14\r\n:1660000000\r\n:25000\r\n"
+        b"*2\r\n$4\r\nKEYS\r\n$1\r\n*\r\n"
+        b"$15\r\n127.0.0.1:50000\r\n$0\r\n\r\n"
+    )
+
+    def _start_redis_stand_in(
+        self, info_memory: str = INFO_MEMORY, slowlog: bytes = EMPTY_SLOWLOG
+    ):
+        return self._serve(RedisStandIn(info_memory, slowlog))[1]
+
+    def _serve(self, redis_stand_in: RedisStandInMixin):
+        self.redis_stand_in = redis_stand_in
+        threading.Thread(target=self.redis_stand_in.serve_forever, daemon=True).start()
+        self.addCleanup(self.redis_stand_in.server_close)
+        self.addCleanup(self.redis_stand_in.shutdown)
+        return self.redis_stand_in.server_address
+
+    def test_given_healthy_redis_when_collect_then_latency_percentiles_memory_and_slowlog_are_reported(  # noqa: E501
+        self,
+    ):
+        port = self._start_redis_stand_in()
+        redis_performance_report = AGWRedisPerformanceReport(
+            port=port, samples=20, latency_threshold_ms=1000
+        )
+
+        report = redis_performance_report.collect()
+
+        self.assertEqual(set(report["latency"].keys()), {"PING", "SET", "GET"})
+        self.assertEqual(set(report["latency"]["GET"].keys()), {"p50", "p95", "p99", "max"})
+        self.assertLessEqual(report["latency"]["PING"]["p50"], report["latency"]["PING"]["max"])
+        self.assertEqual(
+            report["memory"],
+            {
+                "used_memory": 1048576,
+                "maxmemory": 536870912,
+                "maxmemory_policy": "noeviction",
+                "mem_fragmentation_ratio": 1.1,
+            },
+        )
+        self.assertEqual(report["slowlog"], [])
+        self.assertEqual(report["flagged"], [])
+        self.assertIn(["DEL", AGWRedisPerformanceReport.PROBE_KEY], self.redis_stand_in.commands)
+
+    def test_given_redis_without_memory_limit_and_with_slow_commands_when_collect_then_both_are_flagged(  # noqa: E501
+        self,
+    ):
+        port = self._start_redis_stand_in(
+            info_memory=self.INFO_MEMORY.replace("maxmemory:536870912", "maxmemory:0"),
+            slowlog=self.SLOWLOG_WITH_ENTRY,
+        )
+        redis_performance_report = AGWRedisPerformanceReport(
+            port=port, samples=5, latency_threshold_ms=1000
+        )
+
+        report = redis_performance_report.collect()
+
+        self.assertEqual(
+            report["slowlog"], [{"id": 14, "duration_us": 25000, "command": "KEYS *"}]
+        )
+        self.assertEqual(
+            report["flagged"],
+            ["Redis has no memory limit set!", "Slow Redis command: KEYS * took 25000us!"],
+        )
+
+    def test_given_unix_socket_configured_in_redis_config_when_collect_then_redis_is_reached_over_unix_socket(  # noqa: E501
+        self,
+    ):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        unix_socket = os.path.join(tempdir.name, "redis.sock")
+        redis_config_file = os.path.join(tempdir.name, "redis.yml")
+        with open(redis_config_file, "w") as redis_config:
+            yaml.safe_dump(
+                {"bind": "127.0.0.1", "port": 1, "unixsocket": unix_socket}, redis_config
+            )
+        self._serve(UnixRedisStandIn(unix_socket, self.INFO_MEMORY, self.EMPTY_SLOWLOG))
+
+        with patch.object(AGWRedisPerformanceReport, "REDIS_CONFIG_FILE", redis_config_file):
+            report = AGWRedisPerformanceReport(samples=5, latency_threshold_ms=1000).collect()
+
+        self.assertEqual(report["flagged"], [])
+        self.assertIn(["PING"], self.redis_stand_in.commands)
+
+    def test_given_high_fragmentation_ratio_of_nearly_empty_redis_when_collect_then_fragmentation_is_not_flagged(  # noqa: E501
+        self,
+    ):
+        port = self._start_redis_stand_in(
+            info_memory=self.INFO_MEMORY.replace(
+                "mem_fragmentation_ratio:1.10", "mem_fragmentation_ratio:7.50"
+            )
+        )
+        redis_performance_report = AGWRedisPerformanceReport(
+            port=port, samples=5, latency_threshold_ms=1000
+        )
+
+        self.assertEqual(redis_performance_report.collect()["flagged"], [])
+
+    def test_given_high_fragmentation_ratio_of_redis_holding_data_when_collect_then_fragmentation_is_flagged(  # noqa: E501
+        self,
+    ):
+        port = self._start_redis_stand_in(
+            info_memory=self.INFO_MEMORY.replace(
+                "used_memory:1048576", "used_memory:209715200"
+            ).replace("mem_fragmentation_ratio:1.10", "mem_fragmentation_ratio:1.80")
+        )
+        redis_performance_report = AGWRedisPerformanceReport(
+            port=port, samples=5, latency_threshold_ms=1000
+        )
+
+        self.assertEqual(
+            redis_performance_report.collect()["flagged"],
+            ["Redis memory fragmentation ratio of 1.8 exceeds 1.5!"],
+        )
+
+    def test_given_latency_above_threshold_when_collect_then_commands_are_flagged(self):
+        port = self._start_redis_stand_in()
+        redis_performance_report = AGWRedisPerformanceReport(
+            port=port, samples=5, latency_threshold_ms=0
+        )
+
+        report = redis_performance_report.collect()
+
+        self.assertEqual(len(report["flagged"]), 3)
+        self.assertTrue(report["flagged"][0].startswith("Redis PING p99 latency of"))
+
+    def test_given_redis_replying_with_error_when_collect_then_redis_reply_error_is_raised(self):
+        port = self._start_redis_stand_in(slowlog=b"-ERR slowlog disabled\r\n")
+        redis_performance_report = AGWRedisPerformanceReport(port=port, samples=1)
+
+        with self.assertRaises(RedisReplyError):
+            redis_performance_report.collect()
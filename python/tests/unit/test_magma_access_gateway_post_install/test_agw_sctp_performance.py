@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from magma_access_gateway_post_install.agw_sctp_performance import (
+    AGWSCTPPerformanceReport,
+)
+
+
+class TestAGWSCTPPerformanceReport(unittest.TestCase):
+    TEST_INTERVAL = 10
+    ASSOCS_HEADER = (
+        " ASSOC     SOCK   STY SST ST HBKT ASSOC-ID TX_QUEUE RX_QUEUE UID INODE LPORT RPORT "
+        "LADDRS <-> RADDRS HBINT INS OUTS MAXRT T1X T2X RTXC wmema wmemq sndbuf rcvbuf\n"
+    )
+    ASSOC_LINE = (
+        "ffff8881 ffff8882 2   10  {state}  0       {assoc_id}        0        0       0 "
+        "41220 36412 36412  192.168.60.142 <-> *{peer} 10.0.0.1 \t    2000    2    2   10    0"
+        "    0        {rtxc}        1        0   212992   212992\n"
+    )
+    REMADDR = (
+        "ADDR ASSOC_ID HB_ACT RTO MAX_PATH_RTX REM_ADDR_RTX START STATE\n"
+        "192.168.60.10 3 1 1000 5 0 0 2\n"
+        "10.0.0.1 3 1 3000 5 0 0 2\n"
+        "192.168.60.11 4 1 1200 5 0 0 2\n"
+    )
+    SNMP = """SctpCurrEstab                   \t{established}
+SctpActiveEstabs                \t0
+SctpPassiveEstabs               \t{passive_establishments}
+SctpAborteds                    \t0
+SctpShutdowns                   \t0
+SctpOutOrderChunks              \t{sent}
+SctpOutUnorderChunks            \t0
+SctpT3RtxExpireds               \t{t3_expirations}
+SctpT3Retransmits               \t{retransmits}
+SctpFastRetransmits             \t0
+"""
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.patcher = patch.object(AGWSCTPPerformanceReport, "PROC_NET_SCTP", self.tempdir.name)
+        self.patcher.start()
+        self.sctp_performance_report = AGWSCTPPerformanceReport(interval=self.TEST_INTERVAL)
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        self.tempdir.cleanup()
+
+    def _write(self, name: str, content: str):
+        with open(os.path.join(self.tempdir.name, name), "w") as file:
+            file.write(content)
+
+    def _write_sample(self, associations: list, **snmp_counters):
+        self._write(
+            "assocs",
+            self.ASSOCS_HEADER
+            + "".join(  # noqa: W503
+                self.ASSOC_LINE.format(**association) for association in associations
+            ),
+        )
+        self._write("remaddr", self.REMADDR)
+        self._write("snmp", self.SNMP.format(**snmp_counters))
+
+    def _collect_between(self, first_sample: tuple, second_sample: tuple) -> dict:
+        self._write_sample(*first_sample[:1], **first_sample[1])
+        with patch(
+            "magma_access_gateway_post_install.agw_sctp_performance.time.sleep",
+            lambda _: self._write_sample(*second_sample[:1], **second_sample[1]),
+        ):
+            return self.sctp_performance_report.collect()
+
+    def test_given_healthy_associations_when_collect_then_per_enodeb_state_rto_and_rates_are_reported_and_nothing_is_flagged(  # noqa: E501
+        self,
+    ):
+        associations = [
+            {"state": 3, "assoc_id": 3, "peer": "192.168.60.10", "rtxc": 0},
+            {"state": 3, "assoc_id": 4, "peer": "192.168.60.11", "rtxc": 0},
+        ]
+        counters = {"established": 2, "passive_establishments": 2, "t3_expirations": 0}
+
+        report = self._collect_between(
+            (associations, dict(counters, sent=1000, retransmits=0)),
+            (associations, dict(counters, sent=3000, retransmits=1)),
+        )
+
+        self.assertEqual(
+            [
+                (association["peer"], association["state"], association["rto_ms"])
+                for association in report["associations"]
+            ],
+            [
+                ("192.168.60.10:36412", "ESTABLISHED", 1000),
+                ("192.168.60.11:36412", "ESTABLISHED", 1200),
+            ],
+        )
+        self.assertEqual(report["stack"]["retransmission_ratio"], 0.0005)
+        self.assertEqual(report["flagged"], [])
+
+    def test_given_retransmissions_timeouts_and_reestablished_association_when_collect_then_they_are_flagged(  # noqa: E501
+        self,
+    ):
+        report = self._collect_between(
+            (
+                [{"state": 3, "assoc_id": 3, "peer": "192.168.60.10", "rtxc": 10}],
+                {
+                    "established": 1,
+                    "passive_establishments": 1,
+                    "sent": 1000,
+                    "retransmits": 10,
+                    "t3_expirations": 0,
+                },
+            ),
+            (
+                [
+                    {"state": 3, "assoc_id": 3, "peer": "192.168.60.10", "rtxc": 110},
+                    {"state": 1, "assoc_id": 4, "peer": "192.168.60.11", "rtxc": 0},
+                ],
+                {
+                    "established": 1,
+                    "passive_establishments": 2,
+                    "sent": 2000,
+                    "retransmits": 110,
+                    "t3_expirations": 5,
+                },
+            ),
+        )
+
+        self.assertEqual(report["associations"][0]["retransmission_rate"], 10.0)
+        self.assertEqual(
+            report["flagged"],
+            [
+                "SCTP association with 192.168.60.11:36412 is COOKIE_WAIT!",
+                "SCTP retransmission ratio 0.100 exceeds threshold of 0.01!",
+                "SCTP timers expired 0.5 times per second!",
+                "1 SCTP associations were set up or torn down in 10 seconds!",
+            ],
+        )
+
+    def test_given_sctp_module_not_loaded_when_collect_then_it_is_flagged_without_sampling(self):
+        with patch(
+            "magma_access_gateway_post_install.agw_sctp_performance.time.sleep"
+        ) as mocked_sleep:
+            report = self.sctp_performance_report.collect()
+
+        mocked_sleep.assert_not_called()
+        self.assertEqual(report["flagged"], ["SCTP kernel module isn't loaded!"])
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+import uuid
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from magma_access_gateway_post_install.agw_startup_critical_path import (
+    AGWStartupCriticalPathReport,
+)
+
+
+class TestAGWStartupCriticalPathReport(unittest.TestCase):
+    SYSTEMCTL_SHOW_OUTPUT = b"""Id=magma@magmad.service
+After=network.target magma@redis.service
+ActiveState=active
+InactiveExitTimestampMonotonic=12000000
+ExecMainStartTimestampMonotonic=12100000
+ActiveEnterTimestampMonotonic=12200000
+
+Id=magma@redis.service
+After=network.target
+ActiveState=active
+InactiveExitTimestampMonotonic=10000000
+ExecMainStartTimestampMonotonic=10000000
+ActiveEnterTimestampMonotonic=11000000
+
+Id=magma@state.service
+After=magma@redis.service
+ActiveState=active
+InactiveExitTimestampMonotonic=11500000
+ExecMainStartTimestampMonotonic=11500000
+ActiveEnterTimestampMonotonic=11600000
+
+Id=magma@mme.service
+After=magma@magmad.service
+ActiveState=failed
+InactiveExitTimestampMonotonic=0
+ExecMainStartTimestampMonotonic=0
+ActiveEnterTimestampMonotonic=0
+"""
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.startup_critical_path_report = AGWStartupCriticalPathReport()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    @staticmethod
+    def _journal_entry(message: str, seconds_since_boot: float) -> dict:
+        return {
+            "SYSLOG_IDENTIFIER": "magmad",
+            "MESSAGE": message,
+            "__MONOTONIC_TIMESTAMP": (timedelta(seconds=seconds_since_boot), uuid.uuid4()),
+        }
+
+    def _collect(self, journal_entries: list) -> dict:
+        journal_reader = Mock()
+        journal_reader.__iter__ = Mock(return_value=iter(journal_entries))
+        with patch(
+            "magma_access_gateway_post_install.agw_startup_critical_path.check_output",
+            Mock(return_value=self.SYSTEMCTL_SHOW_OUTPUT),
+        ), patch(
+            "magma_access_gateway_post_install.agw_startup_critical_path.journal.Reader",
+            Mock(return_value=journal_reader),
+        ):
+            return self.startup_critical_path_report.collect()
+
+    def test_given_magma_units_and_heartbeat_when_collect_then_critical_path_runs_through_units_magmad_waited_for_to_first_heartbeat(  # noqa: E501
+        self,
+    ):
+        report = self._collect(
+            [
+                self._journal_entry("Starting magmad...", 12.3),
+                self._journal_entry("[SyncRPC] Got heartBeat from cloud", 15.2),
+                self._journal_entry("[SyncRPC] Got heartBeat from cloud", 45.2),
+            ]
+        )
+
+        self.assertEqual(
+            [(step["name"], step["start_s"], step["ready_s"]) for step in report["critical_path"]],
+            [
+                ("magma@redis", 10.0, 11.0),
+                ("magma@magmad", 12.0, 12.2),
+                ("first Orc8r heartbeat", 12.2, 15.2),
+            ],
+        )
+        self.assertEqual(report["first_heartbeat_s"], 15.2)
+        self.assertEqual(
+            [unit["name"] for unit in report["units"]],
+            ["magma@redis", "magma@state", "magma@magmad"],
+        )
+
+    def test_given_heartbeat_of_previous_magmad_only_when_collect_then_missing_heartbeat_is_flagged(  # noqa: E501
+        self,
+    ):
+        report = self._collect([self._journal_entry("[SyncRPC] Got heartBeat from cloud", 5.0)])
+
+        self.assertIsNone(report["first_heartbeat_s"])
+        self.assertEqual(
+            [step["name"] for step in report["critical_path"]], ["magma@redis", "magma@magmad"]
+        )
+        self.assertIn("magma@magmad hasn't reached Orc8r in the current boot!", report["flagged"])
+
+    def test_given_failed_magma_unit_when_collect_then_unit_is_flagged(self):
+        report = self._collect([])
+
+        self.assertIn("magma@mme is failed!", report["flagged"])
+
+    def test_given_report_when_to_graphviz_then_critical_path_edges_are_highlighted(self):
+        report = self._collect(
+            [self._journal_entry("Checkin Successful! Successfully sent states to the cloud!", 14)]
+        )
+
+        graphviz_source = self.startup_critical_path_report.to_graphviz(report)
+
+        self.assertIn('"magma@redis" -> "magma@magmad" [color=red, penwidth=2];', graphviz_source)
+        self.assertIn('"magma@redis" -> "magma@state";', graphviz_source)
+        self.assertIn(
+            '"magma@magmad" -> "first Orc8r heartbeat" [color=red, penwidth=2];', graphviz_source
+        )
+
+    def test_given_dot_output_when_write_graphviz_then_graphviz_source_is_written(self):
+        report = self._collect([])
+        output = os.path.join(self.tempdir.name, "magma-startup.dot")
+
+        self.startup_critical_path_report.write_graphviz(report, output)
+
+        with open(output, "r") as graphviz_source:
+            self.assertTrue(graphviz_source.read().startswith("digraph magma_startup {"))
+
+    @patch("magma_access_gateway_post_install.agw_startup_critical_path.check_output")
+    def test_given_svg_output_when_write_graphviz_then_graph_is_rendered_with_dot(
+        self, mock_check_output
+    ):
+        report = self._collect([])
+
+        self.startup_critical_path_report.write_graphviz(report, "/root/magma-startup.svg")
+
+        mock_check_output.assert_called_once_with(
+            ["dot", "-Tsvg", "-o", "/root/magma-startup.svg"],
+            input=self.startup_critical_path_report.to_graphviz(report).encode(),
+        )
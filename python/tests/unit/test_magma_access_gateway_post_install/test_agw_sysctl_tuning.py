@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from magma_access_gateway_post_install.agw_sysctl_tuning import AGWSysctlTuningReport
+
+
+class TestAGWSysctlTuningReport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sysctl_config_file = os.path.join(self.tempdir.name, "99-magma-agw.conf")
+        self.proc_sys = os.path.join(self.tempdir.name, "proc", "sys")
+        self.patcher = patch.object(AGWSysctlTuningReport, "PROC_SYS", self.proc_sys)
+        self.patcher.start()
+        self.sysctl_tuning_report = AGWSysctlTuningReport(self.sysctl_config_file)
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        self.tempdir.cleanup()
+
+    def _write_proc_sys(self, key: str, value: str):
+        path = os.path.join(self.proc_sys, *key.split("."))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as proc_sys_file:
+            proc_sys_file.write(value)
+
+    def test_given_kernel_not_tuned_during_installation_when_collect_then_nothing_is_flagged(
+        self,
+    ):
+        self.assertEqual(
+            self.sysctl_tuning_report.collect(), {"tuned": False, "settings": [], "flagged": []}
+        )
+
+    def test_given_sctp_module_not_loaded_after_reboot_when_collect_then_lost_sctp_settings_are_flagged(  # noqa: E501
+        self,
+    ):
+        with open(self.sysctl_config_file, "w") as sysctl_config:
+            sysctl_config.write(
+                "# This is the sysctl config written by magma-access-gateway snap\n"
+                "net.core.somaxconn = 4096\n"
+                "net.sctp.sctp_rmem = 4096 262144 16777216\n"
+            )
+        self._write_proc_sys("net.core.somaxconn", "4096\n")
+
+        report = self.sysctl_tuning_report.collect()
+
+        self.assertTrue(report["tuned"])
+        self.assertEqual(report["flagged"], ["net.sctp.sctp_rmem"])